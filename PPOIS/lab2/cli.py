@@ -0,0 +1,270 @@
+"""
+cli.py - консольная утилита для пакетной обработки записей
+
+Работает только с моделью (PetDatabase, XMLHandler) и не импортирует
+tkinter, поэтому подходит для скриптов и запускается быстро.
+
+Подкоманды:
+    import  - объединяет XML-файлы (и архивы) в один, при необходимости удаляя дубликаты
+    search  - выводит найденные записи в stdout
+    delete  - удаляет найденные записи и сохраняет оставшиеся
+    export  - выводит все записи в stdout (CSV, TSV или XML)
+    reminders - список питомцев, которым пора на повторный прием (по ветеринарам)
+
+Условия поиска совпадают с условиями диалогов приложения:
+    --name ИМЯ --birth ДАТА, --visit ДАТА --vet ФИО или --diagnosis ФРАЗА
+
+Примеры:
+    python cli.py import data/demo1.xml data/demo2.xml --dedupe -o all.xml.gz
+    python cli.py search all.xml.gz --diagnosis отит --format tsv
+    python cli.py search all.xml.gz --diagnosis отит --limit 10
+    python cli.py search all.xml.gz --vet "Иванов И.И." --visit 01.02.2024 --count
+    python cli.py delete all.xml.gz --vet "Иванов И.И." --visit 01.02.2024 -o all.xml.gz
+    python cli.py export all.xml.gz > pets.csv
+    python cli.py reminders all.xml.gz --days 365 --within 7 --output-dir recall/
+"""
+
+import argparse
+import os
+import sys
+from datetime import date, timedelta
+
+# Добавляем корневую директорию в путь Python
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from model import PetDatabase, XMLHandler
+from model.pet import parse_date
+from model.xml_handler import PET_FIELDS
+
+# Форматы вывода записей в stdout
+OUTPUT_FORMATS = ("csv", "tsv", "xml")
+
+
+def load_database(filenames):
+    """
+    Загружает записи из нескольких XML-файлов в одну базу
+
+    Args:
+        filenames: Пути к файлам (.xml, .xml.gz, .xml.bz2, .xml.xz)
+
+    Returns:
+        Заполненная PetDatabase
+    """
+    database = PetDatabase()
+    for filename in filenames:
+        database.add_pets(XMLHandler.load_from_xml(filename))
+    return database
+
+
+def unique_pets(pets):
+    """
+    Перебирает записи, пропуская повторы
+
+    Дубликатами считаются записи с совпадающими полями (имя и ФИО
+    ветеринара сравниваются без учета регистра). Сохраняется первая запись.
+
+    Args:
+        pets: Итерируемая коллекция объектов Pet
+
+    Yields:
+        Объекты Pet без повторов
+    """
+    seen = set()
+    for pet in pets:
+        key = (pet.name.lower(), pet.birth_date, pet.last_visit,
+               pet.vet_name.lower(), pet.diagnosis)
+        if key not in seen:
+            seen.add(key)
+            yield pet
+
+
+def find_pets(database, args):
+    """
+    Выполняет поиск по условию из аргументов командной строки
+
+    Returns:
+        QueryResult (записи отбираются по мере перебора)
+
+    Raises:
+        ValueError: Если условие не задано, задано не полностью или дата некорректна
+    """
+    if args.diagnosis is not None:
+        return database.query_by_diagnosis_phrase(args.diagnosis)
+    if args.name is not None and args.birth is not None:
+        return database.query_by_name_and_birth(args.name, parse_date(args.birth))
+    if args.visit is not None and args.vet is not None:
+        return database.query_by_visit_and_vet(parse_date(args.visit), args.vet)
+    raise ValueError("Укажите условие: --name и --birth, --visit и --vet или --diagnosis")
+
+
+def write_pets(pets, stream, output_format):
+    """
+    Записывает питомцев в поток по мере перебора
+
+    Args:
+        pets: Итерируемая коллекция объектов Pet
+        stream: Текстовый поток (обычно sys.stdout)
+        output_format: "csv", "tsv" или "xml"
+    """
+    if output_format == "xml":
+        XMLHandler.write_xml_stream(pets, stream)
+        return
+
+    import csv
+
+    writer = csv.writer(stream, delimiter="\t" if output_format == "tsv" else ",",
+                        lineterminator="\n")
+    writer.writerow(PET_FIELDS)
+    for pet in pets:
+        writer.writerow((pet.name, pet.birth_date.isoformat(), pet.last_visit.isoformat(),
+                         pet.vet_name, pet.diagnosis))
+
+
+def save_pets(pets, output):
+    """Сохраняет записи в файл или, если output равен "-", выводит XML в stdout"""
+    if output == "-":
+        XMLHandler.write_xml_stream(pets, sys.stdout)
+    else:
+        XMLHandler.save_to_xml(pets, output)
+
+
+# Подкоманды
+
+def cmd_import(args):
+    database = load_database(args.files)
+    pets = unique_pets(database) if args.dedupe else database
+    pets = list(pets)
+    save_pets(pets, args.output)
+    print(f"Сохранено записей: {len(pets)} (загружено: {len(database)})", file=sys.stderr)
+
+
+def cmd_search(args):
+    database = load_database(args.files)
+    found = find_pets(database, args)
+    if args.limit is not None:
+        found = found.limit(args.limit)
+    if args.count:
+        print(found.count())
+    else:
+        write_pets(found, sys.stdout, args.format)
+
+
+def cmd_delete(args):
+    database = load_database(args.files)
+    deleted = database.delete_by_ids([pet.record_id for pet in find_pets(database, args)])
+    save_pets(database, args.output)
+    print(f"Удалено записей: {deleted}, осталось: {len(database)}", file=sys.stderr)
+
+
+def cmd_export(args):
+    database = load_database(args.files)
+    write_pets(unique_pets(database) if args.dedupe else database, sys.stdout, args.format)
+
+
+def cmd_reminders(args):
+    from model.reminders import ReminderIndex, export_reminders_per_vet, write_reminders_csv
+
+    database = load_database(args.files)
+    index = ReminderIndex(args.days)
+    database.attach_index(index)
+
+    until = parse_date(args.until) if args.until else date.today() + timedelta(days=args.within)
+    since = parse_date(args.since) if args.since else None
+    if args.output_dir:
+        paths = export_reminders_per_vet(index, args.output_dir, until, since)
+        for vet_name, path in paths.items():
+            print(f"{vet_name}: {path}", file=sys.stderr)
+    else:
+        write_reminders_csv(index.due(until, since, args.vet), sys.stdout)
+
+
+def build_parser():
+    """Создает разборщик аргументов командной строки"""
+    parser = argparse.ArgumentParser(description="Пакетная обработка записей ветеринарной клиники")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_files(subparser):
+        subparser.add_argument("files", nargs="+",
+                               help="XML-файлы или архивы (.xml.gz, .xml.bz2, .xml.xz)")
+
+    def add_query(subparser):
+        query = subparser.add_argument_group("условие поиска")
+        query.add_argument("--name", help="Имя питомца (вместе с --birth)")
+        query.add_argument("--birth", help="Дата рождения ДД.ММ.ГГГГ или ГГГГ-ММ-ДД")
+        query.add_argument("--visit", help="Дата последнего приема (вместе с --vet)")
+        query.add_argument("--vet", help="ФИО ветеринара")
+        query.add_argument("--diagnosis", help="Фраза из диагноза")
+
+    def add_format(subparser):
+        subparser.add_argument("--format", choices=OUTPUT_FORMATS, default="csv",
+                               help="Формат вывода (по умолчанию csv)")
+
+    import_parser = subparsers.add_parser("import", help="Объединение файлов в один")
+    add_files(import_parser)
+    import_parser.add_argument("-o", "--output", required=True,
+                               help="Файл для сохранения (\"-\" - XML в stdout)")
+    import_parser.add_argument("--dedupe", action="store_true", help="Удалить повторяющиеся записи")
+    import_parser.set_defaults(handler=cmd_import)
+
+    search_parser = subparsers.add_parser("search", help="Поиск записей")
+    add_files(search_parser)
+    add_query(search_parser)
+    add_format(search_parser)
+    search_parser.add_argument("--limit", type=int,
+                               help="Вывести не больше N записей (поиск останавливается на N-й)")
+    search_parser.add_argument("--count", action="store_true",
+                               help="Вывести только количество найденных записей")
+    search_parser.set_defaults(handler=cmd_search)
+
+    delete_parser = subparsers.add_parser("delete", help="Удаление найденных записей")
+    add_files(delete_parser)
+    add_query(delete_parser)
+    delete_parser.add_argument("-o", "--output", required=True,
+                               help="Файл для сохранения оставшихся записей (\"-\" - XML в stdout)")
+    delete_parser.set_defaults(handler=cmd_delete)
+
+    export_parser = subparsers.add_parser("export", help="Вывод всех записей")
+    add_files(export_parser)
+    add_format(export_parser)
+    export_parser.add_argument("--dedupe", action="store_true", help="Пропустить повторяющиеся записи")
+    export_parser.set_defaults(handler=cmd_export)
+
+    reminders_parser = subparsers.add_parser("reminders", help="Напоминания о повторном приеме")
+    add_files(reminders_parser)
+    reminders_parser.add_argument("--days", type=int, default=365,
+                                  help="Интервал повторного приема, дней (по умолчанию 365)")
+    reminders_parser.add_argument("--within", type=int, default=0,
+                                  help="Включить сроки на N дней вперед (например, 7 - на неделю)")
+    reminders_parser.add_argument("--until", help="Последняя дата срока (вместо --within)")
+    reminders_parser.add_argument("--since", help="Первая дата срока (по умолчанию - включая просроченные)")
+    reminders_parser.add_argument("--vet", help="Только пациенты указанного ветеринара")
+    reminders_parser.add_argument("--output-dir",
+                                  help="Сохранить CSV-файл для каждого ветеринара в папку")
+    reminders_parser.set_defaults(handler=cmd_reminders)
+
+    return parser
+
+
+def main(argv=None):
+    """
+    Точка входа консольной утилиты
+
+    Returns:
+        Код завершения процесса
+    """
+    args = build_parser().parse_args(argv)
+    try:
+        args.handler(args)
+    except BrokenPipeError:
+        # Вывод прерван (например, "| head"): перенаправляем stdout, чтобы
+        # интерпретатор не сообщал об ошибке при сбросе буфера на выходе
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except (ValueError, RuntimeError) as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
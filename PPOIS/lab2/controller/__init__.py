@@ -2,9 +2,10 @@
 __init__.py - инициализация пакета controller
 
 Этот файл позволяет импортировать классы напрямую из пакета controller:
-from controller import AppController
+from controller import AppController, RemotePetDatabase
 """
 
 from .app_controller import AppController
+from .remote_database import RemotePetDatabase
 
-__all__ = ['AppController']
\ No newline at end of file
+__all__ = ['AppController', 'RemotePetDatabase']
\ No newline at end of file
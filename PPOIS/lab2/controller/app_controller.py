@@ -5,34 +5,86 @@ app_controller.py - главный контроллер приложения
 - Обработка пользовательских действий (добавление, поиск, удаление, сохранение, загрузка)
 - Управление постраничной навигацией
 - Связь между моделью и представлением
+- Передача событий изменения базы открытым окнам
 """
 
 import os
-from datetime import date
+import queue
+import threading
+from datetime import date, datetime, timedelta
 from tkinter import filedialog, messagebox
 
-from model import Pet, PetDatabase, XMLHandler
-from view.dialogs.add_dialog import AddPetDialog
-from view.dialogs.search_dialog import SearchDialog
-from view.dialogs.delete_dialog import DeleteDialog
+from model import (Appointment, HashIndex, Pet, PetDatabase, QueryResult, Schedule,
+                   ScheduleConflict, XMLHandler)
+from model.database import (NAME_BIRTH_FIELDS, VISIT_VET_FIELDS, match_diagnosis_phrase,
+                            match_name_and_birth, match_visit_and_vet)
+from model.pet import parse_date
+from model.instrumentation import instrumentation
+from model.reminders import ReminderIndex, export_reminders_per_vet
+from model.schedule import load_appointments_csv, save_appointments_csv
+from model.background_search import BackgroundSearch
+
+# Период проверки завершения фонового сохранения, мс
+SAVE_POLL_INTERVAL_MS = 100
+
+# Период обновления таблицы во время фоновой загрузки, мс
+LOAD_POLL_INTERVAL_MS = 200
+
+# Типы файлов для диалогов открытия и сохранения (включая сжатые архивы)
+XML_FILETYPES = [
+    ("XML файлы", "*.xml"),
+    ("Сжатые XML-архивы", "*.xml.gz *.xml.bz2 *.xml.xz"),
+    ("Все файлы", "*.*")
+]
+
+# Типы файлов для импорта и экспорта записей на прием
+CSV_FILETYPES = [
+    ("CSV файлы", "*.csv"),
+    ("Все файлы", "*.*")
+]
 
 class AppController:
-    def __init__(self, view=None):
+    def __init__(self, view=None, database=None, lookup_indexes=True):
         """
         Инициализация контроллера
         
         Args:
             view: Объект представления (MainWindow)
+            database: Хранилище записей (по умолчанию - новая потокобезопасная
+                PetDatabase); можно передать, например, ShardedPetDatabase
+            lookup_indexes: Подключать ли хеш-индексы для поиска по условиям
+                1 и 2 (отключаются для сравнения в utils/workload.py)
         """
         self.view = view
-        self.database = PetDatabase()
+        self.database = database if database is not None else PetDatabase(thread_safe=True)
         self.current_file = None  # Текущий файл для сохранения/загрузки
+        self.reminders = None  # Индекс напоминаний (создается при первом обращении)
+        self.schedule = Schedule()  # Расписание приемов ветеринаров
+        self._changes = queue.SimpleQueue()  # События изменения базы из любых потоков
+        self._change_listeners = []  # Окна, получающие события изменения
+        if lookup_indexes:
+            self._attach_lookup_indexes()
+    
+    def _attach_lookup_indexes(self):
+        """
+        Подключает хеш-индексы для поиска по условиям 1 и 2
+        
+        С ними поиск по имени и дате рождения или по дате приема и
+        ветеринару выбирает записи из индекса, а не просматривает всю базу.
+        Общая база на сервере индексов не поддерживает - там ищет сервер.
+        """
+        for fields in (NAME_BIRTH_FIELDS, VISIT_VET_FIELDS):
+            try:
+                self.database.attach_index(HashIndex(fields))
+            except NotImplementedError:
+                return
     
     def initialize(self):
         """Завершает инициализацию контроллера после установки view"""
         # Обновляем интерфейс
         self.update_view()
     
+    @instrumentation.measure("controller.load_demo_data")
     def load_demo_data(self):
         """Загружает демо-данные из XML-файлов"""
         try:
@@ -40,16 +92,14 @@ class AppController:
             demo1_path = os.path.join("data", "demo1.xml")
             if os.path.exists(demo1_path):
                 pets = XMLHandler.load_from_xml(demo1_path)
-                for pet in pets:
-                    self.database.add_pet(pet)
+                self.database.add_pets(pets)
                 print(f"Загружено {len(pets)} записей из {demo1_path}")
             
             # Загружаем данные из demo2.xml
             demo2_path = os.path.join("data", "demo2.xml")
             if os.path.exists(demo2_path):
                 pets = XMLHandler.load_from_xml(demo2_path)
-                for pet in pets:
-                    self.database.add_pet(pet)
+                self.database.add_pets(pets)
                 print(f"Загружено {len(pets)} записей из {demo2_path}")
             
             # Обновляем интерфейс только один раз после загрузки всех данных
@@ -57,8 +107,10 @@ class AppController:
         except Exception as e:
             print(f"Демо-данные не загружены: {str(e)}")
     
+    @instrumentation.measure("controller.update_view")
     def update_view(self):
         """Обновляет таблицу и информацию о пагинации в представлении"""
+        self._dispatch_changes()
         if self.view is None:
             return
             
@@ -70,29 +122,259 @@ class AppController:
         
         # Обновляем информацию о пагинации
         total_pages = self.database.get_total_pages()
-        total_records = len(self.database.get_all_pets())
+        total_records = len(self.database)
         self.view.pagination.update_pagination(
             self.database.get_current_page(),
             total_pages,
             total_records
         )
     
+    #События изменения базы
+    
+    def subscribe_changes(self, callback):
+        """
+        Подписывает окно на события изменения базы
+        
+        База сообщает об изменениях в потоке писателя (например, фоновой
+        загрузки), поэтому события складываются в очередь и передаются
+        окнам в потоке Tk при обновлении представления: после каждого
+        изменения и периодически во время фоновой загрузки.
+        
+        Args:
+            callback: Функция, принимающая ChangeEvent
+        """
+        if not self._change_listeners:
+            self.database.subscribe(self._changes.put)
+        self._change_listeners.append(callback)
+    
+    def unsubscribe_changes(self, callback):
+        """Отписывает окно от событий изменения базы"""
+        self._change_listeners.remove(callback)
+        if not self._change_listeners:
+            self.database.unsubscribe(self._changes.put)
+            self._dispatch_changes()
+    
+    def _dispatch_changes(self):
+        """Передает накопившиеся события изменения подписанным окнам"""
+        while True:
+            try:
+                event = self._changes.get_nowait()
+            except queue.Empty:
+                return
+            for callback in list(self._change_listeners):
+                callback(event)
+    
     #Методы для отображения диалоговых окон 
+    # Диалоги импортируются при первом открытии: без окна (utils/workload.py)
+    # контроллер работает и там, где нет tkcalendar
     
     def show_add_dialog(self):
         """Показывает диалог добавления питомца"""
+        from view.dialogs.add_dialog import AddPetDialog
         AddPetDialog(self.view, self)
     
+    def show_edit_dialog(self):
+        """Показывает диалог изменения питомца, выбранного в таблице"""
+        record_id = self.view.get_selected_record_id()
+        if record_id is None:
+            messagebox.showwarning("Предупреждение", "Выберите питомца в таблице")
+            return
+        for pet in self.database.get_page(self.database.get_current_page()):
+            if pet.record_id == record_id:
+                from view.dialogs.edit_dialog import EditPetDialog
+                EditPetDialog(self.view, self, pet)
+                return
+    
     def show_search_dialog(self):
         """Показывает диалог поиска питомца"""
+        from view.dialogs.search_dialog import SearchDialog
         SearchDialog(self.view, self)
     
     def show_delete_dialog(self):
         """Показывает диалог удаления питомца"""
+        from view.dialogs.delete_dialog import DeleteDialog
         DeleteDialog(self.view, self)
     
+    def show_stats_dialog(self):
+        """Показывает окно статистики длительности операций"""
+        from view.dialogs.stats_dialog import StatsDialog
+        StatsDialog(self.view, instrumentation)
+    
+    def show_reminders_dialog(self):
+        """Показывает окно напоминаний о повторном приеме"""
+        from view.dialogs.reminders_dialog import RemindersDialog
+        RemindersDialog(self.view, self)
+    
+    def show_appointment_dialog(self):
+        """Показывает диалог записи на прием"""
+        from view.dialogs.appointment_dialog import AppointmentDialog
+        AppointmentDialog(self.view, self)
+    
+    #Напоминания о повторном приеме
+    
+    def _reminder_index(self):
+        """
+        Возвращает индекс напоминаний, подключенный к базе
+        
+        Индекс строится один раз и затем обновляется базой при добавлении
+        и удалении записей. Для общей базы на сервере индекс не может
+        отслеживать изменения других стоек, поэтому строится заново.
+        """
+        if self.reminders is not None:
+            return self.reminders
+        index = ReminderIndex()
+        try:
+            self.database.attach_index(index)
+        except NotImplementedError:
+            for pet in self.database:
+                index.on_insert(pet)
+            return index
+        self.reminders = index
+        return index
+    
+    def get_reminder_vets(self):
+        """Возвращает ФИО ветеринаров для фильтра напоминаний"""
+        return self._reminder_index().vets()
+    
+    @instrumentation.measure("controller.get_reminders", records=len)
+    def get_reminders(self, interval_days, within_days=0, vet_name=None):
+        """
+        Список питомцев, которым пора на повторный прием
+        
+        Args:
+            interval_days: Интервал повторного приема, дней
+            within_days: Включить сроки на столько дней вперед (0 - на сегодня)
+            vet_name: Только пациенты указанного ветеринара (None - все)
+            
+        Returns:
+            Список Reminder, отсортированный по сроку приема
+        """
+        until = date.today() + timedelta(days=within_days)
+        return self._reminder_index().due(until, vet_name=vet_name, interval_days=interval_days)
+    
+    def export_reminders(self, directory, interval_days, within_days=0):
+        """
+        Сохраняет напоминания каждого ветеринара в отдельный CSV-файл
+        
+        Args:
+            directory: Папка для файлов
+            interval_days: Интервал повторного приема, дней
+            within_days: Включить сроки на столько дней вперед
+        """
+        try:
+            until = date.today() + timedelta(days=within_days)
+            paths = export_reminders_per_vet(self._reminder_index(), directory, until,
+                                             interval_days=interval_days)
+            messagebox.showinfo("Успех", f"Сохранено файлов: {len(paths)} в папку {directory}")
+        except OSError as e:
+            messagebox.showerror("Ошибка", f"Не удалось сохранить напоминания: {str(e)}")
+    
+    #Расписание приемов
+    
+    def get_vet_names(self):
+        """Возвращает ФИО ветеринаров из базы питомцев и расписания"""
+        names = {name.lower(): name for name in self._reminder_index().vets()}
+        for name in self.schedule.vets():
+            names.setdefault(name.lower(), name)
+        return sorted(names.values(), key=str.lower)
+    
+    def book_appointment(self, pet_name, vet_name, date_str, time_str, duration_minutes, note=""):
+        """
+        Записывает питомца на прием
+        
+        Args:
+            pet_name: Имя питомца
+            vet_name: ФИО ветеринара
+            date_str: Дата приема
+            time_str: Время начала в формате ЧЧ:ММ
+            duration_minutes: Длительность приема в минутах
+            note: Примечание
+            
+        Returns:
+            True, если запись создана
+        """
+        try:
+            start = self._parse_datetime(date_str, time_str)
+            appointment = Appointment(pet_name, vet_name, start,
+                                      start + timedelta(minutes=int(duration_minutes)), note)
+            self.schedule.book(appointment)
+            messagebox.showinfo(
+                "Успех",
+                f"{pet_name} записан(а) на {start.strftime('%d.%m.%Y %H:%M')}"
+            )
+            return True
+        except ScheduleConflict as e:
+            messagebox.showerror("Время занято", str(e))
+        except ValueError as e:
+            messagebox.showerror("Ошибка", f"Некорректные данные записи: {str(e)}")
+        return False
+    
+    def cancel_appointment(self, appointment_id):
+        """Отменяет запись на прием"""
+        return self.schedule.cancel(appointment_id)
+    
+    def get_day_appointments(self, vet_name, date_str):
+        """
+        Возвращает приемы ветеринара за день
+        
+        Returns:
+            Список объектов Appointment (пустой при некорректной дате)
+        """
+        try:
+            return self.schedule.appointments_on(vet_name, self._parse_date(date_str))
+        except ValueError:
+            return []
+    
+    def get_free_slots(self, vet_name, date_str, duration_minutes):
+        """
+        Возвращает свободные промежутки ветеринара за день
+        
+        Returns:
+            Список кортежей (начало, конец) (пустой при некорректных данных)
+        """
+        try:
+            return self.schedule.free_slots(vet_name, self._parse_date(date_str),
+                                            timedelta(minutes=int(duration_minutes)))
+        except ValueError:
+            return []
+    
+    def import_appointments(self):
+        """Загружает существующие записи на прием из CSV-файла"""
+        try:
+            filename = filedialog.askopenfilename(
+                title="Выберите файл с записями на прием",
+                filetypes=CSV_FILETYPES
+            )
+            if not filename:
+                return
+            
+            imported, rejected = self.schedule.import_appointments(load_appointments_csv(filename))
+            message = f"Импортировано записей: {imported}"
+            if rejected:
+                message += f"\nОтклонено из-за пересечений: {len(rejected)}"
+                message += "".join(f"\n- {conflict.appointment}: {conflict}"
+                                   for conflict in rejected[:5])
+            messagebox.showinfo("Импорт записей", message)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Ошибка", f"Не удалось импортировать записи: {str(e)}")
+    
+    def export_appointments(self):
+        """Сохраняет все записи на прием в CSV-файл"""
+        try:
+            filename = filedialog.asksaveasfilename(
+                title="Сохранить записи на прием",
+                defaultextension=".csv",
+                filetypes=CSV_FILETYPES
+            )
+            if filename:
+                save_appointments_csv(self.schedule, filename)
+                messagebox.showinfo("Успех", f"Сохранено записей: {len(self.schedule)}")
+        except OSError as e:
+            messagebox.showerror("Ошибка", f"Не удалось сохранить записи: {str(e)}")
+    
     #Методы для работы с данными 
     
+    @instrumentation.measure("controller.add_pet")
     def add_pet(self, pet_data):
         """
         Добавляет нового питомца в базу данных
@@ -127,8 +409,57 @@ class AppController:
         except Exception as e:
             messagebox.showerror("Ошибка", f"Не удалось добавить питомца: {str(e)}")
     
+    @instrumentation.measure("controller.edit_pet")
+    def edit_pet(self, record_id, pet_data):
+        """
+        Изменяет запись о питомце
+        
+        Args:
+            record_id: Идентификатор записи
+            pet_data: Кортеж с данными питомца (name, birth_date, last_visit, vet_name, diagnosis)
+            
+        Returns:
+            True, если запись изменена
+        """
+        try:
+            name, birth_date_str, last_visit_str, vet_name, diagnosis = pet_data
+            
+            # Преобразование строк в даты
+            birth_date = self._parse_date(birth_date_str)
+            last_visit = self._parse_date(last_visit_str)
+            
+            # Проверка логики дат (дата последнего визита не может быть раньше даты рождения)
+            if last_visit < birth_date:
+                messagebox.showerror(
+                    "Ошибка", 
+                    "Дата последнего приема не может быть раньше даты рождения питомца"
+                )
+                return False
+            
+            self.database.update_pet(
+                record_id,
+                name=name,
+                birth_date=birth_date,
+                last_visit=last_visit,
+                vet_name=vet_name,
+                diagnosis=diagnosis
+            )
+            
+            # Обновление интерфейса
+            self.update_view()
+            messagebox.showinfo("Успех", "Запись о питомце изменена")
+            return True
+        except KeyError:
+            messagebox.showerror("Ошибка", "Запись не найдена (возможно, она уже удалена)")
+        except ValueError as e:
+            messagebox.showerror("Ошибка", f"Некорректный формат данных: {str(e)}")
+        except Exception as e:
+            messagebox.showerror("Ошибка", f"Не удалось изменить запись: {str(e)}")
+        return False
+    
     #Методы поиска согласно варианту 8 
     
+    @instrumentation.measure("controller.search_by_name_and_birth", records=len)
     def search_by_name_and_birth(self, name, birth_date_str):
         """
         Поиск по имени питомца и дате рождения (условие 1)
@@ -150,6 +481,7 @@ class AppController:
             messagebox.showerror("Ошибка", f"Ошибка поиска: {str(e)}")
             return []
     
+    @instrumentation.measure("controller.search_by_visit_and_vet", records=len)
     def search_by_visit_and_vet(self, last_visit_str, vet_name):
         """
         Поиск по дате последнего приема и ФИО ветеринара (условие 2)
@@ -171,6 +503,7 @@ class AppController:
             messagebox.showerror("Ошибка", f"Ошибка поиска: {str(e)}")
             return []
     
+    @instrumentation.measure("controller.search_by_diagnosis_phrase", records=len)
     def search_by_diagnosis_phrase(self, phrase):
         """
         Поиск по фразе из диагноза (условие 3)
@@ -187,8 +520,103 @@ class AppController:
             messagebox.showerror("Ошибка", f"Ошибка поиска: {str(e)}")
             return []
     
+    #Ленивый поиск (первые записи и количество без построения всего списка)
+    
+    def query_by_name_and_birth(self, name, birth_date_str):
+        """
+        Ленивый поиск по имени питомца и дате рождения (условие 1)
+        
+        Returns:
+            QueryResult (пустой при ошибке, о которой сообщается пользователю)
+        """
+        try:
+            return self.database.query_by_name_and_birth(name, self._parse_date(birth_date_str))
+        except ValueError:
+            messagebox.showerror("Ошибка", "Некорректный формат даты рождения")
+        except Exception as e:
+            messagebox.showerror("Ошибка", f"Ошибка поиска: {str(e)}")
+        return QueryResult([])
+    
+    def query_by_visit_and_vet(self, last_visit_str, vet_name):
+        """
+        Ленивый поиск по дате последнего приема и ФИО ветеринара (условие 2)
+        
+        Returns:
+            QueryResult (пустой при ошибке, о которой сообщается пользователю)
+        """
+        try:
+            return self.database.query_by_visit_and_vet(self._parse_date(last_visit_str), vet_name)
+        except ValueError:
+            messagebox.showerror("Ошибка", "Некорректный формат даты последнего приема")
+        except Exception as e:
+            messagebox.showerror("Ошибка", f"Ошибка поиска: {str(e)}")
+        return QueryResult([])
+    
+    def query_by_diagnosis_phrase(self, phrase):
+        """
+        Ленивый поиск по фразе из диагноза (условие 3)
+        
+        Returns:
+            QueryResult (пустой при ошибке, о которой сообщается пользователю)
+        """
+        try:
+            return self.database.query_by_diagnosis_phrase(phrase)
+        except Exception as e:
+            messagebox.showerror("Ошибка", f"Ошибка поиска: {str(e)}")
+        return QueryResult([])
+    
+    def start_diagnosis_search(self, phrase):
+        """
+        Запускает поиск по фразе из диагноза с выдачей результатов частями
+        
+        Если база потокобезопасна, поиск идет в фоновом потоке по снимку
+        базы (снимок создается за O(1) и не меняется во время поиска).
+        Иначе (секционированная база, общая база на сервере) поиск
+        выполняется сразу, а результаты забираются так же частями.
+        
+        Args:
+            phrase: Фраза для поиска в диагнозе
+            
+        Returns:
+            Объект BackgroundSearch
+        """
+        if getattr(self.database, "thread_safe", False):
+            snapshot = self.database.snapshot()
+            return BackgroundSearch(
+                lambda cancel: snapshot.iter_diagnosis_matches(phrase, cancel)
+            )
+        return BackgroundSearch(
+            lambda cancel: [self.database.find_by_diagnosis_phrase(phrase)],
+            background=False
+        )
+    
+    #Условия поиска для обновления результатов по событиям изменения
+    
+    def name_and_birth_filter(self, name, birth_date_str):
+        """
+        Предикат условия поиска 1 (см. search_by_name_and_birth)
+        
+        Raises:
+            ValueError: При некорректном формате даты
+        """
+        return match_name_and_birth(name, self._parse_date(birth_date_str))
+    
+    def visit_and_vet_filter(self, last_visit_str, vet_name):
+        """
+        Предикат условия поиска 2 (см. search_by_visit_and_vet)
+        
+        Raises:
+            ValueError: При некорректном формате даты
+        """
+        return match_visit_and_vet(self._parse_date(last_visit_str), vet_name)
+    
+    def diagnosis_filter(self, phrase):
+        """Предикат условия поиска 3 (см. search_by_diagnosis_phrase)"""
+        return match_diagnosis_phrase(phrase)
+    
     #Методы удаления 
     
+    @instrumentation.measure("controller.delete_pets")
     def delete_pets(self, pets_to_delete):
         """
         Удаляет указанных питомцев из базы данных
@@ -214,53 +642,136 @@ class AppController:
         try:
             filename = filedialog.askopenfilename(
                 title="Выберите XML-файл",
-                filetypes=[("XML файлы", "*.xml"), ("Все файлы", "*.*")]
+                filetypes=XML_FILETYPES
             )
             
             if filename:
-                pets = XMLHandler.load_from_xml(filename)
-                initial_count = len(self.database.get_all_pets())
-                
-                for pet in pets:
-                    self.database.add_pet(pet)
-                
                 self.current_file = filename
-                self.update_view()
-                
-                added_count = len(self.database.get_all_pets()) - initial_count
-                messagebox.showinfo(
-                    "Успех", 
-                    f"Загружено {added_count} записей из {os.path.basename(filename)}"
-                )
+                self._load_file(filename)
         except Exception as e:
             messagebox.showerror("Ошибка", f"Не удалось загрузить файл: {str(e)}")
     
+    def _load_file(self, filename):
+        """
+        Загружает записи из файла в фоновом потоке
+        
+        Если база потокобезопасна, разбор файла и добавление записей
+        выполняются в отдельном потоке, а таблица периодически обновляется,
+        показывая ход загрузки. Иначе (или без окна) загрузка синхронная.
+        
+        Args:
+            filename: Имя файла для загрузки
+        """
+        outcome = {}
+        
+        # Замеряется только разбор файла и добавление записей, без диалогов
+        @instrumentation.measure("controller.load_file", records=int)
+        def load():
+            return self.database.add_pets(XMLHandler.load_from_xml(filename))
+        
+        def run_load():
+            try:
+                outcome["count"] = load()
+            except Exception as e:
+                outcome["error"] = e
+        
+        if self.view is None or not getattr(self.database, "thread_safe", False):
+            run_load()
+            self._finish_load(filename, outcome)
+            return
+        
+        worker = threading.Thread(target=run_load, name="xml-load", daemon=True)
+        worker.start()
+        self.view.after(LOAD_POLL_INTERVAL_MS, self._check_load, worker, filename, outcome)
+    
+    def _check_load(self, worker, filename, outcome):
+        """Обновляет таблицу во время фоновой загрузки и сообщает о ее завершении"""
+        self.update_view()
+        if worker.is_alive():
+            self.view.after(LOAD_POLL_INTERVAL_MS, self._check_load, worker, filename, outcome)
+        else:
+            self._finish_load(filename, outcome)
+    
+    def _finish_load(self, filename, outcome):
+        if "error" in outcome:
+            messagebox.showerror("Ошибка", f"Не удалось загрузить файл: {str(outcome['error'])}")
+            return
+        self.update_view()
+        messagebox.showinfo(
+            "Успех", 
+            f"Загружено {outcome['count']} записей из {os.path.basename(filename)}"
+        )
+    
     def save_to_xml(self):
         """Сохраняет данные в XML-файл"""
         try:
             # Если есть текущий файл, сохраняем в него
             if self.current_file and messagebox.askyesno("Сохранение", 
                     f"Сохранить данные в файл {os.path.basename(self.current_file)}?"):
-                XMLHandler.save_to_xml(self.database.get_all_pets(), self.current_file)
-                messagebox.showinfo("Успех", "Данные успешно сохранены")
+                self._save_snapshot(self.current_file)
                 return
             
             # Иначе запрашиваем имя файла
             filename = filedialog.asksaveasfilename(
                 title="Сохранить как",
                 defaultextension=".xml",
-                filetypes=[("XML файлы", "*.xml"), ("Все файлы", "*.*")]
+                filetypes=XML_FILETYPES
             )
             
             if filename:
-                XMLHandler.save_to_xml(self.database.get_all_pets(), filename)
+                self._save_snapshot(filename)
                 self.current_file = filename
-                messagebox.showinfo("Успех", "Данные успешно сохранены")
         except Exception as e:
             messagebox.showerror("Ошибка", f"Не удалось сохранить файл: {str(e)}")
     
+    def _save_snapshot(self, filename):
+        """
+        Сохраняет снимок базы в фоновом потоке
+        
+        Снимок создается мгновенно и не меняется при последующих добавлениях
+        и удалениях, поэтому пользователь может продолжать работу во время
+        сохранения. Без окна (view is None) сохранение выполняется синхронно.
+        
+        Args:
+            filename: Имя файла для сохранения
+        """
+        snapshot = self.database.snapshot()
+        
+        # Замеряется только запись файла, без диалогов и запуска потока
+        @instrumentation.measure("controller.save_file", records=int)
+        def save():
+            XMLHandler.save_to_xml(snapshot, filename)
+            return len(snapshot)
+        
+        if self.view is None:
+            save()
+            return
+        
+        outcome = {}
+        
+        def run_save():
+            try:
+                save()
+            except Exception as e:
+                outcome["error"] = e
+        
+        # Поток не фоновый (daemon), чтобы выход из приложения дождался записи файла
+        worker = threading.Thread(target=run_save, name="xml-save")
+        worker.start()
+        self.view.after(SAVE_POLL_INTERVAL_MS, self._check_save, worker, outcome, len(snapshot))
+    
+    def _check_save(self, worker, outcome, count):
+        """Периодически проверяет завершение фонового сохранения в потоке Tk"""
+        if worker.is_alive():
+            self.view.after(SAVE_POLL_INTERVAL_MS, self._check_save, worker, outcome, count)
+        elif "error" in outcome:
+            messagebox.showerror("Ошибка", f"Не удалось сохранить файл: {str(outcome['error'])}")
+        else:
+            messagebox.showinfo("Успех", f"Данные успешно сохранены ({count} записей)")
+    
     #Методы для постраничной навигации 
     
+    @instrumentation.measure("controller.change_page")
     def change_page(self, page_num):
         """
         Изменяет текущую страницу
@@ -277,6 +788,7 @@ class AppController:
             else:
                 messagebox.showinfo("Информация", "Нет данных для отображения")
     
+    @instrumentation.measure("controller.change_page_size")
     def change_page_size(self, page_size):
         """
         Изменяет количество записей на странице
@@ -306,42 +818,22 @@ class AppController:
     
     def _parse_date(self, date_str):
         """
-        Парсит строку в объект date
-        
-        Поддерживаемые форматы:
-        - ДД.ММ.ГГГГ
-        - ГГГГ-ММ-ДД
+        Парсит строку в объект date (см. model.pet.parse_date)
         
-        Args:
-            date_str: Строка с датой
-            
-        Returns:
-            Объект date
-            
         Raises:
             ValueError: При некорректном формате даты
         """
-        date_str = date_str.strip()
+        return parse_date(date_str)
+    
+    def _parse_datetime(self, date_str, time_str):
+        """
+        Объединяет дату и время в формате ЧЧ:ММ в объект datetime
         
+        Raises:
+            ValueError: При некорректном формате даты или времени
+        """
         try:
-            # Попробуем формат ДД.ММ.ГГГГ
-            if '.' in date_str:
-                parts = date_str.split('.')
-                if len(parts) == 3:
-                    day = int(parts[0])
-                    month = int(parts[1])
-                    year = int(parts[2])
-                    return date(year, month, day)
-            
-            # Попробуем формат ГГГГ-ММ-ДД
-            if '-' in date_str:
-                parts = date_str.split('-')
-                if len(parts) == 3:
-                    year = int(parts[0])
-                    month = int(parts[1])
-                    day = int(parts[2])
-                    return date(year, month, day)
-            
-            raise ValueError(f"Некорректный формат даты: {date_str}")
-        except (ValueError, TypeError) as e:
-            raise ValueError(f"Некорректный формат даты '{date_str}': {str(e)}")
+            start_time = datetime.strptime(time_str.strip(), "%H:%M").time()
+        except ValueError:
+            raise ValueError(f"Некорректный формат времени '{time_str}', ожидается ЧЧ:ММ")
+        return datetime.combine(self._parse_date(date_str), start_time)
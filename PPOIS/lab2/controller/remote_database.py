@@ -0,0 +1,226 @@
+"""
+remote_database.py - клиентский адаптер к серверу запросов
+
+RemotePetDatabase реализует интерфейс PetDatabase, но выполняет все
+операции на сервере (service/server.py). Благодаря этому AppController
+может работать с общей базой клиники так же, как с локальной:
+    AppController(database=RemotePetDatabase("127.0.0.1:8765"))
+
+Номер текущей страницы и размер страницы хранятся на стороне клиента,
+так как у каждой стойки регистрации они свои.
+"""
+
+import socket
+import threading
+from datetime import date
+
+from model import Pet, PetDatabase
+from model.chunked_list import ChunkedList
+from model.database import PetSnapshot
+from model.query import QueryResult
+from service.protocol import (
+    ALL_PAGE_SIZE,
+    ProtocolError,
+    fields_to_wire,
+    parse_address,
+    pet_from_wire,
+    pet_to_wire,
+    recv_message,
+    send_message
+)
+
+
+class RemotePetDatabase(PetDatabase):
+    """База данных питомцев, расположенная на сервере запросов"""
+
+    def __init__(self, address, records_per_page=10, timeout=30.0):
+        """
+        Подключение к серверу запросов
+
+        Args:
+            address: "host:port", "unix:/путь" или кортеж (host, port)
+            records_per_page: Количество записей на странице
+            timeout: Тайм-аут сетевых операций в секундах
+        """
+        super().__init__(records_per_page)
+        self._target = parse_address(address)
+        self._timeout = timeout
+        self._lock = threading.Lock()  # Один запрос в соединении в каждый момент времени
+        self._sock = self._connect()
+
+    def _connect(self):
+        """Открывает новое соединение с сервером"""
+        if isinstance(self._target, str):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.settimeout(self._timeout)
+        try:
+            sock.connect(self._target)
+        except BaseException:
+            sock.close()
+            raise
+        return sock
+
+    def close(self):
+        """Закрывает соединение с сервером"""
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _call(self, op, *args):
+        """
+        Выполняет операцию на сервере
+
+        Если обмен прерван на середине (тайм-аут, разрыв соединения,
+        поврежденный кадр), непрочитанная часть ответа осталась бы в сокете
+        и досталась следующему запросу. Поэтому такое соединение закрывается,
+        а следующий запрос открывает новое.
+
+        Raises:
+            RuntimeError: Если сервер вернул ошибку
+            ProtocolError: При некорректном ответе
+            OSError: При ошибке соединения или тайм-ауте
+        """
+        with self._lock:
+            if self._sock is None:
+                self._sock = self._connect()
+            try:
+                send_message(self._sock, {"op": op, "args": list(args)})
+                response = recv_message(self._sock)
+            except BaseException:
+                self._sock.close()
+                self._sock = None
+                raise
+        if not isinstance(response, dict) or "ok" not in response:
+            raise ProtocolError(f"Некорректный ответ сервера: {response!r:.100}")
+        if not response["ok"]:
+            raise RuntimeError(f"Ошибка сервера: {response.get('error')}")
+        return response["result"]
+
+    def __len__(self):
+        """Возвращает количество записей на сервере"""
+        return self._call("count")
+
+    def __iter__(self):
+        """Перебирает копии всех записей сервера"""
+        return iter(self.get_all_pets())
+
+    # Добавление
+
+    def add_pet(self, pet: Pet):
+        """Добавляет питомца на сервер"""
+        self.add_pets([pet])
+
+    def add_pets(self, pets):
+        """
+        Добавляет несколько питомцев одним запросом
+
+        Присвоенные сервером идентификаторы записываются в переданные объекты.
+
+        Returns:
+            Количество добавленных записей
+        """
+        pets = list(pets)
+        record_ids = self._call("add", [pet_to_wire(pet) for pet in pets])
+        for pet, record_id in zip(pets, record_ids):
+            pet.record_id = record_id
+        self._emit(inserted=pets)
+        return len(record_ids)
+
+    def get_all_pets(self):
+        """
+        Загружает с сервера все записи частями по ALL_PAGE_SIZE
+
+        Каждая следующая часть запрашивается после идентификатора последней
+        полученной записи, поэтому размер кадра не зависит от размера базы.
+        """
+        pets = []
+        after_id = 0
+        while True:
+            rows = self._call("all", after_id, ALL_PAGE_SIZE)
+            pets.extend(pet_from_wire(row) for row in rows)
+            if len(rows) < ALL_PAGE_SIZE:
+                return pets
+            after_id = pets[-1].record_id
+
+    # Методы поиска
+
+    def find_by_name_and_birth(self, name: str, birth_date: date):
+        """Поиск по имени питомца и дате рождения (условие 1)"""
+        rows = self._call("search_name_birth", name, birth_date.toordinal())
+        return [pet_from_wire(row) for row in rows]
+
+    def find_by_visit_and_vet(self, last_visit: date, vet_name: str):
+        """Поиск по дате последнего приема и ФИО ветеринара (условие 2)"""
+        rows = self._call("search_visit_vet", last_visit.toordinal(), vet_name)
+        return [pet_from_wire(row) for row in rows]
+
+    def find_by_diagnosis_phrase(self, phrase: str):
+        """Поиск по фразе из диагноза (условие 3)"""
+        return [pet_from_wire(row) for row in self._call("search_diagnosis", phrase)]
+
+    def _scan(self, predicate, find):
+        """Поиск выполняет сервер, поэтому результат загружается сразу"""
+        return QueryResult(find())
+
+    # Удаление
+
+    def delete_by_ids(self, record_ids):
+        """Удаляет записи с указанными идентификаторами на сервере"""
+        record_ids = list(record_ids)
+        count = self._call("delete", record_ids)
+        if count:
+            self._emit(deleted=record_ids)
+        return count
+
+    # Редактирование
+
+    def update_pet(self, record_id, **fields):
+        """Изменяет поля записи на сервере и возвращает обновленную запись"""
+        pet = pet_from_wire(self._call("update", record_id, fields_to_wire(fields)))
+        self._emit(updated=(pet,))
+        return pet
+
+    # Постраничная навигация
+
+    def get_page(self, page_num):
+        """Загружает с сервера указанную страницу"""
+        result = self._call("page", page_num, self.records_per_page)
+        return [pet_from_wire(row) for row in result["pets"]]
+
+    # Вторичные индексы
+
+    def attach_index(self, index):
+        """
+        Не поддерживается: общую базу меняют и другие стойки, поэтому
+        локальный индекс устаревал бы незаметно для клиента
+
+        Raises:
+            NotImplementedError: Всегда
+        """
+        raise NotImplementedError("Вторичные индексы общей базы не поддерживаются")
+
+    # События изменения
+
+    def subscribe(self, callback):
+        """
+        Подписывает получателя на события изменения базы
+
+        Сообщаются только изменения, сделанные через этого клиента:
+        изменения других стоек сервер не рассылает.
+        """
+        super().subscribe(callback)
+
+    # Снимки
+
+    def snapshot(self):
+        """Возвращает снимок из копии всех записей, загруженной с сервера"""
+        return PetSnapshot(ChunkedList(self.get_all_pets()), self.records_per_page)
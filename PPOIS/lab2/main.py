@@ -4,6 +4,7 @@ main.py - точка входа в приложение
 Запускает приложение "Ветеринарная клиника"
 """
 
+import argparse
 import os
 import sys
 import tkinter as tk
@@ -13,14 +14,19 @@ from tkinter import messagebox
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from model import PetDatabase, XMLHandler
-from controller import AppController
+from controller import AppController, RemotePetDatabase
 from view import MainWindow
 import config
 
 def main():
     """Запускает приложение"""
-    # Создаем контроллер без окна
-    controller = AppController(None)
+    parser = argparse.ArgumentParser(description="Ветеринарная клиника")
+    parser.add_argument("--server", help="Адрес сервера запросов (host:port или unix:/путь)")
+    args = parser.parse_args()
+    
+    # Создаем контроллер без окна; при указании сервера работаем с общей базой
+    database = RemotePetDatabase(args.server) if args.server else None
+    controller = AppController(None, database=database)
     
     # Создаем главное окно без контроллера
     app = MainWindow()
@@ -31,8 +37,11 @@ def main():
     # Устанавливаем окно в контроллер и завершаем инициализацию
     controller.view = app
     
-    # Загружаем демо-данные и обновляем интерфейс
-    controller.load_demo_data()
+    # Загружаем демо-данные и обновляем интерфейс (общая база уже заполнена сервером)
+    if database is None:
+        controller.load_demo_data()
+    else:
+        controller.update_view()
     
     # Запускаем цикл обработки событий
     app.mainloop()
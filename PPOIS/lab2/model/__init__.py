@@ -2,11 +2,36 @@
 __init__.py - инициализация пакета model
 
 Этот файл позволяет импортировать классы напрямую из пакета model:
-from model import Pet, PetDatabase, XMLHandler
+from model import Pet, PetDatabase, ShardedPetDatabase, XMLHandler, Appointment, Schedule
 """
 
+import importlib
+
 from .pet import Pet
-from .database import PetDatabase
-from .xml_handler import XMLHandler
+from .database import ChangeEvent, PetDatabase, PetSnapshot
+from .query import HashIndex, QueryResult
+
+__all__ = ['Pet', 'PetDatabase', 'PetSnapshot', 'ChangeEvent', 'QueryResult', 'HashIndex',
+           'ShardedPetDatabase', 'XMLHandler', 'Appointment', 'Schedule', 'ScheduleConflict']
+
+
+# Классы, модули которых загружаются только при первом обращении (быстрый
+# запуск консольной утилиты и сервера): ShardedPetDatabase импортирует
+# multiprocessing, XMLHandler - модули сжатия gzip, bz2 и lzma, а расписание
+# нужно только окну записи на прием
+_LAZY_MODULES = {
+    'ShardedPetDatabase': '.sharded_database',
+    'XMLHandler': '.xml_handler',
+    'Appointment': '.appointment',
+    'Schedule': '.schedule',
+    'ScheduleConflict': '.schedule',
+}
+
 
-__all__ = ['Pet', 'PetDatabase', 'XMLHandler']
\ No newline at end of file
+def __getattr__(name):
+    module = _LAZY_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
\ No newline at end of file
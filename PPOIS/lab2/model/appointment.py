@@ -0,0 +1,53 @@
+"""
+appointment.py - класс для представления записи на прием
+
+Запись на прием содержит:
+- Имя питомца (строка)
+- ФИО ветеринара (строка)
+- Начало и окончание приема (тип datetime)
+- Примечание (строка)
+"""
+
+from datetime import datetime
+
+class Appointment:
+    """Класс, представляющий запись питомца на прием к ветеринару"""
+
+    def __init__(self, pet_name: str, vet_name: str, start: datetime, end: datetime,
+                 note: str = ""):
+        """
+        Инициализация объекта Appointment
+
+        Args:
+            pet_name: Имя питомца
+            vet_name: ФИО ветеринара
+            start: Начало приема
+            end: Окончание приема
+            note: Примечание
+
+        Raises:
+            ValueError: Если окончание приема не позже начала
+        """
+        if end <= start:
+            raise ValueError("Окончание приема должно быть позже начала")
+        self.pet_name = pet_name
+        self.vet_name = vet_name
+        self.start = start
+        self.end = end
+        self.note = note
+        self.appointment_id = None  # Присваивается расписанием при записи
+
+    def overlaps(self, start: datetime, end: datetime):
+        """Проверяет, пересекается ли прием с интервалом [start, end)"""
+        return self.start < end and start < self.end
+
+    def __str__(self):
+        """Строковое представление записи для отладки"""
+        return (f"Appointment(pet_name={self.pet_name}, "
+                f"vet_name={self.vet_name}, "
+                f"start={self.start.strftime('%d.%m.%Y %H:%M')}, "
+                f"end={self.end.strftime('%H:%M')})")
+
+    def __repr__(self):
+        """Представление объекта для интерпретатора"""
+        return self.__str__()
@@ -0,0 +1,92 @@
+"""
+background_search.py - поиск с выдачей результатов частями
+
+BackgroundSearch выполняет поиск в отдельном потоке и складывает найденные
+записи в очередь, а окно забирает их порциями в потоке Tk (по таймеру
+after) и дописывает в таблицу. Так поиск по большой базе не блокирует
+интерфейс, а первые результаты появляются до его окончания. Устаревший
+поиск (например, после нового нажатия клавиши) отменяется через cancel().
+"""
+
+import queue
+import threading
+
+# Период вывода результатов фонового поиска (один кадр при 60 Гц), мс
+STREAM_INTERVAL_MS = 16
+
+# Сколько найденных записей показывать (остальные только подсчитываются)
+RESULT_LIMIT = 100
+
+
+class BackgroundSearch:
+    """Поиск, результаты которого поступают частями из фонового потока"""
+
+    def __init__(self, search, background=True):
+        """
+        Запускает поиск
+
+        Args:
+            search: Функция, которая принимает threading.Event отмены и
+                возвращает итерируемую коллекцию списков найденных записей
+                (например, PetDatabase.iter_diagnosis_matches)
+            background: Выполнять поиск в отдельном потоке; иначе он
+                выполняется сразу, в вызывающем потоке
+        """
+        self.error = None  # Исключение, прервавшее поиск
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+        self._chunks = queue.SimpleQueue()  # Списки найденных записей от потока поиска
+        self._current = []  # Список, из которого сейчас забираются записи
+        self._offset = 0  # Сколько записей _current уже забрано
+        if background:
+            threading.Thread(target=self._run, args=(search,), name="search", daemon=True).start()
+        else:
+            self._run(search)
+
+    def _run(self, search):
+        try:
+            for chunk in search(self._cancel):
+                self._chunks.put(chunk)
+        except Exception as e:
+            self.error = e
+        finally:
+            self._done.set()
+
+    def cancel(self):
+        """Отменяет поиск: поток прекращает просмотр перед следующим блоком записей"""
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def wait(self, timeout=None):
+        """Ожидает окончания поиска; возвращает False по истечении timeout"""
+        return self._done.wait(timeout)
+
+    @property
+    def finished(self):
+        """True, если поиск завершен и все найденные записи забраны"""
+        # Все записи кладутся в очередь до установки _done
+        return (self._done.is_set() and self._chunks.empty()
+                and self._offset >= len(self._current))
+
+    def take(self, limit):
+        """
+        Забирает найденные к этому моменту записи, но не больше limit
+
+        Returns:
+            Список питомцев в порядке выдачи поиска (может быть пустым)
+        """
+        taken = []
+        while len(taken) < limit:
+            if self._offset >= len(self._current):
+                try:
+                    self._current = self._chunks.get_nowait()
+                except queue.Empty:
+                    break
+                self._offset = 0
+            part = self._current[self._offset:self._offset + limit - len(taken)]
+            self._offset += len(part)
+            taken.extend(part)
+        return taken
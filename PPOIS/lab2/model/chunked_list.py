@@ -0,0 +1,223 @@
+"""
+chunked_list.py - список из блоков с копированием при записи
+
+ChunkedList хранит элементы в блоках ограниченного размера. Снимок списка
+(snapshot) создается за O(1): он разделяет с исходным списком все блоки.
+При первой записи после снимка исходный список копирует только внешний
+список ссылок на блоки и те блоки, которые изменяет, поэтому память,
+занимаемая снимком, пропорциональна числу изменений, сделанных за время
+его жизни. Снимок неизменяем.
+"""
+
+from bisect import bisect_left, bisect_right
+from itertools import chain
+
+CHUNK_SIZE = 512  # Максимальное количество элементов в блоке
+
+
+class ChunkedList:
+    """Список из блоков с O(1)-снимками и копированием блоков при записи"""
+
+    def __init__(self, items=(), chunk_size=CHUNK_SIZE):
+        """
+        Args:
+            items: Начальные элементы
+            chunk_size: Максимальный размер блока
+        """
+        self._chunk_size = chunk_size
+        self._chunks = []  # Блоки элементов
+        self._owned = set()  # id блоков, которые не разделяются ни с одним снимком
+        self._shared = False  # Внешний список блоков разделяется со снимком
+        self._frozen = False  # Снимок - изменение запрещено
+        self._length = 0
+        self._offsets = []  # Индекс первого элемента каждого блока (None - требует пересчета)
+        self.extend(items)
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        return chain.from_iterable(self._chunks)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            if step != 1:
+                return list(self)[index]
+            return self._slice(start, stop)
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("индекс вне диапазона")
+        chunk_index = bisect_right(self._get_offsets(), index) - 1
+        return self._chunks[chunk_index][index - self._offsets[chunk_index]]
+
+    def __setitem__(self, index, item):
+        """Заменяет элемент, копируя его блок, если он разделяется со снимком"""
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("индекс вне диапазона")
+        self._prepare_write()
+        chunk_index = bisect_right(self._get_offsets(), index) - 1
+        self._writable_chunk(chunk_index)[index - self._offsets[chunk_index]] = item
+
+    def __repr__(self):
+        return f"ChunkedList({list(self)!r})"
+
+    # Служебные методы
+
+    def _get_offsets(self):
+        """Возвращает (при необходимости пересчитывает) начальные индексы блоков"""
+        if self._offsets is None:
+            offsets = []
+            position = 0
+            for chunk in self._chunks:
+                offsets.append(position)
+                position += len(chunk)
+            self._offsets = offsets
+        return self._offsets
+
+    def _slice(self, start, stop):
+        """Возвращает элементы [start, stop) списком, просматривая только нужные блоки"""
+        if start >= stop:
+            return []
+        offsets = self._get_offsets()
+        chunk_index = bisect_right(offsets, start) - 1
+        result = []
+        position = start - offsets[chunk_index]
+        while chunk_index < len(self._chunks) and len(result) < stop - start:
+            chunk = self._chunks[chunk_index]
+            result.extend(chunk[position:position + (stop - start - len(result))])
+            chunk_index += 1
+            position = 0
+        return result
+
+    def _prepare_write(self):
+        """Делает внешний список блоков собственным перед изменением"""
+        if self._frozen:
+            raise TypeError("Снимок нельзя изменять")
+        if self._shared:
+            self._chunks = list(self._chunks)
+            self._shared = False
+
+    def _new_chunk(self, items):
+        """Создает собственный блок"""
+        chunk = list(items)
+        self._owned.add(id(chunk))
+        return chunk
+
+    def _writable_chunk(self, chunk_index):
+        """Возвращает блок для изменения, копируя его, если он разделяется со снимком"""
+        chunk = self._chunks[chunk_index]
+        if id(chunk) not in self._owned:
+            chunk = self._new_chunk(chunk)
+            self._chunks[chunk_index] = chunk
+        return chunk
+
+    def index_sorted(self, value, key):
+        """
+        Ищет элемент в списке, упорядоченном по возрастанию key(item), за O(log n)
+
+        Args:
+            value: Искомое значение ключа
+            key: Функция, вычисляющая ключ элемента
+
+        Returns:
+            Индекс элемента или -1, если элемента с таким ключом нет
+        """
+        chunks = self._chunks
+        # Первый блок, последний элемент которого не меньше искомого ключа
+        low, high = 0, len(chunks)
+        while low < high:
+            middle = (low + high) // 2
+            if key(chunks[middle][-1]) < value:
+                low = middle + 1
+            else:
+                high = middle
+        if low == len(chunks):
+            return -1
+        chunk = chunks[low]
+        position = bisect_left(chunk, value, key=key)
+        if position == len(chunk) or key(chunk[position]) != value:
+            return -1
+        return self._get_offsets()[low] + position
+
+    # Изменение
+
+    def append(self, item):
+        """Добавляет элемент в конец списка"""
+        self._prepare_write()
+        if not self._chunks or len(self._chunks[-1]) >= self._chunk_size:
+            if self._offsets is not None:
+                self._offsets.append(self._length)
+            self._chunks.append(self._new_chunk(()))
+        self._writable_chunk(-1).append(item)
+        self._length += 1
+
+    def extend(self, items):
+        """Добавляет элементы в конец списка"""
+        for item in items:
+            self.append(item)
+
+    def remove_where(self, predicate):
+        """
+        Удаляет элементы, для которых predicate возвращает True
+
+        Блоки без удаляемых элементов сохраняются как есть (и продолжают
+        разделяться со снимками), копируются только затронутые блоки.
+
+        Returns:
+            Количество удаленных элементов
+        """
+        self._prepare_write()
+        chunks = []
+        removed = 0
+        for chunk in self._chunks:
+            kept = [item for item in chunk if not predicate(item)]
+            if len(kept) == len(chunk):
+                chunks.append(chunk)
+                continue
+            removed += len(chunk) - len(kept)
+            self._owned.discard(id(chunk))
+            if kept:
+                chunks.append(self._new_chunk(kept))
+
+        if removed:
+            self._chunks = chunks
+            self._length -= removed
+            self._offsets = None
+            # Слишком мелкие блоки после массовых удалений собираются заново
+            if len(chunks) > 2 * (self._length // self._chunk_size + 1):
+                self._rechunk()
+        return removed
+
+    def _rechunk(self):
+        """Перекладывает элементы в полностью заполненные блоки"""
+        items = list(self)
+        self._owned = set()
+        self._chunks = [self._new_chunk(items[start:start + self._chunk_size])
+                        for start in range(0, len(items), self._chunk_size)]
+        self._offsets = None
+
+    # Снимки
+
+    def snapshot(self):
+        """
+        Возвращает неизменяемый снимок списка за O(1)
+
+        После создания снимка все текущие блоки считаются разделяемыми:
+        следующая запись скопирует внешний список ссылок и изменяемый блок.
+        """
+        view = ChunkedList.__new__(ChunkedList)
+        view._chunk_size = self._chunk_size
+        view._chunks = self._chunks
+        view._owned = set()
+        view._shared = True
+        view._frozen = True
+        view._length = self._length
+        view._offsets = None
+
+        self._shared = True
+        self._owned = set()
+        return view
@@ -3,38 +3,171 @@ database.py - класс для управления коллекцией пит
 
 Содержит методы для:
 - Добавления питомцев
-- Поиска по различным критериям (вариант 8)
+- Поиска по различным критериям (вариант 8), в том числе ленивого (query_*)
 - Удаления питомцев
+- Изменения записей на месте
 - Постраничного отображения данных
+- Получения согласованных снимков для фонового сохранения
+- Поддержки вторичных индексов, обновляемых при изменении базы
+- Подписки на события изменения (добавленные, удаленные, измененные записи)
+- Потокобезопасного режима (один писатель, читатели без блокировок)
 """
 
+import threading
+from collections import namedtuple
+from contextlib import nullcontext
 from datetime import date
+from itertools import islice
 from .pet import Pet
+from .chunked_list import ChunkedList
+from .instrumentation import instrumentation
+from .query import QueryResult
+
+# Количество записей, добавляемых за одну блокировку в потокобезопасном режиме
+WRITE_BATCH_SIZE = 1000
+
+# Количество записей, просматриваемых между проверками отмены при поиске частями
+SCAN_CHUNK_SIZE = 10000
+
+# Поля условий поиска 1 и 2 - для хеш-индексов (см. model.query.HashIndex)
+NAME_BIRTH_FIELDS = ("name", "birth_date")
+VISIT_VET_FIELDS = ("last_visit", "vet_name")
+
+# Событие изменения базы: добавленные записи (Pet), идентификаторы удаленных
+# записей и новые версии измененных записей (Pet)
+ChangeEvent = namedtuple("ChangeEvent", ["inserted", "deleted", "updated"])
+
+
+def _record_key(pet):
+    """Ключ порядка записей - идентификатор (присваивается по возрастанию)"""
+    return pet.record_id
+
+
+# Условия поиска в виде предикатов - те же, что в методах find_*; нужны
+# представлениям, которые дополняют результаты поиска по событиям изменения
+
+def match_name_and_birth(name: str, birth_date: date):
+    """Предикат условия 1: имя питомца (без учета регистра) и дата рождения"""
+    name = name.lower()
+    return lambda pet: pet.name.lower() == name and pet.birth_date == birth_date
+
+
+def match_visit_and_vet(last_visit: date, vet_name: str):
+    """Предикат условия 2: дата последнего приема и ФИО ветеринара (без учета регистра)"""
+    vet_name = vet_name.lower()
+    return lambda pet: pet.last_visit == last_visit and pet.vet_name.lower() == vet_name
+
+
+def match_diagnosis_phrase(phrase: str):
+    """Предикат условия 3: фраза из диагноза (без учета регистра)"""
+    phrase = phrase.lower()
+    return lambda pet: phrase in pet.diagnosis.lower()
+
 
 class PetDatabase:
     """Класс для управления коллекцией питомцев"""
     
-    def __init__(self, records_per_page=10):
+    def __init__(self, records_per_page=10, thread_safe=False):
         """
         Инициализация базы данных питомцев
         
+        В потокобезопасном режиме изменения выполняются под блокировкой
+        по одному писателю, а после каждого изменения (пакета добавлений)
+        публикуется снимок записей. Поиск, листание страниц и перебор
+        читают последний опубликованный снимок без блокировок, поэтому
+        не ждут длительного импорта и видят согласованное состояние.
+        
         Args:
             records_per_page: Количество записей на странице
+            thread_safe: Разрешить изменение базы из фоновых потоков
         """
-        self.pets = []  # Список всех питомцев
+        self.pets = ChunkedList()  # Список всех питомцев (блоки с копированием при записи)
         self.current_page = 1  # Текущая страница
         self.records_per_page = records_per_page  # Записей на странице
-    
+        self._next_record_id = 1  # Следующий идентификатор записи
+        self._indexes = []  # Вторичные индексы (см. attach_index)
+        self._subscribers = []  # Получатели событий изменения (см. subscribe)
+        self.thread_safe = thread_safe
+        self._write_lock = threading.Lock() if thread_safe else nullcontext()
+        self._published = self.pets.snapshot() if thread_safe else None  # Снимок для читателей
+
+    def _read_view(self):
+        """Записи для чтения: опубликованный снимок или сам список"""
+        published = self._published
+        return published if published is not None else self.pets
+
+    def _publish(self):
+        """Публикует снимок для читателей (вызывается писателем под блокировкой)"""
+        if self.thread_safe:
+            self._published = self.pets.snapshot()
+
+    def __len__(self):
+        """Возвращает количество записей в базе"""
+        return len(self._read_view())
+
+    def __iter__(self):
+        """Перебирает записи в порядке добавления"""
+        return iter(self._read_view())
+
+    def _assign_record_id(self, pet: Pet):
+        """Присваивает питомцу уникальный идентификатор записи"""
+        pet.record_id = self._next_record_id
+        self._next_record_id += 1
+
     def add_pet(self, pet: Pet):
         """Добавляет питомца в базу данных"""
+        with self._write_lock:
+            self._append(pet)
+            self._publish()
+            self._emit(inserted=(pet,))
+
+    def _append(self, pet: Pet):
+        """Добавляет питомца (вызывается под блокировкой записи)"""
+        self._assign_record_id(pet)
         self.pets.append(pet)
-    
+        self._notify_insert(pet)
+
+    @instrumentation.measure("db.add_pets", records=int)
+    def add_pets(self, pets):
+        """
+        Добавляет несколько питомцев за одну операцию
+
+        В потокобезопасном режиме записи добавляются пакетами по
+        WRITE_BATCH_SIZE: блокировка не удерживается на весь импорт,
+        и читатели видят его ход после каждого пакета. Подписчики получают
+        одно событие на пакет.
+
+        Args:
+            pets: Итерируемая коллекция объектов Pet
+
+        Returns:
+            Количество добавленных записей
+        """
+        count = 0
+        iterator = iter(pets)
+        while True:
+            with self._write_lock:
+                batch = []
+                for pet in iterator:
+                    self._append(pet)
+                    batch.append(pet)
+                    if self.thread_safe and len(batch) == WRITE_BATCH_SIZE:
+                        break
+                if batch:
+                    self._publish()
+                    self._emit(inserted=batch)
+            added = len(batch)
+            count += added
+            if added < WRITE_BATCH_SIZE or not self.thread_safe:
+                return count
+
     def get_all_pets(self):
         """Возвращает все записи о питомцах"""
-        return self.pets
+        return self._read_view()
     
     # Методы поиска согласно варианту 
     
+    @instrumentation.measure("db.find_by_name_and_birth", records=len)
     def find_by_name_and_birth(self, name: str, birth_date: date):
         """
         Поиск по имени питомца и дате рождения (условие 1)
@@ -46,9 +179,13 @@ class PetDatabase:
         Returns:
             Список найденных питомцев
         """
-        return [pet for pet in self.pets 
+        found = self._lookup(NAME_BIRTH_FIELDS, name, birth_date)
+        if found is not None:
+            return found
+        return [pet for pet in self 
                 if pet.name.lower() == name.lower() and pet.birth_date == birth_date]
     
+    @instrumentation.measure("db.find_by_visit_and_vet", records=len)
     def find_by_visit_and_vet(self, last_visit: date, vet_name: str):
         """
         Поиск по дате последнего приема и ФИО ветеринара (условие 2)
@@ -60,9 +197,13 @@ class PetDatabase:
         Returns:
             Список найденных питомцев
         """
-        return [pet for pet in self.pets 
+        found = self._lookup(VISIT_VET_FIELDS, last_visit, vet_name)
+        if found is not None:
+            return found
+        return [pet for pet in self 
                 if pet.last_visit == last_visit and pet.vet_name.lower() == vet_name.lower()]
     
+    @instrumentation.measure("db.find_by_diagnosis_phrase", records=len)
     def find_by_diagnosis_phrase(self, phrase: str):
         """
         Поиск по фразе из диагноза (условие 3)
@@ -74,7 +215,102 @@ class PetDatabase:
             Список найденных питомцев
         """
         phrase = phrase.lower()
-        return [pet for pet in self.pets if phrase in pet.diagnosis.lower()]
+        return [pet for pet in self if phrase in pet.diagnosis.lower()]
+    
+    def iter_diagnosis_matches(self, phrase: str, cancel=None, chunk_size=SCAN_CHUNK_SIZE):
+        """
+        Поиск по фразе из диагноза частями (условие 3)
+        
+        Записи просматриваются блоками по chunk_size; найденные в блоке
+        записи выдаются сразу, поэтому их можно показывать до окончания
+        поиска. Перед каждым блоком проверяется отмена. Для фонового
+        поиска вызывается у снимка базы (snapshot()).
+        
+        Args:
+            phrase: Фраза для поиска в диагнозе
+            cancel: threading.Event; поиск прекращается после его установки
+            chunk_size: Количество записей в блоке
+            
+        Yields:
+            Непустые списки найденных питомцев в порядке добавления
+        """
+        phrase = phrase.lower()
+        records = iter(self)
+        while cancel is None or not cancel.is_set():
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                return
+            found = [pet for pet in chunk if phrase in pet.diagnosis.lower()]
+            if found:
+                yield found
+    
+    # Ленивый поиск
+    
+    def query_by_name_and_birth(self, name: str, birth_date: date):
+        """
+        Ленивый поиск по имени питомца и дате рождения (условие 1)
+        
+        Returns:
+            QueryResult; при подключенном HashIndex по NAME_BIRTH_FIELDS
+            записи выбираются из индекса
+        """
+        found = self._lookup(NAME_BIRTH_FIELDS, name, birth_date)
+        if found is not None:
+            return QueryResult(found)
+        return self._scan(match_name_and_birth(name, birth_date),
+                          lambda: self.find_by_name_and_birth(name, birth_date))
+    
+    def query_by_visit_and_vet(self, last_visit: date, vet_name: str):
+        """
+        Ленивый поиск по дате последнего приема и ФИО ветеринара (условие 2)
+        
+        Returns:
+            QueryResult; при подключенном HashIndex по VISIT_VET_FIELDS
+            записи выбираются из индекса
+        """
+        found = self._lookup(VISIT_VET_FIELDS, last_visit, vet_name)
+        if found is not None:
+            return QueryResult(found)
+        return self._scan(match_visit_and_vet(last_visit, vet_name),
+                          lambda: self.find_by_visit_and_vet(last_visit, vet_name))
+    
+    def query_by_diagnosis_phrase(self, phrase: str):
+        """
+        Ленивый поиск по фразе из диагноза (условие 3)
+        
+        Returns:
+            QueryResult
+        """
+        return self._scan(match_diagnosis_phrase(phrase),
+                          lambda: self.find_by_diagnosis_phrase(phrase))
+    
+    def _scan(self, predicate, find):
+        """
+        Ленивый результат, который просматривает снимок базы
+        
+        Args:
+            predicate: Условие отбора
+            find: Функция без аргументов, выполняющая тот же поиск сразу;
+                используется хранилищами, которые не могут просматривать
+                записи лениво (секционированная база, сервер)
+        """
+        records = self._published if self.thread_safe else self.pets.snapshot()
+        return QueryResult(records, predicate)
+    
+    def _lookup(self, fields, *values):
+        """
+        Выбирает записи из хеш-индекса по полям fields (None - индекса нет)
+        
+        Индексы изменяются писателем на месте, а не публикуются снимками,
+        поэтому в потокобезопасном режиме выборка делается под блокировкой
+        записи: читатель видит индекс между пакетами изменений, в том же
+        состоянии, что и опубликованный снимок.
+        """
+        with self._write_lock:
+            for index in self._indexes:
+                if getattr(index, "fields", None) == fields:
+                    return index.lookup(*values)
+        return None
     
     # Методы удаления 
     
@@ -88,12 +324,68 @@ class PetDatabase:
         Returns:
             Количество удаленных записей
         """
-        initial_count = len(self.pets)
-        self.pets = [pet for pet in self.pets if pet not in pets_to_delete]
-        return initial_count - len(self.pets)
+        return self.delete_by_ids(pet.record_id for pet in pets_to_delete)
+
+    @instrumentation.measure("db.delete_by_ids", records=int)
+    def delete_by_ids(self, record_ids):
+        """
+        Удаляет записи с указанными идентификаторами
+
+        Args:
+            record_ids: Итерируемая коллекция идентификаторов записей
+
+        Returns:
+            Количество удаленных записей
+        """
+        doomed_ids = set(record_ids)
+        with self._write_lock:
+            count = self.pets.remove_where(lambda pet: pet.record_id in doomed_ids)
+            if count:
+                self._notify_delete(doomed_ids)
+                self._publish()
+                self._emit(deleted=doomed_ids)
+        return count
+    
+    # Редактирование
+    
+    @instrumentation.measure("db.update_pet")
+    def update_pet(self, record_id, **fields):
+        """
+        Изменяет поля записи
+        
+        Запись сохраняет идентификатор и место в порядке добавления. Записи
+        упорядочены по record_id, поэтому она находится бинарным поиском
+        за O(log n). Вместо изменения объекта на месте он заменяется копией
+        с новыми полями: снимки, созданные раньше, продолжают видеть старую
+        версию записи, а копируется только блок, в котором она хранится.
+        Вторичные индексы обновляются только для этой записи.
+        
+        Args:
+            record_id: Идентификатор записи
+            **fields: Новые значения полей (name, birth_date, last_visit, vet_name, diagnosis)
+            
+        Returns:
+            Обновленный объект Pet
+            
+        Raises:
+            KeyError: Если записи с таким идентификатором нет
+            ValueError: При неизвестном имени поля
+        """
+        with self._write_lock:
+            index = self.pets.index_sorted(record_id, key=_record_key)
+            if index < 0:
+                raise KeyError(f"Запись {record_id} не найдена")
+            old_pet = self.pets[index]
+            new_pet = old_pet.copy_with(**fields)
+            self.pets[index] = new_pet
+            self._notify_update(old_pet, new_pet)
+            self._publish()
+            self._emit(updated=(new_pet,))
+        return new_pet
     
     # Методы для постраничной навигации 
     
+    @instrumentation.measure("db.get_page", records=len)
     def get_page(self, page_num):
         """
         Возвращает питомцев для указанной страницы
@@ -106,11 +398,11 @@ class PetDatabase:
         """
         start_idx = (page_num - 1) * self.records_per_page
         end_idx = start_idx + self.records_per_page
-        return self.pets[start_idx:end_idx]
+        return self._read_view()[start_idx:end_idx]
     
     def get_total_pages(self):
         """Возвращает общее количество страниц"""
-        return (len(self.pets) + self.records_per_page - 1) // self.records_per_page
+        return (len(self) + self.records_per_page - 1) // self.records_per_page
     
     def set_page_size(self, page_size):
         """
@@ -143,4 +435,120 @@ class PetDatabase:
         if 1 <= page_num <= total_pages or (total_pages == 0 and page_num == 1):
             self.current_page = page_num
             return True
-        return False
\ No newline at end of file
+        return False
+
+    # Вторичные индексы
+
+    def attach_index(self, index):
+        """
+        Подключает вторичный индекс, который обновляется при изменении базы
+
+        Индекс должен реализовывать методы on_insert(pet), on_delete(record_id)
+        и on_update(old_pet, new_pet); уже имеющиеся записи передаются ему
+        при подключении. Индексу с атрибутом lock (например, ReminderIndex)
+        передается блокировка записи: его запросы, как и выборка из хеш-индексов,
+        не читают индекс во время изменения.
+
+        Args:
+            index: Объект индекса (например, ReminderIndex)
+        """
+        with self._write_lock:
+            for pet in self:
+                index.on_insert(pet)
+            self._indexes.append(index)
+        if hasattr(index, "lock"):
+            index.lock = self._write_lock
+
+    def detach_index(self, index):
+        """Отключает вторичный индекс"""
+        self._indexes.remove(index)
+        if hasattr(index, "lock"):
+            index.lock = nullcontext()
+
+    def _notify_insert(self, pet):
+        """Сообщает индексам о добавленной записи"""
+        for index in self._indexes:
+            index.on_insert(pet)
+
+    def _notify_update(self, old_pet, new_pet):
+        """Сообщает индексам об изменении записи"""
+        for index in self._indexes:
+            index.on_update(old_pet, new_pet)
+
+    def _notify_delete(self, record_ids):
+        """Сообщает индексам об удаленных записях (неизвестные индексу id пропускаются)"""
+        for index in self._indexes:
+            for record_id in record_ids:
+                index.on_delete(record_id)
+
+    # События изменения
+
+    def subscribe(self, callback):
+        """
+        Подписывает получателя на события изменения базы
+
+        После каждого изменения (пакета добавлений) callback получает
+        ChangeEvent с затронутыми записями, поэтому представление может
+        обновить только их, а не повторять поиск по всей базе. Среди
+        удаленных идентификаторов могут быть и уже отсутствовавшие в базе.
+        В потокобезопасном режиме callback вызывается в потоке писателя
+        под блокировкой записи и должен лишь передать событие дальше
+        (например, в очередь).
+
+        Args:
+            callback: Функция, принимающая ChangeEvent
+        """
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """Отписывает получателя от событий изменения"""
+        self._subscribers.remove(callback)
+
+    def _emit(self, inserted=(), deleted=(), updated=()):
+        """Рассылает событие изменения подписчикам"""
+        if not self._subscribers:
+            return
+        event = ChangeEvent(tuple(inserted), frozenset(deleted), tuple(updated))
+        for callback in list(self._subscribers):
+            callback(event)
+
+    # Снимки
+
+    def snapshot(self):
+        """
+        Возвращает согласованный неизменяемый снимок базы за O(1)
+
+        Снимок разделяет блоки записей с базой; изменения базы после его
+        создания копируют только затронутые блоки, поэтому снимок можно
+        сериализовать в фоновом потоке, пока пользователь продолжает
+        добавлять и удалять записи.
+
+        Returns:
+            Объект PetSnapshot
+        """
+        if self.thread_safe:
+            # Опубликованный снимок уже неизменяем
+            return PetSnapshot(self._published, self.records_per_page)
+        return PetSnapshot(self.pets.snapshot(), self.records_per_page)
+
+
+class PetSnapshot(PetDatabase):
+    """
+    Неизменяемый снимок базы питомцев
+
+    Поддерживает перебор, поиск и постраничный вывод так же, как PetDatabase.
+    Попытка изменить снимок вызывает TypeError.
+    """
+
+    def __init__(self, pets, records_per_page=10):
+        """
+        Args:
+            pets: Замороженный ChunkedList с записями
+            records_per_page: Количество записей на странице
+        """
+        super().__init__(records_per_page)
+        self.pets = pets
+
+    def snapshot(self):
+        """Снимок неизменяем, поэтому является собственным снимком"""
+        return self
@@ -0,0 +1,169 @@
+"""
+instrumentation.py - замеры длительности операций приложения
+
+Операции базы данных и контроллера (загрузка, сохранение, поиск, удаление,
+листание страниц, обновление таблицы) оборачиваются декоратором measure.
+Для каждой операции накапливаются количество вызовов, число обработанных
+записей и гистограмма задержек с логарифмическими корзинами.
+
+Пока сбор выключен, декоратор только проверяет флаг и сразу вызывает
+исходную функцию. Включение: переменная окружения VET_PROFILE=1
+(результаты сохраняются при выходе в файл из VET_PROFILE_FILE) или
+флажок в окне статистики.
+"""
+
+import atexit
+import functools
+import os
+import threading
+import time
+
+# Количество корзин гистограммы: корзина i содержит задержки до 2**i микросекунд
+HISTOGRAM_BUCKETS = 40
+
+
+class OperationStats:
+    """Накопленная статистика одной операции"""
+
+    def __init__(self):
+        self.calls = 0
+        self.records = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.histogram = [0] * HISTOGRAM_BUCKETS
+
+    def add(self, seconds, records):
+        """Учитывает один вызов операции"""
+        self.calls += 1
+        self.records += records
+        self.total_time += seconds
+        if seconds > self.max_time:
+            self.max_time = seconds
+        bucket = min(HISTOGRAM_BUCKETS - 1, int(seconds * 1_000_000).bit_length())
+        self.histogram[bucket] += 1
+
+    def percentile(self, fraction):
+        """
+        Оценка перцентиля задержки по гистограмме
+
+        Args:
+            fraction: Доля от 0 до 1 (например, 0.99)
+
+        Returns:
+            Верхняя граница корзины в секундах (не больше максимальной задержки)
+        """
+        if not self.calls:
+            return 0.0
+        threshold = fraction * self.calls
+        seen = 0
+        for bucket, count in enumerate(self.histogram):
+            seen += count
+            if seen >= threshold:
+                return min(self.max_time, (2 ** bucket) / 1_000_000)
+        return self.max_time
+
+    def to_dict(self):
+        """Словарь для отображения и сохранения в JSON"""
+        mean = self.total_time / self.calls if self.calls else 0.0
+        return {
+            "calls": self.calls,
+            "records": self.records,
+            "total_ms": self.total_time * 1000,
+            "mean_ms": mean * 1000,
+            "p50_ms": self.percentile(0.50) * 1000,
+            "p99_ms": self.percentile(0.99) * 1000,
+            "max_ms": self.max_time * 1000,
+            "histogram_us": {f"<={2 ** bucket}": count
+                             for bucket, count in enumerate(self.histogram) if count},
+        }
+
+
+class Instrumentation:
+    """Сборщик статистики длительности операций"""
+
+    def __init__(self, enabled=False):
+        """
+        Args:
+            enabled: Включен ли сбор статистики
+        """
+        self.enabled = enabled
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._dump_path = None
+
+    def record(self, operation, seconds, records=0):
+        """
+        Учитывает один вызов операции
+
+        Args:
+            operation: Имя операции
+            seconds: Длительность в секундах
+            records: Количество обработанных записей
+        """
+        with self._lock:
+            stats = self._stats.get(operation)
+            if stats is None:
+                stats = self._stats[operation] = OperationStats()
+            stats.add(seconds, records)
+
+    def measure(self, operation, records=None):
+        """
+        Декоратор, замеряющий длительность вызовов функции
+
+        Args:
+            operation: Имя операции в статистике
+            records: Функция, вычисляющая число записей по результату вызова
+                (например, len для списков результатов поиска)
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                started = time.perf_counter()
+                result = func(*args, **kwargs)
+                elapsed = time.perf_counter() - started
+                count = 0
+                if records is not None and result is not None:
+                    try:
+                        count = records(result)
+                    except TypeError:
+                        count = 0
+                self.record(operation, elapsed, count)
+                return result
+            return wrapper
+        return decorator
+
+    def snapshot(self):
+        """Возвращает статистику всех операций в виде словаря"""
+        with self._lock:
+            return {operation: stats.to_dict()
+                    for operation, stats in sorted(self._stats.items())}
+
+    def reset(self):
+        """Очищает накопленную статистику"""
+        with self._lock:
+            self._stats = {}
+
+    def dump_json(self, filename):
+        """Сохраняет статистику в JSON-файл"""
+        import json  # Нужен только при сохранении, не замедляет запуск
+
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+
+    def dump_on_exit(self, filename):
+        """Сохраняет статистику в файл при завершении процесса"""
+        if self._dump_path is None:
+            atexit.register(self._dump_at_exit)
+        self._dump_path = filename
+
+    def _dump_at_exit(self):
+        if self._dump_path and self._stats:
+            self.dump_json(self._dump_path)
+
+
+# Общий сборщик статистики приложения
+instrumentation = Instrumentation(enabled=os.environ.get("VET_PROFILE") == "1")
+if instrumentation.enabled:
+    instrumentation.dump_on_exit(os.environ.get("VET_PROFILE_FILE", "profile.json"))
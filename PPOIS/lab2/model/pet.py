@@ -9,8 +9,12 @@ pet.py - класс для представления данных о питом
 - Диагноз (строка)
 """
 
+import copy
 from datetime import date
 
+# Поля питомца, которые можно задавать и изменять
+PET_FIELDS = ("name", "birth_date", "last_visit", "vet_name", "diagnosis")
+
 class Pet:
     """Класс, представляющий питомца в ветеринарной клинике"""
     
@@ -31,6 +35,27 @@ class Pet:
         self.last_visit = last_visit
         self.vet_name = vet_name
         self.diagnosis = diagnosis
+        self.record_id = None  # Присваивается базой данных при добавлении
+    
+    def copy_with(self, **fields):
+        """
+        Возвращает копию питомца с измененными полями
+        
+        Идентификатор записи сохраняется.
+        
+        Args:
+            **fields: Новые значения полей из PET_FIELDS
+            
+        Raises:
+            ValueError: При неизвестном имени поля
+        """
+        unknown = set(fields) - set(PET_FIELDS)
+        if unknown:
+            raise ValueError(f"Неизвестные поля питомца: {', '.join(sorted(unknown))}")
+        pet = copy.copy(self)
+        for field, value in fields.items():
+            setattr(pet, field, value)
+        return pet
     
     def __str__(self):
         """Строковое представление питомца для отладки"""
@@ -42,4 +67,58 @@ class Pet:
     
     def __repr__(self):
         """Представление объекта для интерпретатора"""
-        return self.__str__()
\ No newline at end of file
+        return self.__str__()
+
+
+def pet_row(pet: Pet):
+    """Значения строки таблицы результатов для питомца (даты - ДД.ММ.ГГГГ)"""
+    return (
+        pet.name,
+        pet.birth_date.strftime("%d.%m.%Y"),
+        pet.last_visit.strftime("%d.%m.%Y"),
+        pet.vet_name,
+        pet.diagnosis
+    )
+
+
+def parse_date(date_str: str) -> date:
+    """
+    Парсит строку в объект date
+    
+    Поддерживаемые форматы:
+    - ДД.ММ.ГГГГ
+    - ГГГГ-ММ-ДД
+    
+    Args:
+        date_str: Строка с датой
+        
+    Returns:
+        Объект date
+        
+    Raises:
+        ValueError: При некорректном формате даты
+    """
+    date_str = date_str.strip()
+    
+    try:
+        # Попробуем формат ДД.ММ.ГГГГ
+        if '.' in date_str:
+            parts = date_str.split('.')
+            if len(parts) == 3:
+                day = int(parts[0])
+                month = int(parts[1])
+                year = int(parts[2])
+                return date(year, month, day)
+        
+        # Попробуем формат ГГГГ-ММ-ДД
+        if '-' in date_str:
+            parts = date_str.split('-')
+            if len(parts) == 3:
+                year = int(parts[0])
+                month = int(parts[1])
+                day = int(parts[2])
+                return date(year, month, day)
+        
+        raise ValueError(f"Некорректный формат даты: {date_str}")
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Некорректный формат даты '{date_str}': {str(e)}")
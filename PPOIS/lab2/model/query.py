@@ -0,0 +1,202 @@
+"""
+query.py - ленивые результаты поиска и хеш-индексы
+
+QueryResult не строит список найденных записей заранее: записи
+отбираются по мере перебора, поэтому first(), exists() и limit(n)
+прекращают просмотр базы, как только найдено нужное количество.
+Результат привязан к снимку базы на момент запроса и не меняется при
+последующих добавлениях и удалениях.
+
+HashIndex - вторичный индекс PetDatabase по равенству полей (например,
+имя и дата рождения). Если он подключен (PetDatabase.attach_index), поиск
+по этим полям выбирает записи из индекса за O(k) вместо просмотра всей
+базы, а count() отвечает без перебора.
+"""
+
+from bisect import bisect_left, insort
+from itertools import islice
+
+# Сколько записей просматривается для оценки количества найденных
+ESTIMATE_SAMPLE_SIZE = 20000
+
+# На сколько равных частей делится выборка для оценки (по всей базе)
+ESTIMATE_SAMPLE_PARTS = 20
+
+
+def _record_key(pet):
+    return pet.record_id
+
+
+class QueryResult:
+    """Ленивый результат поиска с limit/offset и досрочным завершением"""
+
+    def __init__(self, records, predicate=None):
+        """
+        Args:
+            records: Последовательность записей-кандидатов, упорядоченная по
+                record_id (снимок базы или выборка из индекса); должна
+                поддерживать len(), перебор и срезы
+            predicate: Условие отбора; None - подходят все кандидаты
+        """
+        self._records = records
+        self._predicate = predicate
+        self._offset = 0
+        self._limit = None
+
+    def _copy(self, offset, limit):
+        result = QueryResult(self._records, self._predicate)
+        result._offset = offset
+        result._limit = limit
+        return result
+
+    def limit(self, count):
+        """Возвращает результат, ограниченный первыми count записями"""
+        if count < 0:
+            raise ValueError("Ограничение не может быть отрицательным")
+        if self._limit is not None:
+            count = min(count, self._limit)
+        return self._copy(self._offset, count)
+
+    def offset(self, count):
+        """Возвращает результат без первых count записей"""
+        if count < 0:
+            raise ValueError("Смещение не может быть отрицательным")
+        limit = None if self._limit is None else max(0, self._limit - count)
+        return self._copy(self._offset + count, limit)
+
+    def __iter__(self):
+        """Перебирает найденные записи, просматривая кандидатов по мере надобности"""
+        if self._predicate is None:
+            stop = len(self._records)
+            if self._limit is not None:
+                stop = min(stop, self._offset + self._limit)
+            return iter(self._records[self._offset:stop])
+        matches = filter(self._predicate, self._records)
+        stop = None if self._limit is None else self._offset + self._limit
+        return islice(matches, self._offset, stop)
+
+    def first(self):
+        """Возвращает первую найденную запись или None"""
+        return next(iter(self), None)
+
+    def exists(self):
+        """Проверяет, есть ли найденные записи (просмотр до первой из них)"""
+        return self.first() is not None
+
+    @property
+    def is_indexed(self):
+        """True, если кандидаты выбраны из индекса и count() не просматривает базу"""
+        return self._predicate is None
+
+    def _clip(self, total):
+        """Количество с учетом offset и limit"""
+        total = max(0, total - self._offset)
+        return total if self._limit is None else min(total, self._limit)
+
+    def count(self):
+        """
+        Возвращает точное количество найденных записей
+
+        Для выборки из индекса - за O(1), иначе - просмотром кандидатов
+        (с остановкой на limit, если он задан).
+        """
+        if self._predicate is None:
+            return self._clip(len(self._records))
+        return sum(1 for _ in self)
+
+    def estimate_count(self, sample_size=ESTIMATE_SAMPLE_SIZE):
+        """
+        Оценивает количество найденных записей без полного просмотра
+
+        Условие проверяется на выборке из sample_size кандидатов, взятых
+        равными частями по всей базе, и доля подходящих переносится на
+        всех кандидатов. Если кандидатов не больше sample_size (или они
+        выбраны из индекса), возвращается точное количество.
+
+        Returns:
+            Кортеж (количество, точное ли оно)
+        """
+        total = len(self._records)
+        if self._predicate is None or total <= sample_size:
+            return self.count(), True
+        part = sample_size // ESTIMATE_SAMPLE_PARTS
+        step = total // ESTIMATE_SAMPLE_PARTS
+        matched = 0
+        for start in range(0, step * ESTIMATE_SAMPLE_PARTS, step):
+            matched += sum(1 for pet in self._records[start:start + part] if self._predicate(pet))
+        return self._clip(round(matched * total / (part * ESTIMATE_SAMPLE_PARTS))), False
+
+
+class HashIndex:
+    """Вторичный индекс записей по равенству полей (строки - без учета регистра)"""
+
+    def __init__(self, fields):
+        """
+        Args:
+            fields: Кортеж имен полей Pet, например ("name", "birth_date")
+        """
+        self.fields = tuple(fields)
+        self._buckets = {}  # Ключ -> список записей, упорядоченный по record_id
+        self._keys = {}  # record_id -> ключ
+
+    def __len__(self):
+        return len(self._keys)
+
+    def make_key(self, *values):
+        """Ключ индекса для значений полей (в порядке fields)"""
+        return tuple(value.lower() if isinstance(value, str) else value for value in values)
+
+    def _pet_key(self, pet):
+        return self.make_key(*(getattr(pet, field) for field in self.fields))
+
+    # Обновление (вызывается PetDatabase)
+
+    def on_insert(self, pet):
+        """Добавляет запись в индекс"""
+        key = self._pet_key(pet)
+        self._keys[pet.record_id] = key
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            self._buckets[key] = [pet]
+        elif bucket[-1].record_id < pet.record_id:
+            bucket.append(pet)
+        else:
+            insort(bucket, pet, key=_record_key)
+
+    def on_delete(self, record_id):
+        """Удаляет запись из индекса (неизвестные идентификаторы пропускаются)"""
+        key = self._keys.pop(record_id, None)
+        if key is None:
+            return
+        bucket = self._buckets[key]
+        del bucket[bisect_left(bucket, record_id, key=_record_key)]
+        if not bucket:
+            del self._buckets[key]
+
+    def on_update(self, old_pet, new_pet):
+        """Обновляет запись; при изменении индексируемых полей переносит ее в другой список"""
+        key = self._keys.get(old_pet.record_id)
+        if key is None:
+            return
+        if self._pet_key(new_pet) == key:
+            bucket = self._buckets[key]
+            bucket[bisect_left(bucket, old_pet.record_id, key=_record_key)] = new_pet
+        else:
+            self.on_delete(old_pet.record_id)
+            self.on_insert(new_pet)
+
+    def clear(self):
+        """Очищает индекс"""
+        self._buckets.clear()
+        self._keys.clear()
+
+    # Запросы
+
+    def lookup(self, *values):
+        """
+        Возвращает записи с указанными значениями полей
+
+        Returns:
+            Новый список записей в порядке record_id
+        """
+        return list(self._buckets.get(self.make_key(*values), ()))
@@ -0,0 +1,218 @@
+"""
+reminders.py - напоминания о повторном приеме
+
+ReminderIndex - вторичный индекс PetDatabase по дате последнего приема,
+разбитый по ветеринарам. Для каждого ветеринара хранится отсортированный
+список ключей (порядковый номер дня последнего приема, record_id), который
+обновляется при добавлении, изменении и удалении записей
+(PetDatabase.attach_index). Запросы выполняются под блокировкой записи
+базы, поэтому во время фонового импорта они видят индекс между пакетами.
+
+Питомец должен прийти на повторный прием, когда с последнего приема
+прошло interval_days дней. Интервал применяется при запросе, поэтому один
+индекс обслуживает списки с любым интервалом. Запрос «кому пора прийти до
+даты X» - это бинарный поиск границы в списке каждого ветеринара и выдача
+k найденных записей: O(V log n + k), где V - количество ветеринаров.
+"""
+
+import hashlib
+import heapq
+import os
+import re
+from contextlib import nullcontext
+from bisect import bisect_left, bisect_right, insort
+from collections import namedtuple
+from datetime import date, timedelta
+
+# Интервал повторного приема по умолчанию, дней
+DEFAULT_INTERVAL_DAYS = 365
+
+# Заголовок CSV-файла со списком напоминаний
+CSV_HEADER = ("due_date", "name", "birth_date", "last_visit", "vet_name", "diagnosis")
+
+# Напоминание: дата, к которой питомцу пора на прием, и сама запись
+Reminder = namedtuple("Reminder", ["due_date", "pet"])
+
+
+class ReminderIndex:
+    """Индекс записей по сроку повторного приема с разбиением по ветеринарам"""
+
+    def __init__(self, interval_days=DEFAULT_INTERVAL_DAYS):
+        """
+        Args:
+            interval_days: Интервал повторного приема по умолчанию, дней
+        """
+        self.interval_days = interval_days
+        self._by_vet = {}  # Ключ ветеринара -> отсортированный список (день приема, record_id)
+        self._vet_names = {}  # Ключ ветеринара -> ФИО для отображения
+        self._entries = {}  # record_id -> (ключ ветеринара, ключ в списке, питомец)
+        # Блокировка записи базы; подставляется PetDatabase.attach_index
+        self.lock = nullcontext()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _vet_key(vet_name):
+        """ФИО ветеринара сравниваются без учета регистра, как при поиске"""
+        return vet_name.strip().lower()
+
+    # Обновление (вызывается PetDatabase)
+
+    def on_insert(self, pet):
+        """Добавляет запись в индекс"""
+        vet_key = self._vet_key(pet.vet_name)
+        key = (pet.last_visit.toordinal(), pet.record_id)
+        self._entries[pet.record_id] = (vet_key, key, pet)
+        keys = self._by_vet.get(vet_key)
+        if keys is None:
+            keys = self._by_vet[vet_key] = []
+            self._vet_names[vet_key] = pet.vet_name
+        # Записи обычно добавляются с недавними датами приема, т.е. в конец списка
+        if not keys or keys[-1] < key:
+            keys.append(key)
+        else:
+            insort(keys, key)
+
+    def on_delete(self, record_id):
+        """Удаляет запись из индекса (неизвестные идентификаторы пропускаются)"""
+        entry = self._entries.pop(record_id, None)
+        if entry is None:
+            return
+        vet_key, key, _ = entry
+        keys = self._by_vet[vet_key]
+        del keys[bisect_left(keys, key)]
+        if not keys:
+            del self._by_vet[vet_key]
+            del self._vet_names[vet_key]
+
+    def on_update(self, old_pet, new_pet):
+        """Обновляет запись; ключ перестраивается, только если изменились ветеринар или дата приема"""
+        entry = self._entries.get(old_pet.record_id)
+        if entry is None:
+            return
+        vet_key, key, _ = entry
+        if (self._vet_key(new_pet.vet_name) == vet_key
+                and new_pet.last_visit.toordinal() == key[0]):
+            self._entries[new_pet.record_id] = (vet_key, key, new_pet)
+        else:
+            self.on_delete(old_pet.record_id)
+            self.on_insert(new_pet)
+
+    def clear(self):
+        """Очищает индекс"""
+        self._by_vet.clear()
+        self._vet_names.clear()
+        self._entries.clear()
+
+    # Запросы
+
+    def vets(self):
+        """Возвращает ФИО ветеринаров, у которых есть пациенты, в алфавитном порядке"""
+        with self.lock:
+            names = list(self._vet_names.values())
+        return sorted(names, key=str.lower)
+
+    def _due_keys(self, vet_key, until, since, interval):
+        """Ключи записей ветеринара со сроком приема в диапазоне [since, until]"""
+        keys = self._by_vet.get(vet_key, [])
+        stop = bisect_right(keys, ((until - interval).toordinal(), float("inf")))
+        start = 0
+        if since is not None:
+            start = bisect_left(keys, ((since - interval).toordinal(),))
+        return keys[start:stop]
+
+    def due(self, until=None, since=None, vet_name=None, interval_days=None):
+        """
+        Возвращает напоминания со сроком приема не позже until
+
+        Args:
+            until: Последняя дата срока (по умолчанию - сегодня)
+            since: Первая дата срока (None - включая давно просроченные)
+            vet_name: Только пациенты указанного ветеринара (None - все)
+            interval_days: Интервал повторного приема (None - interval_days индекса)
+
+        Returns:
+            Список Reminder, отсортированный по сроку приема
+        """
+        until = until or date.today()
+        interval = timedelta(days=self.interval_days if interval_days is None else interval_days)
+        with self.lock:
+            if vet_name is not None:
+                vet_keys = [self._vet_key(vet_name)]
+            else:
+                vet_keys = list(self._by_vet)
+
+            # Списки ветеринаров уже отсортированы, поэтому достаточно их слить
+            merged = heapq.merge(*(self._due_keys(vet_key, until, since, interval)
+                                   for vet_key in vet_keys))
+            return [Reminder(date.fromordinal(ordinal) + interval, self._entries[record_id][2])
+                    for ordinal, record_id in merged]
+
+    def due_by_vet(self, until=None, since=None, interval_days=None):
+        """
+        Возвращает напоминания, сгруппированные по ветеринарам
+
+        Args:
+            until, since, interval_days: См. due()
+
+        Returns:
+            Словарь {ФИО ветеринара: список Reminder}; ветеринары без
+            напоминаний не включаются
+        """
+        result = {}
+        for vet_name in self.vets():
+            reminders = self.due(until, since, vet_name, interval_days)
+            if reminders:
+                result[vet_name] = reminders
+        return result
+
+
+def write_reminders_csv(reminders, stream):
+    """
+    Записывает напоминания в CSV
+
+    Args:
+        reminders: Итерируемая коллекция Reminder
+        stream: Текстовый поток, открытый с newline=""
+    """
+    import csv
+
+    writer = csv.writer(stream)
+    writer.writerow(CSV_HEADER)
+    for due_date, pet in reminders:
+        writer.writerow((due_date.isoformat(), pet.name, pet.birth_date.isoformat(),
+                         pet.last_visit.isoformat(), pet.vet_name, pet.diagnosis))
+
+
+def export_reminders_per_vet(index, directory, until=None, since=None, interval_days=None):
+    """
+    Сохраняет напоминания каждого ветеринара в отдельный CSV-файл
+
+    Недопустимые в имени файла символы заменяются на "_", поэтому разные
+    ФИО могут дать одно имя ("А/Б" и "А Б"). При совпадении (без учета
+    регистра - на случай нечувствительной к регистру файловой системы) к имени
+    добавляется короткий хеш ФИО, и каждый ветеринар получает свой файл.
+
+    Args:
+        index: ReminderIndex
+        directory: Папка для файлов (создается при необходимости)
+        until, since, interval_days: См. ReminderIndex.due()
+
+    Returns:
+        Словарь {ФИО ветеринара: путь к файлу}
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    used = set()
+    for vet_name, reminders in index.due_by_vet(until, since, interval_days).items():
+        filename = re.sub(r"[^\w.-]+", "_", vet_name).strip("_") or "vet"
+        if filename.lower() in used:
+            digest = hashlib.sha1(vet_name.encode("utf-8")).hexdigest()[:8]
+            filename = f"{filename}_{digest}"
+        used.add(filename.lower())
+        path = os.path.join(directory, f"{filename}.csv")
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            write_reminders_csv(reminders, f)
+        paths[vet_name] = path
+    return paths
@@ -0,0 +1,319 @@
+"""
+schedule.py - расписание приемов ветеринаров
+
+Для каждого ветеринара хранится список его приемов, отсортированный по
+началу, и параллельный список начал для бинарного поиска. Приемы одного
+ветеринара не пересекаются, поэтому с новым интервалом могут пересечься
+только ближайший прием слева и ближайший справа: проверка конфликта - это
+один бинарный поиск, O(log n).
+
+Содержит методы для:
+- Записи на прием с проверкой пересечений
+- Отмены записи
+- Поиска приемов и свободного времени ветеринара на день
+- Пакетного импорта существующих записей (в том числе из CSV)
+"""
+
+import heapq
+from bisect import bisect_left, bisect_right
+from datetime import datetime, time, timedelta
+
+from .appointment import Appointment
+from .instrumentation import instrumentation
+
+# Рабочее время клиники по умолчанию
+OPENING_TIME = time(9, 0)
+CLOSING_TIME = time(18, 0)
+
+# Длительность приема по умолчанию
+DEFAULT_DURATION = timedelta(minutes=30)
+
+# Поля CSV-файла с записями на прием
+CSV_FIELDS = ("vet_name", "pet_name", "start", "end", "note")
+
+
+class ScheduleConflict(ValueError):
+    """Интервал записи пересекается с уже существующим приемом"""
+
+    def __init__(self, appointment, conflict):
+        """
+        Args:
+            appointment: Отклоненная запись
+            conflict: Существующий прием, с которым она пересекается
+        """
+        super().__init__(
+            f"{conflict.vet_name} занят(а) с {conflict.start.strftime('%d.%m.%Y %H:%M')} "
+            f"до {conflict.end.strftime('%H:%M')} ({conflict.pet_name})"
+        )
+        self.appointment = appointment
+        self.conflict = conflict
+
+
+class _VetCalendar:
+    """Приемы одного ветеринара, отсортированные по началу"""
+
+    __slots__ = ("starts", "appointments")
+
+    def __init__(self):
+        self.starts = []
+        self.appointments = []
+
+    def find_conflict(self, start, end):
+        """Возвращает прием, пересекающийся с [start, end), или None"""
+        index = bisect_right(self.starts, start)
+        if index > 0 and self.appointments[index - 1].end > start:
+            return self.appointments[index - 1]
+        if index < len(self.starts) and self.starts[index] < end:
+            return self.appointments[index]
+        return None
+
+    def between(self, start, end):
+        """Приемы, начинающиеся в интервале [start, end)"""
+        return self.appointments[bisect_left(self.starts, start):bisect_left(self.starts, end)]
+
+
+class Schedule:
+    """Расписание приемов всех ветеринаров"""
+
+    def __init__(self):
+        """Инициализация пустого расписания"""
+        self._calendars = {}  # Ключ ветеринара -> _VetCalendar
+        self._vet_names = {}  # Ключ ветеринара -> ФИО для отображения
+        self._by_id = {}  # appointment_id -> Appointment
+        self._next_appointment_id = 1
+
+    def __len__(self):
+        """Возвращает количество записей в расписании"""
+        return len(self._by_id)
+
+    def __iter__(self):
+        """Перебирает записи по ветеринарам в порядке начала приема"""
+        for vet_key in sorted(self._calendars):
+            yield from self._calendars[vet_key].appointments
+
+    @staticmethod
+    def _vet_key(vet_name):
+        """ФИО ветеринаров сравниваются без учета регистра, как при поиске"""
+        return vet_name.strip().lower()
+
+    def _calendar(self, vet_name, create=False):
+        vet_key = self._vet_key(vet_name)
+        calendar = self._calendars.get(vet_key)
+        if calendar is None and create:
+            calendar = self._calendars[vet_key] = _VetCalendar()
+            self._vet_names[vet_key] = vet_name.strip()
+        return calendar
+
+    def _assign_appointment_id(self, appointment):
+        appointment.appointment_id = self._next_appointment_id
+        self._next_appointment_id += 1
+        self._by_id[appointment.appointment_id] = appointment
+
+    def vets(self):
+        """Возвращает ФИО ветеринаров, у которых есть записи, в алфавитном порядке"""
+        return sorted(self._vet_names.values(), key=str.lower)
+
+    def get(self, appointment_id):
+        """Возвращает запись по идентификатору или None"""
+        return self._by_id.get(appointment_id)
+
+    # Запись и отмена
+
+    def find_conflict(self, vet_name, start, end):
+        """
+        Ищет прием ветеринара, пересекающийся с интервалом [start, end)
+
+        Returns:
+            Пересекающийся прием или None, если интервал свободен
+        """
+        calendar = self._calendar(vet_name)
+        return calendar.find_conflict(start, end) if calendar else None
+
+    @instrumentation.measure("schedule.book")
+    def book(self, appointment: Appointment):
+        """
+        Записывает на прием, если время ветеринара свободно
+
+        Args:
+            appointment: Новая запись
+
+        Returns:
+            Идентификатор записи
+
+        Raises:
+            ScheduleConflict: Если время пересекается с другим приемом
+        """
+        calendar = self._calendar(appointment.vet_name, create=True)
+        conflict = calendar.find_conflict(appointment.start, appointment.end)
+        if conflict is not None:
+            raise ScheduleConflict(appointment, conflict)
+        index = bisect_right(calendar.starts, appointment.start)
+        calendar.starts.insert(index, appointment.start)
+        calendar.appointments.insert(index, appointment)
+        self._assign_appointment_id(appointment)
+        return appointment.appointment_id
+
+    def cancel(self, appointment_id):
+        """
+        Отменяет запись
+
+        Returns:
+            True, если запись найдена и отменена
+        """
+        appointment = self._by_id.pop(appointment_id, None)
+        if appointment is None:
+            return False
+        calendar = self._calendar(appointment.vet_name)
+        index = bisect_left(calendar.starts, appointment.start)
+        del calendar.starts[index]
+        del calendar.appointments[index]
+        if not calendar.appointments:
+            # Ветеринар без записей не показывается в vets()
+            vet_key = self._vet_key(appointment.vet_name)
+            del self._calendars[vet_key]
+            del self._vet_names[vet_key]
+        return True
+
+    @instrumentation.measure("schedule.import", records=lambda result: result[0])
+    def import_appointments(self, appointments):
+        """
+        Пакетно добавляет существующие записи
+
+        Записи каждого ветеринара сортируются, проверяются на пересечение
+        с расписанием и друг с другом и сливаются со списком ветеринара за
+        один проход, а не вставляются по одной.
+
+        Args:
+            appointments: Итерируемая коллекция объектов Appointment
+
+        Returns:
+            Кортеж (количество добавленных записей, список отклоненных ScheduleConflict)
+        """
+        by_vet = {}
+        for appointment in appointments:
+            by_vet.setdefault(self._vet_key(appointment.vet_name), []).append(appointment)
+
+        imported = 0
+        rejected = []
+        for batch in by_vet.values():
+            batch.sort(key=lambda appointment: appointment.start)
+            # Календарь создается, только если принята хотя бы одна запись
+            calendar = self._calendar(batch[0].vet_name)
+
+            accepted = []
+            for appointment in batch:
+                conflict = calendar.find_conflict(appointment.start, appointment.end) if calendar else None
+                if conflict is None and accepted and accepted[-1].end > appointment.start:
+                    conflict = accepted[-1]
+                if conflict is not None:
+                    rejected.append(ScheduleConflict(appointment, conflict))
+                    continue
+                accepted.append(appointment)
+                self._assign_appointment_id(appointment)
+
+            if accepted:
+                calendar = calendar or self._calendar(batch[0].vet_name, create=True)
+                merged = list(heapq.merge(calendar.appointments, accepted,
+                                          key=lambda appointment: appointment.start))
+                calendar.appointments = merged
+                calendar.starts = [appointment.start for appointment in merged]
+                imported += len(accepted)
+        return imported, rejected
+
+    # Запросы
+
+    def appointments_on(self, vet_name, day):
+        """
+        Возвращает приемы ветеринара за день в порядке начала
+
+        Args:
+            vet_name: ФИО ветеринара
+            day: Дата (тип date)
+        """
+        calendar = self._calendar(vet_name)
+        if calendar is None:
+            return []
+        day_start = datetime.combine(day, time.min)
+        return calendar.between(day_start, day_start + timedelta(days=1))
+
+    def free_slots(self, vet_name, day, duration=DEFAULT_DURATION,
+                   opening=OPENING_TIME, closing=CLOSING_TIME):
+        """
+        Ищет свободные промежутки ветеринара в рабочее время
+
+        Args:
+            vet_name: ФИО ветеринара
+            day: Дата (тип date)
+            duration: Минимальная длительность промежутка
+            opening: Начало рабочего дня
+            closing: Конец рабочего дня
+
+        Returns:
+            Список кортежей (начало, конец) свободных промежутков не короче duration
+        """
+        day_open = datetime.combine(day, opening)
+        day_close = datetime.combine(day, closing)
+        calendar = self._calendar(vet_name)
+
+        busy = []
+        if calendar is not None:
+            # Прием, начавшийся до открытия, может занимать начало рабочего дня
+            index = bisect_left(calendar.starts, day_open)
+            if index > 0:
+                busy.append(calendar.appointments[index - 1])
+            busy.extend(calendar.between(day_open, day_close))
+
+        slots = []
+        cursor = day_open
+        for appointment in busy:
+            if appointment.start - cursor >= duration:
+                slots.append((cursor, min(appointment.start, day_close)))
+            cursor = max(cursor, appointment.end)
+        if day_close - cursor >= duration:
+            slots.append((cursor, day_close))
+        return slots
+
+
+def load_appointments_csv(filename):
+    """
+    Загружает записи на прием из CSV-файла
+
+    Файл должен содержать заголовок с полями vet_name, pet_name, start, end
+    и необязательным note; даты и время - в формате ГГГГ-ММ-ДД ЧЧ:ММ.
+
+    Returns:
+        Список объектов Appointment
+
+    Raises:
+        ValueError: При некорректной строке (с номером строки)
+    """
+    import csv
+
+    appointments = []
+    with open(filename, encoding="utf-8", newline="") as f:
+        for line_num, row in enumerate(csv.DictReader(f), start=2):
+            try:
+                appointments.append(Appointment(
+                    row["pet_name"].strip(),
+                    row["vet_name"].strip(),
+                    datetime.fromisoformat(row["start"].strip()),
+                    datetime.fromisoformat(row["end"].strip()),
+                    (row.get("note") or "").strip()
+                ))
+            except (KeyError, AttributeError, ValueError) as e:
+                raise ValueError(f"Строка {line_num}: {str(e)}")
+    return appointments
+
+
+def save_appointments_csv(appointments, filename):
+    """Сохраняет записи на прием в CSV-файл (формат load_appointments_csv)"""
+    import csv
+
+    with open(filename, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_FIELDS)
+        for appointment in appointments:
+            writer.writerow((appointment.vet_name, appointment.pet_name,
+                             appointment.start.isoformat(sep=" ", timespec="minutes"),
+                             appointment.end.isoformat(sep=" ", timespec="minutes"),
+                             appointment.note))
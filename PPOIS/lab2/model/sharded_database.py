@@ -0,0 +1,388 @@
+"""
+sharded_database.py - секционированная база данных питомцев
+
+Записи распределяются между N рабочими процессами (по идентификатору записи),
+каждый процесс хранит свою секцию и выполняет поиск по ней независимо.
+Запросы рассылаются во все секции одновременно, а результаты собираются
+обратно в порядке добавления записей. Это позволяет задействовать все ядра
+процессора для поиска полным просмотром, который в одном процессе
+ограничен GIL.
+"""
+
+import heapq
+import multiprocessing
+import os
+from bisect import bisect_left
+from datetime import date
+
+from .chunked_list import ChunkedList
+from .database import PetDatabase, PetSnapshot
+from .pet import Pet
+from .query import QueryResult
+
+
+def _record_key(pet):
+    """Ключ сортировки результатов - порядок добавления записей"""
+    return pet.record_id
+
+
+def _shard_worker(conn):
+    """
+    Главный цикл рабочего процесса, обслуживающего одну секцию
+
+    Команды принимаются кортежами вида (операция, аргументы...),
+    ответ на каждую команду отправляется обратно через тот же канал.
+
+    Args:
+        conn: Конец канала multiprocessing.Pipe со стороны рабочего процесса
+    """
+    pets = []  # Записи секции в порядке добавления
+    by_id = {}  # Индекс записей секции по идентификатору
+
+    while True:
+        command, *args = conn.recv()
+
+        try:
+            if command == "add":
+                for pet in args[0]:
+                    pets.append(pet)
+                    by_id[pet.record_id] = pet
+                conn.send(len(args[0]))
+            elif command == "find_name_birth":
+                name, birth_date = args
+                conn.send([pet for pet in pets
+                           if pet.birth_date == birth_date and pet.name.lower() == name])
+            elif command == "find_visit_vet":
+                last_visit, vet_name = args
+                conn.send([pet for pet in pets
+                           if pet.last_visit == last_visit and pet.vet_name.lower() == vet_name])
+            elif command == "find_diagnosis":
+                phrase = args[0]
+                conn.send([pet for pet in pets if phrase in pet.diagnosis.lower()])
+            elif command == "get":
+                conn.send([by_id[record_id] for record_id in args[0]])
+            elif command == "all":
+                conn.send(pets)
+            elif command == "update":
+                record_id, fields = args
+                old_pet = by_id.get(record_id)
+                if old_pet is None:
+                    raise KeyError(f"Запись {record_id} не найдена")
+                new_pet = old_pet.copy_with(**fields)
+                pets[bisect_left(pets, record_id, key=_record_key)] = new_pet
+                by_id[record_id] = new_pet
+                conn.send((old_pet, new_pet))
+            elif command == "delete":
+                doomed_ids = set(args[0])
+                initial_count = len(pets)
+                pets = [pet for pet in pets if pet.record_id not in doomed_ids]
+                for record_id in doomed_ids:
+                    by_id.pop(record_id, None)
+                conn.send(initial_count - len(pets))
+            elif command == "stop":
+                conn.send(True)
+                break
+            else:
+                raise ValueError(f"Неизвестная команда секции: {command}")
+        except Exception as e:
+            # Ошибка передается вызывающей стороне вместо завершения процесса
+            conn.send(e)
+
+    conn.close()
+
+
+class ShardedPetDatabase(PetDatabase):
+    """
+    База данных питомцев, распределенная по рабочим процессам
+
+    Поддерживает тот же интерфейс, что и PetDatabase, поэтому может
+    передаваться в AppController вместо обычной базы. Родительский процесс
+    хранит только порядок идентификаторов записей для постраничного вывода,
+    сами записи находятся в секциях.
+    """
+
+    def __init__(self, records_per_page=10, shard_count=None):
+        """
+        Инициализация секционированной базы данных
+
+        Args:
+            records_per_page: Количество записей на странице
+            shard_count: Количество секций (по умолчанию - число ядер процессора)
+        """
+        super().__init__(records_per_page)
+        self.shard_count = shard_count or os.cpu_count() or 1
+        self._order = []  # Идентификаторы записей в порядке добавления
+        self._connections = []
+        self._processes = []
+
+        context = multiprocessing.get_context()
+        for _ in range(self.shard_count):
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(target=_shard_worker, args=(child_conn,), daemon=True)
+            process.start()
+            child_conn.close()
+            self._connections.append(parent_conn)
+            self._processes.append(process)
+
+    def __len__(self):
+        """Возвращает количество записей во всех секциях"""
+        return len(self._order)
+
+    def __iter__(self):
+        """Перебирает копии записей всех секций в порядке добавления"""
+        return iter(self.get_all_pets())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Останавливает рабочие процессы секций"""
+        for conn in self._connections:
+            try:
+                conn.send(("stop",))
+                conn.recv()
+            except (EOFError, OSError):
+                pass
+            conn.close()
+        for process in self._processes:
+            process.join()
+        self._connections = []
+        self._processes = []
+
+    # Маршрутизация и сбор результатов
+
+    def _shard_of(self, record_id):
+        """Возвращает номер секции, в которой хранится запись"""
+        return record_id % self.shard_count
+
+    def _request(self, shard_index, *command):
+        """Отправляет команду одной секции и возвращает ответ"""
+        conn = self._connections[shard_index]
+        conn.send(command)
+        return self._receive(conn)
+
+    def _scatter(self, *command):
+        """
+        Рассылает команду всем секциям и собирает ответы
+
+        Команда сначала отправляется во все секции, и только затем
+        ожидаются ответы, поэтому секции обрабатывают ее параллельно.
+
+        Returns:
+            Список ответов секций в порядке номеров секций
+        """
+        for conn in self._connections:
+            conn.send(command)
+        return self._receive_all(self._connections)
+
+    @staticmethod
+    def _receive(conn):
+        """Получает ответ секции, пробрасывая возникшее в ней исключение"""
+        response = conn.recv()
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    @staticmethod
+    def _collect(connections):
+        """
+        Получает ответы всех секций, которым была отправлена команда
+
+        Ответы читаются из каждого канала, даже если какая-то секция
+        сообщила об ошибке: непрочитанный ответ достался бы следующей
+        команде, и обмен с секцией рассинхронизировался бы.
+
+        Returns:
+            Список ответов в порядке каналов (исключения секций - как есть)
+        """
+        return [conn.recv() for conn in connections]
+
+    @staticmethod
+    def _raise_first_error(responses):
+        """Пробрасывает первое исключение среди ответов секций"""
+        for response in responses:
+            if isinstance(response, Exception):
+                raise response
+
+    def _receive_all(self, connections):
+        """Получает ответы всех секций и пробрасывает первую ошибку после чтения всех ответов"""
+        responses = self._collect(connections)
+        self._raise_first_error(responses)
+        return responses
+
+    def _gather(self, *command):
+        """Выполняет поиск во всех секциях и объединяет результаты по порядку добавления"""
+        return list(heapq.merge(*self._scatter(*command), key=_record_key))
+
+    def _group_by_shard(self, record_ids):
+        """Группирует идентификаторы записей по секциям"""
+        groups = [[] for _ in range(self.shard_count)]
+        for record_id in record_ids:
+            groups[self._shard_of(record_id)].append(record_id)
+        return groups
+
+    # Добавление
+
+    def add_pet(self, pet: Pet):
+        """Добавляет питомца в секцию, определяемую его идентификатором"""
+        self.add_pets([pet])
+
+    def add_pets(self, pets):
+        """
+        Добавляет несколько питомцев, отправляя каждой секции один пакет
+
+        Args:
+            pets: Итерируемая коллекция объектов Pet
+
+        Если какая-то секция не приняла пакет, записи, принятые остальными
+        секциями, все равно учитываются, после чего пробрасывается ошибка.
+
+        Returns:
+            Количество добавленных записей
+        """
+        batches = [[] for _ in range(self.shard_count)]
+        added = []
+        for pet in pets:
+            self._assign_record_id(pet)
+            batches[self._shard_of(pet.record_id)].append(pet)
+            added.append(pet)
+
+        pending = []
+        for shard_index, batch in enumerate(batches):
+            if batch:
+                self._connections[shard_index].send(("add", batch))
+                pending.append(shard_index)
+        responses = self._collect([self._connections[shard_index] for shard_index in pending])
+
+        failed_shards = {shard_index for shard_index, response in zip(pending, responses)
+                         if isinstance(response, Exception)}
+        if failed_shards:
+            added = [pet for pet in added if self._shard_of(pet.record_id) not in failed_shards]
+
+        self._order.extend(pet.record_id for pet in added)
+        for pet in added:
+            self._notify_insert(pet)
+        if added:
+            self._emit(inserted=added)
+        self._raise_first_error(responses)
+        return len(added)
+
+    def get_all_pets(self):
+        """Возвращает все записи о питомцах в порядке добавления"""
+        return self._gather("all")
+
+    # Методы поиска
+
+    def find_by_name_and_birth(self, name: str, birth_date: date):
+        """Поиск по имени питомца и дате рождения во всех секциях (условие 1)"""
+        return self._gather("find_name_birth", name.lower(), birth_date)
+
+    def find_by_visit_and_vet(self, last_visit: date, vet_name: str):
+        """Поиск по дате последнего приема и ФИО ветеринара во всех секциях (условие 2)"""
+        return self._gather("find_visit_vet", last_visit, vet_name.lower())
+
+    def find_by_diagnosis_phrase(self, phrase: str):
+        """Поиск по фразе из диагноза во всех секциях (условие 3)"""
+        return self._gather("find_diagnosis", phrase.lower())
+
+    def _scan(self, predicate, find):
+        """Секции просматривают записи сами, поэтому результат собирается сразу"""
+        return QueryResult(find())
+
+    # Удаление
+
+    def delete_pets(self, pets_to_delete):
+        """
+        Удаляет указанных питомцев
+
+        Args:
+            pets_to_delete: Список питомцев для удаления
+
+        Returns:
+            Количество удаленных записей
+        """
+        return self.delete_by_ids(pet.record_id for pet in pets_to_delete)
+
+    def delete_by_ids(self, record_ids):
+        """
+        Удаляет записи, направляя идентификаторы только в их секции
+
+        Args:
+            record_ids: Итерируемая коллекция идентификаторов записей
+
+        Returns:
+            Количество удаленных записей
+        """
+        doomed_ids = set(record_ids)
+        pending = []
+        for shard_index, shard_ids in enumerate(self._group_by_shard(doomed_ids)):
+            if shard_ids:
+                self._connections[shard_index].send(("delete", shard_ids))
+                pending.append((shard_index, shard_ids))
+        responses = self._collect([self._connections[shard_index] for shard_index, _ in pending])
+
+        # Записи секций, сообщивших об ошибке, остаются в локальном порядке
+        count = 0
+        for (_, shard_ids), response in zip(pending, responses):
+            if isinstance(response, Exception):
+                doomed_ids.difference_update(shard_ids)
+            else:
+                count += response
+
+        if count:
+            self._order = [record_id for record_id in self._order if record_id not in doomed_ids]
+            self._notify_delete(doomed_ids)
+            self._emit(deleted=doomed_ids)
+        self._raise_first_error(responses)
+        return count
+
+    # Редактирование
+
+    def update_pet(self, record_id, **fields):
+        """
+        Изменяет поля записи в секции, которой она принадлежит
+
+        Returns:
+            Обновленный объект Pet
+
+        Raises:
+            KeyError: Если записи с таким идентификатором нет
+            ValueError: При неизвестном имени поля
+        """
+        old_pet, new_pet = self._request(self._shard_of(record_id), "update", record_id, fields)
+        self._notify_update(old_pet, new_pet)
+        self._emit(updated=(new_pet,))
+        return new_pet
+
+    # Постраничная навигация
+
+    def get_page(self, page_num):
+        """
+        Возвращает питомцев для указанной страницы
+
+        Идентификаторы страницы берутся из локального порядка записей,
+        а сами записи запрашиваются только у секций, в которых они хранятся.
+        """
+        start_idx = (page_num - 1) * self.records_per_page
+        page_ids = self._order[start_idx:start_idx + self.records_per_page]
+
+        found = {}
+        for shard_index, record_ids in enumerate(self._group_by_shard(page_ids)):
+            if record_ids:
+                for pet in self._request(shard_index, "get", record_ids):
+                    found[pet.record_id] = pet
+        return [found[record_id] for record_id in page_ids]
+
+    # Снимки
+
+    def snapshot(self):
+        """
+        Возвращает согласованный снимок базы
+
+        Записи секций находятся в других процессах, поэтому снимок собирается
+        из копий всех записей за O(n).
+        """
+        return PetSnapshot(ChunkedList(self.get_all_pets()), self.records_per_page)
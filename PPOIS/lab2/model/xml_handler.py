@@ -2,31 +2,132 @@
 xml_handler.py - класс для работы с XML
 
 Содержит методы для:
-- Сохранения данных в XML с использованием DOM
+- Сохранения данных в XML: обычные файлы - через DOM, сжатые архивы -
+  потоковым генератором XMLGenerator без построения документа в памяти
 - Загрузки данных из XML с использованием SAX
+- Работы со сжатыми архивами (.xml.gz, .xml.bz2, .xml.xz) в потоковом режиме
 """
 
-import xml.dom.minidom as dom
+import bz2
+import gzip
+import lzma
 import xml.sax
 from datetime import date
-from .pet import Pet
+from xml.sax.saxutils import XMLGenerator
+from .pet import PET_FIELDS, Pet
 from .database import PetDatabase
+from .instrumentation import instrumentation
+
+# Кодеки сжатия: суффикс файла -> (функция открытия, имя параметра уровня сжатия)
+COMPRESSION_CODECS = {
+    ".xml.gz": (gzip.open, "compresslevel"),
+    ".xml.bz2": (bz2.open, "compresslevel"),
+    ".xml.xz": (lzma.open, "preset"),
+}
 
 class XMLHandler:
     """Класс для обработки XML-файлов"""
     
     @staticmethod
-    def save_to_xml(pets, filename):
+    def get_codec(filename):
+        """
+        Определяет кодек сжатия по расширению файла
+        
+        Args:
+            filename: Имя файла
+            
+        Returns:
+            Суффикс кодека из COMPRESSION_CODECS или None для обычного XML
+        """
+        lowered = str(filename).lower()
+        for suffix in COMPRESSION_CODECS:
+            if lowered.endswith(suffix):
+                return suffix
+        return None
+    
+    @staticmethod
+    def open_compressed(filename, mode, compresslevel=None):
+        """
+        Открывает сжатый XML-файл
+        
+        Args:
+            filename: Имя файла с суффиксом из COMPRESSION_CODECS
+            mode: "rb" для чтения или "wt" для записи текста в UTF-8
+            compresslevel: Уровень сжатия (только для записи; None - по умолчанию кодека)
+            
+        Returns:
+            Файловый объект, распаковывающий или сжимающий данные на лету
+        """
+        opener, level_name = COMPRESSION_CODECS[XMLHandler.get_codec(filename)]
+        kwargs = {}
+        if "t" in mode:
+            kwargs["encoding"] = "utf-8"
+        if compresslevel is not None and "w" in mode:
+            kwargs[level_name] = compresslevel
+        return opener(filename, mode, **kwargs)
+    
+    @staticmethod
+    def write_xml_stream(pets, stream):
+        """
+        Записывает питомцев в поток по одному, не строя документ в памяти
+        
+        Формат совпадает с документом, который save_to_xml строит через DOM
+        для несжатых файлов; сжатые архивы save_to_xml записывает этим методом.
+        
+        Args:
+            pets: Итерируемая коллекция объектов Pet
+            stream: Текстовый поток для записи (двоичный поток XMLGenerator
+                оборачивает без буферизации, что резко замедляет сжатие)
+        """
+        writer = XMLGenerator(stream, encoding="utf-8", short_empty_elements=True)
+        writer.startDocument()
+        writer.startElement("pets", {})
+        for pet in pets:
+            writer.ignorableWhitespace("\n  ")
+            writer.startElement("pet", {})
+            values = (pet.name, pet.birth_date.isoformat(), pet.last_visit.isoformat(),
+                      pet.vet_name, pet.diagnosis)
+            for field, value in zip(PET_FIELDS, values):
+                writer.ignorableWhitespace("\n    ")
+                writer.startElement(field, {})
+                writer.characters(value)
+                writer.endElement(field)
+            writer.ignorableWhitespace("\n  ")
+            writer.endElement("pet")
+        writer.ignorableWhitespace("\n")
+        writer.endElement("pets")
+        writer.ignorableWhitespace("\n")
+        writer.endDocument()
+    
+    @staticmethod
+    @instrumentation.measure("xml.save")
+    def save_to_xml(pets, filename, compresslevel=None):
         """
-        Сохраняет данные в XML-файл с использованием DOM
+        Сохраняет данные в XML-файл
+        
+        Обычный файл строится как DOM-документ и записывается целиком.
+        Файлы с расширением .xml.gz, .xml.bz2 или .xml.xz DOM не используют:
+        записи по одной пишутся потоковым генератором (write_xml_stream)
+        прямо в сжимающий поток.
         
         Args:
             pets: Список объектов Pet
             filename: Имя файла для сохранения
+            compresslevel: Уровень сжатия для архивов (None - по умолчанию кодека)
             
         Raises:
             RuntimeError: При ошибках ввода-вывода
         """
+        if XMLHandler.get_codec(filename):
+            try:
+                with XMLHandler.open_compressed(filename, "wt", compresslevel) as f:
+                    XMLHandler.write_xml_stream(pets, f)
+                return
+            except (IOError, Exception) as e:
+                raise RuntimeError(f"Ошибка сохранения в XML: {str(e)}")
+        
+        import xml.dom.minidom as dom
+        
         try:
             # Создаем DOM-документ
             impl = dom.getDOMImplementation()
@@ -73,10 +174,13 @@ class XMLHandler:
             raise RuntimeError(f"Ошибка сохранения в XML: {str(e)}")
     
     @staticmethod
+    @instrumentation.measure("xml.load", records=len)
     def load_from_xml(filename):
         """
         Загружает данные из XML-файла с использованием SAX
         
+        Поддерживаются также сжатые архивы .xml.gz, .xml.bz2 и .xml.xz.
+        
         Args:
             filename: Имя файла для загрузки
             
@@ -177,8 +281,12 @@ class XMLHandler:
             handler = PetHandler()
             parser.setContentHandler(handler)
             
-            # Парсим файл
-            parser.parse(filename)
+            # Парсим файл; сжатый архив распаковывается потоково во время разбора
+            if XMLHandler.get_codec(filename):
+                with XMLHandler.open_compressed(filename, "rb") as f:
+                    parser.parse(f)
+            else:
+                parser.parse(filename)
             
             return handler.pets
         except (xml.sax.SAXException, IOError, Exception) as e:
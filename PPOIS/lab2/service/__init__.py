@@ -0,0 +1,6 @@
+"""
+__init__.py - инициализация пакета service
+
+Пакет содержит сервер запросов к общей базе питомцев и протокол обмена:
+from service.server import QueryServer
+"""
@@ -0,0 +1,143 @@
+"""
+protocol.py - протокол обмена сообщениями с сервером запросов
+
+Каждое сообщение передается кадром: 4 байта длины (big-endian) и
+тело в формате JSON без пробелов. Запрос имеет вид
+{"op": <операция>, "args": [...]}, ответ - {"ok": true, "result": ...}
+или {"ok": false, "error": <текст ошибки>}.
+
+Питомцы передаются компактными списками
+[record_id, name, birth_date, last_visit, vet_name, diagnosis],
+где даты закодированы порядковыми номерами дней (date.toordinal).
+"""
+
+import json
+import struct
+from datetime import date
+
+from model.pet import Pet
+
+HEADER = struct.Struct("!I")  # Длина тела кадра
+MAX_FRAME_SIZE = 256 * 1024 * 1024  # Защита от поврежденного заголовка
+ALL_PAGE_SIZE = 10000  # Записей в одном ответе операции "all"
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+class ProtocolError(Exception):
+    """Ошибка формата кадра или ответа сервера"""
+    pass
+
+
+def pet_to_wire(pet: Pet):
+    """Кодирует питомца в компактный список для передачи"""
+    return [
+        pet.record_id,
+        pet.name,
+        pet.birth_date.toordinal(),
+        pet.last_visit.toordinal(),
+        pet.vet_name,
+        pet.diagnosis
+    ]
+
+
+def pet_from_wire(row):
+    """Восстанавливает питомца из компактного списка"""
+    record_id, name, birth_ordinal, visit_ordinal, vet_name, diagnosis = row
+    pet = Pet(name, date.fromordinal(birth_ordinal), date.fromordinal(visit_ordinal),
+              vet_name, diagnosis)
+    pet.record_id = record_id
+    return pet
+
+
+def fields_to_wire(fields):
+    """Кодирует изменяемые поля питомца (даты - порядковыми номерами дней)"""
+    return {field: value.toordinal() if isinstance(value, date) else value
+            for field, value in fields.items()}
+
+
+def fields_from_wire(fields):
+    """Восстанавливает изменяемые поля питомца"""
+    return {field: date.fromordinal(value) if field in ("birth_date", "last_visit") else value
+            for field, value in fields.items()}
+
+
+def encode_frame(message):
+    """Упаковывает сообщение в кадр: заголовок длины и тело JSON"""
+    body = json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return HEADER.pack(len(body)) + body
+
+
+def decode_body(body):
+    """Разбирает тело кадра"""
+    try:
+        return json.loads(body.decode("utf-8"))
+    except (UnicodeDecodeError, ValueError) as e:
+        raise ProtocolError(f"Некорректное тело кадра: {e}")
+
+
+def _check_length(length):
+    if length > MAX_FRAME_SIZE:
+        raise ProtocolError(f"Слишком большой кадр: {length} байт")
+    return length
+
+
+async def read_message(reader):
+    """
+    Читает одно сообщение из asyncio.StreamReader
+
+    Raises:
+        asyncio.IncompleteReadError: Если соединение закрыто
+    """
+    header = await reader.readexactly(HEADER.size)
+    (length,) = HEADER.unpack(header)
+    return decode_body(await reader.readexactly(_check_length(length)))
+
+
+async def write_message(writer, message):
+    """Отправляет одно сообщение в asyncio.StreamWriter"""
+    writer.write(encode_frame(message))
+    await writer.drain()
+
+
+def _recv_exactly(sock, size):
+    """Читает из сокета ровно size байт"""
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = sock.recv(remaining)
+        if not chunk:
+            raise ConnectionError("Сервер закрыл соединение")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def recv_message(sock):
+    """Читает одно сообщение из блокирующего сокета"""
+    (length,) = HEADER.unpack(_recv_exactly(sock, HEADER.size))
+    return decode_body(_recv_exactly(sock, _check_length(length)))
+
+
+def send_message(sock, message):
+    """Отправляет одно сообщение в блокирующий сокет"""
+    sock.sendall(encode_frame(message))
+
+
+def parse_address(address):
+    """
+    Разбирает адрес сервера
+
+    Args:
+        address: "host:port", "unix:/путь/к/сокету" или кортеж (host, port)
+
+    Returns:
+        Кортеж (host, port) для TCP или строка пути для Unix-сокета
+    """
+    if isinstance(address, tuple):
+        return address
+    if address.startswith("unix:"):
+        return address[len("unix:"):]
+    host, _, port = address.rpartition(":")
+    return (host or DEFAULT_HOST, int(port))
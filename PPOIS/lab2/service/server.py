@@ -0,0 +1,183 @@
+"""
+server.py - сервер запросов к общей базе питомцев
+
+Один процесс владеет единственной PetDatabase и обслуживает запросы
+нескольких стоек регистрации по локальному TCP- или Unix-сокету.
+Все операции выполняются в цикле событий asyncio последовательно,
+поэтому база не требует блокировок.
+
+Запуск:
+    python -m service.server --port 8765 --load data/demo1.xml data/demo2.xml
+    python -m service.server --unix /tmp/vet.sock
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from bisect import bisect_right
+from datetime import date
+from operator import attrgetter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model import PetDatabase, XMLHandler
+from service.protocol import (
+    ALL_PAGE_SIZE,
+    DEFAULT_HOST,
+    DEFAULT_PORT,
+    fields_from_wire,
+    pet_from_wire,
+    pet_to_wire,
+    read_message,
+    write_message
+)
+
+
+class QueryServer:
+    """Сервер, обслуживающий запросы к одной базе питомцев"""
+
+    def __init__(self, database=None):
+        """
+        Инициализация сервера
+
+        Args:
+            database: Обслуживаемая база (по умолчанию - новая PetDatabase)
+        """
+        self.database = database if database is not None else PetDatabase()
+        self.handlers = {
+            "add": self._add,
+            "count": self._count,
+            "all": self._all,
+            "page": self._page,
+            "search_name_birth": self._search_name_birth,
+            "search_visit_vet": self._search_visit_vet,
+            "search_diagnosis": self._search_diagnosis,
+            "delete": self._delete,
+            "update": self._update,
+        }
+        self.request_count = 0
+
+    # Обработчики операций
+
+    def _add(self, rows):
+        pets = [pet_from_wire(row) for row in rows]
+        self.database.add_pets(pets)
+        return [pet.record_id for pet in pets]
+
+    def _count(self):
+        return len(self.database)
+
+    def _all(self, after_id=0, limit=ALL_PAGE_SIZE):
+        """
+        Возвращает до limit записей с идентификатором больше after_id
+
+        Записи упорядочены по record_id, поэтому клиент получает всю базу
+        частями, передавая идентификатор последней полученной записи, и ни
+        один ответ не превышает ALL_PAGE_SIZE записей.
+        """
+        pets = self.database.get_all_pets()
+        start = bisect_right(pets, after_id, key=attrgetter("record_id"))
+        return [pet_to_wire(pet) for pet in pets[start:start + min(limit, ALL_PAGE_SIZE)]]
+
+    def _page(self, page_num, page_size):
+        """Возвращает страницу; размер передается клиентом, т.к. у каждой стойки свой"""
+        shared_page_size = self.database.records_per_page
+        self.database.records_per_page = page_size
+        try:
+            pets = self.database.get_page(page_num)
+        finally:
+            self.database.records_per_page = shared_page_size
+        return {"pets": [pet_to_wire(pet) for pet in pets], "total": len(self.database)}
+
+    def _search_name_birth(self, name, birth_ordinal):
+        pets = self.database.find_by_name_and_birth(name, date.fromordinal(birth_ordinal))
+        return [pet_to_wire(pet) for pet in pets]
+
+    def _search_visit_vet(self, visit_ordinal, vet_name):
+        pets = self.database.find_by_visit_and_vet(date.fromordinal(visit_ordinal), vet_name)
+        return [pet_to_wire(pet) for pet in pets]
+
+    def _search_diagnosis(self, phrase):
+        return [pet_to_wire(pet) for pet in self.database.find_by_diagnosis_phrase(phrase)]
+
+    def _delete(self, record_ids):
+        return self.database.delete_by_ids(record_ids)
+
+    def _update(self, record_id, fields):
+        return pet_to_wire(self.database.update_pet(record_id, **fields_from_wire(fields)))
+
+    def dispatch(self, message):
+        """
+        Выполняет один запрос
+
+        Returns:
+            Словарь ответа протокола
+        """
+        self.request_count += 1
+        try:
+            handler = self.handlers[message["op"]]
+        except (KeyError, TypeError):
+            return {"ok": False, "error": f"Неизвестная операция: {message!r:.100}"}
+        try:
+            return {"ok": True, "result": handler(*message.get("args", []))}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+
+    # Сетевая часть
+
+    async def handle_client(self, reader, writer):
+        """Обслуживает одно соединение до его закрытия клиентом"""
+        try:
+            while True:
+                try:
+                    message = await read_message(reader)
+                except asyncio.IncompleteReadError:
+                    break
+                await write_message(writer, self.dispatch(message))
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+        """
+        Запускает сервер и обслуживает соединения до остановки
+
+        Args:
+            host: Адрес TCP-сервера
+            port: Порт TCP-сервера
+            unix_path: Путь Unix-сокета (если указан, TCP не используется)
+        """
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_client, path=unix_path)
+            print(f"Сервер запросов слушает {unix_path}")
+        else:
+            server = await asyncio.start_server(self.handle_client, host, port)
+            print(f"Сервер запросов слушает {host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    """Запускает сервер запросов из командной строки"""
+    parser = argparse.ArgumentParser(description="Сервер запросов ветеринарной клиники")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Адрес для TCP-сервера")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Порт для TCP-сервера")
+    parser.add_argument("--unix", help="Путь Unix-сокета вместо TCP")
+    parser.add_argument("--load", nargs="*", default=[], help="XML-файлы для начальной загрузки")
+    args = parser.parse_args(argv)
+
+    server = QueryServer()
+    for filename in args.load:
+        count = server.database.add_pets(XMLHandler.load_from_xml(filename))
+        print(f"Загружено {count} записей из {filename}")
+
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        print(f"Сервер остановлен, обработано запросов: {server.request_count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,574 @@
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import pytest
+from datetime import date, datetime, time, timedelta
+from unittest.mock import patch
+from model.pet import Pet
+from model.background_search import BackgroundSearch
+from model.chunked_list import ChunkedList
+from model.sharded_database import ShardedPetDatabase
+from model.reminders import ReminderIndex, export_reminders_per_vet
+from model.database import (NAME_BIRTH_FIELDS, VISIT_VET_FIELDS, WRITE_BATCH_SIZE, ChangeEvent,
+                            PetDatabase, match_diagnosis_phrase)
+from model.query import HashIndex
+from model.appointment import Appointment
+from model.schedule import Schedule, ScheduleConflict
+from controller.remote_database import RemotePetDatabase
+from view.dialogs.live_results import LiveResults
+from service.server import QueryServer
+
+
+def make_pet(index):
+    """Создает питомца с предсказуемыми полями"""
+    return Pet(f"Pet{index}", date(2020, 1, 1 + index % 28), date(2024, 5, 1),
+               "Иванов Иван Иванович", f"Диагноз {index}")
+
+
+class FailingAddConnection:
+    """Канал секции, подменяющий пакет добавления неизвестной командой"""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def send(self, command):
+        if command[0] == "add":
+            command = ("broken",)
+        self._conn.send(command)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class FailingDeleteConnection(FailingAddConnection):
+    """Канал секции, подменяющий команду удаления неизвестной командой"""
+
+    def send(self, command):
+        if command[0] == "delete":
+            command = ("broken",)
+        self._conn.send(command)
+
+
+class FakeTree:
+    """Таблица с интерфейсом ttk.Treeview, достаточным для LiveResults"""
+
+    def __init__(self):
+        self.rows = []  # iid строк по порядку
+        self.values = {}
+
+    def get_children(self):
+        return tuple(self.rows)
+
+    def insert(self, parent, position, iid, values):
+        self.rows.insert(len(self.rows) if position == "end" else position, iid)
+        self.values[iid] = values
+
+    def delete(self, *items):
+        for iid in items:
+            self.rows.remove(iid)
+            del self.values[iid]
+
+    def item(self, iid, values):
+        self.values[iid] = values
+
+    def selection(self):
+        return tuple(self.rows[:1])
+
+
+@pytest.fixture
+def sharded_db():
+    """Секционированная база на две секции"""
+    with ShardedPetDatabase(shard_count=2) as db:
+        yield db
+
+# ==================== ТЕСТЫ CHUNKED LIST ====================
+
+def test_chunked_list_snapshot_is_isolated():
+    """Снимок не видит изменений, сделанных после него, и сам не изменяется"""
+    items = ChunkedList(range(20), chunk_size=4)
+    snapshot = items.snapshot()
+    items[5] = "новый"
+    items.append(20)
+    items.remove_where(lambda item: item in (0, 1, 2, 3, 9))
+
+    assert list(snapshot) == list(range(20))
+    assert snapshot[5] == 5 and snapshot[-1] == 19 and snapshot[3:7] == [3, 4, 5, 6]
+    expected = [item for item in range(21) if item not in (0, 1, 2, 3, 9)]
+    expected[expected.index(5)] = "новый"
+    assert list(items) == expected
+    assert len(items) == len(expected)
+    assert items[2:6] == expected[2:6]
+    with pytest.raises(TypeError):
+        snapshot.append(1)
+    with pytest.raises(TypeError):
+        snapshot[0] = 1
+
+
+def test_chunked_list_copies_only_changed_chunks():
+    """После снимка копируется только измененный блок, остальные разделяются"""
+    items = ChunkedList(range(12), chunk_size=4)
+    snapshot = items.snapshot()
+    items[5] = -5
+    shared = [a is b for a, b in zip(items._chunks, snapshot._chunks)]
+    assert shared == [True, False, True]
+    # Блок уже скопирован - следующая запись в него не копирует его снова
+    chunk = items._chunks[1]
+    items[6] = -6
+    assert items._chunks[1] is chunk
+    assert list(snapshot) == list(range(12))
+
+
+def test_chunked_list_index_sorted():
+    """Бинарный поиск по ключу находит элементы во всех блоках"""
+    items = ChunkedList(range(0, 100, 3), chunk_size=5)
+    for value in range(100):
+        expected = value // 3 if value % 3 == 0 else -1
+        assert items.index_sorted(value, key=lambda item: item) == expected
+
+# ==================== ТЕСТЫ PET DATABASE ====================
+
+def test_index_lookup_waits_for_writer():
+    """В потокобезопасном режиме выборка из индекса не читает индекс во время записи"""
+    db = PetDatabase(thread_safe=True)
+    db.attach_index(HashIndex(NAME_BIRTH_FIELDS))
+    db.add_pets(make_pet(i) for i in range(3))
+
+    found = []
+    with db._write_lock:
+        reader = threading.Thread(
+            target=lambda: found.extend(db.find_by_name_and_birth("pet1", date(2020, 1, 2))))
+        reader.start()
+        reader.join(0.05)
+        assert reader.is_alive()
+    reader.join()
+    assert [pet.name for pet in found] == ["Pet1"]
+
+
+def test_thread_safe_publishes_whole_batches():
+    """Читатели видят базу только между пакетами добавлений, а снимок не меняется"""
+    db = PetDatabase(thread_safe=True)
+    seen = []
+    db.subscribe(lambda event: seen.append((len(event.inserted), len(db))))
+    before = db.snapshot()
+
+    db.add_pets(make_pet(i) for i in range(2 * WRITE_BATCH_SIZE + 10))
+    assert seen == [(WRITE_BATCH_SIZE, WRITE_BATCH_SIZE), (WRITE_BATCH_SIZE, 2 * WRITE_BATCH_SIZE),
+                    (10, 2 * WRITE_BATCH_SIZE + 10)]
+    assert len(before) == 0
+    snapshot = db.snapshot()
+    db.delete_by_ids(range(1, 11))
+    assert len(snapshot) == 2 * WRITE_BATCH_SIZE + 10
+    assert len(db) == 2 * WRITE_BATCH_SIZE
+    assert db.get_page(1)[0].record_id == 11
+
+
+def test_thread_safe_readers_during_import():
+    """Чтение во время фонового импорта видит согласованные префиксы базы"""
+    db = PetDatabase(thread_safe=True)
+    total = 20 * WRITE_BATCH_SIZE
+    writer = threading.Thread(target=db.add_pets, args=([make_pet(i) for i in range(total)],))
+    writer.start()
+    while writer.is_alive():
+        pets = db.get_all_pets()
+        assert len(pets) % WRITE_BATCH_SIZE == 0
+        assert not pets or pets[-1].record_id == len(pets)
+        assert len(db.find_by_diagnosis_phrase("диагноз 1")) <= len(pets)
+    writer.join()
+    assert len(db) == total
+
+
+def test_update_pet_maintains_indexes():
+    """Изменение записи переносит ее в индексах и не затрагивает снимок"""
+    db = PetDatabase()
+    db.attach_index(HashIndex(NAME_BIRTH_FIELDS))
+    db.attach_index(HashIndex(VISIT_VET_FIELDS))
+    reminders = ReminderIndex(365)
+    db.attach_index(reminders)
+    db.add_pets(make_pet(i) for i in range(2000))
+    snapshot = db.snapshot()
+
+    updated = db.update_pet(1500, name="Барсик", vet_name="Петров Петр Петрович", last_visit=date(2023, 1, 1))
+    assert updated.record_id == 1500
+    assert db.get_all_pets()[1499] is updated
+    assert [pet.record_id for pet in db.find_by_name_and_birth("барсик", updated.birth_date)] == [1500]
+    assert db.find_by_name_and_birth("Pet1499", updated.birth_date) == []
+    assert [pet.record_id for pet in db.find_by_visit_and_vet(date(2023, 1, 1), "петров петр петрович")] == [1500]
+    assert 1500 not in [pet.record_id for pet in db.find_by_visit_and_vet(date(2024, 5, 1), "Иванов Иван Иванович")]
+    assert [reminder.pet for reminder in reminders.due(date(2024, 1, 1))] == [updated]
+    assert reminders.vets() == ["Иванов Иван Иванович", "Петров Петр Петрович"]
+    assert snapshot.get_all_pets()[1499].name == "Pet1499"
+
+
+def test_update_pet_errors():
+    """Изменение несуществующей записи или неизвестного поля отклоняется"""
+    db = PetDatabase()
+    db.add_pets(make_pet(i) for i in range(3))
+    db.delete_by_ids([2])
+    with pytest.raises(KeyError):
+        db.update_pet(2, name="Барсик")
+    with pytest.raises(ValueError):
+        db.update_pet(1, color="рыжий")
+    assert [pet.name for pet in db] == ["Pet0", "Pet2"]
+
+# ==================== ТЕСТЫ СОБЫТИЙ ИЗМЕНЕНИЯ ====================
+
+def test_change_events_contents():
+    """Каждое изменение публикует событие с затронутыми записями"""
+    db = PetDatabase()
+    events = []
+    db.subscribe(events.append)
+    db.add_pet(make_pet(0))
+    db.add_pets(make_pet(i) for i in range(1, 4))
+    updated = db.update_pet(2, diagnosis="Перелом")
+    db.delete_by_ids([1, 3, 99])
+    db.delete_by_ids([99])
+    db.unsubscribe(events.append)
+    db.add_pet(make_pet(4))
+
+    assert [[pet.record_id for pet in event.inserted] for event in events] == [[1], [2, 3, 4], [], []]
+    assert events[2] == ChangeEvent((), frozenset(), (updated,))
+    assert events[3].deleted == frozenset({1, 3, 99})
+    assert len(events) == 4
+
+
+def test_live_results_follow_changes():
+    """Показанные результаты обновляются по событиям, как повторный поиск"""
+    db = PetDatabase()
+    db.add_pets(make_pet(i) for i in range(30))
+    tree = FakeTree()
+    results = LiveResults(tree)
+    db.subscribe(results.apply)
+    results.show(db.find_by_diagnosis_phrase("диагноз 1"), match_diagnosis_phrase("диагноз 1"))
+
+    db.update_pet(3, diagnosis="Диагноз 1 (повторно)")
+    db.update_pet(11, diagnosis="Здоров")
+    db.update_pet(12, name="Барсик")
+    db.delete_by_ids([16, 20])
+    db.add_pets([make_pet(10), make_pet(5)])
+
+    expected = db.find_by_diagnosis_phrase("диагноз 1")
+    assert tree.rows == [str(pet.record_id) for pet in expected]
+    assert tree.values["12"][0] == "Барсик"
+    assert set(results.pets) == {pet.record_id for pet in expected}
+    assert results.selected_pets() == [expected[0]]
+
+    results.clear()
+    db.add_pet(make_pet(1))
+    assert tree.rows == []
+
+
+def test_live_results_respect_limit():
+    """Таблица с ограничением показывает только первые limit записей и отмечает, что найдено больше"""
+    db = PetDatabase()
+    db.add_pets(make_pet(i) for i in range(10))
+    tree = FakeTree()
+    changes = []
+    results = LiveResults(tree, limit=3, on_change=lambda: changes.append(len(results.pets)))
+    db.subscribe(results.apply)
+    matches = match_diagnosis_phrase("диагноз")
+    results.show(list(db.query_by_diagnosis_phrase("диагноз").limit(3)), matches)
+    assert tree.rows == ["1", "2", "3"] and not results.complete
+
+    db.add_pet(make_pet(10))
+    assert tree.rows == ["1", "2", "3"]
+    db.delete_by_ids([2])
+    assert tree.rows == ["1", "3"]
+    db.update_pet(1, name="Барсик")
+    db.add_pet(make_pet(11))
+    # Таблица неполная: записи 4-12 за последней показанной не дописываются
+    assert tree.rows == ["1", "3"] and tree.values["1"][0] == "Барсик"
+    assert changes == [2]
+
+    pets = {pet.record_id: pet for pet in db}
+    limited = LiveResults(FakeTree(), limit=2)
+    limited.show([pets[1], pets[5]], lambda pet: True)
+    assert limited.complete is False
+    limited.apply(ChangeEvent((), frozenset(), (pets[3],)))
+    # Запись 3 встала между показанными и вытеснила последнюю строку
+    assert limited.tree.rows == ["1", "3"] and not limited.complete
+
+
+def test_live_results_defer_events_while_streaming():
+    """События во время поступления результатов применяются после последней части"""
+    db = PetDatabase(thread_safe=True)
+    db.add_pets(make_pet(i) for i in range(50))
+    tree = FakeTree()
+    results = LiveResults(tree, limit=100)
+    db.subscribe(results.apply)
+    snapshot = db.snapshot()
+    search = BackgroundSearch(lambda cancel: snapshot.iter_diagnosis_matches("диагноз 1", cancel, chunk_size=7),
+                              background=False)
+
+    results.begin(match_diagnosis_phrase("диагноз 1"))
+    results.extend(search.take(3))
+    db.delete_by_ids([2])
+    db.add_pet(make_pet(1))
+    assert "51" not in tree.rows
+    while not search.finished:
+        results.extend(search.take(2))
+    results.finish()
+
+    assert tree.rows == [str(pet.record_id) for pet in db.find_by_diagnosis_phrase("диагноз 1")]
+    assert results.complete
+
+
+def test_background_search_cancel():
+    """Отмененный поиск прекращает просмотр базы перед следующим блоком"""
+    db = PetDatabase()
+    db.add_pets(make_pet(i) for i in range(100))
+    scanned = []
+
+    def search(cancel):
+        for chunk in db.iter_diagnosis_matches("диагноз", cancel, chunk_size=10):
+            scanned.append(len(chunk))
+            yield chunk
+            cancel.set()
+
+    background = BackgroundSearch(search)
+    assert background.wait(5)
+    assert [pet.record_id for pet in background.take(100)] == list(range(1, 11))
+    assert background.finished and background.cancelled and background.error is None
+    assert scanned == [10]
+
+# ==================== ТЕСТЫ SHARDED DATABASE ====================
+
+def test_sharded_add_and_find(sharded_db):
+    """Записи всех секций возвращаются в порядке добавления"""
+    sharded_db.add_pets(make_pet(i) for i in range(10))
+    assert len(sharded_db) == 10
+    assert [pet.name for pet in sharded_db.get_all_pets()] == [f"Pet{i}" for i in range(10)]
+    assert [pet.name for pet in sharded_db.find_by_diagnosis_phrase("диагноз 3")] == ["Pet3"]
+
+
+def test_sharded_scatter_error_keeps_protocol(sharded_db):
+    """Ошибка секции пробрасывается после чтения ответов всех секций"""
+    sharded_db.add_pets(make_pet(i) for i in range(4))
+    with pytest.raises(ValueError):
+        sharded_db._scatter("broken")
+    # Следующая команда получает свои ответы, а не оставшиеся от ошибки
+    assert len(sharded_db.get_all_pets()) == 4
+
+
+def test_sharded_add_partial_failure(sharded_db):
+    """Записи секций, принявших пакет, учитываются несмотря на ошибку другой секции"""
+    events = []
+    sharded_db.subscribe(events.append)
+    sharded_db._connections[1] = FailingAddConnection(sharded_db._connections[1])
+
+    with pytest.raises(ValueError):
+        sharded_db.add_pets(make_pet(i) for i in range(6))
+
+    stored = sharded_db.get_all_pets()
+    assert [pet.record_id for pet in stored] == sharded_db._order
+    assert all(pet.record_id % 2 == 0 for pet in stored)
+    assert len(stored) == 3
+    assert len(events) == 1
+
+
+def test_sharded_delete_partial_failure(sharded_db):
+    """Записи секции с ошибкой удаления остаются в порядке записей"""
+    sharded_db.add_pets(make_pet(i) for i in range(6))
+    all_ids = [pet.record_id for pet in sharded_db.get_all_pets()]
+    sharded_db._connections[1] = FailingDeleteConnection(sharded_db._connections[1])
+
+    with pytest.raises(ValueError):
+        sharded_db.delete_by_ids(all_ids)
+
+    assert sharded_db._order == [record_id for record_id in all_ids if record_id % 2 == 1]
+    assert [pet.record_id for pet in sharded_db.get_all_pets()] == sharded_db._order
+
+
+def test_sharded_update_missing_record(sharded_db):
+    """Изменение несуществующей записи выбрасывает KeyError из секции"""
+    sharded_db.add_pet(make_pet(0))
+    with pytest.raises(KeyError):
+        sharded_db.update_pet(99, name="Барсик")
+    assert sharded_db.get_page(1)[0].name == "Pet0"
+
+
+@pytest.fixture
+def server_address(tmp_path):
+    """Адрес сервера запросов, запущенного в фоновом потоке"""
+    path = str(tmp_path / "vet.sock")
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(
+        asyncio.start_unix_server(QueryServer().handle_client, path=path))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield "unix:" + path
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    server.close()
+    loop.close()
+
+# ==================== ТЕСТЫ REMOTE DATABASE ====================
+
+def test_remote_get_all_pets_paged(server_address):
+    """Все записи загружаются частями по ALL_PAGE_SIZE"""
+    with patch("controller.remote_database.ALL_PAGE_SIZE", 3), \
+            patch("service.server.ALL_PAGE_SIZE", 3):
+        with RemotePetDatabase(server_address) as db:
+            db.add_pets(make_pet(i) for i in range(7))
+            db.delete_by_ids([2])
+            with patch.object(db, "_call", wraps=db._call) as call:
+                pets = db.get_all_pets()
+    assert [pet.name for pet in pets] == [f"Pet{i}" for i in range(7) if i != 1]
+    assert call.call_count == 3
+
+
+def test_remote_timeout_closes_connection(tmp_path):
+    """После тайм-аута соединение закрывается и не используется повторно"""
+    path = str(tmp_path / "silent.sock")
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.listen()
+    try:
+        db = RemotePetDatabase("unix:" + path, timeout=0.1)
+        with pytest.raises(OSError):
+            len(db)
+        assert db._sock is None
+        with pytest.raises(OSError):
+            len(db)
+        db.close()
+    finally:
+        listener.close()
+
+# ==================== ТЕСТЫ SCHEDULE ====================
+
+DAY = date(2024, 5, 6)
+
+
+def at(hour, minute=0, day=DAY):
+    """Время приема в заданный день"""
+    return datetime.combine(day, time(hour, minute))
+
+
+def test_book_conflicts_match_brute_force():
+    """Конфликт по индексу ветеринара совпадает с перебором всех его приемов"""
+    random.seed(7)
+    schedule = Schedule()
+    booked = []
+    for i in range(300):
+        vet_name = random.choice(["Иванов", "Петров", " иванов "])
+        start = at(9) + timedelta(minutes=5 * random.randrange(100))
+        appointment = Appointment(f"Pet{i}", vet_name, start, start + timedelta(minutes=5 * random.randint(1, 8)))
+        expected = [other for other in booked
+                    if other.vet_name.strip().lower() == vet_name.strip().lower()
+                    and other.overlaps(appointment.start, appointment.end)]
+        if expected:
+            with pytest.raises(ScheduleConflict) as error:
+                schedule.book(appointment)
+            assert error.value.conflict in expected
+        else:
+            schedule.book(appointment)
+            booked.append(appointment)
+    assert len(schedule) == len(booked)
+    assert [vet_name.lower() for vet_name in schedule.vets()] == ["иванов", "петров"]
+
+
+def test_free_slots_and_cancel():
+    """Свободные промежутки учитывают прием, начатый до открытия; отмена освобождает время"""
+    schedule = Schedule()
+    early = schedule.book(Appointment("Барсик", "Иванов", at(8, 30), at(9, 30)))
+    schedule.book(Appointment("Мурка", "Иванов", at(12), at(13)))
+    schedule.book(Appointment("Шарик", "Иванов", at(17, 45), at(18, 30)))
+
+    assert schedule.free_slots("иванов", DAY) == [(at(9, 30), at(12)), (at(13), at(17, 45))]
+    assert schedule.free_slots("Иванов", DAY, duration=timedelta(hours=3)) == [(at(13), at(17, 45))]
+    assert schedule.free_slots("Петров", DAY) == [(at(9), at(18))]
+
+    assert schedule.cancel(early)
+    assert not schedule.cancel(early)
+    assert schedule.free_slots("Иванов", DAY)[0] == (at(9), at(12))
+    assert [appointment.pet_name for appointment in schedule.appointments_on("Иванов", DAY)] == ["Мурка", "Шарик"]
+
+
+def test_cancel_last_appointment_removes_vet():
+    """Ветеринар без записей не остается в списке"""
+    schedule = Schedule()
+    appointment_id = schedule.book(Appointment("Барсик", "Иванов", at(10), at(11)))
+    assert schedule.cancel(appointment_id)
+    assert schedule.vets() == []
+    assert list(schedule) == []
+
+
+def test_import_rejects_conflicts():
+    """Импорт отклоняет записи, пересекающиеся с расписанием и друг с другом"""
+    schedule = Schedule()
+    schedule.book(Appointment("Барсик", "Иванов", at(10), at(11)))
+    imported, rejected = schedule.import_appointments([
+        Appointment("Мурка", "Иванов", at(12), at(13)),
+        Appointment("Шарик", "иванов", at(10, 30), at(11, 30)),
+        Appointment("Бобик", "Иванов", at(12, 30), at(13, 30)),
+        Appointment("Рыжик", "Петров", at(10), at(11)),
+    ])
+    assert imported == 2
+    assert sorted(conflict.appointment.pet_name for conflict in rejected) == ["Бобик", "Шарик"]
+    assert [appointment.pet_name for appointment in schedule] == ["Барсик", "Мурка", "Рыжик"]
+    assert [appointment.start for appointment in schedule.appointments_on("Иванов", DAY)] == [at(10), at(12)]
+    assert len({appointment.appointment_id for appointment in schedule}) == 3
+
+
+def test_import_without_accepted_appointments_creates_no_calendar():
+    """Если все записи ветеринара отклонены, его календарь не создается заново"""
+    schedule = Schedule()
+    appointment_id = schedule.book(Appointment("Барсик", "Иванов", at(10), at(11)))
+    imported, rejected = schedule.import_appointments([Appointment("Шарик", "Иванов", at(10), at(10, 30))])
+    assert (imported, len(rejected)) == (0, 1)
+    schedule.cancel(appointment_id)
+    assert schedule.vets() == []
+
+# ==================== ТЕСТЫ REMINDERS ====================
+
+def test_export_reminders_unique_file_names(tmp_path):
+    """Ветеринары с совпадающими после очистки именами получают разные файлы"""
+    index = ReminderIndex(365)
+    for record_id, vet_name in enumerate(["А/Б", "А Б", "А_Б"], start=1):
+        pet = Pet("Барсик", date(2020, 1, 1), date(2023, 1, 1), vet_name, "Осмотр")
+        pet.record_id = record_id
+        index.on_insert(pet)
+
+    paths = export_reminders_per_vet(index, tmp_path, until=date(2024, 6, 1))
+    assert len(set(paths.values())) == 3
+    for vet_name, path in paths.items():
+        with open(path, encoding="utf-8") as f:
+            assert vet_name in f.read()
+
+
+def test_reminder_queries_wait_for_writer():
+    """В потокобезопасном режиме запросы напоминаний не читают индекс во время записи"""
+    db = PetDatabase(thread_safe=True)
+    reminders = ReminderIndex(365)
+    db.attach_index(reminders)
+    db.add_pets(make_pet(i) for i in range(3))
+
+    found = []
+    with db._write_lock:
+        reader = threading.Thread(target=lambda: found.extend(reminders.due(date(2025, 6, 1))))
+        reader.start()
+        reader.join(0.05)
+        assert reader.is_alive()
+    reader.join()
+    assert [reminder.pet.name for reminder in found] == ["Pet0", "Pet1", "Pet2"]
+    assert reminders.vets() == ["Иванов Иван Иванович"]
+
+    db.detach_index(reminders)
+    with db._write_lock:
+        assert len(reminders.due(date(2025, 6, 1))) == 3
+
+# ==================== ТЕСТЫ ПАКЕТА MODEL ====================
+
+def test_model_package_imports_lazily():
+    """Импорт пакета model не загружает модули сжатия, расписание и multiprocessing"""
+    code = ("import sys, model; "
+            "print(sorted(m for m in ('gzip', 'bz2', 'lzma', 'multiprocessing', 'model.schedule') "
+            "if m in sys.modules)); "
+            "print(model.XMLHandler.__module__, model.ScheduleConflict.__module__)")
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__))).stdout.split("\n")
+    assert output[0] == "[]"
+    assert output[1] == "model.xml_handler model.schedule"
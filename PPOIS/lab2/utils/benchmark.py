@@ -0,0 +1,351 @@
+"""
+benchmark.py - замеры производительности приложения
+
+Подкоманды:
+    codecs  - степень сжатия и скорость сохранения/загрузки XML-архивов
+              для каждого кодека (.xml, .xml.gz, .xml.bz2, .xml.xz)
+    importtime - время выполнения подкоманды search консольной утилиты cli.py
+              на демо-данных (по -X importtime) и проверка того, что она
+              не загружает tkinter
+    concurrency - задержки чтения страниц потокобезопасной PetDatabase
+              без писателя и во время импорта в фоновом потоке
+    livesearch - поиск по диагнозу по мере ввода: задержки кадров потока
+              интерфейса, пока поиск идет в фоновом потоке, и время отмены
+
+Запуск:
+    python utils/benchmark.py codecs --count 100000 --level 6
+    python utils/benchmark.py importtime --runs 10
+    python utils/benchmark.py concurrency --count 500000
+    python utils/benchmark.py livesearch --count 1000000 --phrase воспаление
+"""
+
+import sys
+import os
+# Добавляем корневую директорию проекта в путь Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+from model import Pet, PetDatabase, XMLHandler
+from model.background_search import RESULT_LIMIT, BackgroundSearch, STREAM_INTERVAL_MS
+from model.xml_handler import COMPRESSION_CODECS
+from utils.random_generator import DIAGNOSES, PET_NAMES_DEMO1, PET_NAMES_DEMO2, VET_NAMES
+
+# Консольная утилита, время запуска которой измеряется
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI_PATH = os.path.join(PROJECT_DIR, "cli.py")
+
+# Измеряемая подкоманда: загрузка демо-данных через SAX и поиск по диагнозу
+STARTUP_COMMAND = ["search",
+                   os.path.join(PROJECT_DIR, "data", "demo1.xml"),
+                   os.path.join(PROJECT_DIR, "data", "demo2.xml"),
+                   "--diagnosis", "осмотр", "--count"]
+
+# Целевое время запуска консольной утилиты, мс
+STARTUP_TARGET_MS = 100
+
+
+def generate_pets(count, seed=0):
+    """
+    Генерирует заданное количество случайных питомцев (имена могут повторяться)
+
+    Args:
+        count: Количество записей
+        seed: Зерно генератора случайных чисел
+
+    Returns:
+        Список объектов Pet
+    """
+    rng = random.Random(seed)
+    names = PET_NAMES_DEMO1 + PET_NAMES_DEMO2
+    today = date.today()
+    pets = []
+    for _ in range(count):
+        birth_date = today - timedelta(days=rng.randint(0, 15 * 365))
+        last_visit = birth_date + timedelta(days=rng.randint(0, max(1, (today - birth_date).days)))
+        pets.append(Pet(rng.choice(names), birth_date, last_visit,
+                        rng.choice(VET_NAMES), rng.choice(DIAGNOSES)))
+    return pets
+
+
+def bench_codecs(count, level=None):
+    """
+    Сравнивает кодеки сжатия XML-архивов
+
+    Для каждого кодека сохраняет и загружает один и тот же набор записей
+    и выводит размер файла, степень сжатия относительно обычного XML и
+    скорость по объему несжатых данных.
+
+    Args:
+        count: Количество записей в наборе
+        level: Уровень сжатия (None - по умолчанию кодека)
+    """
+    pets = generate_pets(count)
+    print(f"Записей: {count}, уровень сжатия: {level if level is not None else 'по умолчанию'}")
+    print(f"{'формат':<10}{'размер, КБ':>12}{'сжатие':>10}"
+          f"{'запись, МБ/с':>15}{'чтение, МБ/с':>15}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        raw_size = None
+        for suffix in [".xml"] + list(COMPRESSION_CODECS):
+            filename = os.path.join(tmp_dir, "pets" + suffix)
+
+            started = time.perf_counter()
+            XMLHandler.save_to_xml(pets, filename, compresslevel=level)
+            save_time = time.perf_counter() - started
+
+            started = time.perf_counter()
+            loaded = XMLHandler.load_from_xml(filename)
+            load_time = time.perf_counter() - started
+            if len(loaded) != count:
+                raise RuntimeError(f"{suffix}: загружено {len(loaded)} из {count} записей")
+
+            size = os.path.getsize(filename)
+            if raw_size is None:
+                raw_size = size
+            raw_mb = raw_size / (1024 * 1024)
+            print(f"{suffix:<10}{size / 1024:>12.1f}{raw_size / size:>9.1f}x"
+                  f"{raw_mb / save_time:>15.1f}{raw_mb / load_time:>15.1f}")
+
+
+def parse_importtime(output):
+    """
+    Разбирает вывод интерпретатора с ключом -X importtime
+
+    Args:
+        output: Содержимое stderr
+
+    Returns:
+        Список кортежей (модуль, собственное время мкс, накопленное время мкс, вложенность)
+    """
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return modules
+
+
+def bench_importtime(runs=5, top=10):
+    """
+    Измеряет время запуска консольной утилиты
+
+    Утилита несколько раз выполняет подкоманду STARTUP_COMMAND - с
+    загрузкой файлов, поэтому в замер входят и модули, которые импортируются
+    только при обработке данных (разборщик SAX и т.п.). Выводится лучшее
+    время выполнения процесса, суммарное время импорта модулей и самые
+    медленные импорты.
+
+    Args:
+        runs: Количество запусков
+        top: Сколько самых медленных модулей верхнего уровня вывести
+
+    Returns:
+        True, если время запуска укладывается в STARTUP_TARGET_MS и tkinter не загружается
+    """
+    best_wall = None
+    best_modules = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = subprocess.run([sys.executable, "-X", "importtime", CLI_PATH, *STARTUP_COMMAND],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                text=True, check=True)
+        wall = time.perf_counter() - started
+        if best_wall is None or wall < best_wall:
+            best_wall = wall
+            best_modules = parse_importtime(result.stderr)
+
+    top_level = [module for module in best_modules if module[3] == 0]
+    import_ms = sum(module[2] for module in top_level) / 1000
+    wall_ms = best_wall * 1000
+    uses_tk = any(module[0].split(".")[0] in ("tkinter", "_tkinter", "tkcalendar")
+                  for module in best_modules)
+
+    print(f"Запуск cli.py {STARTUP_COMMAND[0]}: {wall_ms:.1f} мс (лучший из {runs}), "
+          f"импорт модулей: {import_ms:.1f} мс, модулей: {len(best_modules)}")
+    print(f"{'модуль':<40}{'накоплено, мс':>15}")
+    for name, _, cumulative_us, _ in sorted(top_level, key=lambda m: m[2], reverse=True)[:top]:
+        print(f"{name:<40}{cumulative_us / 1000:>15.2f}")
+    if uses_tk:
+        print("ОШИБКА: консольная утилита загружает tkinter")
+
+    ok = wall_ms <= STARTUP_TARGET_MS and not uses_tk
+    print(f"Цель {STARTUP_TARGET_MS} мс: {'выполнена' if ok else 'не выполнена'}")
+    return ok
+
+
+def _measure_reads(database, stop, page_num):
+    """Читает страницу и размер базы, пока не установлен stop; возвращает задержки"""
+    latencies = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        database.get_page(page_num)
+        len(database)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def _latency_row(title, latencies):
+    latencies.sort()
+    count = len(latencies)
+    print(f"{title:<22}{count:>10}"
+          f"{latencies[count // 2] * 1000:>12.3f}"
+          f"{latencies[min(count - 1, int(count * 0.99))] * 1000:>12.3f}"
+          f"{latencies[-1] * 1000:>12.3f}")
+
+
+def bench_concurrency(count, duration=1.0):
+    """
+    Сравнивает задержки чтения страниц без писателя и во время импорта
+
+    База создается в потокобезопасном режиме; половина записей загружается
+    заранее, вторая половина импортируется в фоновом потоке, пока основной
+    поток читает страницы.
+
+    Args:
+        count: Общее количество записей
+        duration: Длительность замера без писателя, секунд
+    """
+    pets = generate_pets(count)
+    database = PetDatabase(thread_safe=True)
+    database.add_pets(pets[:count // 2])
+    page_num = max(1, database.get_total_pages() // 2)
+
+    print(f"Записей: {count // 2} + {count - count // 2} (импорт в фоновом потоке)")
+    print(f"{'режим':<22}{'чтений':>10}{'p50, мс':>12}{'p99, мс':>12}{'макс, мс':>12}")
+
+    stop = threading.Event()
+    timer = threading.Timer(duration, stop.set)
+    timer.start()
+    _latency_row("без писателя", _measure_reads(database, stop, page_num))
+
+    stop = threading.Event()
+    started = time.perf_counter()
+
+    def run_import():
+        database.add_pets(pets[count // 2:])
+        stop.set()
+
+    writer = threading.Thread(target=run_import, name="import")
+    writer.start()
+    _latency_row("во время импорта", _measure_reads(database, stop, page_num))
+    writer.join()
+    print(f"Импорт: {time.perf_counter() - started:.2f} с, записей в базе: {len(database)}")
+
+
+def _stream_frames(search, lags, started):
+    """
+    Имитирует вывод результатов окном: раз в кадр забирает найденные записи,
+    а набрав RESULT_LIMIT, отменяет поиск
+
+    Returns:
+        (количество записей, время до первой порции в секундах или None)
+    """
+    received = 0
+    first = None
+    deadline = time.perf_counter()
+    while not search.finished:
+        deadline += STREAM_INTERVAL_MS / 1000
+        time.sleep(max(0.0, deadline - time.perf_counter()))
+        # Опоздание кадра: сколько поток интерфейса ждал GIL сверх срока
+        lags.append(max(0.0, time.perf_counter() - deadline))
+        taken = len(search.take(RESULT_LIMIT - received))
+        if taken and first is None:
+            first = time.perf_counter() - started
+        received += taken
+        if received >= RESULT_LIMIT:
+            search.cancel()
+            search.wait()
+            break
+        deadline = max(deadline, time.perf_counter())
+    return received, first
+
+
+def bench_livesearch(count, phrase):
+    """
+    Замеряет отзывчивость поиска по диагнозу по мере ввода
+
+    Поиск идет в фоновом потоке по снимку потокобезопасной базы, а основной
+    поток раз в кадр (STREAM_INTERVAL_MS) забирает порцию результатов, как окно
+    поиска. Сначала выполняется поиск по первой букве фразы, который
+    отменяется следующим (как при наборе текста), затем - по всей фразе.
+
+    Args:
+        count: Количество записей в базе
+        phrase: Фраза для поиска
+    """
+    database = PetDatabase(thread_safe=True)
+    database.add_pets(generate_pets(count))
+
+    def start(text):
+        snapshot = database.snapshot()
+        return BackgroundSearch(lambda cancel: snapshot.iter_diagnosis_matches(text, cancel))
+
+    print(f"Записей: {count}, фраза: {phrase!r}, кадр: {STREAM_INTERVAL_MS} мс, "
+          f"показывается записей: {RESULT_LIMIT}")
+
+    # Поиск по первой букве отменяется, как только «введена» следующая
+    stale = start(phrase[:1])
+    time.sleep(STREAM_INTERVAL_MS / 1000)
+    cancelled = time.perf_counter()
+    stale.cancel()
+    stale.wait()
+    print(f"Отмена устаревшего поиска: {(time.perf_counter() - cancelled) * 1000:.1f} мс")
+
+    lags = []
+    started = time.perf_counter()
+    search = start(phrase)
+    received, first = _stream_frames(search, lags, started)
+    total = time.perf_counter() - started
+    lags.sort()
+    print(f"Найдено: {received}, первые результаты через "
+          f"{(first or 0) * 1000:.1f} мс, все - через {total:.2f} с")
+    print(f"Опоздание кадров ({len(lags)}): p50 {lags[len(lags) // 2] * 1000:.2f} мс, "
+          f"p99 {lags[min(len(lags) - 1, int(len(lags) * 0.99))] * 1000:.2f} мс, "
+          f"макс {lags[-1] * 1000:.2f} мс")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Замеры производительности ветеринарной клиники")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    codecs_parser = subparsers.add_parser("codecs", help="Сравнение кодеков сжатия XML")
+    codecs_parser.add_argument("--count", type=int, default=100000,
+                               help="Количество записей в наборе")
+    codecs_parser.add_argument("--level", type=int, default=None,
+                               help="Уровень сжатия (gzip/bz2: 1-9, xz: 0-9)")
+
+    importtime_parser = subparsers.add_parser("importtime", help="Время запуска консольной утилиты")
+    importtime_parser.add_argument("--runs", type=int, default=5, help="Количество запусков")
+    importtime_parser.add_argument("--top", type=int, default=10,
+                                   help="Сколько самых медленных импортов вывести")
+
+    concurrency_parser = subparsers.add_parser("concurrency",
+                                               help="Задержки чтения во время фонового импорта")
+    concurrency_parser.add_argument("--count", type=int, default=500000,
+                                    help="Общее количество записей")
+
+    livesearch_parser = subparsers.add_parser("livesearch",
+                                              help="Отзывчивость поиска по диагнозу по мере ввода")
+    livesearch_parser.add_argument("--count", type=int, default=1000000,
+                                   help="Количество записей в базе")
+    livesearch_parser.add_argument("--phrase", default="воспаление", help="Фраза для поиска")
+
+    args = parser.parse_args()
+
+    if args.command == "codecs":
+        bench_codecs(args.count, args.level)
+    elif args.command == "importtime":
+        sys.exit(0 if bench_importtime(args.runs, args.top) else 1)
+    elif args.command == "concurrency":
+        bench_concurrency(args.count)
+    elif args.command == "livesearch":
+        bench_livesearch(args.count, args.phrase)
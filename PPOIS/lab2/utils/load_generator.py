@@ -0,0 +1,146 @@
+"""
+load_generator.py - нагрузочный тест сервера запросов
+
+Имитирует одновременную работу нескольких стоек регистрации: каждая стойка
+держит свое соединение с сервером и в цикле выполняет смесь операций
+(листание страниц, три вида поиска, добавление). По окончании выводится
+пропускная способность и задержки (p50/p99) по каждой операции.
+
+Запуск (сервер должен быть запущен заранее):
+    python utils/load_generator.py --server 127.0.0.1:8765 --desks 128 --duration 10
+"""
+
+import sys
+import os
+# Добавляем корневую директорию проекта в путь Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import date, timedelta
+
+from service.protocol import parse_address, read_message, write_message
+from utils.random_generator import DIAGNOSES, PET_NAMES_DEMO1, VET_NAMES
+
+# Доли операций в нагрузке стойки регистрации
+OPERATION_MIX = [
+    ("page", 0.50),
+    ("search_name_birth", 0.20),
+    ("search_visit_vet", 0.15),
+    ("search_diagnosis", 0.10),
+    ("add", 0.05),
+]
+
+
+def _random_date(rng):
+    """Случайная дата за последние 15 лет"""
+    return date.today() - timedelta(days=rng.randint(0, 15 * 365))
+
+
+def make_request(op, rng):
+    """Формирует аргументы запроса для операции"""
+    if op == "page":
+        return [rng.randint(1, 20), 10]
+    if op == "search_name_birth":
+        return [rng.choice(PET_NAMES_DEMO1), _random_date(rng).toordinal()]
+    if op == "search_visit_vet":
+        return [_random_date(rng).toordinal(), rng.choice(VET_NAMES)]
+    if op == "search_diagnosis":
+        words = rng.choice(DIAGNOSES).split()
+        return [rng.choice(words).strip(",").lower()]
+    birth = _random_date(rng)
+    row = [None, rng.choice(PET_NAMES_DEMO1), birth.toordinal(),
+           (birth + timedelta(days=rng.randint(0, 365))).toordinal(),
+           rng.choice(VET_NAMES), rng.choice(DIAGNOSES)]
+    return [[row]]
+
+
+async def run_desk(address, deadline, latencies, seed):
+    """
+    Одна стойка регистрации: выполняет запросы до истечения времени
+
+    Args:
+        address: Разобранный адрес сервера
+        deadline: Момент окончания теста (time.perf_counter)
+        latencies: Словарь операция -> список задержек в секундах
+        seed: Зерно генератора случайных чисел стойки
+    """
+    rng = random.Random(seed)
+    ops = [op for op, _ in OPERATION_MIX]
+    weights = [weight for _, weight in OPERATION_MIX]
+
+    if isinstance(address, str):
+        reader, writer = await asyncio.open_unix_connection(address)
+    else:
+        reader, writer = await asyncio.open_connection(*address)
+
+    try:
+        while time.perf_counter() < deadline:
+            op = rng.choices(ops, weights)[0]
+            message = {"op": op, "args": make_request(op, rng)}
+            started = time.perf_counter()
+            await write_message(writer, message)
+            response = await read_message(reader)
+            latencies[op].append(time.perf_counter() - started)
+            if not response.get("ok"):
+                raise RuntimeError(f"Ошибка сервера: {response.get('error')}")
+    finally:
+        writer.close()
+
+
+def percentile(values, fraction):
+    """Перцентиль по отсортированному списку значений"""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(fraction * len(values)))
+    return values[index]
+
+
+async def run_load(address, desks, duration):
+    """
+    Запускает нагрузку и возвращает собранные задержки
+
+    Returns:
+        Кортеж (словарь задержек по операциям, фактическая длительность)
+    """
+    latencies = {op: [] for op, _ in OPERATION_MIX}
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(run_desk(address, deadline, latencies, seed)
+                           for seed in range(desks)))
+    return latencies, time.perf_counter() - started
+
+
+def print_report(latencies, elapsed, desks):
+    """Выводит пропускную способность и задержки по операциям"""
+    total = sum(len(values) for values in latencies.values())
+    print(f"Стоек: {desks}, длительность: {elapsed:.1f} с, запросов: {total}")
+    print(f"Пропускная способность: {total / elapsed:.0f} запросов/с")
+    print(f"{'операция':<20}{'кол-во':>10}{'p50, мс':>12}{'p99, мс':>12}")
+
+    every = []
+    for op, values in latencies.items():
+        values.sort()
+        every.extend(values)
+        print(f"{op:<20}{len(values):>10}"
+              f"{percentile(values, 0.50) * 1000:>12.2f}{percentile(values, 0.99) * 1000:>12.2f}")
+    every.sort()
+    print(f"{'все':<20}{len(every):>10}"
+          f"{percentile(every, 0.50) * 1000:>12.2f}{percentile(every, 0.99) * 1000:>12.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Нагрузочный тест сервера запросов")
+    parser.add_argument("--server", default="127.0.0.1:8765",
+                        help="Адрес сервера (host:port или unix:/путь)")
+    parser.add_argument("--desks", type=int, default=128,
+                        help="Количество одновременно работающих стоек")
+    parser.add_argument("--duration", type=float, default=10.0,
+                        help="Длительность теста в секундах")
+
+    args = parser.parse_args()
+
+    latencies, elapsed = asyncio.run(run_load(parse_address(args.server), args.desks, args.duration))
+    print_report(latencies, elapsed, args.desks)
@@ -0,0 +1,567 @@
+"""
+workload.py - воспроизведение рабочего дня регистратуры клиники
+
+В отличие от замеров отдельных операций (benchmark.py), здесь выполняется
+смесь действий регистратора: добавление питомцев, три вида поиска,
+листание страниц, удаление и периодическое сохранение в файл. Операции
+вызываются через AppController, как при нажатии кнопок, но без окна:
+главное окно и всплывающие сообщения заменены заглушками. По окончании
+выводятся пропускная способность, задержки по операциям (p50, p99, p99.9,
+максимум) и изменение памяти во времени (tracemalloc), поэтому хранилища
+и индексы можно сравнить на одной и той же нагрузке.
+
+Нагрузка задается трассой - файлом JSON Lines: первая строка описывает
+начальную базу, далее по строке на операцию с моментом ее поступления
+(секунды от начала смены). Трасса синтезируется по частоте каждой
+операции (поток Пуассона) и сохраняется, чтобы разные хранилища получили
+одинаковую нагрузку.
+
+Подкоманды:
+    record - синтезирует трассу и сохраняет ее в файл
+    replay - воспроизводит трассу из файла (без файла - синтезирует ее)
+
+Запуск:
+    python utils/workload.py record day.jsonl --count 200000 --duration 480 --rate add=2
+    python utils/workload.py replay day.jsonl --engine threadsafe
+    python utils/workload.py replay day.jsonl --engine sharded --no-indexes
+    python utils/workload.py replay --count 100000 --duration 60 --speed 60
+"""
+
+import sys
+import os
+# Добавляем корневую директорию проекта в путь Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import collections
+import heapq
+import itertools
+import json
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+import controller.app_controller as app_controller
+from controller import AppController, RemotePetDatabase
+from model import PetDatabase, ShardedPetDatabase
+from model.background_search import RESULT_LIMIT
+from model.instrumentation import instrumentation
+from model.pet import pet_row
+from utils.benchmark import generate_pets
+from utils.load_generator import percentile
+from utils.random_generator import DIAGNOSES, PET_NAMES_DEMO1, PET_NAMES_DEMO2, VET_NAMES
+
+# Частота операций одной стойки регистрации по умолчанию, операций в минуту
+DEFAULT_RATES = {
+    "page": 12.0,
+    "search_name_birth": 3.0,
+    "search_visit_vet": 2.0,
+    "search_diagnosis": 1.0,
+    "add": 1.0,
+    "delete": 0.3,
+}
+
+# Период сохранения в файл по умолчанию, минут
+DEFAULT_SAVE_EVERY = 15.0
+
+# Доля поисков по условиям 1 и 2, в которых ищется существующая запись
+SEARCH_HIT_RATIO = 0.8
+
+# Хранилища, которые можно сравнить
+ENGINES = ("memory", "threadsafe", "sharded", "remote")
+
+# Формат дат, который пользователь вводит в диалогах
+DATE_FORMAT = "%d.%m.%Y"
+
+PET_NAMES = PET_NAMES_DEMO1 + PET_NAMES_DEMO2
+
+
+class HeadlessView:
+    """
+    Заглушка главного окна
+
+    Принимает обновления таблицы и пагинации и выполняет отложенные вызовы
+    (after), которыми контроллер проверяет завершение фонового сохранения.
+    Вызовы выполняются между операциями, как в цикле обработки событий Tk.
+    """
+
+    def __init__(self):
+        self.pagination = self  # Контроллер обновляет пагинацию через view.pagination
+        self.rows = []
+        self._timers = []  # Куча (срок, номер, функция, аргументы)
+        self._order = itertools.count()
+
+    def update_table(self, pets):
+        """Формирует строки таблицы, как MainWindow"""
+        self.rows = [pet_row(pet) for pet in pets]
+
+    def update_pagination(self, current_page, total_pages, total_records):
+        pass
+
+    def get_selected_record_id(self):
+        return None
+
+    def after(self, ms, func, *args):
+        """Откладывает вызов func(*args) на ms миллисекунд"""
+        heapq.heappush(self._timers, (time.perf_counter() + ms / 1000, next(self._order), func, args))
+
+    def run_due(self):
+        """Выполняет отложенные вызовы, срок которых наступил"""
+        now = time.perf_counter()
+        while self._timers and self._timers[0][0] <= now:
+            _, _, func, args = heapq.heappop(self._timers)
+            func(*args)
+
+    def drain(self):
+        """Ждет и выполняет все отложенные вызовы (например, до конца сохранения)"""
+        while self._timers:
+            time.sleep(max(0.0, self._timers[0][0] - time.perf_counter()))
+            self.run_due()
+
+
+class HeadlessMessages:
+    """Заглушка tkinter.messagebox: считает сообщения вместо показа окон"""
+
+    def __init__(self):
+        self.counts = collections.Counter()
+        self.errors = collections.Counter()  # Текст ошибки -> количество
+
+    def showinfo(self, title, message, **options):
+        self.counts["info"] += 1
+
+    def showwarning(self, title, message, **options):
+        self.counts["warning"] += 1
+
+    def showerror(self, title, message, **options):
+        self.counts["error"] += 1
+        self.errors[message] += 1
+
+    def askyesno(self, title, message, **options):
+        return True
+
+
+# Синтез трассы
+
+def _date_text(value):
+    return value.strftime(DATE_FORMAT)
+
+
+def _random_date(rng):
+    """Случайная дата за последние 15 лет"""
+    return date.today() - timedelta(days=rng.randint(0, 15 * 365))
+
+
+def make_args(op, rng, pets):
+    """
+    Формирует аргументы операции в том виде, в каком их вводит пользователь
+
+    Args:
+        op: Имя операции
+        rng: Генератор случайных чисел
+        pets: Записи начальной базы (из них берутся ключи поиска)
+    """
+    hit = pets and rng.random() < SEARCH_HIT_RATIO
+    if op == "page":
+        return [rng.random()]
+    if op == "search_name_birth":
+        if hit:
+            pet = rng.choice(pets)
+            return [pet.name, _date_text(pet.birth_date)]
+        return [rng.choice(PET_NAMES), _date_text(_random_date(rng))]
+    if op == "search_visit_vet":
+        if hit:
+            pet = rng.choice(pets)
+            return [_date_text(pet.last_visit), pet.vet_name]
+        return [_date_text(_random_date(rng)), rng.choice(VET_NAMES)]
+    if op == "search_diagnosis":
+        words = rng.choice(DIAGNOSES).split()
+        return [rng.choice(words).strip(",").lower()]
+    if op == "add":
+        birth_date = _random_date(rng)
+        last_visit = min(date.today(), birth_date + timedelta(days=rng.randint(0, 365)))
+        return [rng.choice(PET_NAMES), _date_text(birth_date), _date_text(last_visit),
+                rng.choice(VET_NAMES), rng.choice(DIAGNOSES)]
+    if op == "delete":
+        # Страница и строка на ней в долях: база к этому моменту уже изменилась
+        return [rng.random(), rng.random()]
+    raise ValueError(f"Неизвестная операция: {op}")
+
+
+def synthesize(count, duration, rates, save_every, seed=0, pets=None):
+    """
+    Синтезирует трассу рабочего дня
+
+    Моменты каждой операции образуют поток Пуассона с заданной частотой,
+    сохранение выполняется через равные промежутки.
+
+    Args:
+        count: Количество записей в начальной базе
+        duration: Длительность смены, минут
+        rates: Словарь операция -> частота в минуту
+        save_every: Период сохранения, минут (0 - без сохранений)
+        seed: Зерно генератора (и начальной базы)
+        pets: Записи начальной базы, если уже созданы
+
+    Returns:
+        Кортеж (заголовок трассы, список операций (момент, операция, аргументы))
+    """
+    if pets is None:
+        pets = generate_pets(count, seed)
+    rng = random.Random(seed)
+    end = duration * 60
+    operations = []
+    for op in DEFAULT_RATES:
+        per_second = rates.get(op, 0.0) / 60
+        if per_second <= 0:
+            continue
+        moment = rng.expovariate(per_second)
+        while moment < end:
+            operations.append((moment, op, make_args(op, rng, pets)))
+            moment += rng.expovariate(per_second)
+    if save_every > 0:
+        moment = save_every * 60
+        while moment < end:
+            operations.append((moment, "save", []))
+            moment += save_every * 60
+    operations.sort(key=lambda operation: operation[0])
+    header = {"count": count, "seed": seed, "duration": duration}
+    return header, operations
+
+
+def save_trace(filename, header, operations):
+    """Сохраняет трассу в файл JSON Lines"""
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write(json.dumps(header) + "\n")
+        for moment, op, args in operations:
+            f.write(json.dumps({"t": round(moment, 3), "op": op, "args": args},
+                               ensure_ascii=False) + "\n")
+
+
+def load_trace(filename):
+    """
+    Загружает трассу из файла JSON Lines
+
+    Returns:
+        Кортеж (заголовок, список операций (момент, операция, аргументы))
+    """
+    with open(filename, encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        operations = []
+        for line in f:
+            if line.strip():
+                item = json.loads(line)
+                operations.append((item["t"], item["op"], item["args"]))
+    return header, operations
+
+
+# Воспроизведение
+
+def create_database(engine, server=None, shard_count=None):
+    """Создает хранилище для сравнения"""
+    if engine == "memory":
+        return PetDatabase()
+    if engine == "threadsafe":
+        return PetDatabase(thread_safe=True)
+    if engine == "sharded":
+        return ShardedPetDatabase(shard_count=shard_count)
+    if engine == "remote":
+        if not server:
+            raise ValueError("Для хранилища remote укажите --server")
+        return RemotePetDatabase(server)
+    raise ValueError(f"Неизвестное хранилище: {engine}")
+
+
+def _page_of(database, fraction):
+    """Номер страницы по доле от их количества"""
+    return 1 + int(fraction * max(0, database.get_total_pages() - 1))
+
+
+def _show_first(query):
+    """Получает то же, что показывает окно поиска: первые записи и их количество"""
+    results = list(query.limit(RESULT_LIMIT))
+    if len(results) == RESULT_LIMIT:
+        query.estimate_count()
+    return [pet_row(pet) for pet in results]
+
+
+def run_operation(controller, op, args, save_path):
+    """Выполняет операцию трассы через контроллер, как обработчик кнопки"""
+    if op == "page":
+        controller.change_page(_page_of(controller.database, args[0]))
+    elif op == "search_name_birth":
+        _show_first(controller.query_by_name_and_birth(*args))
+    elif op == "search_visit_vet":
+        _show_first(controller.query_by_visit_and_vet(*args))
+    elif op == "search_diagnosis":
+        _show_first(controller.query_by_diagnosis_phrase(*args))
+    elif op == "add":
+        controller.add_pet(tuple(args))
+    elif op == "delete":
+        # Как в главном окне: открыть страницу и удалить выбранную строку
+        pets = controller.database.get_page(_page_of(controller.database, args[0]))
+        if pets:
+            controller.delete_pets([pets[int(args[1] * len(pets))]])
+    elif op == "save":
+        controller.current_file = save_path
+        controller.save_to_xml()
+    else:
+        raise ValueError(f"Неизвестная операция: {op}")
+
+
+def _megabytes(size):
+    return size / (1024 * 1024)
+
+
+def replay(controller, view, operations, duration, speed=0.0, samples=10, save_path=None,
+           trace_memory=True):
+    """
+    Воспроизводит трассу
+
+    Args:
+        controller: AppController с заглушкой окна view
+        view: HeadlessView
+        operations: Список (момент, операция, аргументы)
+        duration: Длительность смены, минут
+        speed: Ускорение относительно реального времени; 0 - операции идут
+            подряд без пауз (предельная пропускная способность); смена
+            сжимается в секунды, поэтому перед очередным сохранением
+            дожидаемся окончания предыдущего, и это ожидание не входит в
+            длительность. При ускорении задержка считается от момента
+            поступления операции, поэтому в нее входит ожидание завершения
+            предыдущих
+        samples: Количество замеров памяти и задержек за смену
+        save_path: Файл для периодического сохранения
+        trace_memory: Замерять ли память через tracemalloc
+
+    Returns:
+        Кортеж (словарь операция -> список задержек, длительность в секундах
+        без ожидания сохранений, список замеров по ходу смены)
+    """
+    latencies = {op: [] for op in list(DEFAULT_RATES) + ["save"]}
+    timeline = []
+    interval = duration * 60 / samples
+    next_sample = interval
+    window = []
+    window_started = started = time.perf_counter()
+    waited = window_waited = 0.0
+
+    def wait_for_saves():
+        nonlocal waited, window_waited
+        wait_started = time.perf_counter()
+        view.drain()
+        waited += time.perf_counter() - wait_started
+        window_waited += time.perf_counter() - wait_started
+
+    def take_sample(moment):
+        nonlocal window, window_started, window_waited
+        now = time.perf_counter()
+        window.sort()
+        current, peak = tracemalloc.get_traced_memory() if trace_memory else (0, 0)
+        timeline.append({
+            "minute": moment / 60,
+            "elapsed": now - started - waited,
+            "operations": len(window),
+            "records": len(controller.database),
+            "throughput": len(window) / max(now - window_started - window_waited, 1e-9),
+            "p99_ms": percentile(window, 0.99) * 1000,
+            "memory_mb": _megabytes(current),
+            "peak_mb": _megabytes(peak),
+        })
+        if trace_memory:
+            tracemalloc.reset_peak()
+        window = []
+        window_started = now
+        window_waited = 0.0
+
+    take_sample(0)  # Начальная база до первой операции
+    for moment, op, args in operations:
+        while moment >= next_sample:
+            take_sample(next_sample)
+            next_sample += interval
+        due = None
+        if speed <= 0 and op == "save":
+            wait_for_saves()
+        if speed > 0:
+            due = started + moment / speed
+            # Ждем момента поступления, выполняя отложенные вызовы, как цикл Tk
+            while time.perf_counter() < due:
+                view.run_due()
+                time.sleep(min(0.005, max(0.0, due - time.perf_counter())))
+        view.run_due()
+        begin = time.perf_counter()
+        run_operation(controller, op, args, save_path)
+        end = time.perf_counter()
+        latency = end - (min(due, begin) if due is not None else begin)
+        latencies[op].append(latency)
+        window.append(latency)
+
+    wait_for_saves()
+    take_sample(duration * 60)
+    return latencies, time.perf_counter() - started - waited, timeline
+
+
+def print_report(latencies, elapsed, timeline, messages, trace_memory):
+    """Выводит пропускную способность, задержки по операциям и замеры по ходу смены"""
+    total = sum(len(values) for values in latencies.values())
+    print(f"Операций: {total} за {elapsed:.2f} с, "
+          f"пропускная способность: {total / elapsed:.0f} операций/с")
+    print(f"{'операция':<20}{'кол-во':>8}{'p50, мс':>11}{'p99, мс':>11}"
+          f"{'p99.9, мс':>11}{'макс, мс':>11}")
+    every = []
+    for op, values in latencies.items():
+        if not values:
+            continue
+        values.sort()
+        every.extend(values)
+        print(f"{op:<20}{len(values):>8}{percentile(values, 0.50) * 1000:>11.3f}"
+              f"{percentile(values, 0.99) * 1000:>11.3f}{percentile(values, 0.999) * 1000:>11.3f}"
+              f"{values[-1] * 1000:>11.3f}")
+    every.sort()
+    if every:
+        print(f"{'все':<20}{len(every):>8}{percentile(every, 0.50) * 1000:>11.3f}"
+              f"{percentile(every, 0.99) * 1000:>11.3f}{percentile(every, 0.999) * 1000:>11.3f}"
+              f"{every[-1] * 1000:>11.3f}")
+
+    print(f"Сообщений: {messages.counts['info']} информационных, "
+          f"{messages.counts['warning']} предупреждений, {messages.counts['error']} об ошибках")
+    for message, count in messages.errors.most_common(5):
+        print(f"  {count} x {message}")
+
+    title = "память (tracemalloc, только этот процесс)" if trace_memory else "память не замерялась"
+    print(f"По ходу смены, {title}:")
+    print(f"{'минута':>8}{'время, с':>10}{'операций':>10}{'записей':>10}"
+          f"{'опер./с':>10}{'p99, мс':>10}{'память, МБ':>12}{'пик, МБ':>10}")
+    for sample in timeline:
+        print(f"{sample['minute']:>8.1f}{sample['elapsed']:>10.2f}{sample['operations']:>10}"
+              f"{sample['records']:>10}{sample['throughput']:>10.0f}{sample['p99_ms']:>10.3f}"
+              f"{sample['memory_mb']:>12.1f}{sample['peak_mb']:>10.1f}")
+
+
+def parse_rates(items):
+    """
+    Разбирает частоты операций вида операция=в_минуту
+
+    Returns:
+        Частоты по умолчанию с учетом переданных
+    """
+    rates = dict(DEFAULT_RATES)
+    for item in items or []:
+        op, _, value = item.partition("=")
+        try:
+            if op not in DEFAULT_RATES:
+                raise ValueError
+            rates[op] = float(value)
+        except ValueError:
+            raise ValueError(f"Некорректная частота '{item}', ожидается ОПЕРАЦИЯ=ЧИСЛО "
+                             f"(операции: {', '.join(DEFAULT_RATES)})")
+    return rates
+
+
+def _add_synthesis_arguments(parser):
+    parser.add_argument("--count", type=int, default=100000,
+                        help="Количество записей в начальной базе")
+    parser.add_argument("--duration", type=float, default=60.0, help="Длительность смены, минут")
+    parser.add_argument("--rate", action="append", metavar="ОПЕРАЦИЯ=ЧАСТОТА",
+                        help="Частота операции в минуту (можно указать несколько раз); "
+                             f"операции: {', '.join(DEFAULT_RATES)}")
+    parser.add_argument("--save-every", type=float, default=DEFAULT_SAVE_EVERY,
+                        help="Период сохранения в файл, минут (0 - без сохранений)")
+    parser.add_argument("--seed", type=int, default=0, help="Зерно генератора")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Воспроизведение рабочего дня регистратуры")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = subparsers.add_parser("record", help="Синтезировать трассу и сохранить ее")
+    record_parser.add_argument("trace", help="Файл трассы (JSON Lines)")
+    _add_synthesis_arguments(record_parser)
+
+    replay_parser = subparsers.add_parser("replay", help="Воспроизвести трассу")
+    replay_parser.add_argument("trace", nargs="?",
+                               help="Файл трассы (без него трасса синтезируется)")
+    _add_synthesis_arguments(replay_parser)
+    replay_parser.add_argument("--engine", choices=ENGINES, default="threadsafe",
+                               help="Хранилище записей")
+    replay_parser.add_argument("--server", help="Адрес сервера для хранилища remote")
+    replay_parser.add_argument("--shards", type=int, default=None,
+                               help="Количество секций для хранилища sharded")
+    replay_parser.add_argument("--no-indexes", action="store_true",
+                               help="Не подключать хеш-индексы поиска по условиям 1 и 2")
+    replay_parser.add_argument("--speed", type=float, default=0.0,
+                               help="Ускорение относительно реального времени "
+                                    "(0 - операции подряд без пауз)")
+    replay_parser.add_argument("--samples", type=int, default=10,
+                               help="Количество замеров по ходу смены")
+    replay_parser.add_argument("--no-tracemalloc", action="store_true",
+                               help="Не замерять память (tracemalloc замедляет выделение памяти)")
+    replay_parser.add_argument("--profile", metavar="ФАЙЛ",
+                               help="Сохранить статистику операций модели и контроллера в JSON")
+
+    args = parser.parse_args()
+
+    try:
+        rates = parse_rates(args.rate)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.command == "record":
+        header, operations = synthesize(args.count, args.duration, rates,
+                                        args.save_every, args.seed)
+        save_trace(args.trace, header, operations)
+        print(f"Трасса: {len(operations)} операций за {args.duration:g} мин, "
+              f"начальная база: {args.count} записей -> {args.trace}")
+        return
+
+    # Память замеряется с самого начала, чтобы в нее вошли записи начальной базы
+    trace_memory = not args.no_tracemalloc
+    if trace_memory:
+        tracemalloc.start()
+
+    pets = None
+    if args.trace:
+        header, operations = load_trace(args.trace)
+    else:
+        pets = generate_pets(args.count, args.seed)
+        header, operations = synthesize(args.count, args.duration, rates,
+                                        args.save_every, args.seed, pets)
+    if pets is None:
+        pets = generate_pets(header["count"], header["seed"])
+
+    database = create_database(args.engine, args.server, args.shards)
+    view = HeadlessView()
+    messages = HeadlessMessages()
+    app_controller.messagebox = messages
+    controller = AppController(view, database=database, lookup_indexes=not args.no_indexes)
+    loading = time.perf_counter()
+    database.add_pets(pets)
+    del pets
+    controller.initialize()
+    print(f"Хранилище: {args.engine}, индексы: {'нет' if args.no_indexes else 'да'}, "
+          f"начальная база: {len(database)} записей за {time.perf_counter() - loading:.2f} с")
+    print(f"Смена: {header['duration']:g} мин, ускорение: "
+          f"{f'{args.speed:g}x' if args.speed > 0 else 'без пауз'}")
+
+    if args.profile:
+        instrumentation.reset()
+        instrumentation.enabled = True
+    save_dir = tempfile.mkdtemp(prefix="workload-")
+    try:
+        latencies, elapsed, timeline = replay(
+            controller, view, operations, header["duration"], args.speed, args.samples,
+            os.path.join(save_dir, "clinic.xml"), trace_memory)
+    finally:
+        shutil.rmtree(save_dir, ignore_errors=True)
+        if hasattr(database, "close"):
+            database.close()
+    if args.profile:
+        instrumentation.dump_json(args.profile)
+
+    print_report(latencies, elapsed, timeline, messages, trace_memory)
+
+
+if __name__ == "__main__":
+    main()
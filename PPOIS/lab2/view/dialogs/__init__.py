@@ -1,5 +1,10 @@
 from .add_dialog import AddPetDialog
+from .edit_dialog import EditPetDialog
 from .search_dialog import SearchDialog
 from .delete_dialog import DeleteDialog
+from .stats_dialog import StatsDialog
+from .reminders_dialog import RemindersDialog
+from .appointment_dialog import AppointmentDialog
 
-__all__ = ['AddPetDialog', 'SearchDialog', 'DeleteDialog']
+__all__ = ['AddPetDialog', 'EditPetDialog', 'SearchDialog', 'DeleteDialog', 'StatsDialog',
+           'RemindersDialog', 'AppointmentDialog']
@@ -0,0 +1,199 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+from tkcalendar import DateEntry
+
+class AppointmentDialog(tk.Toplevel):
+    """Диалог записи на прием с расписанием ветеринара на выбранный день"""
+
+    def __init__(self, parent, controller):
+        super().__init__(parent)
+        self.controller = controller
+        self.title("Запись на прием")
+        self.geometry("750x500")
+        self.resizable(True, True)
+
+        # Центрируем окно
+        self.transient(parent)
+        self.grab_set()
+        self._center_window()
+
+        # Создаем интерфейс
+        self._create_widgets()
+
+        # Фокус на поле имени
+        self.pet_name_entry.focus_set()
+
+    def _center_window(self):
+        self.update_idletasks()
+        width = self.winfo_width()
+        height = self.winfo_height()
+        x = self.master.winfo_x() + (self.master.winfo_width() // 2) - (width // 2)
+        y = self.master.winfo_y() + (self.master.winfo_height() // 2) - (height // 2)
+        self.geometry(f"+{x}+{y}")
+
+    def _create_widgets(self):
+        # Форма записи
+        form_frame = ttk.LabelFrame(self, text="Новая запись", padding="10")
+        form_frame.pack(fill=tk.X, padx=10, pady=5)
+
+        # Имя питомца
+        ttk.Label(form_frame, text="Имя питомца:").grid(row=0, column=0, sticky=tk.E, pady=5)
+        self.pet_name_entry = ttk.Entry(form_frame, width=30)
+        self.pet_name_entry.grid(row=0, column=1, sticky=tk.W, pady=5)
+
+        # ФИО ветеринара (можно выбрать из списка или ввести)
+        ttk.Label(form_frame, text="ФИО ветеринара:").grid(row=1, column=0, sticky=tk.E, pady=5)
+        self.vet_name_combo = ttk.Combobox(form_frame, width=35, values=self.controller.get_vet_names())
+        self.vet_name_combo.grid(row=1, column=1, sticky=tk.W, pady=5)
+        self.vet_name_combo.bind("<<ComboboxSelected>>", lambda event: self._refresh_day())
+        self.vet_name_combo.bind("<FocusOut>", lambda event: self._refresh_day())
+
+        # Дата приема
+        ttk.Label(form_frame, text="Дата приема:").grid(row=2, column=0, sticky=tk.E, pady=5)
+        self.date_entry = DateEntry(
+            form_frame,
+            width=12,
+            background='darkblue',
+            foreground='white',
+            borderwidth=2,
+            date_pattern='dd.mm.yyyy'
+        )
+        self.date_entry.grid(row=2, column=1, sticky=tk.W, pady=5)
+        self.date_entry.bind("<<DateEntrySelected>>", lambda event: self._refresh_day())
+
+        # Время и длительность
+        ttk.Label(form_frame, text="Время (ЧЧ:ММ):").grid(row=0, column=2, sticky=tk.E, padx=(15, 0), pady=5)
+        self.time_entry = ttk.Entry(form_frame, width=8)
+        self.time_entry.insert(0, "09:00")
+        self.time_entry.grid(row=0, column=3, sticky=tk.W, pady=5)
+
+        ttk.Label(form_frame, text="Длительность (мин):").grid(row=1, column=2, sticky=tk.E, padx=(15, 0), pady=5)
+        self.duration_var = tk.IntVar(value=30)
+        ttk.Spinbox(
+            form_frame,
+            from_=5,
+            to=480,
+            increment=5,
+            width=6,
+            textvariable=self.duration_var,
+            command=self._refresh_day
+        ).grid(row=1, column=3, sticky=tk.W, pady=5)
+
+        # Примечание
+        ttk.Label(form_frame, text="Примечание:").grid(row=2, column=2, sticky=tk.E, padx=(15, 0), pady=5)
+        self.note_entry = ttk.Entry(form_frame, width=20)
+        self.note_entry.grid(row=2, column=3, sticky=tk.W, pady=5)
+
+        # Кнопки
+        button_frame = ttk.Frame(form_frame)
+        button_frame.grid(row=3, column=0, columnspan=4, pady=10)
+
+        ttk.Button(button_frame, text="Записать", command=self._book).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Импорт из CSV...", command=self._import).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Экспорт в CSV...",
+                   command=self.controller.export_appointments).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Закрыть", command=self.destroy).pack(side=tk.LEFT, padx=5)
+
+        # Расписание выбранного ветеринара на день
+        day_frame = ttk.Frame(self)
+        day_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+
+        booked_frame = ttk.LabelFrame(day_frame, text="Записи на день", padding="10")
+        booked_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        columns = ("time", "pet_name", "note")
+        self.booked_tree = ttk.Treeview(booked_frame, columns=columns, show="headings")
+
+        # Настройка заголовков
+        self.booked_tree.heading("time", text="Время")
+        self.booked_tree.heading("pet_name", text="Имя питомца")
+        self.booked_tree.heading("note", text="Примечание")
+
+        # Настройка колонок
+        self.booked_tree.column("time", width=100, anchor=tk.CENTER)
+        self.booked_tree.column("pet_name", width=120, anchor=tk.W)
+        self.booked_tree.column("note", width=180, anchor=tk.W)
+
+        # Прокрутка
+        scrollbar = ttk.Scrollbar(booked_frame, orient=tk.VERTICAL, command=self.booked_tree.yview)
+        self.booked_tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.booked_tree.pack(fill=tk.BOTH, expand=True)
+
+        ttk.Button(booked_frame, text="Отменить запись", command=self._cancel).pack(pady=(5, 0))
+
+        free_frame = ttk.LabelFrame(day_frame, text="Свободное время", padding="10")
+        free_frame.pack(side=tk.LEFT, fill=tk.BOTH, padx=(10, 0))
+
+        self.free_listbox = tk.Listbox(free_frame, width=18)
+        self.free_listbox.pack(fill=tk.BOTH, expand=True)
+        # Двойной щелчок подставляет начало свободного промежутка в поле времени
+        self.free_listbox.bind("<Double-Button-1>", self._use_free_slot)
+
+    def _refresh_day(self):
+        """Перечитывает записи и свободное время ветеринара на выбранный день"""
+        for item in self.booked_tree.get_children():
+            self.booked_tree.delete(item)
+        self.free_listbox.delete(0, tk.END)
+
+        vet_name = self.vet_name_combo.get().strip()
+        if not vet_name:
+            return
+        date_str = self.date_entry.get()
+
+        for appointment in self.controller.get_day_appointments(vet_name, date_str):
+            self.booked_tree.insert("", tk.END, iid=str(appointment.appointment_id), values=(
+                f"{appointment.start.strftime('%H:%M')}-{appointment.end.strftime('%H:%M')}",
+                appointment.pet_name,
+                appointment.note
+            ))
+
+        try:
+            duration = self.duration_var.get()
+        except tk.TclError:
+            return
+        for start, end in self.controller.get_free_slots(vet_name, date_str, duration):
+            self.free_listbox.insert(tk.END, f"{start.strftime('%H:%M')}-{end.strftime('%H:%M')}")
+
+    def _use_free_slot(self, event):
+        selection = self.free_listbox.curselection()
+        if selection:
+            start = self.free_listbox.get(selection[0]).split("-")[0]
+            self.time_entry.delete(0, tk.END)
+            self.time_entry.insert(0, start)
+
+    def _book(self):
+        pet_name = self.pet_name_entry.get().strip()
+        vet_name = self.vet_name_combo.get().strip()
+        time_str = self.time_entry.get().strip()
+
+        if not all([pet_name, vet_name, time_str]):
+            messagebox.showerror("Ошибка", "Заполните имя питомца, ФИО ветеринара и время", parent=self)
+            return
+
+        try:
+            duration = self.duration_var.get()
+        except tk.TclError:
+            messagebox.showerror("Ошибка", "Длительность должна быть целым числом минут", parent=self)
+            return
+
+        if self.controller.book_appointment(pet_name, vet_name, self.date_entry.get(), time_str,
+                                            duration, self.note_entry.get().strip()):
+            self.pet_name_entry.delete(0, tk.END)
+            self.note_entry.delete(0, tk.END)
+        self._refresh_day()
+
+    def _cancel(self):
+        selection = self.booked_tree.selection()
+        if not selection:
+            messagebox.showwarning("Предупреждение", "Выберите запись для отмены", parent=self)
+            return
+        if messagebox.askyesno("Подтверждение", "Отменить выбранные записи?", parent=self):
+            for item in selection:
+                self.controller.cancel_appointment(int(item))
+            self._refresh_day()
+
+    def _import(self):
+        self.controller.import_appointments()
+        self.vet_name_combo.configure(values=self.controller.get_vet_names())
+        self._refresh_day()
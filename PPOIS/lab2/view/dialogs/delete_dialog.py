@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from tkcalendar import DateEntry
+from .live_results import LiveResults
 from datetime import date
 
 class DeleteDialog(tk.Toplevel):
@@ -18,6 +19,18 @@ class DeleteDialog(tk.Toplevel):
         
         # Создаем интерфейс
         self._create_widgets()
+        
+        # Найденные записи обновляются по событиям изменения базы
+        self.controller.subscribe_changes(self._on_database_change)
+    
+    def destroy(self):
+        self.controller.unsubscribe_changes(self._on_database_change)
+        super().destroy()
+    
+    def _on_database_change(self, event):
+        """Обновляет только затронутые изменением строки результатов"""
+        for results in (self.name_birth_results, self.visit_vet_results, self.diagnosis_results):
+            results.apply(event)
     
     def _center_window(self):
         self.update_idletasks()
@@ -108,6 +121,7 @@ class DeleteDialog(tk.Toplevel):
         self.name_birth_tree.configure(yscrollcommand=scrollbar.set)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.name_birth_tree.pack(fill=tk.BOTH, expand=True)
+        self.name_birth_results = LiveResults(self.name_birth_tree)
         
         # Кнопка удаления
         button_frame = ttk.Frame(parent)
@@ -180,6 +194,7 @@ class DeleteDialog(tk.Toplevel):
         self.visit_vet_tree.configure(yscrollcommand=scrollbar.set)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.visit_vet_tree.pack(fill=tk.BOTH, expand=True)
+        self.visit_vet_results = LiveResults(self.visit_vet_tree)
         
         # Кнопка удаления
         button_frame = ttk.Frame(parent)
@@ -241,6 +256,7 @@ class DeleteDialog(tk.Toplevel):
         self.diagnosis_tree.configure(yscrollcommand=scrollbar.set)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.diagnosis_tree.pack(fill=tk.BOTH, expand=True)
+        self.diagnosis_results = LiveResults(self.diagnosis_tree)
         
         # Кнопка удаления
         button_frame = ttk.Frame(parent)
@@ -266,12 +282,18 @@ class DeleteDialog(tk.Toplevel):
             messagebox.showerror("Ошибка", "Выберите дату рождения")
             return
         
+        try:
+            matches = self.controller.name_and_birth_filter(name, birth_date)
+        except ValueError:
+            messagebox.showerror("Ошибка", "Некорректный формат даты рождения")
+            return
+        
         try:
             # Передаем строку, контроллер сам распарсит
             results = self.controller.search_by_name_and_birth(name, birth_date)
             
             # Отображаем результаты
-            self._display_results(self.name_birth_tree, results)
+            self.name_birth_results.show(results, matches)
             
             if not results:
                 messagebox.showinfo("Поиск", "Записи не найдены")
@@ -292,9 +314,15 @@ class DeleteDialog(tk.Toplevel):
             messagebox.showerror("Ошибка", "Введите ФИО ветеринара")
             return
         
+        try:
+            matches = self.controller.visit_and_vet_filter(last_visit, vet_name)
+        except ValueError:
+            messagebox.showerror("Ошибка", "Некорректный формат даты последнего приема")
+            return
+        
         try:
             results = self.controller.search_by_visit_and_vet(last_visit, vet_name)
-            self._display_results(self.visit_vet_tree, results)
+            self.visit_vet_results.show(results, matches)
             
             if not results:
                 messagebox.showinfo("Поиск", "Записи не найдены")
@@ -312,7 +340,7 @@ class DeleteDialog(tk.Toplevel):
         
         try:
             results = self.controller.search_by_diagnosis_phrase(phrase)
-            self._display_results(self.diagnosis_tree, results)
+            self.diagnosis_results.show(results, self.controller.diagnosis_filter(phrase))
             
             if not results:
                 messagebox.showinfo("Поиск", "Записи не найдены")
@@ -320,156 +348,27 @@ class DeleteDialog(tk.Toplevel):
         except Exception as e:
             messagebox.showerror("Ошибка", f"Ошибка поиска: {str(e)}")
     
-    def _display_results(self, tree, results):
-        """Отображает результаты поиска в таблице"""
-        # Очищаем таблицу
-        for item in tree.get_children():
-            tree.delete(item)
-        
-        # Заполняем таблицу результатами
-        for pet in results:
-            tree.insert("", tk.END, values=(
-                pet.name,
-                pet.birth_date.strftime("%d.%m.%Y"),
-                pet.last_visit.strftime("%d.%m.%Y"),
-                pet.vet_name,
-                pet.diagnosis
-            ))
-    
-   
-    def _delete_selected_name_birth(self):
-        """Удаляет выбранные записи из вкладки по имени и дате рождения"""
-        selected_items = self.name_birth_tree.selection()
+    def _delete_selected(self, results):
+        """Удаляет записи, выбранные в таблице результатов"""
+        pets_to_delete = results.selected_pets()
         
-        if not selected_items:
+        if not pets_to_delete:
             messagebox.showinfo("Информация", "Нет выбранных записей для удаления")
             return
         
-        # Получаем объекты Pet для удаления
-        pets_to_delete = []
-        found_pets = []  # Для отслеживания уникальности
-        
-        for item in selected_items:
-            values = self.name_birth_tree.item(item)["values"]
-            if not values:
-                continue
-                
-            name = values[0]
-            birth_date_str = values[1]  # Строка в формате ДД.ММ.ГГГГ
-            
-            try:
-                # Ищем соответствующие объекты в базе
-                # Важно: передаем name и birth_date_str как есть
-                results = self.controller.search_by_name_and_birth(name, birth_date_str)
-                
-                # Добавляем найденных питомцев, избегая дубликатов
-                for pet in results:
-                    # Создаем уникальный ключ для проверки дубликатов
-                    pet_key = (pet.name, pet.birth_date.isoformat())
-                    if pet_key not in found_pets:
-                        found_pets.append(pet_key)
-                        pets_to_delete.append(pet)
-                        
-            except Exception as e:
-                print(f"Ошибка при поиске для удаления: {e}")
-                continue
-        
-        if pets_to_delete:
-            count = len(pets_to_delete)
-            if messagebox.askyesno("Подтверждение", f"Вы действительно хотите удалить {count} запис(ь/и)?"):
-                self.controller.delete_pets(pets_to_delete)
-                # Обновляем результаты поиска
-                self._search_by_name_and_birth()
-        else:
-            messagebox.showerror("Ошибка", "Не удалось найти соответствующие записи в базе")
+        count = len(pets_to_delete)
+        if messagebox.askyesno("Подтверждение", f"Вы действительно хотите удалить {count} запис(ь/и)?"):
+            # Удаленные строки убираются из результатов по событию изменения базы
+            self.controller.delete_pets(pets_to_delete)
+    
+    def _delete_selected_name_birth(self):
+        """Удаляет выбранные записи из вкладки по имени и дате рождения"""
+        self._delete_selected(self.name_birth_results)
     
     def _delete_selected_visit_vet(self):
         """Удаляет выбранные записи из вкладки по визиту и ветеринару"""
-        selected_items = self.visit_vet_tree.selection()
-        
-        if not selected_items:
-            messagebox.showinfo("Информация", "Нет выбранных записей для удаления")
-            return
-        
-        pets_to_delete = []
-        found_pets = []
-        
-        for item in selected_items:
-            values = self.visit_vet_tree.item(item)["values"]
-            if not values:
-                continue
-                
-            last_visit_str = values[2]  # Дата последнего визита
-            vet_name = values[3]         # ФИО ветеринара
-            
-            try:
-                results = self.controller.search_by_visit_and_vet(last_visit_str, vet_name)
-                
-                for pet in results:
-                    pet_key = (pet.name, pet.birth_date.isoformat())
-                    if pet_key not in found_pets:
-                        found_pets.append(pet_key)
-                        pets_to_delete.append(pet)
-                        
-            except Exception as e:
-                print(f"Ошибка при поиске для удаления: {e}")
-                continue
-        
-        if pets_to_delete:
-            count = len(pets_to_delete)
-            if messagebox.askyesno("Подтверждение", f"Вы действительно хотите удалить {count} запис(ь/и)?"):
-                self.controller.delete_pets(pets_to_delete)
-                self._search_by_visit_and_vet()
-        else:
-            messagebox.showerror("Ошибка", "Не удалось найти соответствующие записи в базе")
+        self._delete_selected(self.visit_vet_results)
     
     def _delete_selected_diagnosis(self):
         """Удаляет выбранные записи из вкладки по диагнозу"""
-        selected_items = self.diagnosis_tree.selection()
-        
-        if not selected_items:
-            messagebox.showinfo("Информация", "Нет выбранных записей для удаления")
-            return
-        
-        phrase = self.diagnosis_entry.get().strip()
-        if not phrase:
-            messagebox.showerror("Ошибка", "Не найдена фраза для поиска")
-            return
-        
-        pets_to_delete = []
-        found_pets = []
-        
-        # Получаем все записи, соответствующие фразе
-        try:
-            all_results = self.controller.search_by_diagnosis_phrase(phrase)
-            # Создаем словарь для быстрого поиска по имени и дате
-            results_dict = {}
-            for pet in all_results:
-                key = (pet.name, pet.birth_date.strftime("%d.%m.%Y"))
-                results_dict[key] = pet
-        except Exception as e:
-            messagebox.showerror("Ошибка", f"Ошибка поиска: {str(e)}")
-            return
-        
-        # Для каждого выбранного элемента находим соответствующего питомца
-        for item in selected_items:
-            values = self.diagnosis_tree.item(item)["values"]
-            if not values:
-                continue
-                
-            name = values[0]
-            birth_date_str = values[1]
-            key = (name, birth_date_str)
-            
-            if key in results_dict and key not in found_pets:
-                found_pets.append(key)
-                pets_to_delete.append(results_dict[key])
-        
-        if pets_to_delete:
-            count = len(pets_to_delete)
-            if messagebox.askyesno("Подтверждение", f"Вы действительно хотите удалить {count} запис(ь/и)?"):
-                self.controller.delete_pets(pets_to_delete)
-                self._search_by_diagnosis()  
-        else:
-
-            messagebox.showerror("Ошибка", "Не удалось найти соответствующие записи в базе")
+        self._delete_selected(self.diagnosis_results)
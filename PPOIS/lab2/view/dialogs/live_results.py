@@ -0,0 +1,146 @@
+import tkinter as tk
+from bisect import bisect_left
+from model.pet import pet_row
+
+class LiveResults:
+    """
+    Результаты поиска в таблице, которые обновляются по событиям изменения базы
+
+    Строки таблицы имеют iid, равный идентификатору записи, и идут в порядке
+    идентификаторов, как в базе. После изменения базы обновляются только
+    затронутые строки: повторять поиск по всей базе не нужно.
+
+    Результаты фонового поиска дописываются частями (begin, extend, finish);
+    пока они поступают, события изменения откладываются и применяются
+    после последней части.
+
+    При заданном limit таблица показывает только первые limit найденных
+    записей (по порядку идентификаторов), как и сам поиск. Подходящие записи
+    после последней показанной не вставляются, а complete становится False:
+    найдено больше, чем показано. Строки, удаленные из неполной таблицы,
+    не замещаются следующими записями - для этого нужен повторный поиск.
+    """
+
+    def __init__(self, tree, limit=None, on_change=None):
+        """
+        Args:
+            tree: Таблица ttk.Treeview для результатов
+            limit: Наибольшее количество строк (None - без ограничения)
+            on_change: Функция без аргументов, вызываемая после того, как
+                событие изменения изменило строки (например, для счетчика)
+        """
+        self.tree = tree
+        self.limit = limit
+        self.on_change = on_change
+        self.matches = None  # Условие последнего поиска (None - поиска еще не было)
+        self.pets = {}  # record_id -> показанный питомец
+        self.complete = True  # Показаны все найденные записи
+        self._deferred = None  # События, пришедшие во время поступления результатов
+
+    def show(self, pets, matches):
+        """
+        Показывает результаты поиска
+
+        Args:
+            pets: Найденные питомцы в порядке идентификаторов
+            matches: Предикат условия поиска для новых и измененных записей
+        """
+        self.begin(matches)
+        self.extend(pets)
+        self.finish()
+
+    def begin(self, matches):
+        """Очищает таблицу перед поступлением результатов нового поиска"""
+        self.tree.delete(*self.tree.get_children())
+        self.pets = {}
+        self.matches = matches
+        self.complete = True
+        self._deferred = []
+
+    def extend(self, pets):
+        """Дописывает очередную часть результатов"""
+        for pet in pets:
+            self._append(pet)
+        if self._full():
+            # Поиск выдает не больше limit записей - были ли еще, неизвестно
+            self.complete = False
+
+    def finish(self):
+        """Завершает поступление результатов и применяет отложенные события"""
+        deferred, self._deferred = self._deferred or [], None
+        for event in deferred:
+            self.apply(event)
+
+    def clear(self):
+        """Очищает таблицу и забывает условие поиска"""
+        self.begin(None)
+        self.finish()
+
+    def selected_pets(self):
+        """Возвращает питомцев, выбранных в таблице"""
+        return [self.pets[int(item)] for item in self.tree.selection()]
+
+    def apply(self, event):
+        """
+        Применяет событие изменения базы к показанным результатам
+
+        Args:
+            event: ChangeEvent
+        """
+        if self.matches is None:
+            return
+        if self._deferred is not None:
+            self._deferred.append(event)
+            return
+        rows = len(self.pets), self.complete
+        for record_id in event.deleted:
+            if self.pets.pop(record_id, None) is not None:
+                self.tree.delete(str(record_id))
+        for pet in event.updated:
+            shown = pet.record_id in self.pets
+            if self.matches(pet):
+                if shown:
+                    self.pets[pet.record_id] = pet
+                    self.tree.item(str(pet.record_id), values=pet_row(pet))
+                else:
+                    # Запись стала подходить под условие - вставляем на ее место по порядку
+                    record_ids = [int(item) for item in self.tree.get_children()]
+                    position = bisect_left(record_ids, pet.record_id)
+                    if position == len(record_ids) and not self._accepts_tail():
+                        self.complete = False  # Запись после последней показанной
+                        continue
+                    self._insert(pet, position)
+                    if self.limit is not None and len(self.pets) > self.limit:
+                        # Последняя строка вытеснена за пределы первых limit записей
+                        last = record_ids[-1]
+                        del self.pets[last]
+                        self.tree.delete(str(last))
+                        self.complete = False
+            elif shown:
+                del self.pets[pet.record_id]
+                self.tree.delete(str(pet.record_id))
+        # Новые записи получают наибольшие идентификаторы, поэтому идут в конец.
+        # Запись могла попасть и в снимок, по которому шел поиск, - она уже показана
+        for pet in event.inserted:
+            if pet.record_id not in self.pets and self.matches(pet):
+                self._append(pet)
+        if (len(self.pets), self.complete) != rows and self.on_change is not None:
+            self.on_change()
+
+    def _full(self):
+        return self.limit is not None and len(self.pets) >= self.limit
+
+    def _accepts_tail(self):
+        # После последней показанной строки можно дописывать, только если показаны все
+        # найденные записи: иначе между ними и новой записью есть непоказанные
+        return self.complete and not self._full()
+
+    def _append(self, pet):
+        if self._accepts_tail():
+            self._insert(pet, tk.END)
+        else:
+            self.complete = False
+
+    def _insert(self, pet, position):
+        self.pets[pet.record_id] = pet
+        self.tree.insert("", position, iid=str(pet.record_id), values=pet_row(pet))
@@ -0,0 +1,145 @@
+import tkinter as tk
+from tkinter import ttk, filedialog
+
+# Период, на который составляется список: подпись -> количество дней вперед
+PERIODS = {
+    "На сегодня": 0,
+    "На неделю вперед": 7,
+    "На месяц вперед": 30,
+}
+
+ALL_VETS = "Все ветеринары"
+
+class RemindersDialog(tk.Toplevel):
+    """Окно списка питомцев, которым пора на повторный прием"""
+
+    def __init__(self, parent, controller):
+        super().__init__(parent)
+        self.controller = controller
+        self.title("Напоминания о повторном приеме")
+        self.geometry("850x450")
+        self.resizable(True, True)
+
+        # Центрируем окно
+        self.transient(parent)
+        self.grab_set()
+        self._center_window()
+
+        # Создаем интерфейс
+        self._create_widgets()
+        self._show_reminders()
+
+    def _center_window(self):
+        self.update_idletasks()
+        width = self.winfo_width()
+        height = self.winfo_height()
+        x = self.master.winfo_x() + (self.master.winfo_width() // 2) - (width // 2)
+        y = self.master.winfo_y() + (self.master.winfo_height() // 2) - (height // 2)
+        self.geometry(f"+{x}+{y}")
+
+    def _create_widgets(self):
+        # Параметры списка
+        form_frame = ttk.LabelFrame(self, text="Параметры", padding="10")
+        form_frame.pack(fill=tk.X, padx=10, pady=5)
+
+        ttk.Label(form_frame, text="Прием раз в (дней):").grid(row=0, column=0, sticky=tk.E, pady=5)
+        self.interval_var = tk.IntVar(value=365)
+        ttk.Spinbox(
+            form_frame,
+            from_=1,
+            to=3650,
+            width=8,
+            textvariable=self.interval_var
+        ).grid(row=0, column=1, sticky=tk.W, pady=5)
+
+        ttk.Label(form_frame, text="Период:").grid(row=0, column=2, sticky=tk.E, padx=(15, 0), pady=5)
+        self.period_var = tk.StringVar(value="На сегодня")
+        ttk.Combobox(
+            form_frame,
+            textvariable=self.period_var,
+            values=list(PERIODS),
+            state="readonly",
+            width=18
+        ).grid(row=0, column=3, sticky=tk.W, pady=5)
+
+        ttk.Label(form_frame, text="Ветеринар:").grid(row=1, column=0, sticky=tk.E, pady=5)
+        self.vet_var = tk.StringVar(value=ALL_VETS)
+        ttk.Combobox(
+            form_frame,
+            textvariable=self.vet_var,
+            values=[ALL_VETS] + self.controller.get_reminder_vets(),
+            state="readonly",
+            width=40
+        ).grid(row=1, column=1, columnspan=3, sticky=tk.W, pady=5)
+
+        ttk.Button(form_frame, text="Показать", command=self._show_reminders).grid(
+            row=0, column=4, padx=10, sticky=tk.W)
+        ttk.Button(form_frame, text="Экспорт по ветеринарам...", command=self._export).grid(
+            row=1, column=4, padx=10, sticky=tk.W)
+
+        # Список напоминаний
+        result_frame = ttk.LabelFrame(self, text="Пора на прием", padding="10")
+        result_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+
+        columns = ("due_date", "name", "last_visit", "vet_name", "diagnosis")
+        self.tree = ttk.Treeview(result_frame, columns=columns, show="headings")
+
+        # Настройка заголовков
+        self.tree.heading("due_date", text="Срок приема")
+        self.tree.heading("name", text="Имя питомца")
+        self.tree.heading("last_visit", text="Дата последнего приема")
+        self.tree.heading("vet_name", text="ФИО ветеринара")
+        self.tree.heading("diagnosis", text="Диагноз")
+
+        # Настройка колонок
+        self.tree.column("due_date", width=100, anchor=tk.CENTER)
+        self.tree.column("name", width=120, anchor=tk.W)
+        self.tree.column("last_visit", width=120, anchor=tk.CENTER)
+        self.tree.column("vet_name", width=180, anchor=tk.W)
+        self.tree.column("diagnosis", width=250, anchor=tk.W)
+
+        # Прокрутка
+        scrollbar = ttk.Scrollbar(result_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(fill=tk.BOTH, expand=True)
+
+        self.count_label = ttk.Label(self, text="")
+        self.count_label.pack(anchor=tk.W, padx=10, pady=(0, 10))
+
+    def _get_interval(self):
+        try:
+            return max(1, self.interval_var.get())
+        except tk.TclError:
+            return 365
+
+    def _show_reminders(self):
+        vet_name = self.vet_var.get()
+        reminders = self.controller.get_reminders(
+            self._get_interval(),
+            PERIODS[self.period_var.get()],
+            None if vet_name == ALL_VETS else vet_name
+        )
+
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+
+        for due_date, pet in reminders:
+            self.tree.insert("", tk.END, values=(
+                due_date.strftime("%d.%m.%Y"),
+                pet.name,
+                pet.last_visit.strftime("%d.%m.%Y"),
+                pet.vet_name,
+                pet.diagnosis
+            ))
+
+        self.count_label.config(text=f"Найдено записей: {len(reminders)}")
+
+    def _export(self):
+        directory = filedialog.askdirectory(parent=self, title="Папка для списков по ветеринарам")
+        if directory:
+            self.controller.export_reminders(
+                directory,
+                self._get_interval(),
+                PERIODS[self.period_var.get()]
+            )
@@ -1,11 +1,20 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from tkcalendar import DateEntry
+from model.background_search import RESULT_LIMIT, STREAM_INTERVAL_MS
+from .live_results import LiveResults
+
+# Задержка поиска по диагнозу после последнего нажатия клавиши, мс
+SEARCH_DEBOUNCE_MS = 250
 
 class SearchDialog(tk.Toplevel):
     def __init__(self, parent, controller):
         super().__init__(parent)
         self.controller = controller
+        self._debounce_id = None  # Отложенный запуск поиска по диагнозу
+        self._diagnosis_search = None  # Выполняющийся поиск по диагнозу
+        self._diagnosis_phrase = None  # Фраза последнего поиска по диагнозу
+        self._count_queries = {}  # LiveResults -> функция, создающая запрос последнего поиска
         self.title("Поиск питомца")
         self.geometry("700x400")
         self.resizable(True, True)
@@ -17,6 +26,19 @@ class SearchDialog(tk.Toplevel):
         
         # Создаем интерфейс
         self._create_widgets()
+        
+        # Найденные записи обновляются по событиям изменения базы
+        self.controller.subscribe_changes(self._on_database_change)
+    
+    def destroy(self):
+        self._cancel_diagnosis_search()
+        self.controller.unsubscribe_changes(self._on_database_change)
+        super().destroy()
+    
+    def _on_database_change(self, event):
+        """Обновляет только затронутые изменением строки результатов"""
+        for results in (self.name_birth_results, self.visit_vet_results, self.diagnosis_results):
+            results.apply(event)
     
     def _center_window(self):
         self.update_idletasks()
@@ -67,6 +89,8 @@ class SearchDialog(tk.Toplevel):
             date_pattern='dd.mm.yyyy'
         )
         self.birth_date_entry.grid(row=1, column=1, sticky=tk.W, pady=5)
+        self.name_birth_status = ttk.Label(form_frame, text="")
+        self.name_birth_status.grid(row=2, column=1, sticky=tk.W)
         
         # Кнопка поиска
         ttk.Button(
@@ -106,6 +130,9 @@ class SearchDialog(tk.Toplevel):
         self.name_birth_tree.configure(yscrollcommand=scrollbar.set)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.name_birth_tree.pack(fill=tk.BOTH, expand=True)
+        self.name_birth_results = LiveResults(
+            self.name_birth_tree, RESULT_LIMIT,
+            on_change=lambda: self._refresh_count(self.name_birth_results, self.name_birth_status))
     
     def _create_visit_vet_tab(self, parent):
         # Форма поиска
@@ -128,6 +155,8 @@ class SearchDialog(tk.Toplevel):
         ttk.Label(form_frame, text="ФИО ветеринара:").grid(row=1, column=0, sticky=tk.E, pady=5)
         self.vet_name_entry = ttk.Entry(form_frame, width=30)
         self.vet_name_entry.grid(row=1, column=1, sticky=tk.W, pady=5)
+        self.visit_vet_status = ttk.Label(form_frame, text="")
+        self.visit_vet_status.grid(row=2, column=1, sticky=tk.W)
         
         # Кнопка поиска
         ttk.Button(
@@ -167,6 +196,9 @@ class SearchDialog(tk.Toplevel):
         self.visit_vet_tree.configure(yscrollcommand=scrollbar.set)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.visit_vet_tree.pack(fill=tk.BOTH, expand=True)
+        self.visit_vet_results = LiveResults(
+            self.visit_vet_tree, RESULT_LIMIT,
+            on_change=lambda: self._refresh_count(self.visit_vet_results, self.visit_vet_status))
     
     def _create_diagnosis_tab(self, parent):
         # Форма поиска
@@ -177,7 +209,11 @@ class SearchDialog(tk.Toplevel):
         ttk.Label(form_frame, text="Фраза для поиска:").grid(row=0, column=0, sticky=tk.E, pady=5)
         self.diagnosis_entry = ttk.Entry(form_frame, width=30)
         self.diagnosis_entry.grid(row=0, column=1, sticky=tk.W, pady=5)
+        # Поиск запускается сам, когда пользователь перестает печатать
+        self.diagnosis_entry.bind("<KeyRelease>", self._on_diagnosis_typed)
         ttk.Label(form_frame, text="(поиск будет регистронезависимым)").grid(row=1, column=1, sticky=tk.W)
+        self.diagnosis_status = ttk.Label(form_frame, text="")
+        self.diagnosis_status.grid(row=2, column=1, sticky=tk.W)
         
         # Кнопка поиска
         ttk.Button(
@@ -217,6 +253,9 @@ class SearchDialog(tk.Toplevel):
         self.diagnosis_tree.configure(yscrollcommand=scrollbar.set)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.diagnosis_tree.pack(fill=tk.BOTH, expand=True)
+        self.diagnosis_results = LiveResults(
+            self.diagnosis_tree, RESULT_LIMIT,
+            on_change=lambda: self._refresh_count(self.diagnosis_results, self.diagnosis_status))
     
     def _search_by_name_and_birth(self):
         """Поиск по имени и дате рождения"""
@@ -232,8 +271,18 @@ class SearchDialog(tk.Toplevel):
             return
         
         try:
-            results = self.controller.search_by_name_and_birth(name, birth_date)
-            self._display_results(self.name_birth_tree, results)
+            matches = self.controller.name_and_birth_filter(name, birth_date)
+        except ValueError:
+            messagebox.showerror("Ошибка", "Некорректный формат даты рождения")
+            return
+        
+        try:
+            query = self.controller.query_by_name_and_birth(name, birth_date)
+            results = list(query.limit(RESULT_LIMIT))
+            self.name_birth_results.show(results, matches)
+            self._count_queries[self.name_birth_results] = (
+                lambda: self.controller.query_by_name_and_birth(name, birth_date))
+            self._show_count(self.name_birth_status, self.name_birth_results, query)
             
             if not results:
                 messagebox.showinfo("Поиск", "Записи не найдены")
@@ -255,8 +304,18 @@ class SearchDialog(tk.Toplevel):
             return
         
         try:
-            results = self.controller.search_by_visit_and_vet(last_visit, vet_name)
-            self._display_results(self.visit_vet_tree, results)
+            matches = self.controller.visit_and_vet_filter(last_visit, vet_name)
+        except ValueError:
+            messagebox.showerror("Ошибка", "Некорректный формат даты последнего приема")
+            return
+        
+        try:
+            query = self.controller.query_by_visit_and_vet(last_visit, vet_name)
+            results = list(query.limit(RESULT_LIMIT))
+            self.visit_vet_results.show(results, matches)
+            self._count_queries[self.visit_vet_results] = (
+                lambda: self.controller.query_by_visit_and_vet(last_visit, vet_name))
+            self._show_count(self.visit_vet_status, self.visit_vet_results, query)
             
             if not results:
                 messagebox.showinfo("Поиск", "Записи не найдены")
@@ -272,28 +331,97 @@ class SearchDialog(tk.Toplevel):
             messagebox.showerror("Ошибка", "Введите фразу для поиска")
             return
         
-        try:
-            results = self.controller.search_by_diagnosis_phrase(phrase)
-            self._display_results(self.diagnosis_tree, results)
-            
-            if not results:
-                messagebox.showinfo("Поиск", "Записи не найдены")
-                
-        except Exception as e:
-            messagebox.showerror("Ошибка", f"Ошибка поиска: {str(e)}")
+        self._start_diagnosis_search(phrase, report_empty=True)
+    
+    def _on_diagnosis_typed(self, event):
+        """Откладывает поиск до паузы в наборе текста"""
+        if self._debounce_id is not None:
+            self.after_cancel(self._debounce_id)
+        self._debounce_id = self.after(SEARCH_DEBOUNCE_MS, self._search_as_typed)
+    
+    def _search_as_typed(self):
+        self._debounce_id = None
+        phrase = self.diagnosis_entry.get().strip()
+        if not phrase:
+            self._cancel_diagnosis_search()
+            self.diagnosis_results.clear()
+            self.diagnosis_status.config(text="")
+            return
+        if self.diagnosis_results.matches is not None and phrase == self._diagnosis_phrase:
+            return  # Текст не изменился (например, нажата клавиша со стрелкой)
+        self._start_diagnosis_search(phrase)
+    
+    def _cancel_diagnosis_search(self):
+        """Отменяет отложенный и выполняющийся поиск по диагнозу"""
+        if self._debounce_id is not None:
+            self.after_cancel(self._debounce_id)
+            self._debounce_id = None
+        if self._diagnosis_search is not None:
+            self._diagnosis_search.cancel()
+            self._diagnosis_search = None
     
-    def _display_results(self, tree, results):
-        """Отображает результаты поиска в таблице"""
-        # Очищаем таблицу
-        for item in tree.get_children():
-            tree.delete(item)
-        
-        # Заполняем таблицу результатами
-        for pet in results:
-            tree.insert("", tk.END, values=(
-                pet.name,
-                pet.birth_date.strftime("%d.%m.%Y"),
-                pet.last_visit.strftime("%d.%m.%Y"),
-                pet.vet_name,
-                pet.diagnosis
-            ))
\ No newline at end of file
+    def _start_diagnosis_search(self, phrase, report_empty=False):
+        """
+        Запускает фоновый поиск по диагнозу вместо выполняющегося
+        
+        Args:
+            phrase: Фраза для поиска
+            report_empty: Сообщить, если записи не найдены (поиск по кнопке)
+        """
+        self._cancel_diagnosis_search()
+        self._diagnosis_phrase = phrase
+        self.diagnosis_results.begin(self.controller.diagnosis_filter(phrase))
+        self._count_queries[self.diagnosis_results] = lambda: self.controller.query_by_diagnosis_phrase(phrase)
+        self.diagnosis_status.config(text="Поиск...")
+        self._diagnosis_search = self.controller.start_diagnosis_search(phrase)
+        self._stream_diagnosis_results(self._diagnosis_search, report_empty)
+    
+    def _stream_diagnosis_results(self, search, report_empty):
+        """Дописывает в таблицу очередную порцию результатов (раз в кадр)"""
+        if search is not self._diagnosis_search:
+            return  # Поиск отменен или заменен более новым
+        
+        count = len(self.diagnosis_results.pets)
+        self.diagnosis_results.extend(search.take(RESULT_LIMIT - count))
+        count = len(self.diagnosis_results.pets)
+        if count >= RESULT_LIMIT:
+            # Остальные записи не показываются - просмотр базы можно прекратить
+            search.cancel()
+        elif not search.finished:
+            self.diagnosis_status.config(text=f"Поиск... найдено {count}")
+            self.after(STREAM_INTERVAL_MS, self._stream_diagnosis_results, search, report_empty)
+            return
+        
+        self._diagnosis_search = None
+        self.diagnosis_results.finish()
+        count = len(self.diagnosis_results.pets)
+        self._refresh_count(self.diagnosis_results, self.diagnosis_status)
+        if search.error is not None:
+            messagebox.showerror("Ошибка", f"Ошибка поиска: {str(search.error)}")
+        elif report_empty and not count:
+            messagebox.showinfo("Поиск", "Записи не найдены")
+    
+    def _refresh_count(self, results, label):
+        """Обновляет количество найденных записей после изменения таблицы"""
+        if results.matches is None:
+            return
+        # Запрос нужен только для оценки общего количества, когда показаны не все
+        query = None if results.complete else self._count_queries[results]()
+        self._show_count(label, results, query)
+    
+    def _show_count(self, label, results, query):
+        """
+        Показывает количество найденных записей
+        
+        Если показаны не все, общее количество берется из индекса или
+        оценивается по выборке (тогда перед ним ставится «~»), чтобы не
+        просматривать всю базу. Если показаны все записи (results.complete),
+        query не используется и может быть None.
+        """
+        shown = len(results.pets)
+        if results.complete:
+            label.config(text=f"Найдено записей: {shown}")
+            return
+        total, exact = query.estimate_count()
+        total = max(total, shown)
+        label.config(text=f"Показаны первые {shown} из {'' if exact else '~'}{total}")
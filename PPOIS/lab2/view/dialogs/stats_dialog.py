@@ -0,0 +1,108 @@
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+
+class StatsDialog(tk.Toplevel):
+    """Окно статистики длительности операций (отладка)"""
+
+    def __init__(self, parent, instrumentation):
+        super().__init__(parent)
+        self.instrumentation = instrumentation
+        self.title("Статистика операций")
+        self.geometry("800x400")
+        self.resizable(True, True)
+
+        # Окно не модальное, чтобы можно было работать с приложением и обновлять статистику
+        self.transient(parent)
+        self._center_window()
+
+        self._create_widgets()
+        self._refresh()
+
+    def _center_window(self):
+        self.update_idletasks()
+        width = self.winfo_width()
+        height = self.winfo_height()
+        x = self.master.winfo_x() + (self.master.winfo_width() // 2) - (width // 2)
+        y = self.master.winfo_y() + (self.master.winfo_height() // 2) - (height // 2)
+        self.geometry(f"+{x}+{y}")
+
+    def _create_widgets(self):
+        # Панель управления
+        control_frame = ttk.Frame(self, padding="10")
+        control_frame.pack(fill=tk.X)
+
+        self.enabled_var = tk.BooleanVar(value=self.instrumentation.enabled)
+        ttk.Checkbutton(
+            control_frame,
+            text="Сбор статистики включен",
+            variable=self.enabled_var,
+            command=self._toggle_enabled
+        ).pack(side=tk.LEFT, padx=5)
+
+        ttk.Button(control_frame, text="Обновить", command=self._refresh).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Сбросить", command=self._reset).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Сохранить в JSON", command=self._save).pack(side=tk.LEFT, padx=5)
+
+        # Таблица статистики
+        table_frame = ttk.Frame(self, padding="10")
+        table_frame.pack(fill=tk.BOTH, expand=True)
+
+        columns = ("operation", "calls", "records", "mean", "p50", "p99", "max")
+        self.tree = ttk.Treeview(table_frame, columns=columns, show="headings")
+
+        # Настройка заголовков
+        self.tree.heading("operation", text="Операция")
+        self.tree.heading("calls", text="Вызовов")
+        self.tree.heading("records", text="Записей")
+        self.tree.heading("mean", text="Среднее, мс")
+        self.tree.heading("p50", text="p50, мс")
+        self.tree.heading("p99", text="p99, мс")
+        self.tree.heading("max", text="Макс, мс")
+
+        # Настройка колонок
+        self.tree.column("operation", width=250, anchor=tk.W)
+        for column in columns[1:]:
+            self.tree.column(column, width=80, anchor=tk.E)
+
+        # Прокрутка
+        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(fill=tk.BOTH, expand=True)
+
+    def _refresh(self):
+        """Перечитывает статистику в таблицу"""
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+
+        for operation, stats in self.instrumentation.snapshot().items():
+            self.tree.insert("", tk.END, values=(
+                operation,
+                stats["calls"],
+                stats["records"],
+                f"{stats['mean_ms']:.2f}",
+                f"{stats['p50_ms']:.2f}",
+                f"{stats['p99_ms']:.2f}",
+                f"{stats['max_ms']:.2f}"
+            ))
+
+    def _toggle_enabled(self):
+        self.instrumentation.enabled = self.enabled_var.get()
+
+    def _reset(self):
+        self.instrumentation.reset()
+        self._refresh()
+
+    def _save(self):
+        filename = filedialog.asksaveasfilename(
+            parent=self,
+            title="Сохранить статистику",
+            defaultextension=".json",
+            filetypes=[("JSON файлы", "*.json"), ("Все файлы", "*.*")]
+        )
+        if filename:
+            try:
+                self.instrumentation.dump_json(filename)
+                messagebox.showinfo("Успех", "Статистика сохранена", parent=self)
+            except OSError as e:
+                messagebox.showerror("Ошибка", f"Не удалось сохранить статистику: {str(e)}", parent=self)
@@ -82,6 +82,9 @@ class MainWindow(tk.Tk):
         
         # Добавляем таблицу
         self.tree.pack(fill=tk.BOTH, expand=True)
+        
+        # Двойной щелчок по строке открывает диалог изменения
+        self.tree.bind("<Double-1>", self._on_row_double_click)
     
     def _create_menu(self):
         menu_bar = tk.Menu(self)
@@ -97,10 +100,19 @@ class MainWindow(tk.Tk):
         # Меню "Операции"
         operations_menu = tk.Menu(menu_bar, tearoff=0)
         operations_menu.add_command(label="Добавить питомца", command=self.controller.show_add_dialog)
+        operations_menu.add_command(label="Изменить питомца", command=self.controller.show_edit_dialog)
         operations_menu.add_command(label="Поиск питомца", command=self.controller.show_search_dialog)
         operations_menu.add_command(label="Удалить питомца", command=self.controller.show_delete_dialog)
+        operations_menu.add_separator()
+        operations_menu.add_command(label="Запись на прием", command=self.controller.show_appointment_dialog)
+        operations_menu.add_command(label="Напоминания о приеме", command=self.controller.show_reminders_dialog)
         menu_bar.add_cascade(label="Операции", menu=operations_menu)
         
+        # Меню "Отладка"
+        debug_menu = tk.Menu(menu_bar, tearoff=0)
+        debug_menu.add_command(label="Статистика операций", command=self.controller.show_stats_dialog)
+        menu_bar.add_cascade(label="Отладка", menu=debug_menu)
+        
         self.config(menu=menu_bar)
     
     def _create_toolbar(self):
@@ -108,6 +120,7 @@ class MainWindow(tk.Tk):
         toolbar.pack(side=tk.TOP, fill=tk.X)
         
         ttk.Button(toolbar, text="Добавить", command=self.controller.show_add_dialog).pack(side=tk.LEFT, padx=2)
+        ttk.Button(toolbar, text="Изменить", command=self.controller.show_edit_dialog).pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="Поиск", command=self.controller.show_search_dialog).pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="Удалить", command=self.controller.show_delete_dialog).pack(side=tk.LEFT, padx=2)
         ttk.Button(toolbar, text="Сохранить", command=self.controller.save_to_xml).pack(side=tk.LEFT, padx=2)
@@ -118,12 +131,21 @@ class MainWindow(tk.Tk):
         for item in self.tree.get_children():
             self.tree.delete(item)
         
-        # Заполняем таблицу
+        # Заполняем таблицу (идентификатор строки - идентификатор записи)
         for pet in pets:
-            self.tree.insert("", tk.END, values=(
+            self.tree.insert("", tk.END, iid=str(pet.record_id), values=(
                 pet.name,
                 pet.birth_date.strftime("%d.%m.%Y"),
                 pet.last_visit.strftime("%d.%m.%Y"),
                 pet.vet_name,
                 pet.diagnosis
-            ))
\ No newline at end of file
+            ))
+    
+    def get_selected_record_id(self):
+        """Возвращает идентификатор записи, выбранной в таблице, или None"""
+        selection = self.tree.selection()
+        return int(selection[0]) if selection else None
+    
+    def _on_row_double_click(self, event):
+        if self.tree.identify_row(event.y) and self.controller is not None:
+            self.controller.show_edit_dialog()
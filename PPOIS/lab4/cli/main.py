@@ -18,14 +18,34 @@ from domain.domain_errors import (
     InvalidProductAttributeError,
     InvalidReviewRatingError
 )
+from domain.events import DEBUG, ERROR
+from domain.binary_state import BINARY_EXTENSION
+from domain.rating_stats import RECENT_HALF_LIVES
 from datetime import datetime
 
 
-def main():
+def print_event(event):
+    # Ошибки отделяются пустой строкой, как и остальные сообщения об ошибках
+    print(f"\n{event.message}" if event.level >= ERROR else event.message)
+
+
+def main(state_filename="system_state.json"):
     controller = QualityController()
-    controller.load_state()
+    controller.events.subscribe(print_event, level=DEBUG)
+    # Изменения записываются в журнал (или базу .db) по мере работы, поэтому при выходе сохранять все не нужно
+    controller.open_journal(state_filename)
+    if controller.journal is None:
+        # Файл есть, но не читается: без журнала изменения пропали бы, а запись поверх испортила бы файл
+        print(f"\nРабота остановлена: исправьте или переместите файл {state_filename} и запустите программу снова.")
+        controller.events.close()
+        return
     
     while True:
+        # Ежедневная очистка истекших сертификатов (не чаще раза в сутки)
+        expired = controller.sweep_expired_certificates()
+        if expired:
+            print(f"\nИстек срок действия сертификатов: {len(expired)}.")
+        
         print("\nМеню:")
         print("1. Добавить продукт")
         
@@ -39,7 +59,10 @@ def main():
             print("8. Анализировать отзывы")
             print("9. Сохранить состояние системы")
             print("10. Загрузить состояние системы")
-            print("11. Выход")
+            print("11. Сертификаты с истекающим сроком")
+            print("12. Массовая проверка по стандартам качества")
+            print("13. Рейтинги и тренды отзывов")
+            print("14. Выход")
         else:
             print("2. Выход (список продуктов пуст)")
         
@@ -62,7 +85,7 @@ def main():
                 product = controller.get_product(product_id)
                 print(f"ID: {product_id}, Название: {name}, Этап: {product.get_current_stage()}")
                     
-        elif choice in ['3', '4', '5', '6', '7', '8'] and not controller.products:
+        elif choice in ['3', '4', '5', '6', '7', '8', '11', '12', '13'] and not controller.products:
             print("\nСписок продуктов пуст. Сначала добавьте продукт (пункт 1).")
                 
         elif choice == '3':
@@ -201,6 +224,11 @@ def main():
                     print("Рекомендации: нет рекомендаций")
                 else:
                     print(f"\nСредний рейтинг продукта {product_id}: {avg_rating:.2f}")
+                    stats = product.rating_stats
+                    for half_life in RECENT_HALF_LIVES:
+                        print(f"Недавний рейтинг (полураспад {half_life} дн.): {stats.recent_average(half_life):.2f}")
+                    print("Распределение оценок: " + ", ".join(
+                        f"{rating} - {count}" for rating, count in enumerate(stats.histogram, 1)))
                     
                     if recommendations:
                         print("Рекомендации по улучшению:")
@@ -212,10 +240,13 @@ def main():
                 print(f"\nОшибка: {e}")
                 
         elif choice == '9':
-            filename = input("Введите имя файла для сохранения (по умолчанию system_state.json): ")
+            filename = input("Введите имя файла для сохранения (по умолчанию system_state.json, .bin - двоичный снимок): ")
             if not filename:
                 filename = "system_state.json"
-            controller.save_state(filename)
+            if filename.endswith(BINARY_EXTENSION):
+                controller.save_binary_state(filename)
+            else:
+                controller.save_state(filename)
                 
         elif choice == '10':
             filename = input("Введите имя файла для загрузки (по умолчанию system_state.json): ")
@@ -223,13 +254,87 @@ def main():
                 filename = "system_state.json"
             controller.load_state(filename)
                 
-        elif choice == '11' and controller.products:
-            controller.save_state()
+        elif choice == '11':
+            days = input("Введите количество дней (по умолчанию 30): ")
+            try:
+                days = int(days) if days else 30
+            except ValueError:
+                print("\nКоличество дней должно быть целым числом.")
+                continue
+            expiring = controller.get_expiring_certificates(days)
+            if not expiring:
+                print(f"\nНет сертификатов, срок действия которых истекает в ближайшие {days} дн.")
+            else:
+                print(f"\nСертификаты, срок действия которых истекает в ближайшие {days} дн.:")
+                for product, certificate in expiring:
+                    print(f"ID: {product.product_id}, Название: {product.name}, Этап: {certificate.stage}, "
+                          f"Стандарт: {certificate.standard.standard_name}, "
+                          f"Действителен до: {certificate.expiration_date}")
+                
+        elif choice == '12':
+            try:
+                result = controller.check_compliance_bulk()
+            except ImportError as e:
+                print(f"\nОшибка: {e}")
+                continue
+            print(f"\nПроверено продуктов: {len(result.product_ids)}")
+            for index, (standard, passed) in enumerate(zip(result.standards, result.count_passed())):
+                print(f"\n{standard.standard_name}: соответствуют {passed}")
+                for criterion, failed in result.count_failed_by_criterion(index).items():
+                    if failed:
+                        print(f"- не соответствуют по критерию '{criterion}': {failed}")
+                
+        elif choice == '13':
+            days = input("За сколько последних дней (по умолчанию 30): ")
+            k = input("Сколько продуктов показать (по умолчанию 10): ")
+            try:
+                days = int(days) if days else 30
+                k = int(k) if k else 10
+            except ValueError:
+                print("\nКоличество дней и продуктов должно быть целым числом.")
+                continue
+            try:
+                rankings = [
+                    ("Худшие", controller.rank_products_by_rating(days, k, lowest=True)),
+                    ("Лучшие", controller.rank_products_by_rating(days, k, lowest=False))
+                ]
+            except ImportError as e:
+                print(f"\nОшибка: {e}")
+                continue
+            for title, ranked in rankings:
+                if not ranked:
+                    print(f"\nНет отзывов за последние {days} дн.")
+                    break
+                print(f"\n{title} продукты по средней оценке за последние {days} дн.:")
+                for place, (product, avg_rating, count) in enumerate(ranked, 1):
+                    print(f"{place}. ID: {product.product_id}, Название: {product.name}, "
+                          f"Средняя оценка: {avg_rating:.2f}, Отзывов: {count}")
+            
+            product_id = input("\nВведите ID продукта для тренда по неделям (Enter - пропустить): ")
+            if product_id:
+                try:
+                    trend = controller.rating_trend(product_id)
+                    print(f"\nОценки продукта {product_id} по неделям:")
+                    for week_start, count, avg_rating in trend:
+                        rating_text = f"{avg_rating:.2f}" if avg_rating is not None else "-"
+                        print(f"- неделя с {week_start:%Y-%m-%d}: отзывов {count}, средняя оценка {rating_text}")
+                    latest = controller.latest_reviews(product_id, 3)
+                    if latest:
+                        print("Последние отзывы:")
+                    for date, rating, comment in latest:
+                        print(f"- {date:%Y-%m-%d} ({rating}/5): {comment}")
+                except ProductNotFoundError as e:
+                    print(f"\nОшибка: {e}")
+                
+        elif choice == '14' and controller.products:
             print("\nВыход из программы.")
             break
             
         else:
             print("\nНеверный выбор. Пожалуйста, попробуйте снова.")
+    
+    controller.close_journal()
+    controller.events.close()
 
 
 if __name__ == "__main__":
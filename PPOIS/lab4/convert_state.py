@@ -0,0 +1,30 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from domain.binary_state import convert_binary_to_json
+from domain.events import WARNING
+from domain.quality_controller import QualityController
+
+
+def main():
+    # python convert_state.py to-binary system_state.json system_state.bin
+    # python convert_state.py to-json system_state.bin system_state.json
+    if len(sys.argv) != 4 or sys.argv[1] not in ("to-binary", "to-json"):
+        print("Использование: python convert_state.py to-binary|to-json <исходный файл> <новый файл>")
+        sys.exit(1)
+    if sys.argv[1] == "to-binary":
+        # Файл состояния приложения - контрольная точка и журнал после нее: читаются оба
+        controller = QualityController()
+        if not controller.load_state(sys.argv[2]):
+            print(controller.events.recent(1, level=WARNING)[-1].message)
+            sys.exit(1)
+        controller.save_binary_state(sys.argv[3])
+    else:
+        convert_binary_to_json(sys.argv[2], sys.argv[3])
+    print(f"Файл {sys.argv[2]} преобразован в {sys.argv[3]}")
+
+
+if __name__ == "__main__":
+    main()
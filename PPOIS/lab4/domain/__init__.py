@@ -0,0 +1,79 @@
+from .product import Product
+from .product_registry import ProductRegistry
+from .quality_standard import (
+    QualityStandard,
+    GOSTStandard,
+    BakeryEnterpriseStandard,
+    OrganicBakeryStandard
+)
+from .certificate import Certificate
+from .expiry_scheduler import CertificateExpiryScheduler
+from .compliance_matrix import ComplianceMatrix, ComplianceResult
+from .review_store import ReviewStore, RatingTrend
+from .events import Event, EventSink, JsonlEventWriter
+from .journal import StateJournal
+from .sqlite_store import SqliteStore
+from .state_file import LazyHistory
+from .review import Review
+from .rating_stats import RatingStats
+from .production_stages import (
+    ProductionStage,
+    DoughStage,
+    BakingStage,
+    CoolingStage,
+    PackagingStage
+)
+from .quality_controller import QualityController
+from .domain_errors import (
+    ProductError,
+    ProductNotFoundError,
+    InvalidProductAttributeError,
+    DuplicateProductError,
+    QualityStandardError,
+    UnknownQualityStandardError,
+    QualityCheckFailedError,
+    CertificateError,
+    CertificateAlreadyExistsError,
+    ReviewError,
+    InvalidReviewRatingError
+)
+
+__all__ = [
+    'Product',
+    'ProductRegistry',
+    'QualityStandard',
+    'GOSTStandard',
+    'BakeryEnterpriseStandard',
+    'OrganicBakeryStandard',
+    'Certificate',
+    'CertificateExpiryScheduler',
+    'ComplianceMatrix',
+    'ComplianceResult',
+    'ReviewStore',
+    'RatingTrend',
+    'Event',
+    'EventSink',
+    'JsonlEventWriter',
+    'StateJournal',
+    'SqliteStore',
+    'LazyHistory',
+    'Review',
+    'RatingStats',
+    'ProductionStage',
+    'DoughStage',
+    'BakingStage',
+    'CoolingStage',
+    'PackagingStage',
+    'QualityController',
+    'ProductError',
+    'ProductNotFoundError',
+    'InvalidProductAttributeError',
+    'DuplicateProductError',
+    'QualityStandardError',
+    'UnknownQualityStandardError',
+    'QualityCheckFailedError',
+    'CertificateError',
+    'CertificateAlreadyExistsError',
+    'ReviewError',
+    'InvalidReviewRatingError'
+]
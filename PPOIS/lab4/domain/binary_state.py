@@ -0,0 +1,303 @@
+import json
+import mmap
+import struct
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+# Двоичный снимок состояния: таблицы записей фиксированной ширины, словарь строк
+# и даты в виде порядковых номеров дней. Читается через mmap; история продукта
+# (проверки, отзывы, сертификаты) разбирается только при обращении к ней.
+
+MAGIC = b"BQCS"
+VERSION = 1
+BINARY_EXTENSION = ".bin"
+
+NO_STRING = 0xFFFFFFFF
+
+# Заголовок: сигнатура, версия, резерв, затем (смещение, количество) для каждого раздела
+_HEADER = struct.Struct("<4sHH")
+_SECTION = struct.Struct("<QQ")
+_SECTIONS = ("strings", "products", "attributes", "checks", "reviews", "certificates", "meta")
+
+# Продукт: ID, название, статус, этап, (начало, количество) атрибутов, проверок, отзывов,
+# сертификатов, прочие поля (JSON-строка или NO_STRING)
+_PRODUCT = struct.Struct("<IIIiIIIIIIIII")
+_ATTRIBUTE = struct.Struct("<II")
+# Проверка: этап, результат (JSON-строка), время (день, микросекунды дня, строка)
+_CHECK = struct.Struct("<IIiqI")
+# Отзыв: автор, комментарий, рейтинг, дата (день, микросекунды дня, строка)
+_REVIEW = struct.Struct("<IIiiqI")
+# Сертификат: стандарт, этап, даты выдачи и окончания (порядковые номера дней)
+_CERTIFICATE = struct.Struct("<IIii")
+_OFFSET = struct.Struct("<Q")
+
+_PRODUCT_FIELDS = ("product_id", "name", "attributes", "status", "current_stage",
+                   "quality_checks", "reviews", "certificates")
+_ONE_DAY_US = 86400 * 1000000
+
+
+def _encode_datetime(value: str) -> Tuple[int, int, Optional[str]]:
+    # (день, микросекунды) если строка точно восстанавливается из них, иначе строка как есть
+    try:
+        moment = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return 0, 0, value
+    if moment.tzinfo is not None or moment.isoformat() != value:
+        return 0, 0, value
+    microseconds = ((moment.hour * 60 + moment.minute) * 60 + moment.second) * 1000000 + moment.microsecond
+    return moment.toordinal(), microseconds, None
+
+
+def _decode_datetime(ordinal: int, microseconds: int) -> datetime:
+    return datetime.fromordinal(ordinal) + timedelta(microseconds=microseconds)
+
+
+class _StringPool:
+    def __init__(self) -> None:
+        self.index: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def add(self, value: Optional[str]) -> int:
+        if value is None:
+            return NO_STRING
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+def write_binary_state(filename: str, state: Dict[str, Any]) -> None:
+    """Записать состояние (словарь формата JSON-файла save_state) двоичным снимком"""
+    strings = _StringPool()
+    tables: Dict[str, List[bytes]] = {name: [] for name in _SECTIONS[1:-1]}
+    counts = {name: 0 for name in tables}
+    dump = json.JSONEncoder(ensure_ascii=False, sort_keys=False).encode
+
+    for product_data in state["products"]:
+        attributes = product_data["attributes"]
+        for key, value in attributes.items():
+            tables["attributes"].append(_ATTRIBUTE.pack(strings.add(key), strings.add(value)))
+        for check in product_data["quality_checks"]:
+            day, microseconds, text = _encode_datetime(check["timestamp"])
+            tables["checks"].append(_CHECK.pack(strings.add(check["stage"]), strings.add(dump(check["result"])),
+                                                day, microseconds, strings.add(text)))
+        for review in product_data["reviews"]:
+            day, microseconds, text = _encode_datetime(review["date"])
+            tables["reviews"].append(_REVIEW.pack(strings.add(review["author"]), strings.add(review["comment"]),
+                                                  review["rating"], day, microseconds, strings.add(text)))
+        for certificate in product_data["certificates"]:
+            tables["certificates"].append(_CERTIFICATE.pack(
+                strings.add(certificate["standard_name"]), strings.add(certificate["stage"]),
+                date.fromisoformat(certificate["issue_date"]).toordinal(),
+                date.fromisoformat(certificate["expiration_date"]).toordinal()))
+        extra = {key: value for key, value in product_data.items() if key not in _PRODUCT_FIELDS}
+        tables["products"].append(_PRODUCT.pack(
+            strings.add(product_data["product_id"]), strings.add(product_data["name"]),
+            strings.add(product_data["status"]), product_data["current_stage"],
+            counts["attributes"], len(attributes),
+            counts["checks"], len(product_data["quality_checks"]),
+            counts["reviews"], len(product_data["reviews"]),
+            counts["certificates"], len(product_data["certificates"]),
+            strings.add(dump(extra)) if extra else NO_STRING))
+        counts["attributes"] += len(attributes)
+        counts["checks"] += len(product_data["quality_checks"])
+        counts["reviews"] += len(product_data["reviews"])
+        counts["certificates"] += len(product_data["certificates"])
+        counts["products"] += 1
+
+    meta = {key: value for key, value in state.items() if key != "products"}
+    meta_bytes = dump(meta).encode("utf-8")
+
+    encoded = [value.encode("utf-8") for value in strings.values]
+    offsets = [0]
+    for value in encoded:
+        offsets.append(offsets[-1] + len(value))
+    string_section = (struct.pack(f"<{len(offsets)}Q", *offsets) + b"".join(encoded))
+
+    sections = [(string_section, len(encoded))]
+    sections += [(b"".join(tables[name]), counts[name]) for name in _SECTIONS[1:-1]]
+    sections.append((meta_bytes, len(meta_bytes)))
+
+    position = _HEADER.size + _SECTION.size * len(_SECTIONS)
+    header = [_HEADER.pack(MAGIC, VERSION, 0)]
+    for data, count in sections:
+        header.append(_SECTION.pack(position, count))
+        position += len(data)
+    with open(filename, "wb") as f:
+        f.write(b"".join(header))
+        for data, _ in sections:
+            f.write(data)
+
+
+def is_binary_state(filename: str) -> bool:
+    with open(filename, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class BinaryStateReader:
+    """Чтение двоичного снимка через mmap: записи разбираются по индексу, строки - по запросу"""
+
+    def __init__(self, filename: str) -> None:
+        with open(filename, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _ = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Файл {filename} не является двоичным снимком состояния")
+        if version != VERSION:
+            raise ValueError(f"Неподдерживаемая версия двоичного снимка: {version}")
+        self._sections: Dict[str, Tuple[int, int]] = {}
+        for i, name in enumerate(_SECTIONS):
+            self._sections[name] = _SECTION.unpack_from(self._map, _HEADER.size + i * _SECTION.size)
+        offset, count = self._sections["strings"]
+        self._string_offsets = memoryview(self._map)[offset:offset + (count + 1) * _OFFSET.size].cast("Q")
+        self._string_base = offset + (count + 1) * _OFFSET.size
+        self._strings: List[Optional[str]] = [None] * count
+        self.product_count: int = self._sections["products"][1]
+
+    def close(self) -> None:
+        self._string_offsets.release()
+        self._map.close()
+
+    def string(self, code: int) -> Optional[str]:
+        if code == NO_STRING:
+            return None
+        value = self._strings[code]
+        if value is None:
+            start = self._string_base + self._string_offsets[code]
+            end = self._string_base + self._string_offsets[code + 1]
+            value = self._strings[code] = self._map[start:end].decode("utf-8")
+        return value
+
+    def _records(self, name: str, record: struct.Struct, start: int, count: int):
+        offset = self._sections[name][0] + start * record.size
+        return record.iter_unpack(self._map[offset:offset + count * record.size])
+
+    def meta(self) -> Dict[str, Any]:
+        offset, length = self._sections["meta"]
+        return json.loads(self._map[offset:offset + length])
+
+    def _product(self, index: int) -> tuple:
+        return _PRODUCT.unpack_from(self._map, self._sections["products"][0] + index * _PRODUCT.size)
+
+    def product_header(self, index: int) -> Dict[str, Any]:
+        """Заголовок продукта в формате файла по строкам; история - в поле "history" """
+        (product_id, name, status, current_stage, attr_start, attr_count, _, _,
+         _, review_count, cert_start, cert_count, extra) = self._product(index)
+        string = self.string
+        header = {
+            "product_id": string(product_id),
+            "name": string(name),
+            "attributes": {string(key): string(value)
+                           for key, value in self._records("attributes", _ATTRIBUTE, attr_start, attr_count)},
+            "status": string(status),
+            "current_stage": current_stage,
+            "certificates_count": cert_count,
+            "reviews_count": review_count
+        }
+        # Сертификат этапа - с самым поздним сроком (как в индексе Product)
+        best: Dict[int, Tuple[int, int, tuple]] = {}
+        for i, record in enumerate(self._records("certificates", _CERTIFICATE, cert_start, cert_count)):
+            current = best.get(record[1])
+            if current is None or record[3] >= current[0]:
+                best[record[1]] = (record[3], i, record)
+        header["stage_certificates"] = [[i, self._certificate_data(record)] for _, i, record in best.values()]
+        if extra != NO_STRING:
+            header.update(json.loads(string(extra)))
+        header["history"] = BinaryHistory(self, index)
+        return header
+
+    def _certificate_data(self, record: tuple) -> Dict[str, Any]:
+        standard, stage, issue_date, expiration_date = record
+        return {
+            "standard_name": self.string(standard),
+            "stage": self.string(stage),
+            "issue_date": date.fromordinal(issue_date).isoformat(),
+            "expiration_date": date.fromordinal(expiration_date).isoformat()
+        }
+
+    def history_data(self, index: int) -> Dict[str, Any]:
+        """История продукта в формате JSON-файла (строки дат - как в исходном файле)"""
+        (_, _, _, _, _, _, check_start, check_count,
+         review_start, review_count, cert_start, cert_count, _) = self._product(index)
+        string = self.string
+        quality_checks = []
+        for stage, result, day, microseconds, text in self._records("checks", _CHECK, check_start, check_count):
+            quality_checks.append({
+                "stage": string(stage),
+                "result": json.loads(string(result)),
+                "timestamp": _decode_datetime(day, microseconds).isoformat() if day else string(text)
+            })
+        reviews = []
+        for author, comment, rating, day, microseconds, text in self._records("reviews", _REVIEW, review_start, review_count):
+            reviews.append({
+                "author": string(author),
+                "comment": string(comment),
+                "rating": rating,
+                "date": _decode_datetime(day, microseconds).isoformat() if day else string(text)
+            })
+        certificates = [self._certificate_data(record)
+                        for record in self._records("certificates", _CERTIFICATE, cert_start, cert_count)]
+        return {"quality_checks": quality_checks, "reviews": reviews, "certificates": certificates}
+
+    def product_data(self, index: int) -> Dict[str, Any]:
+        """Продукт целиком в формате JSON-файла"""
+        header = self.product_header(index)
+        data = {key: header[key] for key in ("product_id", "name", "attributes", "status", "current_stage")}
+        data.update(self.history_data(index))
+        for key, value in header.items():
+            if key not in data and key not in ("certificates_count", "reviews_count", "stage_certificates", "history"):
+                data[key] = value
+        return data
+
+
+class BinaryHistory:
+    """История продукта в двоичном снимке: источник для LazyHistory"""
+
+    __slots__ = ("reader", "index")
+
+    def __init__(self, reader: BinaryStateReader, index: int) -> None:
+        self.reader = reader
+        self.index = index
+
+    def data(self) -> Dict[str, Any]:
+        return self.reader.history_data(self.index)
+
+    def to_json(self) -> bytes:
+        return json.dumps(self.data(), ensure_ascii=False).encode("utf-8")
+
+
+def read_binary_state(filename: str, lazy: bool = True) -> Dict[str, Any]:
+    """
+    Прочитать двоичный снимок
+
+    lazy=True - как read_state для файла по строкам: заголовки продуктов и непрочитанная
+    история в поле "history"; lazy=False - полный словарь формата JSON-файла.
+    """
+    reader = BinaryStateReader(filename)
+    if lazy:
+        # Файл остается отображенным, пока на него ссылается непрочитанная история
+        state = {"products": [reader.product_header(i) for i in range(reader.product_count)]}
+        state.update(reader.meta())
+        return state
+    try:
+        state = {"products": [reader.product_data(i) for i in range(reader.product_count)]}
+        state.update(reader.meta())
+    finally:
+        reader.close()
+    return state
+
+
+def convert_json_to_binary(json_filename: str, binary_filename: str) -> None:
+    # Только файл save_state (один JSON-объект); файл журнала с контрольной точкой
+    # преобразует convert_state.py через QualityController.load_state
+    with open(json_filename, "r", encoding="utf-8") as f:
+        state = json.load(f)
+    write_binary_state(binary_filename, state)
+
+
+def convert_binary_to_json(binary_filename: str, json_filename: str) -> None:
+    state = read_binary_state(binary_filename, lazy=False)
+    with open(json_filename, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=4)
+
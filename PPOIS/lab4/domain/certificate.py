@@ -1,21 +1,40 @@
-from datetime import datetime, timedelta
-from typing import TYPE_CHECKING
+import time
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, Optional
 
 if TYPE_CHECKING:
     from .quality_standard import QualityStandard
 
 
+# Кэш текущей даты: (дата, начало этих суток, начало следующих) по time.time()
+_today_cache = (date.min, 0.0, 0.0)
+
+
+def current_date() -> date:
+    """Текущая дата; datetime.now() вызывается только после смены суток"""
+    global _today_cache
+    today, day_start, next_midnight = _today_cache
+    now = time.time()
+    if not day_start <= now < next_midnight:
+        today = datetime.fromtimestamp(now).date()
+        day_start = datetime.combine(today, datetime.min.time()).timestamp()
+        next_midnight = datetime.combine(today + timedelta(days=1), datetime.min.time()).timestamp()
+        _today_cache = (today, day_start, next_midnight)
+    return today
+
+
 class Certificate:
     def __init__(self, product_id: str, standard: 'QualityStandard', stage: str) -> None:
-        self.certificate_id: str = f"CERT-{product_id}-{datetime.now().strftime('%Y%m%d')}"
+        self.certificate_id: str = f"CERT-{product_id}-{current_date().strftime('%Y%m%d')}"
         self.product_id: str = product_id
         self.standard: 'QualityStandard' = standard
         self.stage: str = stage  # Этап производства, для которого выдан сертификат
-        self.issue_date: datetime.date = datetime.now().date()
+        self.issue_date: datetime.date = current_date()
         self.expiration_date: datetime.date = self.issue_date + timedelta(days=365)
+        self.expired: bool = False  # Помечается ежедневной очисткой CertificateExpiryScheduler
     
-    def is_valid(self) -> bool:
-        return datetime.now().date() <= self.expiration_date
+    def is_valid(self, today: Optional[date] = None) -> bool:
+        return (today or current_date()) <= self.expiration_date
 
     def __str__(self) -> str:
         return (
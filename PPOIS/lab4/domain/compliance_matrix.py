@@ -0,0 +1,169 @@
+from typing import Dict, Iterable, List, Sequence, Tuple
+from .product import Product
+from .quality_standard import QualityStandard
+from .domain_errors import InvalidProductAttributeError
+
+try:
+    import numpy as np
+except ImportError:  # numpy нужен только для массовой проверки
+    np = None
+
+
+# Критерии в порядке битов маски несоответствий: бит i - критерий ATTRIBUTES[i]
+ATTRIBUTES: Tuple[str, ...] = ("defects", "texture", "smell", "taste")
+
+# Допустимые значения атрибутов от худшего к лучшему; индекс - порядковый код
+ATTRIBUTE_LEVELS: Dict[str, Tuple[str, ...]] = {
+    "defects": ("have", "few", "none"),
+    "texture": ("poor", "good", "excellent"),
+    "smell": ("bad", "good", "excellent"),
+    "taste": ("poor", "good", "excellent")
+}
+
+
+def failed_criteria(bits: int) -> List[str]:
+    """Названия критериев по маске несоответствий"""
+    return [attribute for i, attribute in enumerate(ATTRIBUTES) if bits >> i & 1]
+
+
+class ComplianceResult:
+    """Результат массовой проверки: строка - стандарт, столбец - продукт"""
+
+    def __init__(self, standards: Sequence[QualityStandard], product_ids: List[str], failed_bits) -> None:
+        self.standards: List[QualityStandard] = list(standards)
+        self.product_ids: List[str] = product_ids
+        # uint8 (стандарты x продукты): бит i установлен, если не выполнен критерий ATTRIBUTES[i]
+        self.failed_bits = failed_bits
+        self.passed = failed_bits == 0
+
+    def count_passed(self) -> List[int]:
+        """Количество соответствующих продуктов по каждому стандарту"""
+        return self.passed.sum(axis=1).tolist()
+
+    def count_failed_by_criterion(self, index: int) -> Dict[str, int]:
+        """Сколько продуктов не выполняют каждый критерий стандарта с номером index"""
+        bits = self.failed_bits[index]
+        return {attribute: int(np.count_nonzero(bits & (1 << i))) for i, attribute in enumerate(ATTRIBUTES)}
+
+    def passed_ids(self, index: int) -> List[str]:
+        """ID продуктов, соответствующих стандарту с номером index"""
+        return [self.product_ids[i] for i in np.flatnonzero(self.passed[index]).tolist()]
+
+    def failed(self, index: int) -> List[Tuple[str, List[str]]]:
+        """Несоответствующие продукты стандарта с номером index: (ID, невыполненные критерии)"""
+        bits = self.failed_bits[index]
+        rows = np.flatnonzero(bits).tolist()
+        return [(self.product_ids[i], failed_criteria(b)) for i, b in zip(rows, bits[rows].tolist())]
+
+
+class ComplianceMatrix:
+    """Атрибуты продуктов в виде матрицы порядковых кодов для проверки всех продуктов за один проход"""
+
+    def __init__(self, products: Iterable[Product] = ()) -> None:
+        if np is None:
+            raise ImportError("Для массовой проверки на соответствие требуется пакет numpy")
+        # Атрибут -> значение -> код; незнакомые значения получают новые коды
+        self._codes: Dict[str, Dict[str, int]] = {
+            attribute: {value: code for code, value in enumerate(ATTRIBUTE_LEVELS[attribute])}
+            for attribute in ATTRIBUTES
+        }
+        self._rows: Dict[str, int] = {}  # ID продукта -> столбец матрицы
+        self._product_ids: List[str] = []
+        # Список ID отдан результату проверки: перед изменением он копируется
+        self._ids_shared: bool = False
+        # Атрибуты x продукты: каждый атрибут хранится непрерывно; емкость с запасом
+        self._matrix = np.zeros((len(ATTRIBUTES), 0), dtype=np.int8)
+        self.rebuild(products)
+
+    def __len__(self) -> int:
+        return len(self._product_ids)
+
+    def __contains__(self, product_id: str) -> bool:
+        return product_id in self._rows
+
+    def _code(self, attribute: str, value: str) -> int:
+        codes = self._codes[attribute]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(codes)
+        return code
+
+    def _encode(self, product: Product) -> List[int]:
+        attributes = product.attributes
+        return [self._code(attribute, attributes[attribute]) for attribute in ATTRIBUTES]
+
+    def _own_ids(self) -> List[str]:
+        if self._ids_shared:
+            self._product_ids = self._product_ids[:]
+            self._ids_shared = False
+        return self._product_ids
+
+    def rebuild(self, products: Iterable[Product]) -> None:
+        """Заново закодировать атрибуты всех продуктов"""
+        products = list(products)
+        self._product_ids = [product.product_id for product in products]
+        self._ids_shared = False
+        self._rows = {product_id: row for row, product_id in enumerate(self._product_ids)}
+        matrix = np.zeros((len(ATTRIBUTES), max(len(products), 16)), dtype=np.int8)
+        for i, attribute in enumerate(ATTRIBUTES):
+            codes = self._codes[attribute]
+            column = [codes.get(product.attributes[attribute], -1) for product in products]
+            if -1 in column:
+                column = [self._code(attribute, product.attributes[attribute]) for product in products]
+            matrix[i, :len(products)] = column
+        self._matrix = matrix
+
+    def add(self, product: Product) -> None:
+        """Добавить продукт (для уже добавленного - обновить его атрибуты)"""
+        row = self._rows.get(product.product_id)
+        if row is None:
+            row = len(self._product_ids)
+            if row == self._matrix.shape[1]:
+                self._matrix = np.concatenate([self._matrix, np.zeros_like(self._matrix)], axis=1)
+            self._rows[product.product_id] = row
+            self._own_ids().append(product.product_id)
+        self._matrix[:, row] = self._encode(product)
+
+    def update(self, product: Product) -> None:
+        """Перекодировать атрибуты продукта после их изменения"""
+        self.add(product)
+
+    def remove(self, product_id: str) -> None:
+        """Убрать продукт: на его место переносится последний столбец"""
+        row = self._rows.pop(product_id, None)
+        if row is None:
+            return
+        product_ids = self._own_ids()
+        last = len(product_ids) - 1
+        if row != last:
+            moved = product_ids[last]
+            self._matrix[:, row] = self._matrix[:, last]
+            product_ids[row] = moved
+            self._rows[moved] = row
+        product_ids.pop()
+
+    def encode_standard(self, standard: QualityStandard) -> List[int]:
+        """Вектор требуемых кодов стандарта; -1 - критерий не проверяется"""
+        required = [-1] * len(ATTRIBUTES)
+        for criterion, value in standard.criteria.items():
+            if criterion not in self._codes:
+                raise InvalidProductAttributeError(f"Атрибут {criterion} не существует")
+            required[ATTRIBUTES.index(criterion)] = self._code(criterion, value)
+        return required
+
+    def evaluate(self, standards: Sequence[QualityStandard]) -> ComplianceResult:
+        """Проверить все продукты по всем стандартам за один векторный проход"""
+        required = np.array([self.encode_standard(standard) for standard in standards],
+                            dtype=np.int8).reshape(len(standards), len(ATTRIBUTES))
+        size = len(self._product_ids)
+        failed_bits = np.zeros((len(standards), size), dtype=np.uint8)
+        for i in range(len(ATTRIBUTES)):
+            checked = required[:, i] >= 0
+            if not checked.any():
+                continue
+            mismatch = self._matrix[i, :size] != required[:, i, None]
+            mismatch &= checked[:, None]
+            failed_bits |= mismatch.view(np.uint8) << i
+        # Список ID не копируется: матрица скопирует его сама при следующем изменении
+        self._ids_shared = True
+        return ComplianceResult(standards, self._product_ids, failed_bits)
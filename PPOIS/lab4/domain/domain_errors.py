@@ -10,6 +10,10 @@ class InvalidProductAttributeError(ProductError):
     #Исключение, возникающее при попытке обновить несуществующий атрибут продукта.
     pass
 
+class DuplicateProductError(ProductError):
+    #Исключение, возникающее при добавлении продукта с уже занятым ID.
+    pass
+
 class QualityStandardError(Exception):
     #Базовый класс для исключений, связанных со стандартами качества.
     pass
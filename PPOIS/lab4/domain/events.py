@@ -0,0 +1,174 @@
+import atexit
+import json
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from logging import DEBUG, INFO, WARNING, ERROR, getLevelName
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Один кодировщик на все события: json.dumps с параметрами создает новый при каждом вызове
+_encoder = json.JSONEncoder(ensure_ascii=False, default=str)
+
+__all__ = ["DEBUG", "INFO", "WARNING", "ERROR", "Event", "EventSink", "JsonlEventWriter"]
+
+
+class Event:
+    """Событие модели: уровень, вид (например, "certificate.issued"), сообщение и данные"""
+
+    __slots__ = ("time", "level", "kind", "message", "data")
+
+    def __init__(self, level: int, kind: str, message: str, data: Dict[str, Any]) -> None:
+        self.time: float = time.time()
+        self.level: int = level
+        self.kind: str = kind
+        self.message: str = message
+        self.data: Dict[str, Any] = data
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "time": datetime.fromtimestamp(self.time).isoformat(),
+            "level": getLevelName(self.level),
+            "kind": self.kind,
+            "message": self.message,
+            **self.data
+        }
+
+    def __str__(self) -> str:
+        return self.message
+
+
+class JsonlEventWriter:
+    """Фоновая запись событий в JSONL-файл: emit только ставит событие в очередь"""
+
+    def __init__(self, filename: str, level: int = INFO, flush_interval: float = 0.2) -> None:
+        self.filename: str = filename
+        self.level: int = level
+        # Поток просыпается не чаще раза в flush_interval секунд и пишет все накопленное,
+        # а не будит себя на каждое событие
+        self.flush_interval: float = flush_interval
+        self._closing = threading.Event()
+        self._queue: "queue.SimpleQueue[Optional[Event]]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="event-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def put(self, event: Event) -> None:
+        self._queue.put(event)
+
+    def _run(self) -> None:
+        with open(self.filename, "a", encoding="utf-8") as f:
+            while True:
+                # Все накопившиеся события записываются одним блоком
+                batch = [self._queue.get()]
+                self._closing.wait(self.flush_interval)
+                while True:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                lines = [_encoder.encode(event.to_dict()) for event in batch if event is not None]
+                if lines:
+                    f.write("\n".join(lines) + "\n")
+                    f.flush()
+                if batch[-1] is None:
+                    return
+
+    def close(self) -> None:
+        """Дописать очередь и остановить поток (повторный вызов ничего не делает)"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._closing.set()
+            self._thread.join()
+        atexit.unregister(self.close)
+
+
+class EventSink:
+    """Приемник событий модели: кольцевой буфер, подписчики и необязательная запись в файл"""
+
+    def __init__(self, capacity: int = 1000, level: int = INFO) -> None:
+        self.level: int = level  # Минимальный уровень событий в буфере
+        self._buffer: "deque[Event]" = deque(maxlen=capacity)
+        # (обработчик, минимальный уровень, виды событий или None - все)
+        self._subscribers: List[Tuple[Callable[[Event], None], int, Optional[frozenset]]] = []
+        self._writer: Optional[JsonlEventWriter] = None
+        self._min_level: int = level
+        self._lock = threading.Lock()
+
+    def _update_min_level(self) -> None:
+        levels = [self.level] + [level for _, level, _ in self._subscribers]
+        if self._writer is not None:
+            levels.append(self._writer.level)
+        self._min_level = min(levels)
+
+    def enabled(self, level: int) -> bool:
+        """Нужны ли кому-нибудь события этого уровня (чтобы не готовить их впустую)"""
+        return level >= self._min_level
+
+    def set_level(self, level: int) -> None:
+        self.level = level
+        self._update_min_level()
+
+    def subscribe(self, callback: Callable[[Event], None], level: int = INFO,
+                  kinds: Optional[Iterable[str]] = None) -> Callable[[Event], None]:
+        """Вызывать callback для событий не ниже level (и только указанных видов, если заданы)"""
+        self._subscribers.append((callback, level, frozenset(kinds) if kinds is not None else None))
+        self._update_min_level()
+        return callback
+
+    def unsubscribe(self, callback: Callable[[Event], None]) -> None:
+        self._subscribers = [entry for entry in self._subscribers if entry[0] != callback]
+        self._update_min_level()
+
+    def start_writer(self, filename: str, level: int = INFO) -> JsonlEventWriter:
+        """Включить фоновую запись событий в JSONL-файл"""
+        self.stop_writer()
+        self._writer = JsonlEventWriter(filename, level)
+        self._update_min_level()
+        return self._writer
+
+    def stop_writer(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            self._update_min_level()
+
+    def close(self) -> None:
+        self.stop_writer()
+
+    def emit(self, level: int, kind: str, message: str, **data: Any) -> None:
+        if level < self._min_level:
+            return
+        event = Event(level, kind, message, data)
+        if level >= self.level:
+            with self._lock:
+                self._buffer.append(event)
+        for callback, min_level, kinds in self._subscribers:
+            if level >= min_level and (kinds is None or kind in kinds):
+                callback(event)
+        writer = self._writer
+        if writer is not None and level >= writer.level:
+            writer.put(event)
+
+    def debug(self, kind: str, message: str, **data: Any) -> None:
+        self.emit(DEBUG, kind, message, **data)
+
+    def info(self, kind: str, message: str, **data: Any) -> None:
+        self.emit(INFO, kind, message, **data)
+
+    def warning(self, kind: str, message: str, **data: Any) -> None:
+        self.emit(WARNING, kind, message, **data)
+
+    def error(self, kind: str, message: str, **data: Any) -> None:
+        self.emit(ERROR, kind, message, **data)
+
+    def recent(self, count: Optional[int] = None, level: int = DEBUG) -> List[Event]:
+        """Последние события из буфера (не более count) не ниже level"""
+        with self._lock:
+            events = [event for event in self._buffer if event.level >= level]
+        return events if count is None else events[-count:] if count else []
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buffer.clear()
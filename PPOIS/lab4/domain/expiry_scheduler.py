@@ -0,0 +1,72 @@
+import heapq
+import itertools
+from datetime import date, timedelta
+from typing import Iterable, List, Optional, Tuple
+from .certificate import Certificate, current_date
+from .product import Product
+
+
+class CertificateExpiryScheduler:
+    """Очередь сертификатов всех продуктов по сроку действия (min-куча по expiration_date)"""
+
+    def __init__(self) -> None:
+        # Элементы кучи: (срок действия, порядковый номер, сертификат, продукт)
+        self._heap: List[Tuple[date, int, Certificate, Product]] = []
+        self._order = itertools.count()
+        self.last_sweep: Optional[date] = None  # Дата последней очистки
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def add(self, product: Product, certificate: Certificate) -> None:
+        """Поставить сертификат в очередь за O(log n)"""
+        heapq.heappush(self._heap, (certificate.expiration_date, next(self._order), certificate, product))
+
+    def rebuild(self, products: Iterable[Product]) -> None:
+        """Заново построить очередь по сертификатам этапов продуктов за O(n)"""
+        # Берутся только сертификаты из индекса этапов: более старые сертификаты этапа не влияют
+        # на его действительность, а история продуктов при загрузке еще не прочитана
+        self._heap = [(cert.expiration_date, next(self._order), cert, product)
+                      for product in products for cert in product.stage_certificates() if not cert.expired]
+        heapq.heapify(self._heap)
+        self.last_sweep = None
+
+    def expiring_within(self, days: int, today: Optional[date] = None) -> List[Tuple[Product, Certificate]]:
+        """Действующие сертификаты, срок которых истекает в ближайшие days дней, по возрастанию срока"""
+        today = today or current_date()
+        limit = today + timedelta(days=days)
+        heap = self._heap
+        result = []
+        if not heap or heap[0][0] > limit:
+            return result
+        # Обход кучи от корня: потомки не раньше родителя, поэтому ветви со сроком
+        # позже limit не просматриваются - O(k log k) для k найденных
+        frontier = [(heap[0][0], heap[0][1], 0)]
+        while frontier:
+            _, _, index = heapq.heappop(frontier)
+            expiration_date, _, certificate, product = heap[index]
+            if expiration_date >= today:
+                result.append((product, certificate))
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(heap) and heap[child][0] <= limit:
+                    heapq.heappush(frontier, (heap[child][0], heap[child][1], child))
+        return result
+
+    def sweep(self, today: Optional[date] = None) -> List[Tuple[Product, Certificate]]:
+        """Извлечь истекшие сертификаты, пометить их и убрать из индексов этапов продуктов"""
+        today = today or current_date()
+        expired = []
+        while self._heap and self._heap[0][0] < today:
+            _, _, certificate, product = heapq.heappop(self._heap)
+            certificate.expired = True
+            product.expire_certificate(certificate)
+            expired.append((product, certificate))
+        self.last_sweep = today
+        return expired
+
+    def sweep_if_due(self, today: Optional[date] = None) -> List[Tuple[Product, Certificate]]:
+        """Ежедневная очистка: выполняется не чаще раза в сутки"""
+        today = today or current_date()
+        if self.last_sweep == today:
+            return []
+        return self.sweep(today)
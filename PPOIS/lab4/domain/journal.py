@@ -0,0 +1,156 @@
+import json
+import os
+import queue
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from .state_file import read_state, write_state
+
+# Один кодировщик на все записи: json.dumps с параметрами создает новый при каждом вызове
+_encoder = json.JSONEncoder(ensure_ascii=False, default=str)
+
+
+class StateJournal:
+    """Журнал изменений состояния (JSONL) рядом с контрольной точкой - файлом состояния"""
+
+    def __init__(self, filename: str, commit_interval: float = 0.01, checkpoint_every: int = 10000) -> None:
+        self.checkpoint_filename: str = filename
+        self.filename: str = filename + ".journal"
+        # Групповая фиксация: записи, пришедшие за commit_interval секунд, сбрасываются одним fsync
+        self.commit_interval: float = commit_interval
+        # Сколько записей копится в журнале до новой контрольной точки
+        self.checkpoint_every: int = checkpoint_every
+        self.seq: int = 0  # Номер последней записи
+        self.checkpoint_seq: int = 0  # Записи с номерами до него вошли в контрольную точку
+        self._durable_seq: int = 0  # Записи с номерами до него уже на диске
+        self._valid_size: int = 0  # Размер журнала без оборванной последней строки
+        self._condition = threading.Condition()
+        self._closing = threading.Event()
+        self._queue: "queue.SimpleQueue[Optional[Tuple[str, int, Any]]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self.error: Optional[Exception] = None  # Ошибка фонового потока записи
+
+    @property
+    def pending(self) -> int:
+        """Количество записей после последней контрольной точки"""
+        return self.seq - self.checkpoint_seq
+
+    def read_checkpoint(self) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(self.checkpoint_filename):
+            return None
+        return read_state(self.checkpoint_filename)
+
+    def read_tail(self, after_seq: int) -> List[Dict[str, Any]]:
+        """Записи журнала с номерами после after_seq (оборванная при сбое последняя строка пропускается)"""
+        records = []
+        self._valid_size = 0
+        if not os.path.exists(self.filename):
+            return records
+        with open(self.filename, "rb") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                self._valid_size += len(line)
+                if record["seq"] > after_seq:
+                    records.append(record)
+        return records
+
+    def start(self, seq: int, checkpoint_seq: int) -> None:
+        """Начать запись после чтения журнала: seq - номер последней записи"""
+        self.seq = self._durable_seq = seq
+        self.checkpoint_seq = checkpoint_seq
+        if os.path.exists(self.filename) and os.path.getsize(self.filename) > self._valid_size:
+            # Дописывать после оборванной строки нельзя - она испортила бы следующую запись
+            with open(self.filename, "r+b") as f:
+                f.truncate(self._valid_size)
+        self._closing.clear()
+        self._thread = threading.Thread(target=self._run, name="state-journal", daemon=True)
+        self._thread.start()
+
+    def append(self, op: str, fields: Dict[str, Any]) -> int:
+        """Добавить запись об изменении; на диск она попадет при ближайшей групповой фиксации"""
+        self.seq += 1
+        self._queue.put(("append", self.seq, {"seq": self.seq, "op": op, **fields}))
+        return self.seq
+
+    def checkpoint(self, state: Dict[str, Any]) -> None:
+        """Записать в фоне новую контрольную точку (по строкам); state должен отражать все записи до seq"""
+        state["journal_seq"] = self.seq
+        self.checkpoint_seq = self.seq
+        self._queue.put(("checkpoint", self.seq, state))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Дождаться, пока все добавленные записи окажутся на диске"""
+        seq = self.seq
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._durable_seq >= seq or self.error is not None or not self._is_running(), timeout)
+
+    def close(self) -> None:
+        """Дописать очередь и остановить поток записи"""
+        if self._is_running():
+            self._queue.put(None)
+            self._closing.set()
+            self._thread.join()
+        self._thread = None
+
+    def _is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self) -> None:
+        f = open(self.filename, "a", encoding="utf-8")
+        try:
+            while True:
+                batch = [self._queue.get()]
+                self._closing.wait(self.commit_interval)
+                while True:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                lines = []
+                durable_seq = self._durable_seq
+                for item in batch:
+                    if item is None:
+                        break
+                    kind, seq, payload = item
+                    if kind == "append":
+                        lines.append(_encoder.encode(payload))
+                    else:
+                        self._write(f, lines)
+                        lines = []
+                        self._write_checkpoint(payload)
+                        # Все записи в журнале вошли в контрольную точку: журнал начинается заново
+                        f.close()
+                        f = open(self.filename, "w", encoding="utf-8")
+                    durable_seq = seq
+                self._write(f, lines)
+                with self._condition:
+                    self._durable_seq = durable_seq
+                    self._condition.notify_all()
+                if batch[-1] is None:
+                    return
+        except Exception as e:
+            self.error = e
+            with self._condition:
+                self._condition.notify_all()
+        finally:
+            f.close()
+
+    def _write(self, f, lines: List[str]) -> None:
+        if lines:
+            f.write("\n".join(lines) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _write_checkpoint(self, state: Dict[str, Any]) -> None:
+        # Новая контрольная точка заменяет старую только после записи на диск
+        temp_filename = self.checkpoint_filename + ".tmp"
+        with open(temp_filename, "wb") as f:
+            write_state(f, state)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_filename, self.checkpoint_filename)
@@ -1,10 +1,12 @@
 from datetime import date, datetime
-from typing import Dict, List, TYPE_CHECKING
+from typing import Dict, List, Optional, TYPE_CHECKING
 from .domain_errors import InvalidProductAttributeError
+from .rating_stats import RatingStats
 
 if TYPE_CHECKING:
     from .review import Review
     from .certificate import Certificate
+    from .state_file import LazyHistory
 
 
 class Product:
@@ -21,14 +23,80 @@ class Product:
             "taste": "poor"        # poor, good, excellent
         }
         
-        self.quality_checks: List[dict] = []  # Результаты проверок
-        self.reviews: List['Review'] = []     # Отзывы
-        self.certificates: List['Certificate'] = []  # Сертификаты
+        self._quality_checks: List[dict] = []  # Результаты проверок
+        self._reviews: List['Review'] = []     # Отзывы
+        self._certificates: List['Certificate'] = []  # Сертификаты
+        # История (проверки, отзывы, сертификаты), еще не прочитанная из файла состояния;
+        # читается при первом обращении к любому из трех списков
+        self._history: Optional['LazyHistory'] = None
+        self._history_counts: tuple = (0, 0)  # (сертификаты, отзывы) до чтения истории
+        # Агрегаты оценок; строятся при первом обращении и обновляются add_review
+        self._rating_stats: Optional[RatingStats] = None
+        # Этап -> сертификат этапа с самым поздним сроком действия
+        self._certificates_by_stage: Dict[str, 'Certificate'] = {}
         self.status: str = "production"  # production, quality_check, approved, rejected
         self.current_stage: int = 0  # Индекс текущего этапа производства
         
         Product._id_counter += 1
     
+    def set_lazy_history(self, history: 'LazyHistory', certificate_count: int, review_count: int) -> None:
+        self._history = history
+        self._history_counts = (certificate_count, review_count)
+    
+    @property
+    def lazy_history(self) -> Optional['LazyHistory']:
+        return self._history
+    
+    def _load_history(self) -> None:
+        history, self._history = self._history, None
+        self._quality_checks, self._reviews, self._certificates = history.load()
+    
+    @property
+    def quality_checks(self) -> List[dict]:
+        if self._history is not None:
+            self._load_history()
+        return self._quality_checks
+    
+    @quality_checks.setter
+    def quality_checks(self, value: List[dict]) -> None:
+        if self._history is not None:
+            self._load_history()
+        self._quality_checks = value
+    
+    @property
+    def reviews(self) -> List['Review']:
+        if self._history is not None:
+            self._load_history()
+        return self._reviews
+    
+    @reviews.setter
+    def reviews(self, value: List['Review']) -> None:
+        if self._history is not None:
+            self._load_history()
+        self._reviews = value
+        self._rating_stats = None
+    
+    @property
+    def certificates(self) -> List['Certificate']:
+        if self._history is not None:
+            self._load_history()
+        return self._certificates
+    
+    @certificates.setter
+    def certificates(self, value: List['Certificate']) -> None:
+        if self._history is not None:
+            self._load_history()
+        self._certificates = value
+    
+    @property
+    def certificate_count(self) -> int:
+        # Количество без чтения истории (для списка продуктов)
+        return self._history_counts[0] if self._history is not None else len(self._certificates)
+    
+    @property
+    def review_count(self) -> int:
+        return self._history_counts[1] if self._history is not None else len(self._reviews)
+    
     def get_current_stage(self) -> str:
         if self.current_stage < len(self.PRODUCTION_STAGES):
             return self.PRODUCTION_STAGES[self.current_stage]
@@ -40,13 +108,52 @@ class Product:
         else:
             raise InvalidProductAttributeError(f"Атрибут {attribute} не существует")
     
+    @property
+    def rating_stats(self) -> RatingStats:
+        # Агрегаты из заголовка файла состояния, иначе - один проход по отзывам
+        if self._rating_stats is None:
+            if self._history is not None and self._history.rating_stats is not None:
+                self._rating_stats = RatingStats.from_data(self._history.rating_stats)
+            if self._rating_stats is None:
+                self._rating_stats = RatingStats.from_reviews(self.reviews)
+        return self._rating_stats
+    
     def add_review(self, review: 'Review') -> None:
         self.reviews.append(review)
+        if self._rating_stats is not None:
+            self._rating_stats.add(review.rating, review.date)
+    
+    def add_certificate(self, certificate: 'Certificate') -> None:
+        self.certificates.append(certificate)
+        self.index_certificate(certificate)
+    
+    def index_certificate(self, certificate: 'Certificate') -> None:
+        # Учесть сертификат в индексе этапов, не добавляя в список (история читается позже)
+        best = self._certificates_by_stage.get(certificate.stage)
+        if best is None or certificate.expiration_date >= best.expiration_date:
+            self._certificates_by_stage[certificate.stage] = certificate
+    
+    def expire_certificate(self, certificate: 'Certificate') -> None:
+        # Истек сертификат с самым поздним сроком - действующих для этапа больше нет
+        if self._certificates_by_stage.get(certificate.stage) is certificate:
+            del self._certificates_by_stage[certificate.stage]
+    
+    def stage_certificates(self) -> List['Certificate']:
+        # Сертификаты, определяющие действительность этапов: по одному на этап
+        return list(self._certificates_by_stage.values())
+    
+    def get_stage_certificate(self, stage: str) -> Optional['Certificate']:
+        # Для проверки достаточно сертификата с самым поздним сроком: O(1) при любой истории
+        return self._certificates_by_stage.get(stage)
+    
+    def has_valid_certificate(self, stage: str, today: Optional[date] = None) -> bool:
+        certificate = self._certificates_by_stage.get(stage)
+        return certificate is not None and certificate.is_valid(today)
     
     def __str__(self) -> str:
         return (
             f"Product(ID={self.product_id}, Name={self.name}, "
             f"Status={self.status}, ProductionStage={self.get_current_stage()}, "
-            f"Certificates={len(self.certificates)}, "
+            f"Certificates={self.certificate_count}, "
             f"Attributes={self.attributes})"
         )
\ No newline at end of file
@@ -0,0 +1,94 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from .product import Product
+from .domain_errors import DuplicateProductError
+
+
+class ProductRegistry:
+    """Реестр продуктов с индексами по ID, текущему этапу и статусу"""
+
+    def __init__(self, products: Iterable[Product] = ()) -> None:
+        self._by_id: Dict[str, Product] = {}  # Порядок словаря - порядок добавления
+        self._by_stage: Dict[int, Dict[str, Product]] = {}
+        self._by_status: Dict[str, Dict[str, Product]] = {}
+        self._keys: Dict[str, Tuple[int, str]] = {}  # ID -> (этап, статус) в индексах
+        self.rebuild(products)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __iter__(self) -> Iterator[Product]:
+        return iter(self._by_id.values())
+
+    def __contains__(self, product_id: str) -> bool:
+        return product_id in self._by_id
+
+    def get(self, product_id: str) -> Optional[Product]:
+        """Продукт по ID за O(1) или None"""
+        return self._by_id.get(product_id)
+
+    def add(self, product: Product) -> None:
+        """Добавить продукт; занятый ID - ошибка, а не замена чужого продукта"""
+        if product.product_id in self._by_id:
+            raise DuplicateProductError(f"Продукт с ID {product.product_id} уже существует.")
+        self._by_id[product.product_id] = product
+        self._index(product)
+
+    def remove(self, product_id: str) -> Optional[Product]:
+        """Удалить продукт из реестра и индексов"""
+        product = self._by_id.pop(product_id, None)
+        if product is not None:
+            self._unindex(product_id)
+        return product
+
+    def rebuild(self, products: Iterable[Product]) -> None:
+        """Заменить содержимое реестра, построив индексы за один проход"""
+        self._by_id = {}
+        self._by_stage = {}
+        self._by_status = {}
+        self._keys = {}
+        for product in products:
+            self._by_id[product.product_id] = product
+            self._index(product)
+
+    def by_stage(self, stage: int) -> List[Product]:
+        """Продукты на этапе с указанным индексом в порядке перехода на этап"""
+        return list(self._by_stage.get(stage, {}).values())
+
+    def by_status(self, status: str) -> List[Product]:
+        """Продукты с указанным статусом в порядке получения статуса"""
+        return list(self._by_status.get(status, {}).values())
+
+    def set_stage(self, product: Product, stage: int) -> None:
+        """Перевести продукт на этап и обновить индекс этапов"""
+        product.current_stage = stage
+        self.reindex(product)
+
+    def set_status(self, product: Product, status: str) -> None:
+        """Изменить статус продукта и обновить индекс статусов"""
+        product.status = status
+        self.reindex(product)
+
+    def reindex(self, product: Product) -> None:
+        """Обновить индексы после изменения этапа или статуса продукта напрямую"""
+        if self._keys.get(product.product_id) != (product.current_stage, product.status):
+            self._unindex(product.product_id)
+            self._index(product)
+
+    def _index(self, product: Product) -> None:
+        key = (product.current_stage, product.status)
+        self._keys[product.product_id] = key
+        self._by_stage.setdefault(key[0], {})[product.product_id] = product
+        self._by_status.setdefault(key[1], {})[product.product_id] = product
+
+    def _unindex(self, product_id: str) -> None:
+        key = self._keys.pop(product_id, None)
+        if key is None:
+            return
+        stage_bucket = self._by_stage[key[0]]
+        del stage_bucket[product_id]
+        if not stage_bucket:
+            del self._by_stage[key[0]]
+        status_bucket = self._by_status[key[1]]
+        del status_bucket[product_id]
+        if not status_bucket:
+            del self._by_status[key[1]]
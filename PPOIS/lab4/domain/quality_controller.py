@@ -1,8 +1,9 @@
 import json
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 import os
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Union
 from .product import Product
+from .product_registry import ProductRegistry
 from .quality_standard import (
     QualityStandard, 
     GOSTStandard, 
@@ -10,6 +11,14 @@ from .quality_standard import (
     OrganicBakeryStandard
 )
 from .certificate import Certificate
+from .expiry_scheduler import CertificateExpiryScheduler
+from .compliance_matrix import ComplianceMatrix, ComplianceResult
+from .review_store import ReviewStore
+from .events import EventSink, DEBUG
+from .journal import StateJournal
+from .sqlite_store import SqliteStore, SQLITE_EXTENSION
+from .state_file import HistorySnapshot, LazyHistory, read_state
+from .binary_state import write_binary_state
 from .review import Review
 from .production_stages import (
     DoughStage,
@@ -23,15 +32,30 @@ from .domain_errors import (
     QualityCheckFailedError,
     CertificateAlreadyExistsError,
     InvalidProductAttributeError,
-    InvalidReviewRatingError
+    InvalidReviewRatingError,
+    DuplicateProductError
 )
 from datetime import datetime
 
+# Суффикс файла, в который сохраняется состояние после ошибки записи журнала
+RECOVERY_SUFFIX = ".recovered.json"
+
 
 class QualityController:
     
-    def __init__(self) -> None:
-        self.products: List[Product] = []
+    def __init__(self, events: Optional[EventSink] = None) -> None:
+        # Сообщения о ходе работы: модель не печатает их сама, их выводят подписчики (CLI, GUI)
+        self.events: EventSink = events if events is not None else EventSink()
+        self.products: ProductRegistry = ProductRegistry()
+        self.expiry: CertificateExpiryScheduler = CertificateExpiryScheduler()
+        # Коды атрибутов для массовой проверки; строятся при первой такой проверке
+        self.compliance: Optional[ComplianceMatrix] = None
+        # Отзывы всех продуктов по столбцам для рейтингов и трендов; строятся при первом таком запросе
+        self.review_store: Optional[ReviewStore] = None
+        # Журнал изменений или база SQLite (open_journal); без них состояние сохраняется только save_state
+        self.journal: Optional[Union[StateJournal, SqliteStore]] = None
+        # Файл, куда close_journal сохранит состояние, если запись журнала прервалась ошибкой
+        self.recovery_filename: Optional[str] = None
         self.quality_standards: Dict[str, QualityStandard] = {
             "1": GOSTStandard(),
             "2": BakeryEnterpriseStandard(),
@@ -56,29 +80,41 @@ class QualityController:
 
     def add_product(self, name: str) -> Product:
         product = Product(name)
-        self.products.append(product)
+        self.products.add(product)
+        if self.compliance is not None:
+            self.compliance.add(product)
+        self._record("add_product", product_id=product.product_id, name=name,
+                     attributes=product.attributes.copy(), status=product.status,
+                     current_stage=product.current_stage, next_product_id_counter=Product._id_counter)
         return product
 
     def show_products(self) -> List[Tuple[str, str]]:
         return [(product.product_id, product.name) for product in self.products]
 
     def get_product(self, product_id: str) -> Product:
-        product = next((p for p in self.products if p.product_id == product_id), None)
+        product = self.products.get(product_id)
         if not product:
             raise ProductNotFoundError(f"Продукт с ID {product_id} не найден.")
         return product
 
+    def get_products_by_stage(self, stage: str) -> List[Product]:
+        # stage - название этапа из Product.PRODUCTION_STAGES или "completed"
+        if stage == "completed":
+            return self.products.by_stage(len(Product.PRODUCTION_STAGES))
+        return self.products.by_stage(Product.PRODUCTION_STAGES.index(stage))
+
+    def get_products_by_status(self, status: str) -> List[Product]:
+        return self.products.by_status(status)
+
     def has_certificate_for_current_stage(self, product_id: str) -> bool:
         try:
             product = self.get_product(product_id)
         except ProductNotFoundError:
             return False
-        
-        current_stage = product.get_current_stage()
-        for cert in product.certificates:
-            if cert.stage == current_stage and cert.is_valid():
-                return True
-        return False
+        return self._has_valid_certificate(product)
+
+    def _has_valid_certificate(self, product: Product) -> bool:
+        return product.has_valid_certificate(product.get_current_stage())
 
     def advance_stage(self, product_id: str) -> bool:
         try:
@@ -86,8 +122,9 @@ class QualityController:
         except ProductNotFoundError:
             return False
         
-        if self.has_certificate_for_current_stage(product_id) and product.current_stage < len(product.PRODUCTION_STAGES) - 1:
-            product.current_stage += 1
+        if self._has_valid_certificate(product) and product.current_stage < len(product.PRODUCTION_STAGES) - 1:
+            self.products.set_stage(product, product.current_stage + 1)
+            self._record("stage", product_id=product_id, current_stage=product.current_stage)
             return True
         return False
 
@@ -101,21 +138,32 @@ class QualityController:
     def add_quality_check(self, product_id: str, stage: str, result: dict) -> None:
         try:
             product = self.get_product(product_id)
-            product.quality_checks.append({
+            check = {
                 "stage": stage,
                 "result": result,
                 "timestamp": datetime.now()
-            })
+            }
+            product.quality_checks.append(check)
+            self._record("quality_check", product_id=product_id, **self._quality_check_data(check))
         except ProductNotFoundError:
             pass
 
     def add_certificate(self, product_id: str, certificate: Certificate) -> None:
         try:
             product = self.get_product(product_id)
-            product.certificates.append(certificate)
+            product.add_certificate(certificate)
+            self.expiry.add(product, certificate)
+            self._record("certificate", product_id=product_id, **self._certificate_data(certificate))
         except ProductNotFoundError:
             pass
 
+    def get_expiring_certificates(self, days: int) -> List[Tuple[Product, Certificate]]:
+        return self.expiry.expiring_within(days)
+
+    def sweep_expired_certificates(self) -> List[Tuple[Product, Certificate]]:
+        # Ежедневная очистка: повторный вызов в те же сутки ничего не делает
+        return self.expiry.sweep_if_due()
+
     def check_compliance(self, product_id: str, standard: QualityStandard) -> Tuple[bool, List[str]]:
         try:
             product = self.get_product(product_id)
@@ -124,9 +172,15 @@ class QualityController:
         
         current_stage = product.get_current_stage()
         failed_criteria = []
+        trace = self.events.enabled(DEBUG)
         for criterion, required_value in standard.criteria.items():
             actual_value = product.attributes[criterion]
-            print(f"Проверка критерия '{criterion}': продукт имеет '{actual_value}', требуется '{required_value}'")
+            if trace:
+                self.events.debug(
+                    "compliance.criterion",
+                    f"Проверка критерия '{criterion}': продукт имеет '{actual_value}', требуется '{required_value}'",
+                    product_id=product_id, criterion=criterion, actual=actual_value, required=required_value
+                )
             if actual_value != required_value:
                 failed_criteria.append(criterion)
         
@@ -135,37 +189,42 @@ class QualityController:
         
         return True, []
 
+    def check_compliance_bulk(self, standards: Optional[List[QualityStandard]] = None) -> ComplianceResult:
+        # Все продукты по всем стандартам (по умолчанию - встроенным) за один векторный проход
+        if self.compliance is None:
+            self.compliance = ComplianceMatrix(self.products)
+        if standards is None:
+            standards = list(self.quality_standards.values())
+        return self.compliance.evaluate(standards)
+
     def certify_product(self, product_id: str, standard: QualityStandard) -> bool:
         try:
             product = self.get_product(product_id)
         except ProductNotFoundError as e:
-            print(f"\nОшибка: {e}")
+            self.events.error("product.not_found", f"Ошибка: {e}", product_id=product_id)
             return False
         try:
             self.check_compliance(product_id, standard)
         except QualityCheckFailedError as e:
-            print(f"\nОшибка: {e}")
+            self.events.error("compliance.failed", f"Ошибка: {e}", product_id=product_id,
+                              standard=standard.standard_name)
             return False
         
         current_stage = product.get_current_stage()
-        existing_cert = next(
-            (cert for cert in product.certificates 
-             if cert.stage == current_stage and cert.is_valid()), 
-            None
-        )
-        
-        if existing_cert:
+        if product.has_valid_certificate(current_stage):
             raise CertificateAlreadyExistsError(f"Продукт {product_id} уже имеет действующий сертификат для этапа {current_stage}.")
         certificate = Certificate(product_id, standard, current_stage)
         self.add_certificate(product_id, certificate)
-        print(f"Сертификат успешно выдан для продукта {product_id} на этапе {current_stage}.")
+        self.events.info("certificate.issued",
+                         f"Сертификат успешно выдан для продукта {product_id} на этапе {current_stage}.",
+                         product_id=product_id, stage=current_stage, standard=standard.standard_name)
         return True
 
     def improve_product(self, product_id: str, standard: QualityStandard) -> List[str]:
         try:
             product = self.get_product(product_id)
         except ProductNotFoundError as e:
-            print(f"\nОшибка: {e}")
+            self.events.error("product.not_found", f"Ошибка: {e}", product_id=product_id)
             return [f"Продукт с ID {product_id} не найден."]
         
         try:
@@ -177,7 +236,11 @@ class QualityController:
                 old_value = product.attributes[criterion]
                 new_value = standard.criteria[criterion]
                 product.update_attribute(criterion, new_value)
-                print(f"  {criterion}: улучшено с '{old_value}' на '{new_value}'")
+                self._record("attribute", product_id=product_id, attribute=criterion, value=new_value)
+                self.events.info("product.improved", f"  {criterion}: улучшено с '{old_value}' на '{new_value}'",
+                                 product_id=product_id, criterion=criterion, old=old_value, new=new_value)
+            if self.compliance is not None:
+                self.compliance.update(product)
             return failed_criteria
 
     def _check_compliance_without_exception(self, product_id: str, standard: QualityStandard) -> Tuple[bool, List[str]]:
@@ -199,34 +262,44 @@ class QualityController:
         try:
             product = self.get_product(product_id)
         except ProductNotFoundError as e:
-            print(f"\nОшибка: {e}")
+            self.events.error("product.not_found", f"Ошибка: {e}", product_id=product_id)
             return
         
-        print(f"\nЗапуск производства для продукта {product_id}...")
-
         current_stage = product.get_current_stage()
-        print(f"Текущий этап производства: {current_stage}")
+        self.events.info("production.started", f"Запуск производства для продукта {product_id}...",
+                         product_id=product_id)
+        self.events.info("production.stage", f"Текущий этап производства: {current_stage}",
+                         product_id=product_id, stage=current_stage)
         
-        if self.has_certificate_for_current_stage(product_id):
-            print(f"Этап {current_stage} уже пройден.")
+        if self._has_valid_certificate(product):
+            self.events.info("production.stage_passed", f"Этап {current_stage} уже пройден.",
+                             product_id=product_id, stage=current_stage)
             try:
                 if self.advance_stage(product_id):
-                    print(f"Переход к следующему этапу: {product.get_current_stage()}")
+                    self.events.info("production.advanced", f"Переход к следующему этапу: {product.get_current_stage()}",
+                                     product_id=product_id, stage=product.get_current_stage())
                 else:
-                    print("Производство завершено успешно.")
+                    self.events.info("production.completed", "Производство завершено успешно.",
+                                     product_id=product_id)
             except Exception as e:
-                print(f"\nОшибка при переходе к следующему этапу: {e}")
+                self.events.error("production.error", f"Ошибка при переходе к следующему этапу: {e}",
+                                  product_id=product_id)
         else:
-            print(f"Необходимо пройти проверку и получить сертификат для этапа {current_stage}.")
+            self.events.warning("production.certificate_required",
+                                f"Необходимо пройти проверку и получить сертификат для этапа {current_stage}.",
+                                product_id=product_id, stage=current_stage)
 
     def add_review(self, product_id: str, author: str, comment: str, rating: int) -> bool:
         try:
             product = self.get_product(product_id)
             review = Review(product_id, author, comment, rating)
             product.add_review(review)
+            if self.review_store is not None:
+                self.review_store.add(product_id, review)
+            self._record("review", product_id=product_id, **self._review_data(review))
             return True
         except (ProductNotFoundError, InvalidReviewRatingError) as e:
-            print(f"\nОшибка: {e}")
+            self.events.error("review.error", f"Ошибка: {e}", product_id=product_id)
             return False
 
     def analyze_reviews(self, product_id: str) -> Tuple[Optional[float], List[str]]:
@@ -235,9 +308,10 @@ class QualityController:
         except ProductNotFoundError as e:
             return None, [str(e)]
         
-        if not product.reviews:
+        # Средняя из накопленных агрегатов: O(1) вместо суммирования всех отзывов
+        avg_rating = product.rating_stats.average
+        if avg_rating is None:
             return None, []
-        avg_rating = sum(review.rating for review in product.reviews) / len(product.reviews)
         
         recommendations = []
         if avg_rating < 4:
@@ -245,7 +319,71 @@ class QualityController:
         
         return avg_rating, recommendations
 
-    def save_state(self, filename: str = "system_state.json") -> None:
+    def _reviews_by_column(self) -> ReviewStore:
+        # Сборка читает отзывы всех продуктов, поэтому выполняется только по запросу;
+        # непрочитанная история продуктов при этом так и остается непрочитанной
+        if self.review_store is None:
+            self.review_store = ReviewStore(self.products)
+        return self.review_store
+
+    def rank_products_by_rating(self, days: int = 30, k: int = 20, lowest: bool = True,
+                                min_reviews: int = 1) -> List[Tuple[Product, float, int]]:
+        # k худших (lowest) или лучших продуктов по средней оценке отзывов за последние days дней
+        start = datetime.now() - timedelta(days=days)
+        ranked = self._reviews_by_column().rank(k, start=start, lowest=lowest, min_reviews=min_reviews)
+        return [(self.products.get(product_id), average, count) for product_id, average, count in ranked]
+
+    def rating_trend(self, product_id: str, weeks: int = 12) -> List[Tuple[datetime, int, Optional[float]]]:
+        # Количество отзывов и средняя оценка продукта по неделям за последние weeks недель
+        product = self.get_product(product_id)
+        end = datetime.now()
+        trend = self._reviews_by_column().trend(end - timedelta(weeks=weeks), end, 7, product.product_id)
+        return trend.rows(product.product_id)
+
+    def latest_reviews(self, product_id: str, limit: int = 5) -> List[Tuple[datetime, int, str]]:
+        # Последние отзывы продукта: (время, оценка, текст)
+        product = self.get_product(product_id)
+        return self._reviews_by_column().latest_comments(product.product_id, limit)
+
+    def _quality_check_data(self, check: dict) -> dict:
+        return {
+            "stage": check["stage"],
+            "result": check["result"],
+            "timestamp": check["timestamp"].isoformat() if hasattr(check["timestamp"], "isoformat") else str(check["timestamp"])
+        }
+
+    def _review_data(self, review: Review) -> dict:
+        return {
+            "author": review.author,
+            "comment": review.comment,
+            "rating": review.rating,
+            "date": review.date.isoformat()
+        }
+
+    def _certificate_data(self, certificate: Certificate) -> dict:
+        return {
+            "standard_name": certificate.standard.standard_name,
+            "stage": certificate.stage,
+            "issue_date": certificate.issue_date.isoformat(),
+            "expiration_date": certificate.expiration_date.isoformat()
+        }
+
+    def _history_data(self, quality_checks: List[dict], reviews: List[Review],
+                      certificates: List[Certificate]) -> Dict[str, List[dict]]:
+        return {
+            "quality_checks": [self._quality_check_data(check) for check in quality_checks],
+            "reviews": [self._review_data(review) for review in reviews],
+            "certificates": [self._certificate_data(certificate) for certificate in certificates]
+        }
+
+    def _stage_certificate_data(self, product: Product) -> list:
+        # [номер в истории, данные] для сертификатов из индекса этапов (история не прочитана)
+        certificates = product.lazy_history.stage_certificates.items()
+        return [[index, self._certificate_data(certificate)] for index, certificate in certificates
+                if product.get_stage_certificate(certificate.stage) is certificate]
+
+    def _state_snapshot(self, lazy: bool = False) -> dict:
+        # lazy - для файла по строкам: история непрочитанных продуктов не разбирается
         state = {
             "products": [],
             "next_product_id_counter": Product._id_counter,
@@ -254,121 +392,329 @@ class QualityController:
                 "version": "1.0"
             }
         }
+        if self.journal is not None:
+            # Снимок включает все записи журнала: при открытии они не применяются повторно
+            state["journal_seq"] = self.journal.seq
         
         for product in self.products:
+            if lazy:
+                product_data = {
+                    "product_id": product.product_id,
+                    "name": product.name,
+                    "attributes": product.attributes.copy(),
+                    "status": product.status,
+                    "current_stage": product.current_stage,
+                    "certificates_count": product.certificate_count,
+                    "reviews_count": product.review_count
+                }
+                if product.lazy_history is not None:
+                    product_data["stage_certificates"] = self._stage_certificate_data(product)
+                    product_data["history"] = product.lazy_history.raw
+                    if product.lazy_history.rating_stats is not None:
+                        product_data["rating_stats"] = product.lazy_history.rating_stats
+                else:
+                    # История и сертификаты этапов кодируются в потоке записи (write_state)
+                    product_data["history"] = HistorySnapshot(product.quality_checks, product.reviews,
+                                                              product.certificates, product.stage_certificates(),
+                                                              self._history_data)
+                    product_data["rating_stats"] = product.rating_stats.to_data()
+                state["products"].append(product_data)
+                continue
+            
             product_data = {
                 "product_id": product.product_id,
                 "name": product.name,
                 "attributes": product.attributes.copy(),
                 "status": product.status,
                 "current_stage": product.current_stage,
-                "quality_checks": [],
-                "reviews": [],
-                "certificates": []
+                "quality_checks": [self._quality_check_data(check) for check in product.quality_checks],
+                "reviews": [self._review_data(review) for review in product.reviews],
+                "certificates": [self._certificate_data(certificate) for certificate in product.certificates],
+                "rating_stats": product.rating_stats.to_data()
             }
-            
-            for check in product.quality_checks:
-                check_data = {
-                    "stage": check["stage"],
-                    "result": check["result"],
-                    "timestamp": check["timestamp"].isoformat() if hasattr(check["timestamp"], "isoformat") else str(check["timestamp"])
-                }
-                product_data["quality_checks"].append(check_data)
-            
-            for review in product.reviews:
-                review_data = {
-                    "author": review.author,
-                    "comment": review.comment,
-                    "rating": review.rating,
-                    "date": review.date.isoformat()
-                }
-                product_data["reviews"].append(review_data)
-            
-            for certificate in product.certificates:
-                certificate_data = {
-                    "standard_name": certificate.standard.standard_name,
-                    "stage": certificate.stage,
-                    "issue_date": certificate.issue_date.isoformat(),
-                    "expiration_date": certificate.expiration_date.isoformat()
-                }
-                product_data["certificates"].append(certificate_data)
-            
             state["products"].append(product_data)
-     
+        return state
+
+    def _is_journal_file(self, filename: str) -> bool:
+        # Файл открытого журнала: его пишет поток записи, а состояние в нем - только вместе с журналом
+        if self.journal is None:
+            return False
+        journal_files = {os.path.realpath(self.journal.checkpoint_filename), os.path.realpath(self.journal.filename)}
+        if os.path.realpath(filename) not in journal_files:
+            return False
+        self.events.error("state.in_use", f"Файл {filename} - текущий файл состояния: все изменения уже "
+                          f"записываются в него через журнал. Укажите другой файл.", filename=filename)
+        return True
+
+    def save_state(self, filename: str = "system_state.json") -> bool:
+        if self._is_journal_file(filename):
+            return False
+        state = self._state_snapshot()
         with open(filename, 'w', encoding='utf-8') as f:
             json.dump(state, f, ensure_ascii=False, indent=4)
         
-        print(f"Состояние системы сохранено в файл {filename}")
+        self.events.info("state.saved", f"Состояние системы сохранено в файл {filename}",
+                         filename=filename, products=len(self.products))
+        return True
+
+    def save_binary_state(self, filename: str = "system_state.bin") -> bool:
+        # Двоичный снимок; load_state и open_journal распознают его по сигнатуре
+        if self._is_journal_file(filename):
+            return False
+        write_binary_state(filename, self._state_snapshot())
+        self.events.info("state.saved", f"Состояние системы сохранено в двоичный файл {filename}",
+                         filename=filename, products=len(self.products))
+        return True
+
+    def _quality_check_from_data(self, check_data: dict) -> dict:
+        try:
+            timestamp = datetime.fromisoformat(check_data["timestamp"])
+        except:
+            timestamp = datetime.now()
+        
+        return {
+            "stage": check_data["stage"],
+            "result": check_data["result"],
+            "timestamp": timestamp
+        }
+
+    def _review_from_data(self, product_id: str, review_data: dict) -> Review:
+        review = Review(
+            product_id=product_id,
+            author=review_data["author"],
+            comment=review_data["comment"],
+            rating=review_data["rating"]
+        )
+        review.date = datetime.fromisoformat(review_data["date"])
+        return review
+
+    def _certificate_from_data(self, product_id: str, cert_data: dict) -> Optional[Certificate]:
+        standard = None
+        if cert_data["standard_name"] == "ГОСТ СТ-1":
+            standard = GOSTStandard()
+        elif cert_data["standard_name"] == "Собственный стандарт пекарни":
+            standard = BakeryEnterpriseStandard()
+        elif cert_data["standard_name"] == "Органическая выпечка":
+            standard = OrganicBakeryStandard()
+        
+        if not standard:
+            return None
+        certificate = Certificate(
+            product_id=product_id,
+            standard=standard,
+            stage=cert_data["stage"]
+        )
+        certificate.issue_date = date.fromisoformat(cert_data["issue_date"])
+        certificate.expiration_date = date.fromisoformat(cert_data["expiration_date"])
+        return certificate
+
+    def _hydrate_history(self, product_id: str):
+        # Разбор строки истории продукта при первом обращении к ней
+        def hydrate(data: dict, stage_certificates: Dict[int, Certificate]):
+            quality_checks = [self._quality_check_from_data(check_data) for check_data in data["quality_checks"]]
+            reviews = [self._review_from_data(product_id, review_data) for review_data in data["reviews"]]
+            certificates = []
+            for index, cert_data in enumerate(data["certificates"]):
+                certificate = stage_certificates.get(index) or self._certificate_from_data(product_id, cert_data)
+                if certificate:
+                    certificates.append(certificate)
+            return quality_checks, reviews, certificates
+        return hydrate
+
+    def _restore_lazy_history(self, product: Product, product_data: dict) -> None:
+        # Сразу создаются только сертификаты этапов: они нужны индексу этапов и очереди сроков
+        stage_certificates = {}
+        for index, cert_data in product_data["stage_certificates"]:
+            certificate = self._certificate_from_data(product.product_id, cert_data)
+            if certificate:
+                product.index_certificate(certificate)
+                stage_certificates[index] = certificate
+        history = LazyHistory(product_data["history"], stage_certificates, self._hydrate_history(product.product_id),
+                              product_data.get("rating_stats"))
+        product.set_lazy_history(history, product_data["certificates_count"], product_data["reviews_count"])
+
+    def _restore_state(self, state: dict) -> None:
+        # Продукты разбираются в локальный список: при ошибке в файле ни реестр,
+        # ни счетчик ID не меняются, и следующий add_product не займет чужой ID
+        products = []
+        product_ids = set()
+        id_counter = Product._id_counter
+        try:
+            for product_data in state["products"]:
+                products.append(self._product_from_data(product_data))
+                if products[-1].product_id in product_ids:
+                    raise DuplicateProductError(f"Продукт с ID {products[-1].product_id} встречается дважды.")
+                product_ids.add(products[-1].product_id)
+        finally:
+            # Конструктор Product увеличивает общий счетчик
+            Product._id_counter = id_counter
+        
+        # Индексы реестра строятся за один проход после чтения всех продуктов
+        self.products.rebuild(products)
+        self.expiry.rebuild(products)
+        if self.compliance is not None:
+            self.compliance.rebuild(products)
+        # Столбцы отзывов соберутся заново при следующем запросе: сборка прочитала бы всю историю
+        self.review_store = None
+        
+        numeric_ids = [int(product_id) for product_id in product_ids if product_id.isdigit()]
+        Product._id_counter = state.get("next_product_id_counter", max(numeric_ids, default=0) + 1)
+
+    def _product_from_data(self, product_data: dict) -> Product:
+        product = Product(product_data["name"])
+        product.product_id = product_data["product_id"]
+        product.attributes = product_data["attributes"]
+        product.status = product_data["status"]
+        product.current_stage = product_data["current_stage"]
+        
+        if "history" in product_data:
+            self._restore_lazy_history(product, product_data)
+            return product
+        
+        for check_data in product_data["quality_checks"]:
+            product.quality_checks.append(self._quality_check_from_data(check_data))
+        
+        for review_data in product_data["reviews"]:
+            product.reviews.append(self._review_from_data(product.product_id, review_data))
+        
+        for cert_data in product_data["certificates"]:
+            certificate = self._certificate_from_data(product.product_id, cert_data)
+            if certificate:
+                product.add_certificate(certificate)
+        
+        return product
 
     def load_state(self, filename: str = "system_state.json") -> bool:
        
         if not os.path.exists(filename):
-            print(f"Файл состояния {filename} не найден.")
+            self.events.warning("state.not_found", f"Файл состояния {filename} не найден.", filename=filename)
+            return False
+        if self._is_journal_file(filename):
+            # Контрольная точка без записей журнала после нее старше состояния в памяти,
+            # а новая контрольная точка из нее стерла бы эти записи
             return False
         
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                state = json.load(f)
-            
-            self.products = []
-            Product._id_counter = 1 
+            state = read_state(filename)
+            # Файл, записанный журналом: изменения после его контрольной точки лежат в <файл>.journal
+            records = StateJournal(filename).read_tail(state.get("journal_seq", 0))
+            self._restore_state(state)
+            for record in records:
+                self._apply_record(record)
+            if self.journal is not None:
+                # Загруженное состояние заменяет журнал: сразу записывается новая контрольная точка
+                self.journal.checkpoint(self._state_snapshot(lazy=True))
             
-            for product_data in state["products"]:
-                product = Product(product_data["name"])
-                product.product_id = product_data["product_id"]
-                product.attributes = product_data["attributes"]
-                product.status = product_data["status"]
-                product.current_stage = product_data["current_stage"]
-                
-                for check_data in product_data["quality_checks"]:
-                    try:
-                        timestamp = datetime.fromisoformat(check_data["timestamp"])
-                    except:
-                        timestamp = datetime.now()
-                    
-                    product.quality_checks.append({
-                        "stage": check_data["stage"],
-                        "result": check_data["result"],
-                        "timestamp": timestamp
-                    })
-                
-                for review_data in product_data["reviews"]:
-                    review = Review(
-                        product_id=product.product_id,
-                        author=review_data["author"],
-                        comment=review_data["comment"],
-                        rating=review_data["rating"]
-                    )
-                    review.date = datetime.fromisoformat(review_data["date"])
-                    product.reviews.append(review)
-                
-                for cert_data in product_data["certificates"]:
-                    standard = None
-                    if cert_data["standard_name"] == "ГОСТ СТ-1":
-                        standard = GOSTStandard()
-                    elif cert_data["standard_name"] == "Собственный стандарт пекарни":
-                        standard = BakeryEnterpriseStandard()
-                    elif cert_data["standard_name"] == "Органическая выпечка":
-                        standard = OrganicBakeryStandard()
-                    
-                    if standard:
-                       
-                        certificate = Certificate(
-                            product_id=product.product_id,
-                            standard=standard,
-                            stage=cert_data["stage"]
-                        )
-                        certificate.issue_date = date.fromisoformat(cert_data["issue_date"])
-                        certificate.expiration_date = date.fromisoformat(cert_data["expiration_date"])
-                        product.certificates.append(certificate)
-                
-                self.products.append(product)
-            
-            if "next_product_id_counter" in state:
-                Product._id_counter = state["next_product_id_counter"]
-            
-            print(f"Состояние системы успешно загружено из файла {filename}")
+            self.events.info("state.loaded", f"Состояние системы успешно загружено из файла {filename}",
+                             filename=filename, products=len(self.products))
             return True
         except Exception as e:
-            print(f"Ошибка при загрузке состояния: {e}")
-            return False
\ No newline at end of file
+            self.events.error("state.error", f"Ошибка при загрузке состояния: {e}", filename=filename)
+            return False
+
+    def _record(self, op: str, **fields) -> None:
+        # Запись об изменении в журнал; контрольная точка - после стольких записей, сколько
+        # продуктов в системе (но не меньше checkpoint_every), чтобы ее стоимость делилась на них
+        if self.journal is None:
+            return
+        if self.journal.error is not None:
+            # Поток записи остановился: об ошибке сообщается сразу, а не при выходе
+            self._detach_journal()
+            return
+        self.journal.append(op, fields)
+        pending = self.journal.pending
+        if pending and pending >= max(self.journal.checkpoint_every, len(self.products)):
+            self.journal.checkpoint(self._state_snapshot(lazy=True))
+
+    def _apply_record(self, record: dict) -> None:
+        op = record["op"]
+        if op == "add_product":
+            product = Product(record["name"])
+            product.product_id = record["product_id"]
+            Product._id_counter = record["next_product_id_counter"]
+            self.products.add(product)
+            if self.compliance is not None:
+                self.compliance.add(product)
+            return
+        
+        product = self.products.get(record["product_id"])
+        if product is None:
+            return
+        if op == "attribute":
+            product.update_attribute(record["attribute"], record["value"])
+            if self.compliance is not None:
+                self.compliance.update(product)
+        elif op == "review":
+            review = self._review_from_data(product.product_id, record)
+            product.add_review(review)
+            if self.review_store is not None:
+                self.review_store.add(product.product_id, review)
+        elif op == "certificate":
+            certificate = self._certificate_from_data(product.product_id, record)
+            if certificate:
+                product.add_certificate(certificate)
+                self.expiry.add(product, certificate)
+        elif op == "stage":
+            self.products.set_stage(product, record["current_stage"])
+        elif op == "quality_check":
+            product.quality_checks.append(self._quality_check_from_data(record))
+
+    def open_journal(self, filename: str = "system_state.json", **options) -> bool:
+        # Состояние = последняя контрольная точка (файл состояния) + записи журнала после нее;
+        # файл .db - база SQLite, где каждая запись сразу применяется к таблицам
+        self.close_journal()
+        if filename.endswith(SQLITE_EXTENSION):
+            journal = SqliteStore(filename, **options)
+        else:
+            journal = StateJournal(filename, **options)
+        try:
+            state = journal.read_checkpoint()
+            checkpoint_seq = state.get("journal_seq", 0) if state else 0
+            if state:
+                self._restore_state(state)
+            records = journal.read_tail(checkpoint_seq)
+            for record in records:
+                self._apply_record(record)
+            journal.start(records[-1]["seq"] if records else checkpoint_seq, checkpoint_seq)
+        except Exception as e:
+            # self.journal остается None: продолжать работу без журнала вызывающий не должен
+            journal.close()
+            self.events.error("state.error", f"Ошибка при загрузке состояния: {e}", filename=filename)
+            return False
+        
+        self.journal = journal
+        if state is None:
+            # Первая контрольная точка: записи журнала ссылаются на продукты, которые должны в ней быть
+            journal.checkpoint(self._state_snapshot(lazy=True))
+        if state is None and not records:
+            self.events.warning("state.not_found", f"Файл состояния {filename} не найден.", filename=filename)
+            return False
+        self.events.info("state.loaded", f"Состояние системы успешно загружено из файла {filename}",
+                         filename=filename, products=len(self.products), journal_records=len(records))
+        return True
+
+    def flush_journal(self) -> None:
+        if self.journal is not None:
+            self.journal.flush()
+
+    def close_journal(self) -> None:
+        if self.journal is not None:
+            self._detach_journal()
+        if self.recovery_filename is not None:
+            # Журнал не дописан: состояние из памяти сохраняется целиком в отдельный файл,
+            # исходный файл состояния и журнал не перезаписываются
+            filename, self.recovery_filename = self.recovery_filename, None
+            try:
+                self.save_state(filename)
+            except OSError as e:
+                self.events.error("state.error", f"Не удалось сохранить состояние: {e}", filename=filename)
+
+    def _detach_journal(self) -> None:
+        journal, self.journal = self.journal, None
+        journal.close()
+        if journal.error is not None:
+            self.recovery_filename = os.path.splitext(journal.checkpoint_filename)[0] + RECOVERY_SUFFIX
+            self.events.error("journal.error",
+                              f"Ошибка записи журнала: {journal.error}. Изменения больше не записываются; "
+                              f"при выходе состояние будет сохранено в файл {self.recovery_filename}",
+                              filename=journal.filename, recovery_filename=self.recovery_filename)
\ No newline at end of file
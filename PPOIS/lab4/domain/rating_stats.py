@@ -0,0 +1,94 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .review import Review
+
+
+# Периоды полураспада (в днях) для средних по недавним отзывам: отзыв, оставленный
+# на такой срок раньше последнего, весит вдвое меньше
+RECENT_HALF_LIVES: tuple = (7, 30)
+
+_SECONDS_PER_DAY = 86400.0
+
+
+class RatingStats:
+    """Накопленные агрегаты оценок продукта: add за O(1), средние - без перебора отзывов"""
+
+    __slots__ = ("count", "total", "histogram", "_last", "_decayed")
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.total: int = 0
+        self.histogram: List[int] = [0, 0, 0, 0, 0]  # Количество оценок 1..5
+        self._last: Optional[float] = None  # Время самого позднего отзыва (timestamp)
+        # Для каждого периода полураспада: [взвешенная сумма оценок, сумма весов] на момент _last
+        self._decayed: List[List[float]] = [[0.0, 0.0] for _ in RECENT_HALF_LIVES]
+
+    @classmethod
+    def from_reviews(cls, reviews: Iterable['Review']) -> 'RatingStats':
+        """Построить агрегаты за один проход по отзывам"""
+        stats = cls()
+        for review in reviews:
+            stats.add(review.rating, review.date)
+        return stats
+
+    def add(self, rating: int, when: datetime) -> None:
+        """Учесть оценку отзыва, оставленного в момент when"""
+        self.count += 1
+        self.total += rating
+        self.histogram[rating - 1] += 1
+        timestamp = when.timestamp()
+        if self._last is None or timestamp >= self._last:
+            # Новый отзыв позже прежних: накопленные суммы затухают до его времени
+            if self._last is not None and timestamp > self._last:
+                days = (timestamp - self._last) / _SECONDS_PER_DAY
+                for decayed, half_life in zip(self._decayed, RECENT_HALF_LIVES):
+                    factor = 0.5 ** (days / half_life)
+                    decayed[0] *= factor
+                    decayed[1] *= factor
+            self._last = timestamp
+            for decayed in self._decayed:
+                decayed[0] += rating
+                decayed[1] += 1.0
+        else:
+            # Отзыв раньше последнего (при загрузке не по порядку) входит с уже затухшим весом
+            days = (self._last - timestamp) / _SECONDS_PER_DAY
+            for decayed, half_life in zip(self._decayed, RECENT_HALF_LIVES):
+                weight = 0.5 ** (days / half_life)
+                decayed[0] += rating * weight
+                decayed[1] += weight
+
+    @property
+    def average(self) -> Optional[float]:
+        """Средняя оценка по всем отзывам (None, если отзывов нет)"""
+        return self.total / self.count if self.count else None
+
+    def recent_average(self, half_life: int = RECENT_HALF_LIVES[0]) -> Optional[float]:
+        """Средняя оценка с весами, убывающими с давностью отзыва (half_life - из RECENT_HALF_LIVES)"""
+        weighted, weight = self._decayed[RECENT_HALF_LIVES.index(half_life)]
+        return weighted / weight if weight else None
+
+    def to_data(self) -> Dict[str, Any]:
+        """Агрегаты для заголовка продукта в файле состояния"""
+        return {
+            "count": self.count,
+            "total": self.total,
+            "histogram": list(self.histogram),
+            "last": self._last,
+            "half_lives": list(RECENT_HALF_LIVES),
+            "decayed": [list(decayed) for decayed in self._decayed]
+        }
+
+    @classmethod
+    def from_data(cls, data: Dict[str, Any]) -> Optional['RatingStats']:
+        """Агрегаты из заголовка; None, если они посчитаны для других периодов полураспада"""
+        if tuple(data["half_lives"]) != RECENT_HALF_LIVES:
+            return None
+        stats = cls()
+        stats.count = data["count"]
+        stats.total = data["total"]
+        stats.histogram = list(data["histogram"])
+        stats._last = data["last"]
+        stats._decayed = [list(decayed) for decayed in data["decayed"]]
+        return stats
@@ -0,0 +1,212 @@
+import heapq
+import math
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from .product import Product
+from .review import Review
+
+try:
+    import numpy as np
+except ImportError:  # numpy нужен только для аналитики отзывов
+    np = None
+
+
+_SECONDS_PER_DAY = 86400.0
+
+
+class RatingTrend:
+    """Оценки по интервалам времени: строка - продукт, столбец - интервал"""
+
+    def __init__(self, product_ids: List[str], bucket_starts: List[datetime], counts, sums) -> None:
+        self.product_ids: List[str] = product_ids
+        self.bucket_starts: List[datetime] = bucket_starts  # Начало каждого интервала
+        self.counts = counts  # int64 (продукты x интервалы): количество отзывов
+        self.sums = sums  # float64 (продукты x интервалы): сумма оценок
+
+    def averages(self):
+        """Средние оценки по интервалам (NaN - в интервале нет отзывов)"""
+        with np.errstate(invalid="ignore"):
+            return self.sums / self.counts
+
+    def rows(self, product_id: str) -> List[Tuple[datetime, int, Optional[float]]]:
+        """Интервалы продукта: (начало, количество отзывов, средняя оценка или None)"""
+        row = self.product_ids.index(product_id)
+        return [(start, count, total / count if count else None)
+                for start, count, total in zip(self.bucket_starts, self.counts[row].tolist(), self.sums[row].tolist())]
+
+
+class ReviewStore:
+    """
+    Отзывы всех продуктов по столбцам для запросов сразу по всем продуктам
+
+    Номер продукта (int32), оценка (int8) и время (float64, timestamp) хранятся в
+    массивах numpy с запасом емкости, тексты отзывов - подряд в общем буфере UTF-8
+    со смещениями. Агрегаты за период считаются одним проходом bincount по маске
+    времени, а лучшие и худшие продукты отбираются кучей из k элементов.
+    """
+
+    def __init__(self, products: Iterable[Product] = ()) -> None:
+        if np is None:
+            raise ImportError("Для аналитики отзывов требуется пакет numpy")
+        self._rows: Dict[str, int] = {}  # ID продукта -> номер продукта в столбцах
+        self._product_ids: List[str] = []
+        self._size: int = 0
+        self._product = np.zeros(0, dtype=np.int32)
+        self._rating = np.zeros(0, dtype=np.int8)
+        self._time = np.zeros(0, dtype=np.float64)
+        # Текст отзыва i - _arena[_offsets[i]:_offsets[i + 1]]
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._arena = bytearray()
+        self.rebuild(products)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _row(self, product_id: str) -> int:
+        row = self._rows.get(product_id)
+        if row is None:
+            row = self._rows[product_id] = len(self._product_ids)
+            self._product_ids.append(product_id)
+        return row
+
+    def rebuild(self, products: Iterable[Product]) -> None:
+        """Заново собрать столбцы по отзывам всех продуктов за один проход"""
+        self._rows = {}
+        self._product_ids = []
+        rows, ratings, times, comments = [], [], [], []
+        for product in products:
+            row = self._row(product.product_id)
+            for rating, timestamp, comment in self._reviews_of(product):
+                rows.append(row)
+                ratings.append(rating)
+                times.append(timestamp)
+                comments.append(comment.encode("utf-8"))
+        size = self._size = len(ratings)
+        capacity = max(size, 16)
+        self._product = np.zeros(capacity, dtype=np.int32)
+        self._rating = np.zeros(capacity, dtype=np.int8)
+        self._time = np.zeros(capacity, dtype=np.float64)
+        self._offsets = np.zeros(capacity + 1, dtype=np.int64)
+        self._product[:size] = rows
+        self._rating[:size] = ratings
+        self._time[:size] = times
+        self._offsets[1:size + 1] = np.cumsum([len(comment) for comment in comments], dtype=np.int64)
+        self._arena = bytearray(b"".join(comments))
+
+    @staticmethod
+    def _reviews_of(product: Product) -> Iterable[Tuple[int, float, str]]:
+        # (оценка, время, текст); непрочитанная история разбирается без создания Review,
+        # поэтому сборка столбцов не загружает историю в продукты
+        history = product.lazy_history
+        if history is not None:
+            return ((review["rating"], datetime.fromisoformat(review["date"]).timestamp(), review["comment"])
+                    for review in history.data()["reviews"])
+        return ((review.rating, review.date.timestamp(), review.comment) for review in product.reviews)
+
+    def add(self, product_id: str, review: Review) -> None:
+        """Добавить отзыв за амортизированное O(1)"""
+        index = self._size
+        if index == len(self._rating):
+            self._product = np.concatenate([self._product, np.zeros_like(self._product)])
+            self._rating = np.concatenate([self._rating, np.zeros_like(self._rating)])
+            self._time = np.concatenate([self._time, np.zeros_like(self._time)])
+            self._offsets = np.concatenate([self._offsets, np.zeros(index, dtype=np.int64)])
+        self._product[index] = self._row(product_id)
+        self._rating[index] = review.rating
+        self._time[index] = review.date.timestamp()
+        self._arena += review.comment.encode("utf-8")
+        self._offsets[index + 1] = len(self._arena)
+        self._size = index + 1
+
+    def comment(self, index: int) -> str:
+        """Текст отзыва с номером index (в порядке добавления)"""
+        return self._arena[self._offsets[index]:self._offsets[index + 1]].decode("utf-8")
+
+    def _window(self, start: Optional[datetime], end: Optional[datetime]):
+        # Маска отзывов с временем в [start, end); None - все отзывы
+        time = self._time[:self._size]
+        mask = None
+        if start is not None:
+            mask = time >= start.timestamp()
+        if end is not None:
+            before = time < end.timestamp()
+            mask = before if mask is None else mask & before
+        return mask
+
+    def totals(self, start: Optional[datetime] = None, end: Optional[datetime] = None):
+        """Количество отзывов и сумма оценок каждого продукта за период [start, end)"""
+        product = self._product[:self._size]
+        rating = self._rating[:self._size]
+        mask = self._window(start, end)
+        if mask is not None:
+            product = product[mask]
+            rating = rating[mask]
+        size = len(self._product_ids)
+        return np.bincount(product, minlength=size), np.bincount(product, weights=rating, minlength=size)
+
+    def rank(self, k: int, start: Optional[datetime] = None, end: Optional[datetime] = None,
+             lowest: bool = True, min_reviews: int = 1) -> List[Tuple[str, float, int]]:
+        """
+        k продуктов с самой низкой (lowest) или высокой средней оценкой за период
+
+        Учитываются продукты, у которых за период не меньше min_reviews отзывов.
+        При равной средней выше стоит продукт с меньшим (для худших) или большим
+        (для лучших) количеством отзывов.
+
+        Returns:
+            Список (ID продукта, средняя оценка, количество отзывов)
+        """
+        counts, sums = self.totals(start, end)
+        rows = np.flatnonzero(counts >= max(min_reviews, 1))
+        counts = counts[rows]
+        averages = sums[rows] / counts
+        # Куча из k элементов: O(n log k) вместо сортировки всех продуктов
+        select = heapq.nsmallest if lowest else heapq.nlargest
+        ranked = select(k, zip(averages.tolist(), counts.tolist(), rows.tolist()))
+        return [(self._product_ids[row], average, count) for average, count, row in ranked]
+
+    def trend(self, start: datetime, end: datetime, bucket_days: int = 7,
+              product_id: Optional[str] = None) -> RatingTrend:
+        """
+        Количество отзывов и сумма оценок по интервалам в bucket_days дней от start до end
+
+        Без product_id считается сразу для всех продуктов (матрица продукты x интервалы).
+        """
+        width = bucket_days * _SECONDS_PER_DAY
+        buckets = max(1, math.ceil((end - start).total_seconds() / width))
+        if product_id is None:
+            product_ids = list(self._product_ids)
+            mask = self._window(start, end)
+            product = self._product[:self._size][mask]
+            rating = self._rating[:self._size][mask]
+            time = self._time[:self._size][mask]
+        else:
+            # Сначала отзывы продукта, затем окно времени - только по ним
+            product_ids = [product_id]
+            indices = np.flatnonzero(self._product[:self._size] == self._rows.get(product_id, -1))
+            time = self._time[indices]
+            mask = (time >= start.timestamp()) & (time < end.timestamp())
+            rating = self._rating[indices][mask]
+            time = time[mask]
+        index = ((time - start.timestamp()) // width).astype(np.int64)
+        if product_id is None:
+            index += product.astype(np.int64) * buckets
+        size = len(product_ids) * buckets
+        counts = np.bincount(index, minlength=size).reshape(len(product_ids), buckets)
+        sums = np.bincount(index, weights=rating, minlength=size).reshape(len(product_ids), buckets)
+        bucket_starts = [start + timedelta(days=bucket_days * i) for i in range(buckets)]
+        return RatingTrend(product_ids, bucket_starts, counts, sums)
+
+    def latest_comments(self, product_id: str, limit: int = 5,
+                        start: Optional[datetime] = None) -> List[Tuple[datetime, int, str]]:
+        """Последние (по времени) отзывы продукта: (время, оценка, текст)"""
+        row = self._rows.get(product_id)
+        if row is None:
+            return []
+        selected = self._product[:self._size] == row
+        mask = self._window(start, None)
+        if mask is not None:
+            selected &= mask
+        indices = np.flatnonzero(selected)
+        latest = indices[np.argsort(self._time[indices], kind="stable")[::-1][:limit]].tolist()
+        return [(datetime.fromtimestamp(self._time[i]), int(self._rating[i]), self.comment(i)) for i in latest]
@@ -0,0 +1,363 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import weakref
+from urllib.parse import quote
+from typing import Any, Dict, List, Optional, Tuple
+
+# Файл состояния с таким расширением open_journal хранит в базе SQLite, а не в журнале
+SQLITE_EXTENSION = ".db"
+
+# Первые байты файла базы SQLite: по ним read_state отличает базу от других форматов
+SQLITE_MAGIC = b"SQLite format 3\x00"
+
+_encoder = json.JSONEncoder(ensure_ascii=False, default=str)
+
+# Позиция строки (rowid) задает порядок продуктов, атрибутов и истории каждого продукта
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    product_id TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    current_stage INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS products_by_stage ON products (current_stage);
+CREATE TABLE IF NOT EXISTS attributes (
+    id INTEGER PRIMARY KEY,
+    product_id TEXT NOT NULL,
+    attribute TEXT NOT NULL,
+    value TEXT NOT NULL,
+    UNIQUE (product_id, attribute)
+);
+CREATE TABLE IF NOT EXISTS quality_checks (
+    id INTEGER PRIMARY KEY,
+    product_id TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    result TEXT NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS quality_checks_by_product ON quality_checks (product_id, id);
+CREATE TABLE IF NOT EXISTS reviews (
+    id INTEGER PRIMARY KEY,
+    product_id TEXT NOT NULL,
+    author TEXT NOT NULL,
+    comment TEXT NOT NULL,
+    rating INTEGER NOT NULL,
+    date TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reviews_by_product ON reviews (product_id, id);
+CREATE TABLE IF NOT EXISTS certificates (
+    id INTEGER PRIMARY KEY,
+    product_id TEXT NOT NULL,
+    standard_name TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    issue_date TEXT NOT NULL,
+    expiration_date TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS certificates_by_product ON certificates (product_id, id);
+CREATE INDEX IF NOT EXISTS certificates_by_stage ON certificates (product_id, stage, expiration_date);
+CREATE INDEX IF NOT EXISTS certificates_by_expiration ON certificates (expiration_date);
+"""
+
+_CHECK_FIELDS = ("stage", "result", "timestamp")
+_REVIEW_FIELDS = ("author", "comment", "rating", "date")
+_CERTIFICATE_FIELDS = ("standard_name", "stage", "issue_date", "expiration_date")
+
+_INSERT_PRODUCT = "INSERT INTO products (product_id, name, status, current_stage) VALUES (?, ?, ?, ?)"
+_UPSERT_ATTRIBUTE = ("INSERT INTO attributes (product_id, attribute, value) VALUES (?, ?, ?) "
+                     "ON CONFLICT (product_id, attribute) DO UPDATE SET value = excluded.value")
+_INSERT_CHECK = "INSERT INTO quality_checks (product_id, stage, result, timestamp) VALUES (?, ?, ?, ?)"
+_INSERT_REVIEW = "INSERT INTO reviews (product_id, author, comment, rating, date) VALUES (?, ?, ?, ?, ?)"
+_INSERT_CERTIFICATE = ("INSERT INTO certificates (product_id, standard_name, stage, issue_date, expiration_date) "
+                       "VALUES (?, ?, ?, ?, ?)")
+_UPSERT_META = "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value"
+
+# Сертификат этапа - с самым поздним сроком (при равных - выданный последним, как в
+# Product.index_certificate) вместе с его номером в истории продукта
+_STAGE_CERTIFICATES = """
+SELECT product_id, position, standard_name, stage, issue_date, expiration_date FROM (
+    SELECT *,
+           row_number() OVER (PARTITION BY product_id ORDER BY id) - 1 AS position,
+           row_number() OVER (PARTITION BY product_id, stage ORDER BY expiration_date DESC, id DESC) AS rank
+    FROM certificates
+) WHERE rank = 1
+"""
+
+
+def _connect(filename: str, check_same_thread: bool = True, read_only: bool = False) -> sqlite3.Connection:
+    if read_only:
+        # Только чтение (mode=ro): файл не переводится в WAL и таблицы в нем не создаются
+        uri = "file:" + quote(os.path.abspath(filename)) + "?mode=ro"
+        return sqlite3.connect(uri, uri=True, check_same_thread=check_same_thread)
+    connection = sqlite3.connect(filename, check_same_thread=check_same_thread)
+    # WAL: чтение истории не ждет записи, а фиксация - одна запись в конец журнала WAL
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=FULL")
+    connection.executescript(_SCHEMA)
+    return connection
+
+
+class SqliteHistory:
+    """История продукта в базе: читается по индексу продукта при первом обращении (LazyHistory)"""
+
+    __slots__ = ("store", "product_id")
+
+    def __init__(self, store: 'SqliteStore', product_id: str) -> None:
+        self.store = store
+        self.product_id = product_id
+
+    def data(self) -> Dict[str, List[dict]]:
+        return self.store.history_data(self.product_id)
+
+    def to_json(self) -> bytes:
+        return _encoder.encode(self.data()).encode("utf-8")
+
+
+class SqliteStore:
+    """
+    Хранение состояния в базе SQLite с тем же интерфейсом, что у StateJournal
+
+    Продукты, атрибуты, проверки, отзывы и сертификаты лежат в отдельных таблицах.
+    Каждая запись об изменении сразу применяется к таблицам, поэтому контрольные
+    точки не нужны (pending всегда 0), а checkpoint(state) заменяет все содержимое
+    базы (загрузка состояния из файла). Записи применяет фоновый поток: все, что
+    пришло за commit_interval секунд, фиксируется одной транзакцией.
+    """
+
+    def __init__(self, filename: str, commit_interval: float = 0.01, read_only: bool = False) -> None:
+        self.filename: str = filename
+        self.read_only: bool = read_only  # Только чтение истории (read_sqlite_state), без потока записи
+        self.checkpoint_filename: str = filename  # Как у StateJournal: файл, из которого читается состояние
+        self.commit_interval: float = commit_interval
+        self.seq: int = 0  # Номер последней записи (в базе не хранится)
+        self.pending: int = 0  # Записи применяются к таблицам сразу - контрольная точка не нужна
+        self._durable_seq: int = 0  # Записи с номерами до него уже зафиксированы
+        self._reader: Optional[sqlite3.Connection] = None  # Чтение истории (в потоке вызывающего)
+        self._read_lock = threading.Lock()
+        self._condition = threading.Condition()
+        self._closing = threading.Event()
+        self._queue: "queue.SimpleQueue[Optional[Tuple[str, int, Any]]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self.error: Optional[Exception] = None  # Ошибка фонового потока записи
+
+    def _read_connection(self) -> sqlite3.Connection:
+        if self._reader is None:
+            self._reader = _connect(self.filename, check_same_thread=False, read_only=self.read_only)
+        return self._reader
+
+    def read_checkpoint(self) -> Optional[Dict[str, Any]]:
+        """
+        Состояние из базы в формате read_state (None, если база пуста)
+
+        Читаются только заголовки продуктов, количество сертификатов и отзывов и
+        сертификаты этапов; история продукта остается в базе (SqliteHistory).
+        """
+        with self._read_lock:
+            connection = self._read_connection()
+            state = {key: json.loads(value) for key, value in connection.execute("SELECT key, value FROM meta")}
+            if not state:
+                return None
+            attributes: Dict[str, Dict[str, str]] = {}
+            for product_id, attribute, value in connection.execute(
+                    "SELECT product_id, attribute, value FROM attributes ORDER BY id"):
+                attributes.setdefault(product_id, {})[attribute] = value
+            certificate_counts = dict(connection.execute(
+                "SELECT product_id, count(*) FROM certificates GROUP BY product_id"))
+            review_counts = dict(connection.execute(
+                "SELECT product_id, count(*) FROM reviews GROUP BY product_id"))
+            stage_certificates: Dict[str, list] = {}
+            for product_id, position, *values in connection.execute(_STAGE_CERTIFICATES):
+                stage_certificates.setdefault(product_id, []).append(
+                    [position, dict(zip(_CERTIFICATE_FIELDS, values))])
+            products = []
+            for product_id, name, status, current_stage in connection.execute(
+                    "SELECT product_id, name, status, current_stage FROM products ORDER BY id"):
+                products.append({
+                    "product_id": product_id,
+                    "name": name,
+                    "attributes": attributes.get(product_id, {}),
+                    "status": status,
+                    "current_stage": current_stage,
+                    "certificates_count": certificate_counts.get(product_id, 0),
+                    "reviews_count": review_counts.get(product_id, 0),
+                    "stage_certificates": sorted(stage_certificates.get(product_id, ())),
+                    "history": SqliteHistory(self, product_id)
+                })
+        state["products"] = products
+        return state
+
+    def history_data(self, product_id: str) -> Dict[str, List[dict]]:
+        """Проверки, отзывы и сертификаты продукта (в формате файла состояния)"""
+        with self._read_lock:
+            connection = self._read_connection()
+            quality_checks = [
+                {"stage": stage, "result": json.loads(result), "timestamp": timestamp}
+                for stage, result, timestamp in connection.execute(
+                    "SELECT stage, result, timestamp FROM quality_checks WHERE product_id = ? ORDER BY id",
+                    (product_id,))
+            ]
+            reviews = [dict(zip(_REVIEW_FIELDS, row)) for row in connection.execute(
+                "SELECT author, comment, rating, date FROM reviews WHERE product_id = ? ORDER BY id",
+                (product_id,))]
+            certificates = [dict(zip(_CERTIFICATE_FIELDS, row)) for row in connection.execute(
+                "SELECT standard_name, stage, issue_date, expiration_date FROM certificates "
+                "WHERE product_id = ? ORDER BY id", (product_id,))]
+        return {"quality_checks": quality_checks, "reviews": reviews, "certificates": certificates}
+
+    def read_tail(self, after_seq: int) -> List[Dict[str, Any]]:
+        """Непримененных записей в базе не бывает: каждая фиксируется вместе с изменением таблиц"""
+        return []
+
+    def start(self, seq: int, checkpoint_seq: int) -> None:
+        """Начать запись после чтения базы"""
+        self.seq = self._durable_seq = seq
+        self._closing.clear()
+        self._thread = threading.Thread(target=self._run, name="sqlite-store", daemon=True)
+        self._thread.start()
+
+    def append(self, op: str, fields: Dict[str, Any]) -> int:
+        """Добавить запись об изменении; в базу она попадет со следующей транзакцией"""
+        self.seq += 1
+        self._queue.put(("append", self.seq, (op, fields)))
+        return self.seq
+
+    def checkpoint(self, state: Dict[str, Any]) -> None:
+        """Заменить содержимое базы состоянием state (одной транзакцией в фоне)"""
+        self.seq += 1
+        self._queue.put(("checkpoint", self.seq, state))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Дождаться, пока все добавленные записи будут зафиксированы"""
+        seq = self.seq
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._durable_seq >= seq or self.error is not None or not self._is_running(), timeout)
+
+    def close(self) -> None:
+        """Зафиксировать очередь, остановить поток записи и закрыть соединения"""
+        if self._is_running():
+            self._queue.put(None)
+            self._closing.set()
+            self._thread.join()
+        self._thread = None
+        with self._read_lock:
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
+
+    def _is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self) -> None:
+        connection = None
+        try:
+            connection = _connect(self.filename)
+            while True:
+                batch = [self._queue.get()]
+                self._closing.wait(self.commit_interval)
+                while True:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                durable_seq = self._durable_seq
+                with connection:
+                    for item in batch:
+                        if item is None:
+                            break
+                        kind, seq, payload = item
+                        if kind == "append":
+                            self._apply(connection, *payload)
+                        else:
+                            self._replace(connection, payload)
+                        durable_seq = seq
+                with self._condition:
+                    self._durable_seq = durable_seq
+                    self._condition.notify_all()
+                if batch[-1] is None:
+                    return
+        except Exception as e:
+            self.error = e
+            with self._condition:
+                self._condition.notify_all()
+        finally:
+            if connection is not None:
+                connection.close()
+
+    def _apply(self, connection: sqlite3.Connection, op: str, record: Dict[str, Any]) -> None:
+        # Те же записи, что QualityController пишет в журнал (_record)
+        product_id = record.get("product_id")
+        if op == "add_product":
+            connection.execute(_INSERT_PRODUCT, (product_id, record["name"], record["status"], record["current_stage"]))
+            connection.executemany(_UPSERT_ATTRIBUTE, [(product_id, attribute, value)
+                                                       for attribute, value in record["attributes"].items()])
+            connection.execute(_UPSERT_META, ("next_product_id_counter",
+                                              _encoder.encode(record["next_product_id_counter"])))
+        elif op == "attribute":
+            connection.execute(_UPSERT_ATTRIBUTE, (product_id, record["attribute"], record["value"]))
+        elif op == "stage":
+            connection.execute("UPDATE products SET current_stage = ? WHERE product_id = ?",
+                               (record["current_stage"], product_id))
+        elif op == "review":
+            connection.execute(_INSERT_REVIEW, (product_id, *(record[field] for field in _REVIEW_FIELDS)))
+        elif op == "certificate":
+            connection.execute(_INSERT_CERTIFICATE, (product_id, *(record[field] for field in _CERTIFICATE_FIELDS)))
+        elif op == "quality_check":
+            connection.execute(_INSERT_CHECK, (product_id, record["stage"], _encoder.encode(record["result"]),
+                                               record["timestamp"]))
+
+    def _replace(self, connection: sqlite3.Connection, state: Dict[str, Any]) -> None:
+        for table in ("meta", "products", "attributes", "quality_checks", "reviews", "certificates"):
+            connection.execute(f"DELETE FROM {table}")
+        connection.executemany(_UPSERT_META, [(key, _encoder.encode(value)) for key, value in state.items()
+                                              if key not in ("products", "journal_seq")])
+        products, attributes, checks, reviews, certificates = [], [], [], [], []
+        for product_data in state["products"]:
+            product_id = product_data["product_id"]
+            products.append((product_id, product_data["name"], product_data["status"], product_data["current_stage"]))
+            attributes.extend((product_id, attribute, value) for attribute, value in product_data["attributes"].items())
+            # Непрочитанная история снимка (lazy) приходит строкой файла состояния,
+            # прочитанная - HistorySnapshot, который разбирается здесь, в потоке записи
+            history = product_data.get("history", product_data)
+            if isinstance(history, bytes):
+                history = json.loads(history)
+            elif history is not product_data:
+                history = history.data()
+            checks.extend((product_id, check["stage"], _encoder.encode(check["result"]), check["timestamp"])
+                          for check in history["quality_checks"])
+            reviews.extend((product_id, *(review[field] for field in _REVIEW_FIELDS))
+                           for review in history["reviews"])
+            certificates.extend((product_id, *(certificate[field] for field in _CERTIFICATE_FIELDS))
+                                for certificate in history["certificates"])
+        connection.executemany(_INSERT_PRODUCT, products)
+        connection.executemany(_UPSERT_ATTRIBUTE, attributes)
+        connection.executemany(_INSERT_CHECK, checks)
+        connection.executemany(_INSERT_REVIEW, reviews)
+        connection.executemany(_INSERT_CERTIFICATE, certificates)
+
+
+def read_sqlite_state(filename: str) -> Dict[str, Any]:
+    """
+    Состояние из базы SQLite для read_state; история продуктов читается из базы по запросу
+
+    База открывается только для чтения. Соединением владеет возвращенное состояние:
+    оно закрывается, когда не останется непрочитанных историй (SqliteHistory) продуктов.
+    """
+    store = SqliteStore(filename, read_only=True)
+    try:
+        state = store.read_checkpoint()
+    except BaseException:
+        store.close()
+        raise
+    if state is None or not state["products"]:
+        store.close()
+        return state or {"products": []}
+    weakref.finalize(store, store._reader.close)
+    return state
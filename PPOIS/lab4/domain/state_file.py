@@ -0,0 +1,138 @@
+import json
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+from .binary_state import MAGIC, read_binary_state
+from .sqlite_store import SQLITE_MAGIC, read_sqlite_state
+
+if TYPE_CHECKING:
+    from .certificate import Certificate
+    from .review import Review
+
+
+# Формат файла состояния по строкам: первая строка - общие данные, затем для каждого
+# продукта строка заголовка (ID, название, этап, атрибуты, ...) и строка истории
+STATE_FORMAT = "bakery-state-lines/1"
+
+# Поля продукта, которые хранятся в строке истории и читаются только при обращении
+HISTORY_FIELDS = ("quality_checks", "reviews", "certificates")
+
+_encoder = json.JSONEncoder(ensure_ascii=False, default=str)
+
+
+class LazyHistory:
+    """Непрочитанная история продукта: строка файла состояния и сертификаты этапов из заголовка"""
+
+    __slots__ = ("source", "stage_certificates", "rating_stats", "_hydrate")
+
+    def __init__(self, source, stage_certificates: Dict[int, 'Certificate'],
+                 hydrate: Callable[[dict, Dict[int, 'Certificate']], Tuple[List[dict], List['Review'], List['Certificate']]],
+                 rating_stats: Optional[Dict[str, Any]] = None) -> None:
+        # Строка истории (bytes), BinaryHistory - запись двоичного снимка или SqliteHistory - строки базы
+        self.source = source
+        # Номер сертификата в истории -> уже созданный объект (он же в индексе этапов и очереди сроков)
+        self.stage_certificates: Dict[int, 'Certificate'] = stage_certificates
+        # Агрегаты оценок из заголовка (RatingStats.to_data): средние считаются без чтения отзывов
+        self.rating_stats: Optional[Dict[str, Any]] = rating_stats
+        self._hydrate = hydrate
+
+    @property
+    def raw(self) -> bytes:
+        """Строка истории для файла по строкам"""
+        return self.source if isinstance(self.source, bytes) else self.source.to_json()
+
+    def data(self) -> Dict[str, List[dict]]:
+        """История в формате файла состояния: объекты не создаются, продукт остается непрочитанным"""
+        return json.loads(self.source) if isinstance(self.source, bytes) else self.source.data()
+
+    def load(self) -> Tuple[List[dict], List['Review'], List['Certificate']]:
+        return self._hydrate(self.data(), self.stage_certificates)
+
+
+class HistorySnapshot:
+    """
+    История прочитанного продукта в контрольной точке: разбирается в потоке записи
+
+    Списки проверок, отзывов и сертификатов только дополняются, поэтому снимок
+    хранит сами списки и их длины на момент вызова, а поток записи берет срезы.
+    Вызывающий поток тратит на продукт O(1) независимо от объема истории.
+    """
+
+    __slots__ = ("_lists", "_counts", "_stage_certificates", "_encode")
+
+    def __init__(self, quality_checks: List[dict], reviews: List['Review'], certificates: List['Certificate'],
+                 stage_certificates: List['Certificate'],
+                 encode: Callable[[List[dict], List['Review'], List['Certificate']], Dict[str, List[dict]]]) -> None:
+        self._lists = (quality_checks, reviews, certificates)
+        self._counts = (len(quality_checks), len(reviews), len(certificates))
+        self._stage_certificates = stage_certificates
+        self._encode = encode
+
+    def data(self) -> Dict[str, List[dict]]:
+        """Проверки, отзывы и сертификаты (в формате файла состояния)"""
+        return self._encode(*(items[:count] for items, count in zip(self._lists, self._counts)))
+
+    def stage_certificate_data(self, data: Dict[str, List[dict]]) -> List[list]:
+        """[номер в истории, данные] для сертификатов этапов на момент снимка"""
+        stage_ids = {id(certificate) for certificate in self._stage_certificates}
+        certificates = self._lists[2][:self._counts[2]]
+        return [[index, data["certificates"][index]] for index, certificate in enumerate(certificates)
+                if id(certificate) in stage_ids]
+
+
+def write_state(f: BinaryIO, state: Dict[str, Any]) -> None:
+    """Записать состояние по строкам; у непрочитанных продуктов история копируется как есть"""
+    products = state["products"]
+    meta = {key: value for key, value in state.items() if key != "products"}
+    meta["format"] = STATE_FORMAT
+    meta["product_count"] = len(products)
+    lines = [_encoder.encode(meta).encode("utf-8")]
+    for product_data in products:
+        header = {key: value for key, value in product_data.items()
+                  if key not in HISTORY_FIELDS and key != "history"}
+        history = product_data.get("history")
+        if isinstance(history, HistorySnapshot):
+            data = history.data()
+            header["stage_certificates"] = history.stage_certificate_data(data)
+            history = _encoder.encode(data).encode("utf-8")
+        elif history is None:
+            history = _encoder.encode({key: product_data[key] for key in HISTORY_FIELDS}).encode("utf-8")
+        lines.append(_encoder.encode(header).encode("utf-8"))
+        lines.append(history)
+        if len(lines) >= 10000:
+            f.write(b"\n".join(lines) + b"\n")
+            lines = []
+    if lines:
+        f.write(b"\n".join(lines) + b"\n")
+
+
+def read_state(filename: str) -> Dict[str, Any]:
+    """
+    Прочитать файл состояния любого формата
+
+    Файл по строкам читается потоково: разбираются только заголовки продуктов, а строка
+    истории сохраняется в поле "history" (bytes) без разбора. Двоичный снимок читается
+    так же, но история остается в отображенном файле, а у базы SQLite - в базе. Файл
+    старого формата (один JSON-объект) читается целиком.
+    """
+    with open(filename, "rb") as f:
+        signature = f.read(len(SQLITE_MAGIC))
+        if signature.startswith(MAGIC):
+            return read_binary_state(filename)
+        if signature == SQLITE_MAGIC:
+            return read_sqlite_state(filename)
+        f.seek(0)
+        first_line = f.readline()
+        try:
+            meta = json.loads(first_line)
+        except ValueError:
+            meta = None
+        if not isinstance(meta, dict) or meta.get("format") != STATE_FORMAT:
+            f.seek(0)
+            return json.load(f)
+        
+        products = []
+        for header_line in f:
+            header = json.loads(header_line)
+            header["history"] = next(f).rstrip(b"\r\n")
+            products.append(header)
+    meta["products"] = products
+    return meta
@@ -5,19 +5,24 @@ from tkinter import messagebox
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from domain.events import ERROR
 from domain.quality_controller import QualityController
 from gui.controllers.main_controller import MainController
 from gui.views.main_window import MainWindow
 
 
-def main():
+def main(state_filename="system_state.json"):
     root = tk.Tk()
     model = QualityController()
-    try:
-        model.load_state()
-    except Exception as e:
-        messagebox.showwarning("Предупреждение",
-                               f"Не удалось загрузить сохраненное состояние: {e}")
+    model.open_journal(state_filename)
+    if model.journal is None:
+        # Без журнала изменения не сохранились бы, поэтому приложение не запускается
+        errors = model.events.recent(1, level=ERROR)
+        messagebox.showerror("Ошибка",
+                             f"{errors[-1].message if errors else 'Не удалось открыть файл состояния.'}\n\n"
+                             f"Исправьте или переместите файл {state_filename} и запустите программу снова.")
+        root.destroy()
+        return
 
     #  контроллер
     controller = MainController(model)
@@ -28,4 +33,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    # python gui.py [файл состояния], например system_state.db - хранение в SQLite
+    main(*sys.argv[1:2])
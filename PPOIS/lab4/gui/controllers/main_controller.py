@@ -5,6 +5,10 @@ from domain import (
     BakeryEnterpriseStandard,
     OrganicBakeryStandard
 )
+from domain.certificate import current_date
+from domain.events import WARNING
+from domain.binary_state import BINARY_EXTENSION
+from domain.rating_stats import RECENT_HALF_LIVES
 from domain.domain_errors import (
     ProductNotFoundError,
     UnknownQualityStandardError,
@@ -13,6 +17,9 @@ from domain.domain_errors import (
     InvalidReviewRatingError
 )
 
+# Период проверки, не наступили ли новые сутки для очистки истекших сертификатов, мс
+EXPIRY_SWEEP_INTERVAL_MS = 60 * 60 * 1000
+
 
 class MainController:
     def __init__(self, model: QualityController):
@@ -21,6 +28,45 @@ class MainController:
         
     def set_view(self, view):
         self.view = view
+        self.model.events.subscribe(self.on_model_event)
+        self.run_expiry_sweep()
+
+    def on_model_event(self, event):
+        # Сообщения модели о ходе работы выводятся в строку состояния
+        if self.view:
+            if event.kind == "journal.error":
+                # Изменения перестали сохраняться - об этом нужно сообщить сразу, а не строкой состояния
+                self.view.show_error(event.message)
+            else:
+                self.view.update_status(event.message.strip())
+
+    def close(self):
+        # Дописать журнал изменений и события, если включена их запись в файл
+        self.model.close_journal()
+        self.model.events.close()
+
+    def run_expiry_sweep(self):
+        # Очистка выполняется раз в сутки; проверка повторяется каждый час
+        expired = self.model.sweep_expired_certificates()
+        if self.view:
+            if expired:
+                self.view.update_status(f"Истек срок действия сертификатов: {len(expired)}")
+                self.view.refresh_product_list()
+            self.view.schedule(EXPIRY_SWEEP_INTERVAL_MS, self.run_expiry_sweep)
+
+    def get_expiring_certificates(self, days: int):
+        today = current_date()
+        return [
+            {
+                "product_id": product.product_id,
+                "product_name": product.name,
+                "stage": certificate.stage,
+                "standard_name": certificate.standard.standard_name,
+                "expiration_date": certificate.expiration_date,
+                "days_left": (certificate.expiration_date - today).days
+            }
+            for product, certificate in self.model.get_expiring_certificates(days)
+        ]
 
     def get_products(self):
         return self.model.products
@@ -139,8 +185,8 @@ class MainController:
                 "has_certificate": has_certificate,
                 "is_completed": product.current_stage >= len(product.PRODUCTION_STAGES),
                 "attributes": product.attributes,
-                "certificates_count": len(product.certificates),
-                "reviews_count": len(product.reviews)
+                "certificates_count": product.certificate_count,
+                "reviews_count": product.review_count
             }
         except ProductNotFoundError as e:
             return None
@@ -167,18 +213,61 @@ class MainController:
                     "recommendations": []
                 }
             else:
+                stats = product.rating_stats
                 return {
                     "has_reviews": True,
                     "avg_rating": avg_rating,
                     "recommendations": recommendations,
-                    "reviews_count": len(product.reviews)
+                    "reviews_count": stats.count,
+                    "rating_histogram": list(stats.histogram),
+                    "recent_ratings": {half_life: stats.recent_average(half_life)
+                                       for half_life in RECENT_HALF_LIVES}
                 }
         except ProductNotFoundError as e:
             return {"error": str(e)}
 
+    def get_rating_leaderboard(self, days: int, k: int, lowest: bool):
+        try:
+            ranked = self.model.rank_products_by_rating(days, k, lowest=lowest)
+        except ImportError as e:
+            return {"error": str(e)}
+        return {
+            "products": [
+                {
+                    "product_id": product.product_id,
+                    "product_name": product.name,
+                    "avg_rating": avg_rating,
+                    "reviews_count": count
+                }
+                for product, avg_rating, count in ranked
+            ]
+        }
+
+    def get_rating_trend(self, product_id: str, weeks: int = 12):
+        try:
+            trend = self.model.rating_trend(product_id, weeks)
+            latest = self.model.latest_reviews(product_id)
+        except (ProductNotFoundError, ImportError) as e:
+            return {"error": str(e)}
+        return {
+            "weeks": [
+                {"week_start": week_start.date(), "reviews_count": count, "avg_rating": avg_rating}
+                for week_start, count, avg_rating in trend
+            ],
+            "latest_reviews": [
+                {"date": date.strftime("%Y-%m-%d"), "rating": rating, "comment": comment}
+                for date, rating, comment in latest
+            ]
+        }
+
     def save_state(self, filename="system_state.json"):
         try:
-            self.model.save_state(filename)
+            if filename.endswith(BINARY_EXTENSION):
+                saved = self.model.save_binary_state(filename)
+            else:
+                saved = self.model.save_state(filename)
+            if not saved:
+                return False, self._last_error(f"Не удалось сохранить состояние в файл {filename}")
             return True, f"Состояние сохранено в файл {filename}"
         except Exception as e:
             return False, f"Ошибка при сохранении: {e}"
@@ -187,8 +276,14 @@ class MainController:
         try:
             success = self.model.load_state(filename)
             if success:
+                self.model.sweep_expired_certificates()
                 return True, f"Состояние загружено из файла {filename}"
             else:
-                return False, f"Не удалось загрузить состояние из файла {filename}"
+                return False, self._last_error(f"Не удалось загрузить состояние из файла {filename}")
         except Exception as e:
             return False, f"Ошибка при загрузке: {e}"
+
+    def _last_error(self, default: str) -> str:
+        # Причину отказа модель сообщает событием (например, state.in_use)
+        errors = self.model.events.recent(1, level=WARNING)
+        return errors[-1].message if errors else default
@@ -9,7 +9,7 @@ class AnalysisDialog(tk.Toplevel):
         self.product_info = self.controller.get_production_status(product_id)
         self.analysis_result = self.controller.analyze_reviews(product_id)
         self.title(f"Анализ отзывов - Продукт {product_id}")
-        self.geometry("500x400")
+        self.geometry("500x480")
         self.resizable(True, True)
         self.transient(parent)
         self.grab_set()
@@ -70,6 +70,18 @@ class AnalysisDialog(tk.Toplevel):
                      font=("Arial", 10, "bold")).grid(row=1, column=0, sticky=tk.W, pady=2)
             ttk.Label(stats_frame, text=str(self.analysis_result["reviews_count"])).grid(
                 row=1, column=1, sticky=tk.W, padx=(10, 0))
+            row = 2
+            for half_life, recent_rating in self.analysis_result["recent_ratings"].items():
+                ttk.Label(stats_frame, text=f"Недавний рейтинг ({half_life} дн.):",
+                         font=("Arial", 10, "bold")).grid(row=row, column=0, sticky=tk.W, pady=2)
+                ttk.Label(stats_frame, text=f"{recent_rating:.2f} / 5.00").grid(
+                    row=row, column=1, sticky=tk.W, padx=(10, 0))
+                row += 1
+            histogram = self.analysis_result["rating_histogram"]
+            ttk.Label(stats_frame, text="Распределение оценок:",
+                     font=("Arial", 10, "bold")).grid(row=row, column=0, sticky=tk.W, pady=2)
+            ttk.Label(stats_frame, text="  ".join(f"{rating}★: {count}" for rating, count in enumerate(histogram, 1))).grid(
+                row=row, column=1, sticky=tk.W, padx=(10, 0))
             if self.analysis_result["recommendations"]:
                 rec_frame = ttk.LabelFrame(result_frame, text="Рекомендации по улучшению", padding="10")
                 rec_frame.pack(fill=tk.BOTH, expand=True, pady=(10, 0))
@@ -0,0 +1,68 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+class ExpiryDialog(tk.Toplevel):
+    def __init__(self, parent, controller):
+        super().__init__(parent)
+        self.controller = controller
+        self.title("Сертификаты с истекающим сроком")
+        self.geometry("700x400")
+        self.resizable(True, True)
+        self.transient(parent)
+        self.grab_set()
+        self.center_window()
+        self.create_widgets()
+        self.show_certificates()
+        
+    def center_window(self):
+        self.update_idletasks()
+        parent = self.master
+        x = parent.winfo_x() + (parent.winfo_width() // 2) - (self.winfo_width() // 2)
+        y = parent.winfo_y() + (parent.winfo_height() // 2) - (self.winfo_height() // 2)
+        self.geometry(f'+{x}+{y}')
+    
+    def create_widgets(self):
+        main_frame = ttk.Frame(self, padding="20")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        filter_frame = ttk.Frame(main_frame)
+        filter_frame.pack(fill=tk.X, pady=(0, 10))
+        ttk.Label(filter_frame, text="Истекают в ближайшие (дней):").pack(side=tk.LEFT)
+        self.days_var = tk.StringVar(value="30")
+        ttk.Spinbox(filter_frame, from_=0, to=3650, textvariable=self.days_var, width=6).pack(side=tk.LEFT, padx=5)
+        ttk.Button(filter_frame, text="Показать", command=self.show_certificates).pack(side=tk.LEFT)
+        self.count_label = ttk.Label(filter_frame, text="")
+        self.count_label.pack(side=tk.RIGHT)
+        columns = ("id", "name", "stage", "standard", "expiration", "days_left")
+        self.tree = ttk.Treeview(main_frame, columns=columns, show="headings", height=12)
+        self.tree.heading("id", text="ID")
+        self.tree.heading("name", text="Название")
+        self.tree.heading("stage", text="Этап")
+        self.tree.heading("standard", text="Стандарт")
+        self.tree.heading("expiration", text="Действителен до")
+        self.tree.heading("days_left", text="Осталось дней")
+        self.tree.column("id", width=50)
+        self.tree.column("name", width=140)
+        self.tree.column("stage", width=90)
+        self.tree.column("standard", width=180)
+        self.tree.column("expiration", width=110, anchor=tk.CENTER)
+        self.tree.column("days_left", width=90, anchor=tk.CENTER)
+        scrollbar = ttk.Scrollbar(main_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        ttk.Button(self, text="Закрыть", command=self.destroy).pack(pady=(0, 10))
+    
+    def show_certificates(self):
+        try:
+            days = int(self.days_var.get())
+        except ValueError:
+            messagebox.showerror("Ошибка", "Количество дней должно быть целым числом", parent=self)
+            return
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+        certificates = self.controller.get_expiring_certificates(days)
+        for cert in certificates:
+            self.tree.insert("", tk.END, values=(cert["product_id"], cert["product_name"], cert["stage"],
+                                                 cert["standard_name"], cert["expiration_date"],
+                                                 cert["days_left"]))
+        self.count_label.config(text=f"Найдено: {len(certificates)}")
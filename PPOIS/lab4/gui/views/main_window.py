@@ -59,6 +59,8 @@ class MainWindow:
         menubar.add_cascade(label="Продукт", menu=product_menu)
         product_menu.add_command(label="Добавить продукт", command=self.add_product)
         product_menu.add_command(label="Обновить список", command=self.refresh_product_list)
+        product_menu.add_command(label="Истекающие сертификаты", command=self.show_expiring_certificates)
+        product_menu.add_command(label="Аналитика отзывов", command=self.show_review_analytics)
         help_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Справка", menu=help_menu)
         help_menu.add_command(label="О программе", command=self.show_about)
@@ -145,8 +147,8 @@ class MainWindow:
                                      values=(product.product_id, 
                                             product.name, 
                                             product.get_current_stage(),
-                                            len(product.certificates),
-                                            len(product.reviews)),
+                                            product.certificate_count,
+                                            product.review_count),
                                      tags=(product.product_id,))
         self.update_status(f"Загружено {len(products)} продуктов")
     
@@ -281,11 +283,21 @@ class MainWindow:
             dialog = AnalysisDialog(self.root, self.controller, product_id)
             self.root.wait_window(dialog)
     
+    def show_expiring_certificates(self):
+        from .expiry_dialog import ExpiryDialog
+        dialog = ExpiryDialog(self.root, self.controller)
+        self.root.wait_window(dialog)
+    
+    def show_review_analytics(self):
+        from .review_analytics_dialog import ReviewAnalyticsDialog
+        dialog = ReviewAnalyticsDialog(self.root, self.controller)
+        self.root.wait_window(dialog)
+    
     def save_state(self):
         from tkinter import filedialog
         filename = filedialog.asksaveasfilename(
             defaultextension=".json",
-            filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+            filetypes=[("JSON files", "*.json"), ("Binary snapshot", "*.bin"), ("All files", "*.*")],
             initialfile="system_state.json"
         )
         if filename:
@@ -299,7 +311,7 @@ class MainWindow:
     def load_state(self):
         from tkinter import filedialog
         filename = filedialog.askopenfilename(
-            filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+            filetypes=[("JSON files", "*.json"), ("Binary snapshot", "*.bin"), ("All files", "*.*")]
         )
         if filename:
             success, message = self.controller.load_state(filename)
@@ -321,11 +333,14 @@ class MainWindow:
     def update_status(self, message: str):
         self.status_bar.config(text=message)
     
+    def schedule(self, delay_ms: int, callback):
+        self.root.after(delay_ms, callback)
+    
     def show_about(self):
         about_text = "Система контроля качества выпечки"
         messagebox.showinfo("О программе", about_text)
     
     def on_closing(self):
         if messagebox.askyesno("Выход", "Вы действительно хотите выйти?"):
-            self.controller.save_state()
+            self.controller.close()
             self.root.destroy()
\ No newline at end of file
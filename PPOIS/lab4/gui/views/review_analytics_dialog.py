@@ -0,0 +1,111 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+class ReviewAnalyticsDialog(tk.Toplevel):
+    def __init__(self, parent, controller):
+        super().__init__(parent)
+        self.controller = controller
+        self.title("Аналитика отзывов")
+        self.geometry("720x560")
+        self.resizable(True, True)
+        self.transient(parent)
+        self.grab_set()
+        self.center_window()
+        self.create_widgets()
+        self.show_leaderboard()
+        
+    def center_window(self):
+        self.update_idletasks()
+        parent = self.master
+        x = parent.winfo_x() + (parent.winfo_width() // 2) - (self.winfo_width() // 2)
+        y = parent.winfo_y() + (parent.winfo_height() // 2) - (self.winfo_height() // 2)
+        self.geometry(f'+{x}+{y}')
+    
+    def create_widgets(self):
+        main_frame = ttk.Frame(self, padding="20")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        filter_frame = ttk.Frame(main_frame)
+        filter_frame.pack(fill=tk.X, pady=(0, 10))
+        ttk.Label(filter_frame, text="За последние (дней):").pack(side=tk.LEFT)
+        self.days_var = tk.StringVar(value="30")
+        ttk.Spinbox(filter_frame, from_=1, to=3650, textvariable=self.days_var, width=6).pack(side=tk.LEFT, padx=5)
+        ttk.Label(filter_frame, text="Продуктов:").pack(side=tk.LEFT)
+        self.k_var = tk.StringVar(value="20")
+        ttk.Spinbox(filter_frame, from_=1, to=1000, textvariable=self.k_var, width=5).pack(side=tk.LEFT, padx=5)
+        self.lowest_var = tk.BooleanVar(value=True)
+        ttk.Radiobutton(filter_frame, text="Худшие", variable=self.lowest_var, value=True).pack(side=tk.LEFT)
+        ttk.Radiobutton(filter_frame, text="Лучшие", variable=self.lowest_var, value=False).pack(side=tk.LEFT, padx=5)
+        ttk.Button(filter_frame, text="Показать", command=self.show_leaderboard).pack(side=tk.LEFT)
+        
+        rank_frame = ttk.LabelFrame(main_frame, text="Рейтинг продуктов по средней оценке", padding="5")
+        rank_frame.pack(fill=tk.BOTH, expand=True)
+        columns = ("place", "id", "name", "avg_rating", "reviews")
+        self.tree = ttk.Treeview(rank_frame, columns=columns, show="headings", height=8)
+        self.tree.heading("place", text="Место")
+        self.tree.heading("id", text="ID")
+        self.tree.heading("name", text="Название")
+        self.tree.heading("avg_rating", text="Средняя оценка")
+        self.tree.heading("reviews", text="Отзывов")
+        self.tree.column("place", width=50, anchor=tk.CENTER)
+        self.tree.column("id", width=50)
+        self.tree.column("name", width=220)
+        self.tree.column("avg_rating", width=110, anchor=tk.CENTER)
+        self.tree.column("reviews", width=80, anchor=tk.CENTER)
+        scrollbar = ttk.Scrollbar(rank_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.bind("<<TreeviewSelect>>", self.on_product_select)
+        
+        trend_frame = ttk.LabelFrame(main_frame, text="Тренд по неделям (выберите продукт)", padding="5")
+        trend_frame.pack(fill=tk.BOTH, expand=True, pady=(10, 0))
+        trend_columns = ("week", "reviews", "avg_rating")
+        self.trend_tree = ttk.Treeview(trend_frame, columns=trend_columns, show="headings", height=6)
+        self.trend_tree.heading("week", text="Неделя с")
+        self.trend_tree.heading("reviews", text="Отзывов")
+        self.trend_tree.heading("avg_rating", text="Средняя оценка")
+        self.trend_tree.column("week", width=120, anchor=tk.CENTER)
+        self.trend_tree.column("reviews", width=80, anchor=tk.CENTER)
+        self.trend_tree.column("avg_rating", width=110, anchor=tk.CENTER)
+        self.trend_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.latest_text = tk.Text(trend_frame, height=6, width=40, wrap=tk.WORD, state=tk.DISABLED)
+        self.latest_text.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(10, 0))
+        ttk.Button(self, text="Закрыть", command=self.destroy).pack(pady=(0, 10))
+    
+    def show_leaderboard(self):
+        try:
+            days = int(self.days_var.get())
+            k = int(self.k_var.get())
+        except ValueError:
+            messagebox.showerror("Ошибка", "Количество дней и продуктов должно быть целым числом", parent=self)
+            return
+        result = self.controller.get_rating_leaderboard(days, k, self.lowest_var.get())
+        if "error" in result:
+            messagebox.showerror("Ошибка", result["error"], parent=self)
+            return
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+        for place, product in enumerate(result["products"], 1):
+            self.tree.insert("", tk.END, values=(place, product["product_id"], product["product_name"],
+                                                 f"{product['avg_rating']:.2f}", product["reviews_count"]))
+    
+    def on_product_select(self, event):
+        selection = self.tree.selection()
+        if not selection:
+            return
+        product_id = str(self.tree.item(selection[0])["values"][1])
+        result = self.controller.get_rating_trend(product_id)
+        if "error" in result:
+            messagebox.showerror("Ошибка", result["error"], parent=self)
+            return
+        for item in self.trend_tree.get_children():
+            self.trend_tree.delete(item)
+        for week in result["weeks"]:
+            avg_rating = f"{week['avg_rating']:.2f}" if week["avg_rating"] is not None else "-"
+            self.trend_tree.insert("", tk.END, values=(week["week_start"], week["reviews_count"], avg_rating))
+        self.latest_text.config(state=tk.NORMAL)
+        self.latest_text.delete("1.0", tk.END)
+        self.latest_text.insert(tk.END, "Последние отзывы:\n")
+        for review in result["latest_reviews"]:
+            self.latest_text.insert(tk.END, f"{review['date']} ({review['rating']}/5): {review['comment']}\n")
+        self.latest_text.config(state=tk.DISABLED)
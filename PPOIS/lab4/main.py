@@ -6,4 +6,5 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from cli.main import main as cli_main
 
 if __name__ == "__main__":
-    cli_main()
+    # python main.py [файл состояния], например system_state.db - хранение в SQLite
+    cli_main(*sys.argv[1:2])
@@ -0,0 +1,544 @@
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+import pytest
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+from domain import certificate as certificate_module
+from domain.certificate import Certificate, current_date
+from domain.compliance_matrix import ATTRIBUTE_LEVELS
+from domain.events import DEBUG, INFO, WARNING, ERROR, Event, EventSink, JsonlEventWriter
+from domain.expiry_scheduler import CertificateExpiryScheduler
+from domain.product import Product
+from domain.quality_standard import GOSTStandard, QualityStandard
+from domain.quality_controller import QualityController
+from domain.rating_stats import RECENT_HALF_LIVES, RatingStats
+from domain.product_registry import ProductRegistry
+from domain.domain_errors import DuplicateProductError
+from domain.binary_state import convert_binary_to_json, convert_json_to_binary
+import convert_state
+
+# Условная дата для тестов сертификатов
+TODAY = date(2024, 5, 6)
+
+
+@pytest.fixture
+def controller():
+    """Контроллер с продуктами, пронумерованными с 1"""
+    Product._id_counter = 1
+    return QualityController()
+
+
+def fill(controller, count=5):
+    """Продукты с отзывами, сертификатом и проверкой качества"""
+    for i in range(count):
+        product = controller.add_product(f"Хлеб {i}")
+        controller.add_review(product.product_id, "Иван", f"Отзыв {i}", 1 + i % 5)
+        if i % 2 == 0:
+            controller.improve_product(product.product_id, GOSTStandard())
+            controller.certify_product(product.product_id, GOSTStandard())
+            controller.add_quality_check(product.product_id, "dough", {"passed": True})
+
+
+def snapshot(controller):
+    """Состояние контроллера без служебных полей"""
+    state = controller._state_snapshot()
+    state.pop("system_metadata")
+    state.pop("journal_seq", None)
+    return state
+
+# ==================== ТЕСТЫ PRODUCT REGISTRY ====================
+
+def test_registry_rejects_duplicate_id():
+    """Продукт с занятым ID не заменяет существующий"""
+    registry = ProductRegistry()
+    first = Product("Хлеб")
+    registry.add(first)
+    duplicate = Product("Батон")
+    duplicate.product_id = first.product_id
+    with pytest.raises(DuplicateProductError):
+        registry.add(duplicate)
+    assert registry.get(first.product_id) is first
+    assert len(registry) == 1
+
+# ==================== ТЕСТЫ СОСТОЯНИЯ ====================
+
+def test_failed_load_keeps_products_and_id_counter(controller, tmp_path):
+    """Неудачная загрузка не меняет реестр и счетчик ID"""
+    first = controller.add_product("Хлеб")
+    controller.add_product("Батон")
+    counter = Product._id_counter
+    broken = tmp_path / "broken.json"
+    broken.write_text(json.dumps({"products": [{"product_id": "1", "name": "Торт"}]}), encoding="utf-8")
+
+    assert not controller.load_state(str(broken))
+    assert Product._id_counter == counter
+    assert controller.get_product(first.product_id) is first
+    third = controller.add_product("Пирог")
+    assert len(controller.products) == 3
+    assert third.product_id not in (first.product_id, "2")
+
+
+def test_load_state_with_duplicate_ids_fails(controller, tmp_path):
+    """Файл с повторяющимся ID продукта не загружается"""
+    controller.add_product("Хлеб")
+    path = tmp_path / "state.json"
+    controller.save_state(str(path))
+    state = json.loads(path.read_text(encoding="utf-8"))
+    state["products"].append(state["products"][0])
+    path.write_text(json.dumps(state), encoding="utf-8")
+
+    assert not controller.load_state(str(path))
+    assert len(controller.products) == 1
+
+# ==================== ТЕСТЫ ЖУРНАЛА ====================
+
+def test_journal_replay(controller, tmp_path):
+    """Изменения восстанавливаются из контрольной точки и журнала"""
+    filename = str(tmp_path / "state.json")
+    controller.open_journal(filename)
+    fill(controller)
+    expected = snapshot(controller)
+    controller.close_journal()
+
+    reopened = QualityController()
+    assert reopened.open_journal(filename)
+    assert snapshot(reopened) == expected
+    reopened.close_journal()
+
+
+def test_journal_replay_skips_torn_last_line(controller, tmp_path):
+    """Оборванная при сбое последняя строка журнала пропускается и обрезается"""
+    filename = str(tmp_path / "state.json")
+    controller.open_journal(filename)
+    fill(controller)
+    expected = snapshot(controller)
+    controller.close_journal()
+    with open(filename + ".journal", "a", encoding="utf-8") as f:
+        f.write('{"seq": 1000, "op": "add_pro')
+
+    reopened = QualityController()
+    assert reopened.open_journal(filename)
+    assert snapshot(reopened) == expected
+    product = reopened.add_product("Батон")
+    expected = snapshot(reopened)
+    reopened.close_journal()
+
+    again = QualityController()
+    assert again.open_journal(filename)
+    assert again.get_product(product.product_id).name == "Батон"
+    assert snapshot(again) == expected
+    again.close_journal()
+
+
+def test_checkpoint_keeps_history_at_snapshot_time(controller, tmp_path):
+    """История в контрольной точке - на момент снимка, хотя кодируется позже в потоке записи"""
+    fill(controller)
+    filename = str(tmp_path / "state.json")
+    controller.open_journal(filename, checkpoint_every=1)
+    controller.journal.close()
+    expected = snapshot(controller)
+    state = controller._state_snapshot(lazy=True)
+    controller.add_review("1", "Петр", "Поздний отзыв", 5)
+    controller.improve_product("2", GOSTStandard())
+    controller.certify_product("2", GOSTStandard())
+    controller.journal._write_checkpoint(state)
+
+    restored = QualityController()
+    assert restored.load_state(filename)
+    assert snapshot(restored) == expected
+
+
+def test_load_and_save_refuse_live_state_file(controller, tmp_path):
+    """Текущий файл состояния нельзя загрузить или перезаписать: записи журнала после контрольной точки пропали бы"""
+    filename = str(tmp_path / "state.json")
+    controller.open_journal(filename)
+    product = controller.add_product("Хлеб")
+    controller.add_review(product.product_id, "Иван", "Свежий", 5)
+    controller.flush_journal()
+
+    assert not controller.load_state(filename)
+    assert controller.events.recent(1)[-1].kind == "state.in_use"
+    assert not controller.save_state(filename)
+    assert not controller.save_binary_state(filename + ".journal")
+    assert len(controller.products) == 1
+    expected = snapshot(controller)
+    controller.close_journal()
+
+    reopened = QualityController()
+    assert reopened.open_journal(filename)
+    assert snapshot(reopened) == expected
+    reopened.close_journal()
+
+
+def test_failed_open_journal(controller, tmp_path):
+    """Нечитаемый файл состояния не открывается, журнал не подключается"""
+    filename = tmp_path / "state.json"
+    filename.write_text("не JSON", encoding="utf-8")
+    assert not controller.open_journal(str(filename))
+    assert controller.journal is None
+    assert controller.events.recent(1)[-1].kind == "state.error"
+    assert filename.read_text(encoding="utf-8") == "не JSON"
+
+
+def test_journal_write_error_is_reported_and_state_recovered(controller, tmp_path):
+    """Ошибка записи журнала сообщается при следующем изменении, состояние сохраняется при выходе"""
+    filename = str(tmp_path / "state.json")
+    controller.open_journal(filename)
+    with patch.object(controller.journal, "_write", side_effect=OSError("Нет места на диске")):
+        controller.add_product("Хлеб")
+        controller.flush_journal()
+    assert controller.journal.error is not None
+
+    controller.add_product("Батон")
+    assert controller.journal is None
+    assert controller.events.recent(1)[-1].kind == "journal.error"
+    expected = snapshot(controller)
+    controller.close_journal()
+
+    assert os.path.exists(str(tmp_path / "state.recovered.json"))
+    recovered = QualityController()
+    assert recovered.load_state(str(tmp_path / "state.recovered.json"))
+    assert snapshot(recovered) == expected
+
+# ==================== ТЕСТЫ ФОРМАТОВ СОСТОЯНИЯ ====================
+
+def test_line_format_round_trip(controller, tmp_path):
+    """JSON -> файл по строкам -> новая контрольная точка из непрочитанной истории -> JSON"""
+    fill(controller)
+    expected = snapshot(controller)
+    controller.save_state(str(tmp_path / "state.json"))
+    lines = str(tmp_path / "state.lines")
+    stored = QualityController()
+    stored.open_journal(lines)
+    assert stored.load_state(str(tmp_path / "state.json"))
+    stored.close_journal()
+
+    reopened = QualityController()
+    assert reopened.open_journal(lines)
+    assert all(product.lazy_history is not None for product in reopened.products)
+    reopened.journal.checkpoint(reopened._state_snapshot(lazy=True))
+    reopened.close_journal()
+
+    loaded = QualityController()
+    assert loaded.load_state(lines)
+    loaded.save_state(str(tmp_path / "again.json"))
+    assert snapshot(loaded) == expected
+    again = QualityController()
+    assert again.load_state(str(tmp_path / "again.json"))
+    assert snapshot(again) == expected
+
+def test_binary_round_trip(controller, tmp_path):
+    """Двоичный снимок читается без изменений и конвертируется в JSON и обратно"""
+    fill(controller)
+    expected = snapshot(controller)
+    controller.save_binary_state(str(tmp_path / "state.bin"))
+
+    loaded = QualityController()
+    assert loaded.load_state(str(tmp_path / "state.bin"))
+    assert snapshot(loaded) == expected
+    convert_binary_to_json(str(tmp_path / "state.bin"), str(tmp_path / "state.json"))
+    convert_json_to_binary(str(tmp_path / "state.json"), str(tmp_path / "again.bin"))
+    for filename in ("state.json", "again.bin"):
+        converted = QualityController()
+        assert converted.load_state(str(tmp_path / filename))
+        assert snapshot(converted) == expected
+
+
+def test_review_columns_keep_history_lazy(controller, tmp_path):
+    """Аналитика отзывов после загрузки не загружает историю в продукты"""
+    fill(controller, count=10)
+    expected = controller.rank_products_by_rating(days=1, k=3)
+    controller.save_state(str(tmp_path / "state.json"))
+    lines = str(tmp_path / "state.lines")
+    stored = QualityController()
+    stored.open_journal(lines)
+    assert stored.load_state(str(tmp_path / "state.json"))
+    stored.close_journal()
+
+    loaded = QualityController()
+    assert loaded.load_state(lines)
+    ranked = loaded.rank_products_by_rating(days=1, k=3)
+    assert [(product.product_id, average, count) for product, average, count in ranked] == \
+        [(product.product_id, average, count) for product, average, count in expected]
+    assert all(product.lazy_history is not None for product in loaded.products)
+    assert loaded.latest_reviews("1") == controller.latest_reviews("1")
+
+
+def test_convert_journal_state_to_binary(controller, tmp_path):
+    """convert_state.py to-binary читает контрольную точку вместе с журналом после нее"""
+    filename = str(tmp_path / "state.json")
+    controller.open_journal(filename)
+    fill(controller)
+    expected = snapshot(controller)
+    controller.close_journal()
+    assert os.path.getsize(filename + ".journal") > 0
+
+    loaded = QualityController()
+    assert loaded.load_state(filename)
+    assert snapshot(loaded) == expected
+    binary = str(tmp_path / "state.bin")
+    with patch.object(sys, "argv", ["convert_state.py", "to-binary", filename, binary]):
+        convert_state.main()
+    converted = QualityController()
+    assert converted.load_state(binary)
+    assert snapshot(converted) == expected
+
+
+def test_sqlite_round_trip(controller, tmp_path):
+    """Состояние переносится из JSON в базу SQLite и читается из нее без изменений"""
+    fill(controller)
+    expected = snapshot(controller)
+    controller.save_state(str(tmp_path / "state.json"))
+    database = str(tmp_path / "state.db")
+    stored = QualityController()
+    stored.open_journal(database)
+    assert stored.load_state(str(tmp_path / "state.json"))
+    stored.close_journal()
+
+    loaded = QualityController()
+    assert loaded.load_state(database)
+    assert snapshot(loaded) == expected
+    reopened = QualityController()
+    assert reopened.open_journal(database)
+    assert snapshot(reopened) == expected
+    reopened.close_journal()
+
+
+def test_load_state_does_not_modify_foreign_database(controller, tmp_path):
+    """load_state открывает базу только для чтения: таблицы не создаются, режим журнала не меняется"""
+    database = str(tmp_path / "other.db")
+    connection = sqlite3.connect(database)
+    connection.execute("CREATE TABLE notes (text TEXT)")
+    connection.commit()
+    connection.close()
+    with open(database, "rb") as f:
+        content = f.read()
+
+    assert not controller.load_state(database)
+    with open(database, "rb") as f:
+        assert f.read() == content
+    assert not os.path.exists(database + "-wal")
+
+# ==================== ТЕСТЫ СЕРТИФИКАТОВ ====================
+
+def make_certificate(product, stage, expiration_date):
+    """Сертификат этапа с заданным сроком действия"""
+    certificate = Certificate(product.product_id, GOSTStandard(), stage)
+    certificate.expiration_date = expiration_date
+    return certificate
+
+
+def test_stage_index_matches_certificate_scan(controller):
+    """Индекс этапов отвечает так же, как перебор всех сертификатов продукта"""
+    rng = random.Random(41)
+    product = controller.add_product("Хлеб")
+    scheduler = CertificateExpiryScheduler()
+    for day in range(0, 90, 3):
+        today = TODAY + timedelta(days=day)
+        for _ in range(rng.randint(0, 3)):
+            stage = rng.choice(Product.PRODUCTION_STAGES)
+            certificate = make_certificate(product, stage, today + timedelta(days=rng.randint(-5, 30)))
+            product.add_certificate(certificate)
+            scheduler.add(product, certificate)
+        scheduler.sweep(today)
+        for stage in Product.PRODUCTION_STAGES:
+            valid = [c for c in product.certificates if c.stage == stage and c.is_valid(today)]
+            assert product.has_valid_certificate(stage, today) == bool(valid)
+            if valid:
+                best = product.get_stage_certificate(stage)
+                assert best.expiration_date == max(c.expiration_date for c in valid)
+
+
+def test_current_date_rolls_over_at_midnight():
+    """Кэш текущей даты обновляется после полуночи и при переводе часов назад"""
+    midnight = datetime(2024, 5, 7).timestamp()
+    with patch.object(certificate_module, "_today_cache", (date.min, 0.0, 0.0)), \
+            patch.object(certificate_module.time, "time") as clock:
+        clock.return_value = midnight - 1
+        assert current_date() == date(2024, 5, 6)
+        certificate = Certificate("1", GOSTStandard(), "dough")
+        assert certificate.issue_date == date(2024, 5, 6)
+        assert certificate.certificate_id == "CERT-1-20240506"
+        clock.return_value = midnight
+        assert current_date() == date(2024, 5, 7)
+        clock.return_value = midnight + 86399
+        assert current_date() == date(2024, 5, 7)
+        clock.return_value = midnight - 1
+        assert current_date() == date(2024, 5, 6)
+    assert current_date() == date.today()
+
+
+def test_expiry_scheduler_matches_scan(controller):
+    """expiring_within и sweep находят те же сертификаты, что и перебор"""
+    rng = random.Random(42)
+    scheduler = CertificateExpiryScheduler()
+    certificates = []
+    for i in range(20):
+        product = controller.add_product(f"Хлеб {i}")
+        for _ in range(rng.randint(0, 6)):
+            stage = rng.choice(Product.PRODUCTION_STAGES)
+            certificate = make_certificate(product, stage, TODAY + timedelta(days=rng.randint(-5, 60)))
+            product.add_certificate(certificate)
+            scheduler.add(product, certificate)
+            certificates.append((product, certificate))
+
+    # Очередь, построенная по индексам этапов, содержит только лучшие сертификаты этапов
+    rebuilt = CertificateExpiryScheduler()
+    rebuilt.rebuild(controller.products)
+    window = [c for p in controller.products for c in p.stage_certificates()
+              if TODAY <= c.expiration_date <= TODAY + timedelta(days=20)]
+    assert window
+    assert sorted(id(c) for _, c in rebuilt.expiring_within(20, TODAY)) == sorted(id(c) for c in window)
+
+    swept = set()
+    for day in range(0, 70, 3):
+        today = TODAY + timedelta(days=day)
+        window = [c for _, c in certificates if today <= c.expiration_date <= today + timedelta(days=10)]
+        found = scheduler.expiring_within(10, today)
+        assert sorted(id(c) for _, c in found) == sorted(id(c) for c in window)
+        assert [c.expiration_date for _, c in found] == sorted(c.expiration_date for c in window)
+        assert all(p.product_id == c.product_id for p, c in found)
+
+        expected = {id(c) for _, c in certificates if c.expiration_date < today and id(c) not in swept}
+        expired = scheduler.sweep(today)
+        assert {id(c) for _, c in expired} == expected
+        swept |= expected
+        assert all(c.expired == (c.expiration_date < today) for _, c in certificates)
+        assert scheduler.sweep_if_due(today) == []
+
+# ==================== ТЕСТЫ МАССОВОЙ ПРОВЕРКИ ====================
+
+def assert_bulk_matches_single(controller, standards):
+    """Каждая строка массовой проверки совпадает с проверкой продуктов по одному"""
+    result = controller.check_compliance_bulk(standards)
+    for index, standard in enumerate(standards):
+        expected = {}
+        for product in controller.products:
+            passed, failed = controller._check_compliance_without_exception(product.product_id, standard)
+            expected[product.product_id] = (passed, sorted(failed))
+        assert sorted(result.passed_ids(index)) == sorted(pid for pid, (passed, _) in expected.items() if passed)
+        assert {pid: sorted(failed) for pid, failed in result.failed(index)} == \
+            {pid: failed for pid, (passed, failed) in expected.items() if not passed}
+        assert result.count_passed()[index] == sum(passed for passed, _ in expected.values())
+
+
+def test_bulk_compliance_matches_single_checks(controller):
+    """check_compliance_bulk согласован с проверкой каждого продукта отдельно"""
+    rng = random.Random(43)
+    for i in range(30):
+        product = controller.add_product(f"Хлеб {i}")
+        for attribute, levels in ATTRIBUTE_LEVELS.items():
+            product.update_attribute(attribute, rng.choice(levels))
+    standards = list(controller.quality_standards.values()) + [
+        QualityStandard("Частичный", {"defects": "few", "taste": "poor"}),
+        QualityStandard("Незнакомое значение", {"smell": "fresh"})
+    ]
+    assert_bulk_matches_single(controller, standards)
+    assert controller.check_compliance_bulk().standards == list(controller.quality_standards.values())
+
+    # Изменения после построения матрицы: улучшение продуктов и новые продукты
+    for product in rng.sample(list(controller.products), 10):
+        controller.improve_product(product.product_id, rng.choice(standards[:3]))
+    for i in range(20):
+        controller.add_product(f"Батон {i}")
+    assert_bulk_matches_single(controller, standards)
+
+# ==================== ТЕСТЫ СОБЫТИЙ ====================
+
+def test_event_sink_filters_by_level_and_kind():
+    """Буфер и подписчики получают только события своего уровня и вида"""
+    sink = EventSink(level=WARNING)
+    everything, issued = [], []
+
+    def on_any(event):
+        everything.append(event.message)
+
+    def on_issued(event):
+        issued.append(event.message)
+
+    sink.subscribe(on_any, level=DEBUG)
+    sink.subscribe(on_issued, level=INFO, kinds=["certificate.issued"])
+    assert sink.enabled(DEBUG)
+    sink.debug("compliance.criterion", "критерий")
+    sink.info("certificate.issued", "выдан")
+    sink.info("product.added", "добавлен")
+    sink.warning("certificate.issued", "выдан повторно")
+    sink.error("state.in_use", "файл занят")
+
+    assert everything == ["критерий", "выдан", "добавлен", "выдан повторно", "файл занят"]
+    assert issued == ["выдан", "выдан повторно"]
+    assert [e.message for e in sink.recent()] == ["выдан повторно", "файл занят"]
+    assert [e.message for e in sink.recent(level=ERROR)] == ["файл занят"]
+    assert [e.message for e in sink.recent(1)] == ["файл занят"]
+    assert sink.recent(0) == []
+
+    sink.unsubscribe(on_any)
+    assert not sink.enabled(DEBUG) and sink.enabled(INFO)
+    sink.debug("compliance.criterion", "не нужен")
+    assert everything[-1] == "файл занят"
+
+
+def test_event_writer_flushes_on_close(tmp_path):
+    """close дописывает очередь в файл, не дожидаясь интервала записи"""
+    path = tmp_path / "events.jsonl"
+    writer = JsonlEventWriter(str(path), flush_interval=60)
+    for i in range(3):
+        writer.put(Event(INFO, "product.added", f"Продукт {i}", {"product_id": str(i)}))
+    started = time.monotonic()
+    writer.close()
+    assert time.monotonic() - started < 5
+    writer.close()
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [(line["level"], line["kind"], line["product_id"]) for line in lines] == \
+        [("INFO", "product.added", str(i)) for i in range(3)]
+
+    sink = EventSink()
+    sink.start_writer(str(path), level=WARNING)
+    sink.info("product.added", "Продукт 3")
+    sink.error("state.in_use", "Файл занят", filename="state.json")
+    sink.close()
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert len(lines) == 4
+    assert lines[-1]["message"] == "Файл занят" and lines[-1]["filename"] == "state.json"
+
+# ==================== ТЕСТЫ СТАТИСТИКИ ОТЗЫВОВ ====================
+
+def assert_stats_match(stats, reviews):
+    """Агрегаты совпадают с пересчетом по всем отзывам"""
+    ratings = [rating for rating, _ in reviews]
+    assert stats.count == len(ratings)
+    assert stats.histogram == [ratings.count(r) for r in range(1, 6)]
+    assert stats.average == pytest.approx(sum(ratings) / len(ratings))
+    last = max(when for _, when in reviews)
+    for half_life in RECENT_HALF_LIVES:
+        weights = [0.5 ** ((last - when).total_seconds() / 86400 / half_life) for _, when in reviews]
+        expected = sum(w * rating for w, rating in zip(weights, ratings)) / sum(weights)
+        assert stats.recent_average(half_life) == pytest.approx(expected)
+
+
+def test_rating_stats_match_recomputation():
+    """RatingStats при добавлении не по порядку и после from_data совпадает с пересчетом"""
+    rng = random.Random(49)
+    start = datetime(2024, 1, 1)
+    reviews = [(rng.randint(1, 5), start + timedelta(hours=rng.randint(0, 24 * 120))) for _ in range(200)]
+
+    stats = RatingStats()
+    assert stats.average is None and stats.recent_average() is None
+    for i, (rating, when) in enumerate(reviews[:100]):
+        stats.add(rating, when)
+        if i % 10 == 9:
+            assert_stats_match(stats, reviews[:i + 1])
+
+    restored = RatingStats.from_data(json.loads(json.dumps(stats.to_data())))
+    assert_stats_match(restored, reviews[:100])
+    for rating, when in reviews[100:]:
+        restored.add(rating, when)
+    assert_stats_match(restored, reviews)
+
+    data = stats.to_data()
+    data["half_lives"] = [1]
+    assert RatingStats.from_data(data) is None